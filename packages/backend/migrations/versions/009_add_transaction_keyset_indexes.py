@@ -0,0 +1,35 @@
+"""Add keyset pagination indexes to transactions
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create (sort key, id) indexes used by cursor pagination."""
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transaction_date_id "
+            "ON transactions (date, id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transaction_amount_id "
+            "ON transactions (amount, id)"
+        )
+
+
+def downgrade() -> None:
+    """Drop cursor pagination indexes."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_transaction_amount_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_transaction_date_id")
@@ -0,0 +1,54 @@
+"""Add full-text and trigram search indexes to transactions
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+
+Adding the generated column rewrites the transactions table once; the
+indexes themselves are built concurrently.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add search_vector column, GIN full-text index and trigram index."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.execute("""
+        ALTER TABLE transactions
+        ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(merchant_name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(original_description, '')), 'B')
+        ) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transaction_search_vector "
+            "ON transactions USING gin (search_vector)"
+        )
+        # Expression must match SEARCH_DOCUMENT in services/transaction_search.py
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transaction_search_trgm
+            ON transactions USING gin (
+                (coalesce(name, '') || ' ' ||
+                 coalesce(merchant_name, '') || ' ' ||
+                 coalesce(original_description, '')) gin_trgm_ops
+            )
+        """)
+
+
+def downgrade() -> None:
+    """Remove search indexes and column."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_transaction_search_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_transaction_search_vector")
+    op.execute("ALTER TABLE transactions DROP COLUMN IF EXISTS search_vector")
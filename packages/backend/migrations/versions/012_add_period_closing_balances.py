@@ -0,0 +1,43 @@
+"""Add period closing balances
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create per-account closing balance snapshots for closed periods."""
+    op.create_table('period_closing_balances',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('period_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('chart_account_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('period_debits', sa.Numeric(15, 2), nullable=False),
+        sa.Column('period_credits', sa.Numeric(15, 2), nullable=False),
+        sa.Column('debit_total', sa.Numeric(15, 2), nullable=False),
+        sa.Column('credit_total', sa.Numeric(15, 2), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['period_id'], ['accounting_periods.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['chart_account_id'], ['chart_of_accounts.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('period_id', 'chart_account_id', name='uq_period_closing_balance_account')
+    )
+    # Closing totals are grouped from posted entries by user and date
+    op.create_index('ix_journal_entries_user_posted_date', 'journal_entries',
+                    ['user_id', 'is_posted', 'entry_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop period closing balances."""
+    op.drop_index('ix_journal_entries_user_posted_date', table_name='journal_entries')
+    op.drop_table('period_closing_balances')
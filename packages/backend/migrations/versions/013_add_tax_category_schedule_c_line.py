@@ -0,0 +1,33 @@
+"""Add normalized Schedule C line to tax categories
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Store each Schedule C category's line number so exports can group on it."""
+    op.add_column('tax_categories', sa.Column('schedule_c_line', sa.String(10), nullable=True))
+    op.execute(
+        "UPDATE tax_categories "
+        "SET schedule_c_line = substring(tax_line from '[0-9]+') "
+        "WHERE tax_form = 'Schedule C'"
+    )
+    op.create_index('idx_tax_categories_schedule_c_line', 'tax_categories',
+                    ['schedule_c_line'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the Schedule C line column."""
+    op.drop_index('idx_tax_categories_schedule_c_line', table_name='tax_categories')
+    op.drop_column('tax_categories', 'schedule_c_line')
@@ -0,0 +1,316 @@
+"""Partition transactions by date
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18
+
+Moves transactions into a table range partitioned on date while the table
+stays writable:
+
+1. transactions_partitioned is created with one partition per year (or per
+   month with TRANSACTION_PARTITION_INTERVAL=month) from the oldest
+   transaction through the next interval, a DEFAULT partition and copies of
+   the table's indexes.
+2. A trigger mirrors every write on transactions into it.
+3. Existing rows are copied in batches of TRANSACTION_BACKFILL_BATCH_SIZE,
+   each batch committed on its own.
+4. The tables are swapped under a short ACCESS EXCLUSIVE lock.
+
+Unique constraints on a partitioned table must include the partition key,
+so the primary key becomes (id, date) and plaid_transaction_id is unique
+per date; sync already looks transactions up by plaid_transaction_id before
+inserting. Foreign keys cannot reference transactions.id alone any more:
+they are dropped, their definitions are kept in transactions_partitioning_fks
+for downgrade, and their ON DELETE actions are applied by a trigger.
+Inserts and updates of the referencing columns are checked by the triggers
+from migration 018.
+
+The original table is kept as transactions_unpartitioned; drop it once the
+partitioned table has been verified. Downgrade copies the rows back and
+needs it. Later partitions are created by ensure_transaction_partitions
+(src/database/partitioning.py) on startup and from
+scripts/manage_transaction_partitions.py.
+"""
+import os
+import re
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+INTERVAL = os.getenv("TRANSACTION_PARTITION_INTERVAL", "year")
+BATCH_SIZE = int(os.getenv("TRANSACTION_BACKFILL_BATCH_SIZE", "5000"))
+
+TABLE = "transactions"
+NEW_TABLE = "transactions_partitioned"
+OLD_TABLE = "transactions_unpartitioned"
+FK_TABLE = "transactions_partitioning_fks"
+DEFAULT_PARTITION = "transactions_default"
+
+MIRROR_FUNCTION = "transactions_mirror_to_partitioned"
+DELETE_FUNCTION = "transactions_delete_dependents"
+
+_FK_ACTIONS = {
+    "c": "DELETE FROM {table} WHERE {column} = OLD.id;",
+    "n": "UPDATE {table} SET {column} = NULL WHERE {column} = OLD.id;",
+    "d": "UPDATE {table} SET {column} = DEFAULT WHERE {column} = OLD.id;",
+}
+_FK_RESTRICT = """
+        IF EXISTS (SELECT 1 FROM {table} WHERE {column} = OLD.id) THEN
+            RAISE EXCEPTION 'transaction % is still referenced from {table}', OLD.id
+                USING ERRCODE = 'foreign_key_violation';
+        END IF;"""
+
+
+def _partition_start(day):
+    if INTERVAL not in ("year", "month"):
+        raise ValueError("TRANSACTION_PARTITION_INTERVAL must be year or month")
+    return date(day.year, 1, 1) if INTERVAL == "year" else date(day.year, day.month, 1)
+
+
+def _next_partition_start(start):
+    if INTERVAL == "year" or start.month == 12:
+        return date(start.year + 1, 1, 1)
+    return date(start.year, start.month + 1, 1)
+
+
+def _partition_ranges(first_day, last_day):
+    """(name, start, end) of each partition; names match src/database/partitioning.py."""
+    start = _partition_start(first_day)
+    ranges = []
+    while start <= last_day:
+        end = _next_partition_start(start)
+        suffix = f"y{start.year}" if INTERVAL == "year" else f"y{start.year}m{start.month:02d}"
+        ranges.append((f"{TABLE}_{suffix}", start, end))
+        start = end
+    return ranges
+
+
+def _columns(bind, table):
+    """Columns accepting values, in table order (generated columns excluded)."""
+    return list(bind.execute(sa.text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table "
+        "AND is_generated = 'NEVER' ORDER BY ordinal_position"
+    ), {"table": table}).scalars())
+
+
+def _plain_indexes(bind, table):
+    """(name, definition) of the non-unique indexes on ``table``."""
+    return bind.execute(sa.text(
+        "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE i.indrelid = to_regclass(:table) AND NOT i.indisunique"
+    ), {"table": table}).all()
+
+
+def _outgoing_foreign_keys(bind):
+    """(name, definition) of foreign keys from transactions to other tables."""
+    return bind.execute(sa.text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE contype = 'f' AND conrelid = to_regclass(:table) "
+        "AND confrelid <> to_regclass(:table)"
+    ), {"table": TABLE}).all()
+
+
+def _incoming_foreign_keys(bind):
+    """(table, name, definition, column, on delete) of foreign keys to transactions."""
+    return bind.execute(sa.text(
+        "SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid), "
+        "a.attname, c.confdeltype FROM pg_constraint c "
+        "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] "
+        "WHERE c.contype = 'f' AND c.confrelid = to_regclass(:table)"
+    ), {"table": TABLE}).all()
+
+
+def _user_triggers(bind, table):
+    """Definitions of the triggers created on ``table`` outside this migration."""
+    return list(bind.execute(sa.text(
+        "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+        "WHERE tgrelid = to_regclass(:table) AND NOT tgisinternal "
+        "AND tgname NOT IN ('transactions_mirror', 'transactions_delete_dependents')"
+    ), {"table": table}).scalars())
+
+
+def _create_partitioned_table(bind):
+    op.execute(
+        f"CREATE TABLE {NEW_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS "
+        "INCLUDING GENERATED INCLUDING CONSTRAINTS) PARTITION BY RANGE (date)"
+    )
+    op.execute(f"ALTER TABLE {NEW_TABLE} ADD PRIMARY KEY (id, date)")
+    op.execute(
+        f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT uq_transactions_plaid_transaction_id_date "
+        "UNIQUE (plaid_transaction_id, date)"
+    )
+
+    first_day = bind.execute(sa.text(f"SELECT min(date) FROM {TABLE}")).scalar() or date.today()
+    last_day = _next_partition_start(_partition_start(date.today()))
+    for name, start, end in _partition_ranges(first_day, last_day):
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF {NEW_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {NEW_TABLE} DEFAULT")
+
+    # The tables are still empty, so plain CREATE INDEX is quick
+    for name, definition in _plain_indexes(bind, TABLE):
+        op.execute(re.sub(
+            r"^CREATE INDEX \S+ ON (?:ONLY )?\S+ ",
+            f"CREATE INDEX {name}_p ON {NEW_TABLE} ",
+            definition
+        ))
+
+    for name, definition in _outgoing_foreign_keys(bind):
+        op.execute(f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {name} {definition}")
+
+
+def _create_mirror_trigger(columns):
+    column_list = ", ".join(columns)
+    values = ", ".join(f"NEW.{column}" for column in columns)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {MIRROR_FUNCTION}() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {NEW_TABLE} WHERE id = OLD.id AND date = OLD.date;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {NEW_TABLE} ({column_list}) VALUES ({values});
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        f"CREATE TRIGGER transactions_mirror AFTER INSERT OR UPDATE OR DELETE ON {TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION {MIRROR_FUNCTION}()"
+    )
+
+
+def _backfill(bind, columns):
+    """Copy existing rows in batches, committing each batch."""
+    column_list = ", ".join(columns)
+    last_id = None
+    with op.get_context().autocommit_block():
+        while True:
+            after = "" if last_id is None else "WHERE id > CAST(:after AS uuid)"
+            last_id = bind.execute(sa.text(f"""
+                WITH batch AS (
+                    SELECT {column_list} FROM {TABLE} {after}
+                    ORDER BY id LIMIT :limit FOR SHARE
+                ), copied AS (
+                    INSERT INTO {NEW_TABLE} ({column_list})
+                    SELECT {column_list} FROM batch
+                    ON CONFLICT (id, date) DO NOTHING
+                )
+                SELECT id FROM batch ORDER BY id DESC LIMIT 1
+            """), {"after": str(last_id), "limit": BATCH_SIZE}).scalar()
+            if last_id is None:
+                break
+
+
+def _create_delete_trigger(foreign_keys):
+    actions = []
+    for table, _name, _definition, column, on_delete in foreign_keys:
+        template = _FK_ACTIONS.get(on_delete, _FK_RESTRICT)
+        actions.append(template.format(table=table, column=column))
+    body = "\n            ".join(actions)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {DELETE_FUNCTION}() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Rows moving to another partition are deleted and re-inserted
+            IF EXISTS (SELECT 1 FROM {TABLE} WHERE id = OLD.id) THEN
+                RETURN NULL;
+            END IF;
+            {body}
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        f"CREATE TRIGGER transactions_delete_dependents AFTER DELETE ON {TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION {DELETE_FUNCTION}()"
+    )
+
+
+def _rename_indexes(bind, table, suffix_from, suffix_to):
+    for name, _definition in _plain_indexes(bind, table):
+        if name.endswith(suffix_from):
+            base = name[:len(name) - len(suffix_from)] if suffix_from else name
+            op.execute(f"ALTER INDEX {name} RENAME TO {base}{suffix_to}")
+
+
+def upgrade() -> None:
+    """Swap transactions for a table range partitioned on date."""
+    bind = op.get_bind()
+    columns = _columns(bind, TABLE)
+
+    _create_partitioned_table(bind)
+    _create_mirror_trigger(columns)
+    _backfill(bind, columns)
+
+    # Short swap; writes wait on the lock instead of failing
+    op.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+    op.execute(f"DROP TRIGGER transactions_mirror ON {TABLE}")
+    op.execute(f"DROP FUNCTION {MIRROR_FUNCTION}()")
+
+    foreign_keys = _incoming_foreign_keys(bind)
+    op.execute(f"CREATE TABLE {FK_TABLE} (table_name text, constraint_name text, definition text)")
+    for table, name, definition, _column, _on_delete in foreign_keys:
+        bind.execute(
+            sa.text(f"INSERT INTO {FK_TABLE} VALUES (:table, :name, :definition)"),
+            {"table": table, "name": name, "definition": definition}
+        )
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+
+    triggers = _user_triggers(bind, TABLE)
+
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+    op.execute(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT transactions_pkey TO {OLD_TABLE}_pkey")
+    _rename_indexes(bind, OLD_TABLE, "", "_old")
+
+    op.execute(f"ALTER TABLE {NEW_TABLE} RENAME TO {TABLE}")
+    op.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {NEW_TABLE}_pkey TO transactions_pkey")
+    _rename_indexes(bind, TABLE, "_p", "")
+
+    # Captured before the rename, so the definitions name the new table
+    for definition in triggers:
+        op.execute(definition)
+    _create_delete_trigger(foreign_keys)
+
+
+def downgrade() -> None:
+    """Copy rows back into the unpartitioned table and swap it back in (blocks writes)."""
+    bind = op.get_bind()
+    if bind.execute(sa.text("SELECT to_regclass(:table)"), {"table": OLD_TABLE}).scalar() is None:
+        raise RuntimeError(f"{OLD_TABLE} was dropped; restore it before downgrading")
+
+    op.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+    column_list = ", ".join(_columns(bind, OLD_TABLE))
+    op.execute(f"TRUNCATE {OLD_TABLE}")
+    op.execute(f"INSERT INTO {OLD_TABLE} ({column_list}) SELECT {column_list} FROM {TABLE}")
+
+    op.execute(f"DROP TRIGGER transactions_delete_dependents ON {TABLE}")
+    op.execute(f"DROP FUNCTION {DELETE_FUNCTION}()")
+
+    op.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT transactions_pkey TO {NEW_TABLE}_pkey")
+    _rename_indexes(bind, TABLE, "", "_p")
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {NEW_TABLE}")
+
+    op.execute(f"ALTER TABLE {OLD_TABLE} RENAME TO {TABLE}")
+    op.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {OLD_TABLE}_pkey TO transactions_pkey")
+    _rename_indexes(bind, TABLE, "_old", "")
+
+    for table, name, definition in bind.execute(
+        sa.text(f"SELECT table_name, constraint_name, definition FROM {FK_TABLE}")
+    ).all():
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    op.execute(f"DROP TABLE {FK_TABLE}")
+    op.execute(f"DROP TABLE {NEW_TABLE}")
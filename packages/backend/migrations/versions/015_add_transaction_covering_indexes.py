@@ -0,0 +1,87 @@
+"""Add covering and expression indexes for user-scoped transaction reads
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18
+
+The dashboard, stats and export queries filter on
+account_id IN (the user's accounts) AND date >= ... and aggregate amount by
+date or by coalesce(user_category_override, subcategory, 'Uncategorized').
+idx_transaction_account_date_cover serves the date-range reads as index-only
+scans; idx_transaction_account_category serves the category grouping.
+
+On the partitioned transactions table (014) CREATE INDEX CONCURRENTLY is not
+supported, so each index is created on the parent only, built concurrently on
+every partition and attached.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+# Must match the Index definitions on Transaction in src/database/models.py
+INDEXES = {
+    "idx_transaction_account_date_cover": (
+        "account_date_cover",
+        "(account_id, date DESC) INCLUDE (amount, subcategory, user_category_override, pending)",
+    ),
+    "idx_transaction_account_category": (
+        "account_category",
+        "(account_id, (coalesce(user_category_override, subcategory, 'Uncategorized')), date) "
+        "INCLUDE (amount)",
+    ),
+}
+
+
+def _partitions(bind):
+    """Partitions of transactions, or None when it is not partitioned."""
+    partitioned = bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass('transactions'))"
+    )).scalar()
+    if not partitioned:
+        return None
+    return list(bind.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('transactions') ORDER BY c.relname"
+    )).scalars())
+
+
+def upgrade() -> None:
+    """Create covering and expression indexes on transactions."""
+    bind = op.get_bind()
+    partitions = _partitions(bind)
+
+    if partitions is None:
+        with op.get_context().autocommit_block():
+            for name, (_, definition) in INDEXES.items():
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON transactions {definition}")
+        return
+
+    # The parent index stays invalid until every partition's index is attached
+    for name, (_, definition) in INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY transactions {definition}")
+    with op.get_context().autocommit_block():
+        for name, (suffix, definition) in INDEXES.items():
+            for partition in partitions:
+                child = f"{partition}_{suffix}"
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}")
+                op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+def downgrade() -> None:
+    """Drop covering and expression indexes."""
+    bind = op.get_bind()
+    if _partitions(bind) is None:
+        with op.get_context().autocommit_block():
+            for name in INDEXES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        return
+
+    # Dropping a partitioned index drops the attached partition indexes
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,146 @@
+"""Add user_id to transactions
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-18
+
+Copies accounts.user_id onto transactions so user-scoped reads filter one
+table instead of joining accounts. The column is added without a rewrite, a
+BEFORE INSERT trigger fills it for writers that do not set it, existing rows
+are backfilled in batches of TRANSACTION_BACKFILL_BATCH_SIZE committed one at
+a time, and the (user_id, ...) indexes are built concurrently. They replace
+the account_id based indexes from 015, whose queries now filter on user_id.
+
+The column stays nullable; the trigger keeps it populated.
+"""
+import os
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = int(os.getenv("TRANSACTION_BACKFILL_BATCH_SIZE", "5000"))
+
+# Must match the Index definitions on Transaction in src/database/models.py
+INDEXES = {
+    "idx_transaction_user_date": (
+        "user_date",
+        "(user_id, date DESC) INCLUDE (amount, subcategory, user_category_override, pending)",
+    ),
+    "idx_transaction_user_category": (
+        "user_category",
+        "(user_id, (coalesce(user_category_override, subcategory, 'Uncategorized')), date) "
+        "INCLUDE (amount)",
+    ),
+}
+REPLACED_INDEXES = {
+    "idx_transaction_account_date_cover": (
+        "account_date_cover",
+        "(account_id, date DESC) INCLUDE (amount, subcategory, user_category_override, pending)",
+    ),
+    "idx_transaction_account_category": (
+        "account_category",
+        "(account_id, (coalesce(user_category_override, subcategory, 'Uncategorized')), date) "
+        "INCLUDE (amount)",
+    ),
+}
+
+
+def _partitions(bind):
+    """Partitions of transactions, or None when it is not partitioned."""
+    partitioned = bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass('transactions'))"
+    )).scalar()
+    if not partitioned:
+        return None
+    return list(bind.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('transactions') ORDER BY c.relname"
+    )).scalars())
+
+
+def _create_indexes(bind, indexes):
+    partitions = _partitions(bind)
+    if partitions is None:
+        with op.get_context().autocommit_block():
+            for name, (_, definition) in indexes.items():
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON transactions {definition}")
+        return
+
+    for name, (_, definition) in indexes.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY transactions {definition}")
+    with op.get_context().autocommit_block():
+        for name, (suffix, definition) in indexes.items():
+            for partition in partitions:
+                child = f"{partition}_{suffix}"
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}")
+                op.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+
+def _drop_indexes(bind, indexes):
+    if _partitions(bind) is None:
+        with op.get_context().autocommit_block():
+            for name in indexes:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        return
+    for name in indexes:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    """Add, fill and index transactions.user_id."""
+    bind = op.get_bind()
+    op.execute("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS user_id uuid")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION transactions_set_user_id() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NEW.user_id IS NULL THEN
+                SELECT user_id INTO NEW.user_id FROM accounts WHERE id = NEW.account_id;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute(
+        "CREATE TRIGGER transactions_set_user_id BEFORE INSERT OR UPDATE OF account_id "
+        "ON transactions FOR EACH ROW EXECUTE FUNCTION transactions_set_user_id()"
+    )
+
+    # Walk the table in id order so each batch is an index range scan
+    last_id = None
+    with op.get_context().autocommit_block():
+        while True:
+            after = "" if last_id is None else "WHERE id > CAST(:after AS uuid)"
+            last_id = bind.execute(sa.text(f"""
+                WITH batch AS (
+                    SELECT id FROM transactions {after} ORDER BY id LIMIT :limit
+                ), filled AS (
+                    UPDATE transactions t SET user_id = a.user_id
+                    FROM accounts a
+                    WHERE t.id IN (SELECT id FROM batch)
+                    AND a.id = t.account_id AND t.user_id IS NULL
+                )
+                SELECT id FROM batch ORDER BY id DESC LIMIT 1
+            """), {"after": str(last_id), "limit": BATCH_SIZE}).scalar()
+            if last_id is None:
+                break
+
+    _create_indexes(bind, INDEXES)
+    _drop_indexes(bind, REPLACED_INDEXES)
+
+
+def downgrade() -> None:
+    """Restore the account_id indexes and drop transactions.user_id."""
+    bind = op.get_bind()
+    _create_indexes(bind, REPLACED_INDEXES)
+    _drop_indexes(bind, INDEXES)
+    op.execute("DROP TRIGGER IF EXISTS transactions_set_user_id ON transactions")
+    op.execute("DROP FUNCTION IF EXISTS transactions_set_user_id()")
+    op.execute("ALTER TABLE transactions DROP COLUMN IF EXISTS user_id")
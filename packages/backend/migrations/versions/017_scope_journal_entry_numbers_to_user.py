@@ -0,0 +1,32 @@
+"""Scope journal entry numbers to the user
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-18
+
+Entry numbers are allocated from a per-user sequence, so two users can both
+hold JE-YYYYMM-0001. The global unique constraint on entry_number is replaced
+by one on (user_id, entry_number), which also serves the allocator's
+per-user max lookup.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace the global entry_number constraint with a per-user one."""
+    op.drop_constraint('journal_entries_entry_number_key', 'journal_entries', type_='unique')
+    op.create_unique_constraint(
+        'uq_journal_entries_user_entry_number', 'journal_entries', ['user_id', 'entry_number']
+    )
+
+
+def downgrade() -> None:
+    """Restore the global entry_number constraint."""
+    op.drop_constraint('uq_journal_entries_user_entry_number', 'journal_entries', type_='unique')
+    op.create_unique_constraint('journal_entries_entry_number_key', 'journal_entries', ['entry_number'])
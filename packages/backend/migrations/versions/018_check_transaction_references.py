@@ -0,0 +1,88 @@
+"""Check references to transactions on insert and update
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-18
+
+Migration 014 dropped the foreign keys pointing at transactions.id, which
+cannot be referenced alone once the table is partitioned, and emulated only
+their ON DELETE actions. Each column those foreign keys covered (listed in
+transactions_partitioning_fks) now gets a BEFORE INSERT OR UPDATE trigger
+that rejects ids with no transaction. The transaction row is locked FOR KEY
+SHARE, as a foreign key check would, so a concurrent delete waits for the
+referencing write to finish.
+"""
+import re
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+FK_TABLE = "transactions_partitioning_fks"
+CHECK_FUNCTION = "transactions_check_reference"
+
+_FK_COLUMN = re.compile(r"FOREIGN KEY \((\w+)\)")
+
+
+def _references(bind):
+    """(table, column) of every foreign key migration 014 dropped."""
+    if bind.execute(sa.text("SELECT to_regclass(:table)"), {"table": FK_TABLE}).scalar() is None:
+        return []
+    references = []
+    for table, definition in bind.execute(
+        sa.text(f"SELECT table_name, definition FROM {FK_TABLE}")
+    ).all():
+        match = _FK_COLUMN.search(definition)
+        if match:
+            references.append((table, match.group(1)))
+    return references
+
+
+def _trigger_name(column):
+    return f"{column}_references_transaction"
+
+
+def upgrade() -> None:
+    """Add reference checks for the columns that lost their foreign keys."""
+    bind = op.get_bind()
+    references = _references(bind)
+    if not references:
+        return
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {CHECK_FUNCTION}() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            ref uuid := (to_jsonb(NEW) ->> TG_ARGV[0])::uuid;
+        BEGIN
+            IF ref IS NOT NULL THEN
+                PERFORM 1 FROM transactions WHERE id = ref FOR KEY SHARE;
+                IF NOT FOUND THEN
+                    RAISE EXCEPTION 'transaction % referenced from %.% does not exist',
+                        ref, TG_TABLE_NAME, TG_ARGV[0]
+                        USING ERRCODE = 'foreign_key_violation';
+                END IF;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """)
+    for table, column in references:
+        op.execute(
+            f"CREATE TRIGGER {_trigger_name(column)} "
+            f"BEFORE INSERT OR UPDATE OF {column} ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {CHECK_FUNCTION}('{column}')"
+        )
+
+
+def downgrade() -> None:
+    """Drop the reference checks."""
+    bind = op.get_bind()
+    for table, column in _references(bind):
+        op.execute(f"DROP TRIGGER IF EXISTS {_trigger_name(column)} ON {table}")
+    op.execute(f"DROP FUNCTION IF EXISTS {CHECK_FUNCTION}()")
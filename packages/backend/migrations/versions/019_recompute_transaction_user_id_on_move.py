@@ -0,0 +1,55 @@
+"""Recompute transactions.user_id when a transaction changes account
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-18
+
+The trigger from migration 016 fires on UPDATE OF account_id but only filled
+user_id when it was NULL, and on UPDATE it still holds the previous owner.
+Moving a transaction to another user's account kept the old user_id. The
+function now recomputes user_id whenever account_id changes, and rows
+already out of step with their account are repaired.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Recompute user_id on account moves and repair mismatched rows."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION transactions_set_user_id() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF (TG_OP = 'INSERT' AND NEW.user_id IS NULL)
+                    OR (TG_OP = 'UPDATE' AND NEW.account_id IS DISTINCT FROM OLD.account_id) THEN
+                SELECT user_id INTO NEW.user_id FROM accounts WHERE id = NEW.account_id;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        UPDATE transactions t SET user_id = a.user_id
+        FROM accounts a
+        WHERE a.id = t.account_id AND t.user_id IS DISTINCT FROM a.user_id
+    """)
+
+
+def downgrade() -> None:
+    """Restore the insert-only fill from migration 016."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION transactions_set_user_id() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF NEW.user_id IS NULL THEN
+                SELECT user_id INTO NEW.user_id FROM accounts WHERE id = NEW.account_id;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+    """)
@@ -16,7 +16,7 @@ class MLPrediction(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "ml_predictions"
     
     # Links
-    transaction_id = Column(UUID(as_uuid=True), ForeignKey("transactions.id"), nullable=False, index=True)
+    transaction_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # Checked by trigger (migration 018)
     category_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=False, index=True)
     
     # Model information
@@ -49,7 +49,11 @@ class MLPrediction(Base, UUIDMixin, TimestampMixin):
     review_reason = Column(String(100))  # Why it needs review
     
     # Relationships
-    transaction = relationship("Transaction", back_populates="ml_predictions")
+    transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(MLPrediction.transaction_id) == Transaction.id",
+        back_populates="ml_predictions"
+    )
     category = relationship("Category", back_populates="ml_predictions")
     
     # Indexes and constraints
@@ -6,30 +6,16 @@ from .database import engine
 
 
 class DatabaseOptimizer:
-    """Database performance optimization utilities."""
+    """Database performance optimization utilities.
+
+    Indexes for the API's transaction queries are maintained in the alembic
+    migrations and listed in src/database/index_advisor.py; see
+    scripts/index_advisor.py for missing and unused index reports. Indexes
+    here are skipped when a column they need does not exist.
+    """
     
     # Custom indexes beyond what's defined in models
     CUSTOM_INDEXES = [
-        # Transaction analysis indexes
-        {
-            "name": "idx_transactions_amount_date_business",
-            "table": "transactions",
-            "columns": ["amount", "date", "is_business"],
-            "description": "Optimize large transaction queries by business type"
-        },
-        {
-            "name": "idx_transactions_merchant_amount",
-            "table": "transactions", 
-            "columns": ["merchant_name", "amount"],
-            "description": "Fast merchant spending analysis"
-        },
-        {
-            "name": "idx_transactions_category_amount_date",
-            "table": "transactions",
-            "columns": ["category_id", "amount", "date"],
-            "description": "Category spending reports with amounts"
-        },
-        
         # ML prediction optimization
         {
             "name": "idx_ml_predictions_model_confidence_date",
@@ -94,25 +80,9 @@ class DatabaseOptimizer:
     # Partial indexes for better performance on filtered queries
     PARTIAL_INDEXES = [
         {
-            "name": "idx_transactions_pending_recent",
-            "sql": """
-                CREATE INDEX CONCURRENTLY idx_transactions_pending_recent 
-                ON transactions (account_id, date) 
-                WHERE is_pending = true AND date >= NOW() - INTERVAL '7 days'
-            """,
-            "description": "Recent pending transactions only"
-        },
-        {
-            "name": "idx_transactions_business_deductible",
-            "sql": """
-                CREATE INDEX CONCURRENTLY idx_transactions_business_deductible
-                ON transactions (category_id, amount, date)
-                WHERE is_business = true AND is_tax_deductible = true
-            """,
-            "description": "Business tax-deductible transactions for reporting"
-        },
-        {
-            "name": "idx_ml_predictions_low_confidence", 
+            "name": "idx_ml_predictions_low_confidence",
+            "table": "ml_predictions",
+            "columns": ["transaction_id", "confidence", "prediction_date", "requires_review"],
             "sql": """
                 CREATE INDEX CONCURRENTLY idx_ml_predictions_low_confidence
                 ON ml_predictions (transaction_id, confidence, prediction_date)
@@ -122,6 +92,8 @@ class DatabaseOptimizer:
         },
         {
             "name": "idx_plaid_items_needs_attention",
+            "table": "plaid_items",
+            "columns": ["user_id", "status", "last_sync_attempt", "requires_reauth"],
             "sql": """
                 CREATE INDEX CONCURRENTLY idx_plaid_items_needs_attention
                 ON plaid_items (user_id, status, last_sync_attempt)
@@ -133,16 +105,10 @@ class DatabaseOptimizer:
     
     # JSONB indexes for metadata queries
     JSONB_INDEXES = [
-        {
-            "name": "idx_transactions_location_gin",
-            "sql": """
-                CREATE INDEX CONCURRENTLY idx_transactions_location_gin
-                ON transactions USING gin (location_coordinates)
-            """,
-            "description": "Geographic transaction analysis"
-        },
         {
             "name": "idx_transactions_tags_gin",
+            "table": "transactions",
+            "columns": ["tags"],
             "sql": """
                 CREATE INDEX CONCURRENTLY idx_transactions_tags_gin
                 ON transactions USING gin (tags)
@@ -151,22 +117,25 @@ class DatabaseOptimizer:
         },
         {
             "name": "idx_users_preferences_gin",
+            "table": "users",
+            "columns": ["preferences"],
             "sql": """
                 CREATE INDEX CONCURRENTLY idx_users_preferences_gin
                 ON users USING gin (preferences)
             """,
             "description": "User preference queries"
-        },
-        {
-            "name": "idx_ml_predictions_features_gin",
-            "sql": """
-                CREATE INDEX CONCURRENTLY idx_ml_predictions_features_gin
-                ON ml_predictions USING gin (features_used)
-            """,
-            "description": "ML feature analysis"
         }
     ]
     
+    @classmethod
+    def _missing_columns(cls, session: Session, idx_config: dict) -> list:
+        """Columns of an index definition that do not exist in the database."""
+        existing = set(session.execute(text("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :table
+        """), {"table": idx_config["table"]}).scalars())
+        return [column for column in idx_config["columns"] if column not in existing]
+    
     @classmethod
     def create_performance_indexes(cls, session: Session) -> None:
         """Create all performance optimization indexes."""
@@ -175,6 +144,10 @@ class DatabaseOptimizer:
         
         # Create composite indexes
         for idx_config in cls.CUSTOM_INDEXES:
+            missing = cls._missing_columns(session, idx_config)
+            if missing:
+                print(f"- Skipped {idx_config['name']}: missing {idx_config['table']} columns {', '.join(missing)}")
+                continue
             try:
                 columns_str = ", ".join(idx_config["columns"])
                 sql = f"""
@@ -188,6 +161,10 @@ class DatabaseOptimizer:
         
         # Create partial indexes
         for idx_config in cls.PARTIAL_INDEXES:
+            missing = cls._missing_columns(session, idx_config)
+            if missing:
+                print(f"- Skipped {idx_config['name']}: missing {idx_config['table']} columns {', '.join(missing)}")
+                continue
             try:
                 session.execute(text(idx_config["sql"]))
                 print(f"✓ Created partial index: {idx_config['name']}")
@@ -196,6 +173,10 @@ class DatabaseOptimizer:
         
         # Create JSONB indexes
         for idx_config in cls.JSONB_INDEXES:
+            missing = cls._missing_columns(session, idx_config)
+            if missing:
+                print(f"- Skipped {idx_config['name']}: missing {idx_config['table']} columns {', '.join(missing)}")
+                continue
             try:
                 session.execute(text(idx_config["sql"]))
                 print(f"✓ Created JSONB index: {idx_config['name']}")
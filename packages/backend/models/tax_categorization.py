@@ -4,14 +4,23 @@ from sqlalchemy import (
     Column, String, Boolean, Numeric, DateTime, Text, ForeignKey, Index,
     CheckConstraint, Integer, Date, UniqueConstraint, func
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 from datetime import date, datetime
+import re
 from .base import Base, UUIDMixin, TimestampMixin
 
 
+def schedule_c_line_number(tax_form: Optional[str], tax_line: Optional[str]) -> Optional[str]:
+    """Schedule C line number a tax line reports on, e.g. "Line 27a" -> "27"."""
+    if tax_form != "Schedule C" or not tax_line:
+        return None
+    match = re.search(r"\d+", tax_line)
+    return match.group() if match else None
+
+
 class ChartOfAccount(Base, UUIDMixin, TimestampMixin):
     """Chart of accounts for double-entry bookkeeping."""
 
@@ -96,6 +105,7 @@ class TaxCategory(Base, UUIDMixin, TimestampMixin):
     category_name = Column(String(255), nullable=False)
     tax_form = Column(String(50), nullable=False)  # Schedule C, Schedule E, etc.
     tax_line = Column(String(100))  # Specific line on tax form
+    schedule_c_line = Column(String(10))  # Normalized Schedule C line number, kept in sync with tax_line
     description = Column(Text)
 
     # Deduction properties
@@ -127,6 +137,7 @@ class TaxCategory(Base, UUIDMixin, TimestampMixin):
     __table_args__ = (
         Index("idx_tax_categories_code", "category_code"),
         Index("idx_tax_categories_form", "tax_form", "is_active"),
+        Index("idx_tax_categories_schedule_c_line", "schedule_c_line"),
         Index("idx_tax_categories_business", "is_business_expense", "is_active"),
         Index("idx_tax_categories_effective", "effective_date", "expiration_date"),
         CheckConstraint(
@@ -139,6 +150,13 @@ class TaxCategory(Base, UUIDMixin, TimestampMixin):
         ),
     )
 
+    @validates("tax_form", "tax_line")
+    def _sync_schedule_c_line(self, key, value):
+        tax_form = value if key == "tax_form" else self.tax_form
+        tax_line = value if key == "tax_line" else self.tax_line
+        self.schedule_c_line = schedule_c_line_number(tax_form, tax_line)
+        return value
+
     def is_currently_effective(self) -> bool:
         """Check if category is currently effective."""
         today = date.today()
@@ -177,7 +195,7 @@ class BusinessExpenseTracking(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "business_expense_tracking"
 
     # Core references
-    transaction_id = Column(UUID(as_uuid=True), ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False, unique=True)
+    transaction_id = Column(UUID(as_uuid=True), nullable=False, unique=True)  # Checked by trigger (migration 018)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     # Business purpose and percentage
@@ -205,7 +223,11 @@ class BusinessExpenseTracking(Base, UUIDMixin, TimestampMixin):
     audit_trail = Column(JSONB, default=list)
 
     # Relationships
-    transaction = relationship("Transaction", back_populates="business_expense_tracking")
+    transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(BusinessExpenseTracking.transaction_id) == Transaction.id",
+        back_populates="business_expense_tracking"
+    )
     user = relationship("User", back_populates="business_expense_tracking")
 
     # Constraints
@@ -329,7 +351,7 @@ class CategorizationAudit(Base, UUIDMixin):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Core references
-    transaction_id = Column(UUID(as_uuid=True), ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False)
+    transaction_id = Column(UUID(as_uuid=True), nullable=False)  # Checked by trigger (migration 018)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     # Action details
@@ -353,7 +375,11 @@ class CategorizationAudit(Base, UUIDMixin):
     audit_metadata = Column(JSONB, default=dict)
 
     # Relationships
-    transaction = relationship("Transaction", back_populates="categorization_audits")
+    transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(CategorizationAudit.transaction_id) == Transaction.id",
+        back_populates="categorization_audits"
+    )
     user = relationship("User", back_populates="categorization_audits")
     old_category = relationship("Category", foreign_keys=[old_category_id])
     new_category = relationship("Category", foreign_keys=[new_category_id])
@@ -2,7 +2,7 @@
 
 from sqlalchemy import (
     Column, String, Boolean, Numeric, DateTime, Text, ForeignKey, Index,
-    CheckConstraint, Integer, func, event
+    CheckConstraint, Integer, UniqueConstraint, func, event
 )
 from sqlalchemy.orm import relationship, Session
 from sqlalchemy.dialects.postgresql import UUID, JSONB
@@ -18,12 +18,14 @@ class Transaction(Base, UUIDMixin, TimestampMixin):
     
     # Core identifiers
     account_id = Column(UUID(as_uuid=True), ForeignKey("accounts.id"), nullable=False, index=True)
-    plaid_transaction_id = Column(String(255), unique=True, index=True)
+    user_id = Column(UUID(as_uuid=True))  # Copy of accounts.user_id for user-scoped filters
+    plaid_transaction_id = Column(String(255))  # Unique per date, see __table_args__
     
     # Transaction details
     amount = Column(Numeric(15, 2), nullable=False)  # Always positive for debit/credit clarity
     transaction_type = Column(String(10), nullable=False)  # debit or credit
-    date = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Partition key (migration 014); part of the primary key with id
+    date = Column(DateTime(timezone=True), primary_key=True, index=True)
     posted_date = Column(DateTime(timezone=True))  # When transaction actually posted
     
     # Description fields
@@ -47,6 +49,16 @@ class Transaction(Base, UUIDMixin, TimestampMixin):
     is_tax_deductible = Column(Boolean, default=False, nullable=False)
     tax_year = Column(Integer, index=True)  # Year for tax reporting
     
+    # Tax categorization (added by migration 004)
+    chart_account_id = Column(UUID(as_uuid=True), ForeignKey("chart_of_accounts.id"), index=True)
+    tax_category_id = Column(UUID(as_uuid=True), ForeignKey("tax_categories.id"), index=True)
+    schedule_c_line = Column(String(50))
+    business_use_percentage = Column(Numeric(5, 2), default=Decimal("0.00"))
+    deductible_amount = Column(Numeric(15, 2))
+    requires_substantiation = Column(Boolean, default=False)
+    substantiation_complete = Column(Boolean, default=False)
+    tax_notes = Column(Text)
+    
     # Location data
     location_address = Column(String(500))
     location_city = Column(String(100))
@@ -61,7 +73,8 @@ class Transaction(Base, UUIDMixin, TimestampMixin):
     account_number_masked = Column(String(20))  # Last 4 digits of payment method
     
     # Double-entry bookkeeping support
-    contra_transaction_id = Column(UUID(as_uuid=True), ForeignKey("transactions.id"))
+    # References to the partitioned table are checked by trigger (migration 018)
+    contra_transaction_id = Column(UUID(as_uuid=True))
     journal_entry_id = Column(UUID(as_uuid=True))  # Group related transactions
     
     # Reconciliation
@@ -82,17 +95,37 @@ class Transaction(Base, UUIDMixin, TimestampMixin):
     # Relationships
     account = relationship("Account", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
-    contra_transaction = relationship("Transaction", remote_side=[id])
-    ml_predictions = relationship("MLPrediction", back_populates="transaction", cascade="all, delete-orphan")
+    contra_transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(Transaction.contra_transaction_id) == remote(Transaction.id)"
+    )
+    ml_predictions = relationship(
+        "MLPrediction",
+        primaryjoin="Transaction.id == foreign(MLPrediction.transaction_id)",
+        back_populates="transaction",
+        cascade="all, delete-orphan"
+    )
 
     # Tax categorization relationships
     chart_account = relationship("ChartOfAccount", back_populates="transactions")
     tax_category = relationship("TaxCategory", back_populates="transactions")
-    business_expense_tracking = relationship("BusinessExpenseTracking", back_populates="transaction", uselist=False, cascade="all, delete-orphan")
-    categorization_audits = relationship("CategorizationAudit", back_populates="transaction", cascade="all, delete-orphan")
+    business_expense_tracking = relationship(
+        "BusinessExpenseTracking",
+        primaryjoin="Transaction.id == foreign(BusinessExpenseTracking.transaction_id)",
+        back_populates="transaction",
+        uselist=False,
+        cascade="all, delete-orphan"
+    )
+    categorization_audits = relationship(
+        "CategorizationAudit",
+        primaryjoin="Transaction.id == foreign(CategorizationAudit.transaction_id)",
+        back_populates="transaction",
+        cascade="all, delete-orphan"
+    )
     
     # Indexes and constraints
     __table_args__ = (
+        UniqueConstraint("plaid_transaction_id", "date", name="uq_transactions_plaid_transaction_id_date"),
         Index("idx_transactions_account_date", "account_id", "date"),
         Index("idx_transactions_merchant", "merchant_name"),
         Index("idx_transactions_amount", "amount"),
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare user-scoped transaction reads before and after transactions.user_id.
+
+Runs EXPLAIN (ANALYZE, BUFFERS) for the dashboard, list, export and report
+statements in two forms: filtering through accounts (a join or an
+account_id IN subquery, as before migration 016) and filtering on
+transactions.user_id. Prints execution time, shared buffers touched and the
+scan nodes of each plan. PostgreSQL only; by default it uses the user with
+the most transactions:
+
+    python scripts/benchmark_tenant_filters.py
+    python scripts/benchmark_tenant_filters.py --user-id <uuid> --days 365 --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+from datetime import date, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+
+from src.database import engine_registry
+from src.database.models import Account, Transaction
+from src.routers.dashboard import EFFECTIVE_CATEGORY, _active_transactions
+
+SCAN_NODES = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Bitmap Index Scan"}
+
+
+def comparisons(user_id, start_date: date):
+    """Statement pairs (through accounts, on user_id) by label."""
+    active_accounts = select(Account.id).where(Account.user_id == user_id, Account.is_active == True)
+    return {
+        "dashboard spending by category": (
+            select(EFFECTIVE_CATEGORY, func.sum(Transaction.amount)).where(
+                Transaction.account_id.in_(active_accounts),
+                Transaction.date >= start_date, Transaction.amount > 0
+            ).group_by(EFFECTIVE_CATEGORY),
+            select(EFFECTIVE_CATEGORY, func.sum(Transaction.amount)).where(
+                *_active_transactions(user_id),
+                Transaction.date >= start_date, Transaction.amount > 0
+            ).group_by(EFFECTIVE_CATEGORY),
+        ),
+        "transaction list first page": (
+            select(Transaction).join(Account).where(Account.user_id == user_id)
+            .order_by(Transaction.date.desc(), Transaction.id.desc()).limit(50),
+            select(Transaction).where(Transaction.user_id == user_id)
+            .order_by(Transaction.date.desc(), Transaction.id.desc()).limit(50),
+        ),
+        "export rows": (
+            select(Transaction.date, Transaction.amount, Transaction.name).join(Account).where(
+                Account.user_id == user_id, Transaction.date >= start_date
+            ).order_by(Transaction.date.desc()),
+            select(Transaction.date, Transaction.amount, Transaction.name).where(
+                Transaction.user_id == user_id, Transaction.date >= start_date
+            ).order_by(Transaction.date.desc()),
+        ),
+        "report profit and loss": (
+            select(func.sum(Transaction.amount)).join(Account).where(
+                Account.user_id == user_id, Transaction.date >= start_date
+            ),
+            select(func.sum(Transaction.amount)).where(
+                Transaction.user_id == user_id, Transaction.date >= start_date
+            ),
+        ),
+    }
+
+
+def _scans(plan):
+    """Scan nodes of a plan as 'Node Type on relation (index)'."""
+    scans = []
+    if plan["Node Type"] in SCAN_NODES:
+        scan = f"{plan['Node Type']} on {plan.get('Relation Name', '-')}"
+        if plan.get("Index Name"):
+            scan += f" ({plan['Index Name']})"
+        scans.append(scan)
+    for child in plan.get("Plans", []):
+        scans.extend(_scans(child))
+    return scans
+
+
+def explain(conn, statement, runs: int):
+    """Median execution time, shared buffers and scan nodes over ``runs`` executions."""
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    timings, buffers, plan = [], [], None
+    for _ in range(runs):
+        result = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}").scalar()
+        plan = result[0]["Plan"]
+        timings.append(result[0]["Execution Time"])
+        buffers.append(plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0))
+    return statistics.median(timings), statistics.median(buffers), _scans(plan)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user-id", help="User to filter on (default: most transactions)")
+    parser.add_argument("--days", type=int, default=90, help="Date range of the range queries")
+    parser.add_argument("--runs", type=int, default=3, help="Executions per statement")
+    args = parser.parse_args()
+
+    with engine_registry.get_engine().connect() as conn:
+        if conn.dialect.name != "postgresql":
+            print("The benchmark requires PostgreSQL", file=sys.stderr)
+            return 1
+
+        user_id = args.user_id or conn.execute(
+            select(Transaction.user_id).where(Transaction.user_id.isnot(None))
+            .group_by(Transaction.user_id).order_by(func.count().desc()).limit(1)
+        ).scalar()
+        if user_id is None:
+            print("No transactions with user_id; run the database migrations first", file=sys.stderr)
+            return 1
+
+        start_date = date.today() - timedelta(days=args.days)
+        print(f"user {user_id}, {args.days} days, median of {args.runs} run(s)")
+        for label, (before, after) in comparisons(user_id, start_date).items():
+            print(f"\n=== {label.upper()} ===")
+            for form, statement in (("accounts", before), ("user_id", after)):
+                ms, blocks, scans = explain(conn, statement, args.runs)
+                print(f"  {form:<9} {ms:>9.2f}ms {blocks:>8} buffers")
+                for scan in scans:
+                    print(f"            {scan}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
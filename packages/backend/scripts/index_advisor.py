@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+index-advisor: report missing and unused indexes from PostgreSQL statistics.
+
+Reads pg_stat_statements (the extension must be installed and listed in
+shared_preload_libraries), pg_stat_user_tables and pg_stat_user_indexes:
+
+    python scripts/index_advisor.py
+    python scripts/index_advisor.py --limit 50 --min-rows 100000 --json
+
+Unused-index counts are since the last statistics reset; check
+pg_stat_database.stats_reset before dropping anything, and run it against
+the replica too if reads are routed there.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import engine_registry
+from src.database.index_advisor import advise
+
+
+def _print_report(report) -> None:
+    print("=== MISSING MAINTAINED INDEXES ===")
+    for entry in report["missing_query_indexes"]:
+        print(f"  {entry['index']}: {entry['serves']}")
+    if not report["missing_query_indexes"]:
+        print("  none")
+
+    print("\n=== EXPENSIVE STATEMENTS WITH SEQUENTIAL SCANS ===")
+    if report["statements"] is None:
+        print("  pg_stat_statements is not installed")
+    elif not report["statements"]:
+        print("  none")
+    for statement in report["statements"] or []:
+        query = " ".join(statement["query"].split())
+        print(f"  {statement['total_ms']:.0f}ms total, {statement['mean_ms']:.2f}ms mean, "
+              f"{statement['calls']} calls: {query[:120]}")
+        if statement["scans"] is None:
+            print("    (no generic plan; needs PostgreSQL 16)")
+        for scan in statement["scans"] or []:
+            print(f"    seq scan on {scan['table']} filter {scan['filter']}")
+
+    print("\n=== TABLES READ MOSTLY BY SEQUENTIAL SCANS ===")
+    for table in report["sequential_scan_tables"]:
+        print(f"  {table['table']}: {table['seq_scan']} seq scans, {table['idx_scan']} index scans, "
+              f"{table['live_rows']} rows")
+    if not report["sequential_scan_tables"]:
+        print("  none")
+
+    print("\n=== UNUSED INDEXES ===")
+    for index in report["unused_indexes"]:
+        print(f"  {index['table']}.{index['index']}: {index['size']}")
+    if not report["unused_indexes"]:
+        print("  none")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report missing and unused indexes")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="Number of most expensive statements to explain")
+    parser.add_argument("--min-rows", type=int, default=10000,
+                        help="Ignore sequential scans of tables smaller than this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    with engine_registry.get_engine().connect() as conn:
+        report = advise(conn, limit=args.limit, min_rows=args.min_rows)
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Load test for the hot read paths (dashboard, transaction list, reports).
+
+Measures throughput and latency of a single API worker under concurrent
+load. Start the API with one worker, e.g.
+
+    uvicorn src.main:app --workers 1 --port 8000
+
+then run this script before and after a change to compare requests per
+second at the same concurrency:
+
+    python scripts/load_test_read_paths.py --base-url http://localhost:8000 \\
+        --concurrency 50 --duration 30
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/dashboard/summary",
+    "/api/v1/dashboard/transactions/recent",
+    "/api/v1/dashboard/spending/by-category",
+    "/api/v1/dashboard/kpis",
+    "/api/v1/transactions/?page_size=50&include_total=false",
+    "/api/v1/transactions/stats",
+    "/api/v1/reports/reports/balance-sheet",
+]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    paths: List[str],
+    deadline: float,
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+    offset: int
+) -> None:
+    index = offset
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies[path].append(time.perf_counter() - started)
+        else:
+            errors[path] += 1
+
+
+async def run(base_url: str, paths: List[str], concurrency: int, duration: float, token: str) -> None:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        # Warm up connection pools on both sides before measuring
+        await asyncio.gather(*(client.get(path) for path in paths))
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            _worker(client, paths, deadline, latencies, errors, offset)
+            for offset in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{total} requests in {elapsed:.1f}s at concurrency {concurrency}: "
+          f"{total / elapsed:.1f} req/s, {sum(errors.values())} errors")
+    print(f"{'path':<60} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for path in paths:
+        samples = sorted(latencies[path])
+        if not samples:
+            print(f"{path:<60} {'-':>8} {'-':>8} {'-':>8}  ({errors[path]} errors)")
+            continue
+        p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+        print(f"{path:<60} {len(samples) / elapsed:>8.1f} "
+              f"{statistics.median(samples) * 1000:>8.1f} {p95 * 1000:>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--token", default="", help="Bearer token, if authentication is enabled")
+    parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.paths or DEFAULT_PATHS, args.concurrency, args.duration, args.token))
+
+
+if __name__ == "__main__":
+    main()
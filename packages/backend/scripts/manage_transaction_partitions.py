@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Maintain the date partitions of the transactions table.
+
+Creates the partitions for the coming TRANSACTION_PARTITIONS_AHEAD intervals
+(the API also does this on startup). Run it from cron, e.g. daily:
+
+    python scripts/manage_transaction_partitions.py
+
+With --check-pruning it also prints which partitions the dashboard, report
+and export queries read for the current month, and exits non-zero if any
+of them scans every partition:
+
+    python scripts/manage_transaction_partitions.py --check-pruning
+"""
+
+import argparse
+import logging
+import os
+import sys
+import uuid
+from datetime import date, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+
+from src.database import engine_registry
+from src.database.models import Account, Transaction
+from src.database.partitioning import (
+    ensure_transaction_partitions, existing_partitions, is_partitioned, scanned_partitions
+)
+from src.routers.dashboard import _active_transactions
+from src.services.transaction_export import TransactionExportService
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def pruning_checks(user_id, start_date: date, end_date: date):
+    """Representative date-range statements of the dashboard, report and export paths."""
+    export_filters = TransactionExportService(None)._filters(user_id, start_date, end_date)
+    return {
+        "dashboard spending by category": select(func.sum(Transaction.amount)).where(
+            *_active_transactions(user_id),
+            Transaction.date >= start_date,
+            Transaction.amount > 0
+        ),
+        "report profit and loss": select(Transaction.id).where(
+            Transaction.user_id == user_id,
+            Transaction.date >= start_date,
+            Transaction.date <= end_date
+        ),
+        "export rows": select(Transaction.date, Transaction.amount).join(
+            Account, Transaction.account_id == Account.id
+        ).where(*export_filters).order_by(Transaction.date.desc()),
+    }
+
+
+def check_pruning(conn) -> bool:
+    """Print the partitions each statement reads; False if one reads them all."""
+    partitions = existing_partitions(conn)
+    end_date = date.today()
+    start_date = end_date - timedelta(days=30)
+    pruned = True
+    for label, statement in pruning_checks(str(uuid.uuid4()), start_date, end_date).items():
+        scanned = scanned_partitions(conn, statement)
+        ok = len(scanned) < len(partitions)
+        pruned = pruned and ok
+        logger.info(f"{'OK  ' if ok else 'FAIL'} {label}: {', '.join(scanned) or 'none'}")
+    return pruned
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ahead", type=int, default=None,
+                        help="Intervals to create ahead (default TRANSACTION_PARTITIONS_AHEAD)")
+    parser.add_argument("--check-pruning", action="store_true",
+                        help="Verify date-range queries prune partitions")
+    args = parser.parse_args()
+
+    with engine_registry.get_engine().begin() as conn:
+        if not is_partitioned(conn):
+            logger.error("transactions is not partitioned; run the database migrations first")
+            return 1
+
+        created = ensure_transaction_partitions(conn, ahead=args.ahead)
+        logger.info(f"Created {len(created)} partition(s)")
+
+        if args.check_pruning and not check_pruning(conn):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
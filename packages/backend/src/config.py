@@ -33,9 +33,28 @@ class Settings(BaseSettings):
         env="DATABASE_URL"
     )
     database_password: Optional[str] = Field(default=None, env="DATABASE_PASSWORD")
+    # Defaults to DATABASE_URL with its async driver (asyncpg / aiosqlite)
+    async_database_url: Optional[str] = Field(default=None, env="ASYNC_DATABASE_URL")
     database_echo: bool = Field(default=False, env="DATABASE_ECHO")
     database_pool_size: int = Field(default=5, env="DATABASE_POOL_SIZE")
     database_max_overflow: int = Field(default=10, env="DATABASE_MAX_OVERFLOW")
+    # queue, null, static or singleton; defaults to static in testing, queue otherwise
+    database_pool_class: Optional[str] = Field(default=None, env="DATABASE_POOL_CLASS")
+    database_pool_timeout: int = Field(default=30, env="DATABASE_POOL_TIMEOUT")
+    database_pool_recycle: int = Field(default=3600, env="DATABASE_POOL_RECYCLE")
+    database_connect_timeout: int = Field(default=30, env="DATABASE_CONNECT_TIMEOUT")
+    database_statement_timeout_ms: int = Field(default=30000, env="DATABASE_STATEMENT_TIMEOUT_MS")
+    database_replica_url: Optional[str] = Field(default=None, env="DATABASE_REPLICA_URL")
+    # Connecting through a transaction-pooling PgBouncer (see docs/PGBOUNCER.md)
+    database_external_pooler: bool = Field(default=False, env="DATABASE_EXTERNAL_POOLER")
+    # Read-only sessions fall back to the primary when the replica lags more than this
+    database_replica_max_lag_seconds: float = Field(default=5.0, env="DATABASE_REPLICA_MAX_LAG_SECONDS")
+    database_replica_lag_check_interval: float = Field(default=5.0, env="DATABASE_REPLICA_LAG_CHECK_INTERVAL")
+    # How long a user's reads stay on the primary after they write (read-your-writes)
+    database_read_your_writes_seconds: int = Field(default=60, env="DATABASE_READ_YOUR_WRITES_SECONDS")
+    # Partitions of the transactions table are created this many intervals ahead
+    transaction_partition_interval: str = Field(default="year", env="TRANSACTION_PARTITION_INTERVAL")
+    transaction_partitions_ahead: int = Field(default=1, env="TRANSACTION_PARTITIONS_AHEAD")
     
     # Redis Settings
     redis_url: str = Field(
@@ -43,6 +62,19 @@ class Settings(BaseSettings):
         env="REDIS_URL"
     )
     redis_ttl: int = Field(default=3600, env="REDIS_TTL")  # 1 hour default
+    # Per-worker connection pools; after REDIS_CIRCUIT_FAILURES consecutive
+    # connection errors Redis is skipped for REDIS_CIRCUIT_RESET_SECONDS
+    redis_max_connections: int = Field(default=50, env="REDIS_MAX_CONNECTIONS")
+    redis_pool_timeout: float = Field(default=2.0, env="REDIS_POOL_TIMEOUT")
+    redis_socket_timeout: float = Field(default=5.0, env="REDIS_SOCKET_TIMEOUT")
+    redis_circuit_failures: int = Field(default=3, env="REDIS_CIRCUIT_FAILURES")
+    redis_circuit_reset_seconds: float = Field(default=30.0, env="REDIS_CIRCUIT_RESET_SECONDS")
+    # Messages for users with no open WebSocket wait in a capped Redis stream
+    websocket_offline_queue_max: int = Field(default=100, env="WEBSOCKET_OFFLINE_QUEUE_MAX")
+    websocket_offline_queue_ttl: int = Field(default=604800, env="WEBSOCKET_OFFLINE_QUEUE_TTL")  # 7 days
+    chart_hierarchy_cache_ttl: int = Field(default=300, env="CHART_HIERARCHY_CACHE_TTL")
+    bookkeeping_status_cache_ttl: int = Field(default=60, env="BOOKKEEPING_STATUS_CACHE_TTL")
+    tax_summary_cache_ttl: int = Field(default=300, env="TAX_SUMMARY_CACHE_TTL")
     
     # Security Settings
     secret_key: str = Field(
@@ -102,6 +134,11 @@ class Settings(BaseSettings):
     audit_logging_enabled: bool = Field(default=True, env="AUDIT_LOGGING_ENABLED")
     security_headers_enabled: bool = Field(default=True, env="SECURITY_HEADERS_ENABLED")
     rate_limiting_enabled: bool = Field(default=True, env="RATE_LIMITING_ENABLED")
+    # Slower Redis answers fall back to a per-worker limiter for the given seconds
+    rate_limit_redis_timeout_ms: int = Field(default=50, env="RATE_LIMIT_REDIS_TIMEOUT_MS")
+    rate_limit_fallback_seconds: int = Field(default=30, env="RATE_LIMIT_FALLBACK_SECONDS")
+    # /metrics/* expose pool and circuit breaker internals; admins only, and off unless enabled
+    metrics_endpoints_enabled: bool = Field(default=False, env="METRICS_ENDPOINTS_ENABLED")
 
     # Encryption Settings
     field_encryption_enabled: bool = Field(default=True, env="FIELD_ENCRYPTION_ENABLED")
@@ -113,6 +150,14 @@ class Settings(BaseSettings):
     # Pagination Settings
     default_page_size: int = Field(default=50, env="DEFAULT_PAGE_SIZE")
     max_page_size: int = Field(default=200, env="MAX_PAGE_SIZE")
+    transaction_count_cache_ttl: int = Field(default=60, env="TRANSACTION_COUNT_CACHE_TTL")
+
+    # Export Settings
+    export_directory: str = Field(default="./data/exports", env="EXPORT_DIRECTORY")
+    export_job_ttl: int = Field(default=86400, env="EXPORT_JOB_TTL")  # 24 hours
+
+    # Period Close Settings
+    period_close_job_ttl: int = Field(default=86400, env="PERIOD_CLOSE_JOB_TTL")  # 24 hours
     
     @validator("environment")
     def validate_environment(cls, v):
@@ -130,6 +175,14 @@ class Settings(BaseSettings):
             raise ValueError(f"Plaid environment must be one of {allowed}")
         return v
     
+    @validator("transaction_partition_interval")
+    def validate_transaction_partition_interval(cls, v):
+        """Validate transaction partition interval."""
+        allowed = ["year", "month"]
+        if v not in allowed:
+            raise ValueError(f"Transaction partition interval must be one of {allowed}")
+        return v
+    
     @validator("secret_key")
     def validate_secret_key(cls, v, values):
         """Ensure secret key is changed in production."""
@@ -9,15 +9,14 @@ import logging
 import time
 import contextlib
 from typing import Generator, Optional, Dict, Any
-from sqlalchemy import create_engine, MetaData, event, pool, text
+from sqlalchemy import MetaData, event, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import DisconnectionError, OperationalError
-from sqlalchemy.pool import StaticPool
 
-from ..config import settings
-from .secrets import get_secure_database_url, secrets_manager
+from ..database.engines import engine_registry
+from .secrets import get_secure_database_url
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +60,7 @@ class SecureDatabase:
             raise DatabaseError(f"Database initialization failed: {e}")
 
     def _create_engine(self) -> None:
-        """Create secure database engine with proper configuration."""
+        """Use the process-wide primary engine rather than opening a second pool."""
         try:
             # Get secure database URL with credentials from secrets
             database_url = get_secure_database_url()
@@ -70,23 +69,9 @@ class SecureDatabase:
             if not database_url.startswith(("postgresql://", "postgresql+psycopg2://")):
                 raise DatabaseError("Only PostgreSQL databases are supported")
 
-            # Configure engine options based on environment
-            engine_kwargs = {
-                "echo": settings.database_echo,
-                "pool_size": settings.database_pool_size,
-                "max_overflow": settings.database_max_overflow,
-                "pool_pre_ping": True,  # Verify connections before using
-                "pool_recycle": 3600,   # Recycle connections after 1 hour
-                "connect_args": self._get_connect_args()
-            }
-
-            # Use static pool for testing to avoid connection issues
-            if settings.environment == "testing":
-                engine_kwargs["poolclass"] = StaticPool
-                engine_kwargs["pool_size"] = 1
-                engine_kwargs["max_overflow"] = 0
-
-            self.engine = create_engine(database_url, **engine_kwargs)
+            # Pool class, connect arguments and session settings are
+            # configured once in the engine registry
+            self.engine = engine_registry.get_engine()
 
             # Test connection
             self._test_connection()
@@ -95,26 +80,6 @@ class SecureDatabase:
             logger.error(f"Failed to create database engine: {e}")
             raise DatabaseError(f"Engine creation failed: {e}")
 
-    def _get_connect_args(self) -> Dict[str, Any]:
-        """Get connection arguments based on environment."""
-        connect_args = {
-            "application_name": f"manna_{settings.environment}",
-            "connect_timeout": 30,
-        }
-
-        # SSL configuration for production
-        if settings.environment == "production":
-            connect_args.update({
-                "sslmode": "require",
-                "sslcert": secrets_manager.get_secret("db_ssl_cert_path"),
-                "sslkey": secrets_manager.get_secret("db_ssl_key_path"),
-                "sslrootcert": secrets_manager.get_secret("db_ssl_ca_path"),
-            })
-            # Remove None values
-            connect_args = {k: v for k, v in connect_args.items() if v is not None}
-
-        return connect_args
-
     def _test_connection(self) -> None:
         """Test database connection and validate credentials."""
         try:
@@ -166,15 +131,6 @@ class SecureDatabase:
             self._connection_stats["total_connections"] += 1
             self._connection_stats["active_connections"] += 1
 
-            # Set connection-level security settings
-            with dbapi_connection.cursor() as cursor:
-                # Set statement timeout (30 seconds)
-                cursor.execute("SET statement_timeout = '30s'")
-                # Set timezone
-                cursor.execute("SET timezone = 'UTC'")
-                # Disable autocommit for explicit transaction control
-                cursor.execute("SET autocommit = false")
-
         @event.listens_for(self.engine, "close")
         def on_close(dbapi_connection, connection_record):
             """Handle connection closures."""
@@ -256,15 +212,8 @@ class SecureDatabase:
 
             health_info["response_time"] = time.time() - start_time
 
-            # Engine information
-            if self.engine:
-                pool = self.engine.pool
-                health_info["engine_info"] = {
-                    "pool_size": pool.size(),
-                    "checked_in": pool.checkedin(),
-                    "checked_out": pool.checkedout(),
-                    "overflow": pool.overflow(),
-                }
+            # Pool occupancy, wait and connect latency for every engine
+            health_info["engine_info"] = engine_registry.metrics()
 
             health_info["status"] = "healthy"
 
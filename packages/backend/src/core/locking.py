@@ -5,12 +5,13 @@ Implements optimistic locking using version columns with proper
 SQLAlchemy 2.x event handlers and distributed locking using Redis.
 """
 
+import asyncio
 import logging
 import time
 import hashlib
 from typing import Optional, Any, Type, Union, Set
 from datetime import datetime, timedelta
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager, suppress
 from sqlalchemy import Column, Integer, event, inspect
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import Session, Mapper
@@ -21,7 +22,7 @@ from sqlalchemy.orm.exc import StaleDataError
 import redis
 
 # Import settings configuration
-from ..config import settings
+from ..utils.redis import redis_registry
 
 logger = logging.getLogger(__name__)
 
@@ -254,18 +255,9 @@ class DistributedLock:
         Initialize distributed lock manager.
 
         Args:
-            redis_client: Optional Redis client. If None, creates default client.
+            redis_client: Optional Redis client. If None, uses the shared sync client.
         """
-        if redis_client:
-            self.redis = redis_client
-        else:
-            # Create Redis client from settings
-            self.redis = redis.from_url(
-                settings.redis_url,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5
-            )
+        self.redis = redis_client or redis_registry.sync_client
 
         self.lock_prefix = "manna:lock:"
 
@@ -509,6 +501,243 @@ def get_distributed_lock() -> DistributedLock:
     return _distributed_lock
 
 
+class AsyncDistributedLock:
+    """
+    Asyncio Redis lock for code running on the event loop.
+
+    Uses the same lock keys as ``DistributedLock``. Waiting uses
+    ``asyncio.sleep`` and auto-extension an asyncio task, so neither blocks
+    the loop. Waiters are served in arrival order: each holds a place in a
+    queue (a sorted set scored by Redis server time) kept alive by a
+    heartbeat key refreshed on every attempt, and only the head of the queue
+    may take a free lock. Waiters that stop polling drop out once their
+    heartbeat expires.
+    """
+
+    # KEYS: lock, waiter queue; ARGV: token, lock TTL ms, heartbeat TTL ms,
+    # heartbeat key prefix
+    ACQUIRE_SCRIPT = """
+        local head = redis.call('ZRANGE', KEYS[2], 0, 0)[1]
+        while head and head ~= ARGV[1] and redis.call('EXISTS', ARGV[4] .. head) == 0 do
+            redis.call('ZREM', KEYS[2], head)
+            head = redis.call('ZRANGE', KEYS[2], 0, 0)[1]
+        end
+        if redis.call('EXISTS', KEYS[1]) == 0 and (not head or head == ARGV[1]) then
+            redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+            redis.call('ZREM', KEYS[2], ARGV[1])
+            redis.call('DEL', ARGV[4] .. ARGV[1])
+            return 1
+        end
+        if not redis.call('ZSCORE', KEYS[2], ARGV[1]) then
+            local now = redis.call('TIME')
+            redis.call('ZADD', KEYS[2], now[1] * 1000000 + now[2], ARGV[1])
+        end
+        redis.call('SET', ARGV[4] .. ARGV[1], 1, 'PX', ARGV[3])
+        redis.call('PEXPIRE', KEYS[2], math.max(tonumber(ARGV[2]), tonumber(ARGV[3])))
+        return 0
+    """
+
+    RELEASE_SCRIPT = """
+        if redis.call("get", KEYS[1]) == ARGV[1] then
+            return redis.call("del", KEYS[1])
+        else
+            return 0
+        end
+    """
+
+    EXTEND_SCRIPT = """
+        if redis.call("get", KEYS[1]) == ARGV[1] then
+            return redis.call("pexpire", KEYS[1], ARGV[2])
+        else
+            return 0
+        end
+    """
+
+    def __init__(self, redis_client=None):
+        """
+        Initialize the async lock manager.
+
+        Args:
+            redis_client: Optional async Redis client. If None, uses the shared async client.
+        """
+        self._redis = redis_client
+        self.lock_prefix = "manna:lock:"
+        self._scripts = {}
+
+    @property
+    def redis(self):
+        return self._redis or redis_registry.async_client
+
+    def _get_lock_key(self, resource: str) -> str:
+        """Get Redis key for the lock."""
+        return f"{self.lock_prefix}{resource}"
+
+    async def _run_script(self, name: str, keys: list, args: list):
+        script = self._scripts.get(name)
+        if script is None:
+            # Sent with EVALSHA, falling back to EVAL once per server
+            script = self._scripts[name] = self.redis.register_script(getattr(self, name))
+        return await script(keys=keys, args=args, client=self.redis)
+
+    async def acquire_lock(
+        self,
+        resource: str,
+        timeout: float = 30.0,
+        retry_interval: float = 0.1,
+        lock_ttl: float = 300.0
+    ) -> Optional[str]:
+        """
+        Acquire a distributed lock for a resource, waiting in turn.
+
+        Args:
+            resource: Resource identifier to lock
+            timeout: How long to wait for the lock (seconds)
+            retry_interval: How often to retry acquiring the lock (seconds)
+            lock_ttl: How long the lock should live (seconds)
+
+        Returns:
+            Lock token if acquired, None if timeout
+
+        Raises:
+            DistributedLockError: If Redis is unavailable
+        """
+        import secrets
+
+        lock_key = self._get_lock_key(resource)
+        queue_key = f"{lock_key}:queue"
+        heartbeat_prefix = f"{lock_key}:waiter:"
+        lock_token = secrets.token_hex(16)
+        # Outlives a slow retry, but an abandoned waiter soon drops out
+        heartbeat_ms = max(1000, int(retry_interval * 5000))
+        deadline = time.monotonic() + timeout
+
+        try:
+            while True:
+                acquired = await self._run_script(
+                    "ACQUIRE_SCRIPT",
+                    [lock_key, queue_key],
+                    [lock_token, int(lock_ttl * 1000), heartbeat_ms, heartbeat_prefix]
+                )
+                if acquired:
+                    logger.debug(f"Acquired lock for resource: {resource}")
+                    return lock_token
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(retry_interval, remaining))
+
+            # Leave the queue so later waiters need not wait for our heartbeat to expire
+            await self.redis.zrem(queue_key, lock_token)
+            await self.redis.delete(f"{heartbeat_prefix}{lock_token}")
+            logger.warning(f"Failed to acquire lock for resource: {resource} (timeout after {timeout}s)")
+            return None
+
+        except redis.RedisError as e:
+            logger.error(f"Redis error acquiring lock for {resource}: {e}")
+            raise DistributedLockError(f"Could not acquire lock: {e}")
+
+    async def release_lock(self, resource: str, lock_token: str) -> bool:
+        """
+        Release a distributed lock atomically.
+
+        Returns:
+            True if lock was released, False if not owned by this token
+        """
+        try:
+            result = await self._run_script("RELEASE_SCRIPT", [self._get_lock_key(resource)], [lock_token])
+        except redis.RedisError as e:
+            logger.error(f"Redis error releasing lock for {resource}: {e}")
+            return False
+
+        if not result:
+            logger.warning(f"Failed to release lock for {resource}: not owned by token")
+            return False
+        logger.debug(f"Released lock for resource: {resource}")
+        return True
+
+    async def extend_lock(self, resource: str, lock_token: str, extend_ttl: float = 300.0) -> bool:
+        """
+        Extend the TTL of an existing lock atomically.
+
+        Returns:
+            True if lock was extended, False if not owned
+        """
+        try:
+            result = await self._run_script(
+                "EXTEND_SCRIPT", [self._get_lock_key(resource)], [lock_token, int(extend_ttl * 1000)]
+            )
+            return bool(result)
+        except redis.RedisError as e:
+            logger.error(f"Redis error extending lock for {resource}: {e}")
+            return False
+
+    async def _extend_periodically(self, resource: str, lock_token: str, lock_ttl: float, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            if not await self.extend_lock(resource, lock_token, lock_ttl):
+                logger.warning(f"Failed to extend lock for {resource}")
+                return
+
+    @asynccontextmanager
+    async def lock(
+        self,
+        resource: str,
+        timeout: float = 30.0,
+        lock_ttl: float = 300.0,
+        auto_extend: bool = False,
+        auto_extend_interval: float = 60.0
+    ):
+        """
+        Async context manager for distributed locking.
+
+        Args:
+            resource: Resource identifier to lock
+            timeout: How long to wait for the lock
+            lock_ttl: How long the lock should live
+            auto_extend: Whether to auto-extend the lock
+            auto_extend_interval: How often to extend the lock (seconds)
+
+        Yields:
+            Lock token if acquired
+
+        Raises:
+            DistributedLockError: If lock cannot be acquired
+        """
+        lock_token = await self.acquire_lock(resource, timeout, lock_ttl=lock_ttl)
+
+        if not lock_token:
+            raise DistributedLockError(f"Could not acquire lock for resource: {resource}")
+
+        extend_task = None
+        if auto_extend:
+            extend_task = asyncio.create_task(
+                self._extend_periodically(resource, lock_token, lock_ttl, auto_extend_interval)
+            )
+
+        try:
+            yield lock_token
+        finally:
+            if extend_task:
+                extend_task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await extend_task
+
+            await self.release_lock(resource, lock_token)
+
+
+# Global async distributed lock manager
+_async_distributed_lock = None
+
+
+def get_async_distributed_lock() -> AsyncDistributedLock:
+    """Get the global async distributed lock manager."""
+    global _async_distributed_lock
+    if _async_distributed_lock is None:
+        _async_distributed_lock = AsyncDistributedLock()
+    return _async_distributed_lock
+
+
 def safe_cursor_update(
     session: Session,
     plaid_item: Any,
@@ -583,10 +812,10 @@ def create_sync_lock_key(plaid_item_id: str, operation_type: str = "sync") -> st
     return f"plaid:{operation_type}:{plaid_item_id}"
 
 
-@contextmanager
-def plaid_sync_lock(plaid_item_id: str, timeout: float = 30.0):
+@asynccontextmanager
+async def plaid_sync_lock(plaid_item_id: str, timeout: float = 30.0):
     """
-    Context manager for Plaid sync operations.
+    Async context manager for Plaid sync operations.
 
     Args:
         plaid_item_id: Plaid item ID
@@ -599,7 +828,7 @@ def plaid_sync_lock(plaid_item_id: str, timeout: float = 30.0):
         DistributedLockError: If lock cannot be acquired
     """
     lock_key = create_sync_lock_key(plaid_item_id)
-    distributed_lock = get_distributed_lock()
+    distributed_lock = get_async_distributed_lock()
 
-    with distributed_lock.lock(lock_key, timeout=timeout, auto_extend=True):
+    async with distributed_lock.lock(lock_key, timeout=timeout, auto_extend=True):
         yield
\ No newline at end of file
@@ -20,7 +20,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm.exc import StaleDataError
 import redis
 
-from ..config import settings
+from ..utils.redis import redis_registry
 
 logger = logging.getLogger(__name__)
 
@@ -227,18 +227,9 @@ class DistributedLock:
         Initialize distributed lock manager.
 
         Args:
-            redis_client: Optional Redis client. If None, creates default client.
+            redis_client: Optional Redis client. If None, uses the shared sync client.
         """
-        if redis_client:
-            self.redis = redis_client
-        else:
-            # Create Redis client from settings
-            self.redis = redis.from_url(
-                settings.redis_url,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5
-            )
+        self.redis = redis_client or redis_registry.sync_client
 
         self.lock_prefix = "manna:lock:"
 
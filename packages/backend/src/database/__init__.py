@@ -2,13 +2,20 @@
 Database package for Manna Financial Platform.
 """
 
-from .base import Base, get_db, SessionLocal, engine, init_db, check_db_connection
-from .models import User, Institution, Account, Transaction, PlaidItem, TaxCategory
+from .base import (
+    Base, get_db, SessionLocal, engine, init_db, check_db_connection,
+    get_async_db, get_async_engine, dispose_async_engine
+)
+from .engines import engine_registry
+from .models import (
+    User, Institution, Account, Transaction, PlaidItem, TaxCategory, AccountBalanceSnapshot
+)
 from .bookkeeping_models import (
     AccountingPeriod,
     BookkeepingRule,
     JournalEntry,
     JournalEntryLine,
+    PeriodClosingBalance,
     ReconciliationRecord,
     ReconciliationItem,
     TransactionPattern
@@ -21,16 +28,22 @@ __all__ = [
     "engine",
     "init_db",
     "check_db_connection",
+    "get_async_db",
+    "get_async_engine",
+    "dispose_async_engine",
+    "engine_registry",
     "User",
     "Institution",
     "Account",
     "Transaction",
     "PlaidItem",
     "TaxCategory",
+    "AccountBalanceSnapshot",
     "AccountingPeriod",
     "BookkeepingRule",
     "JournalEntry",
     "JournalEntryLine",
+    "PeriodClosingBalance",
     "ReconciliationRecord",
     "ReconciliationItem",
     "TransactionPattern",
@@ -2,24 +2,19 @@
 Database connection and session management.
 """
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 import logging
 
-from ..config import settings
+from .engines import engine_registry
 
 logger = logging.getLogger(__name__)
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.database_echo,
-    pool_size=settings.database_pool_size,
-    max_overflow=settings.database_max_overflow,
-    pool_pre_ping=True,  # Verify connections before using
-)
+# Shared primary engine; SecureDatabase uses the same pool
+engine = engine_registry.get_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(
@@ -45,6 +40,27 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_async_engine() -> AsyncEngine:
+    """Get the application's async engine, creating it on first use."""
+    return engine_registry.get_async_engine()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async database session.
+
+    Queries are awaited on the event loop instead of blocking it, so one
+    worker can serve many requests waiting on the database at once.
+    """
+    async with engine_registry.get_async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections, e.g. on shutdown."""
+    await engine_registry.dispose_async()
+
+
 def init_db() -> None:
     """
     Initialize database by creating all tables.
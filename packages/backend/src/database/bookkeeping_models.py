@@ -61,7 +61,7 @@ class JournalEntry(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    entry_number = Column(String(50), unique=True, nullable=False)  # Sequential numbering
+    entry_number = Column(String(50), nullable=False)  # Sequential numbering, per user
     entry_date = Column(Date, nullable=False)
     description = Column(Text, nullable=False)
     reference = Column(String(100), nullable=True)  # Invoice number, check number, etc.
@@ -83,6 +83,10 @@ class JournalEntry(Base):
     automation_rule = relationship("BookkeepingRule", back_populates="journal_entries")
     lines = relationship("JournalEntryLine", back_populates="journal_entry", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "entry_number", name="uq_journal_entries_user_entry_number"),
+    )
+
     def validate_balance(self):
         """Ensure debits equal credits."""
         total_debits = sum(line.debit_amount or Decimal(0) for line in self.lines)
@@ -100,7 +104,9 @@ class JournalEntryLine(Base):
     debit_amount = Column(Numeric(15, 2), default=Decimal("0.00"))
     credit_amount = Column(Numeric(15, 2), default=Decimal("0.00"))
     description = Column(Text, nullable=True)
-    transaction_id = Column(UUID(as_uuid=True), ForeignKey("transactions.id"), nullable=True)
+    # No foreign key: transactions is partitioned (migration 014), so its id
+    # alone cannot be referenced; a trigger checks it instead (migration 018)
+    transaction_id = Column(UUID(as_uuid=True), nullable=True)
     line_number = Column(Integer, nullable=False)
     tax_category_id = Column(UUID(as_uuid=True), ForeignKey("tax_categories.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -110,7 +116,11 @@ class JournalEntryLine(Base):
     journal_entry = relationship("JournalEntry", back_populates="lines")
     # ChartOfAccount relationship will be added when models are properly integrated
     # chart_account = relationship("ChartOfAccount", back_populates="journal_entry_lines")
-    transaction = relationship("Transaction", back_populates="journal_entry_lines")
+    transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(JournalEntryLine.transaction_id) == Transaction.id",
+        back_populates="journal_entry_lines"
+    )
     tax_category = relationship("TaxCategory", back_populates="journal_entry_lines")
 
 
@@ -143,7 +153,7 @@ class ReconciliationItem(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     reconciliation_id = Column(UUID(as_uuid=True), ForeignKey("reconciliation_records.id", ondelete="CASCADE"), nullable=False)
-    transaction_id = Column(UUID(as_uuid=True), ForeignKey("transactions.id"), nullable=True)
+    transaction_id = Column(UUID(as_uuid=True), nullable=True)  # Checked by trigger, see JournalEntryLine
     statement_date = Column(Date, nullable=False)
     statement_description = Column(String(255), nullable=True)
     statement_amount = Column(Numeric(15, 2), nullable=False)
@@ -153,7 +163,11 @@ class ReconciliationItem(Base):
 
     # Relationships
     reconciliation = relationship("ReconciliationRecord", back_populates="items")
-    transaction = relationship("Transaction", back_populates="reconciliation_items")
+    transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(ReconciliationItem.transaction_id) == Transaction.id",
+        back_populates="reconciliation_items"
+    )
 
 
 class TransactionPattern(Base):
@@ -172,4 +186,21 @@ class TransactionPattern(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="transaction_patterns")
\ No newline at end of file
+    user = relationship("User", back_populates="transaction_patterns")
+
+class PeriodClosingBalance(Base):
+    """Per-account balances captured when an accounting period is closed."""
+    __tablename__ = "period_closing_balances"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    period_id = Column(UUID(as_uuid=True), ForeignKey("accounting_periods.id", ondelete="CASCADE"), nullable=False)
+    chart_account_id = Column(UUID(as_uuid=True), ForeignKey("chart_of_accounts.id"), nullable=False)
+    period_debits = Column(Numeric(15, 2), nullable=False, default=Decimal("0.00"))  # Activity within the period
+    period_credits = Column(Numeric(15, 2), nullable=False, default=Decimal("0.00"))
+    debit_total = Column(Numeric(15, 2), nullable=False, default=Decimal("0.00"))  # Cumulative through period end
+    credit_total = Column(Numeric(15, 2), nullable=False, default=Decimal("0.00"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("period_id", "chart_account_id", name="uq_period_closing_balance_account"),
+    )
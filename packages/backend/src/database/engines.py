@@ -0,0 +1,454 @@
+"""
+Process-wide registry of SQLAlchemy engines.
+
+Every engine in a worker process comes from here, so each database has
+exactly one connection pool per process: the primary (used by both
+``get_db`` and ``SecureDatabase``), an optional read replica, and their
+async counterparts behind ``get_async_db``. Each pool is instrumented with
+``PoolMetrics`` for the health and metrics endpoints.
+"""
+
+import logging
+import ssl
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool, NullPool, Pool, QueuePool, SingletonThreadPool, StaticPool
+)
+
+from ..config import settings
+from ..core.secrets import get_secure_database_url, secrets_manager
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+# Metrics keys for async engines are prefixed, e.g. "async_primary"
+ASYNC_PREFIX = "async_"
+
+# DATABASE_POOL_CLASS values mapped to (sync, async) pool classes
+POOL_CLASSES: Dict[str, tuple] = {
+    "queue": (QueuePool, AsyncAdaptedQueuePool),
+    "null": (NullPool, NullPool),
+    "static": (StaticPool, StaticPool),
+    "singleton": (SingletonThreadPool, None),
+}
+
+# Pool classes that accept sizing arguments
+_SIZED_POOLS = (QueuePool, AsyncAdaptedQueuePool)
+
+# Key under which a new connection's open time waits for its first checkout
+_CONNECT_SECONDS_KEY = "_connect_seconds"
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    Async driver equivalent of a sync database URL.
+
+    PostgreSQL URLs use asyncpg (``sslmode`` becomes asyncpg's ``ssl``) and
+    SQLite URLs use aiosqlite; other URLs are returned unchanged.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        query = dict(url.query)
+        sslmode = query.pop("sslmode", None)
+        if sslmode:
+            query["ssl"] = sslmode
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+def pool_class_name() -> str:
+    """
+    Configured pool class name.
+
+    Defaults to no local pool behind an external pooler, a single static
+    connection in tests, and a queue pool otherwise.
+    """
+    if settings.database_pool_class:
+        name = settings.database_pool_class.lower()
+    elif settings.database_external_pooler:
+        name = "null"
+    else:
+        name = "static" if settings.environment == "testing" else "queue"
+    if name not in POOL_CLASSES:
+        raise ValueError(
+            f"DATABASE_POOL_CLASS must be one of: {', '.join(POOL_CLASSES)}"
+        )
+    return name
+
+
+class PoolMetrics:
+    """
+    Counters for one engine's connection pool.
+
+    Connect latency is the time to open a new DBAPI connection; checkout
+    wait is the time spent waiting for the pool to hand one out, excluding
+    any connect time it triggered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.checkout_timeouts = 0
+        self.invalidations = 0
+
+    def record_connect(self, seconds: float) -> None:
+        with self._lock:
+            self.connections_opened += 1
+            self.connect_seconds_total += seconds
+            self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+
+    def record_checkout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        """Counters plus the pool's live occupancy, in milliseconds."""
+        with self._lock:
+            data = {
+                "pool_class": type(pool).__name__,
+                "connections_opened": self.connections_opened,
+                "connect_time_avg_ms": _average_ms(self.connect_seconds_total, self.connections_opened),
+                "connect_time_max_ms": round(self.connect_seconds_max * 1000, 3),
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": _average_ms(self.wait_seconds_total, self.checkouts),
+                "checkout_wait_max_ms": round(self.wait_seconds_max * 1000, 3),
+                "checkout_timeouts": self.checkout_timeouts,
+                "invalidations": self.invalidations,
+            }
+
+        # Only sized pools report occupancy
+        for key, method in (("pool_size", "size"), ("checked_in", "checkedin"),
+                            ("checked_out", "checkedout"), ("overflow", "overflow")):
+            if callable(getattr(pool, method, None)):
+                data[key] = getattr(pool, method)()
+        return data
+
+
+def _average_ms(total_seconds: float, count: int) -> float:
+    return round(total_seconds / count * 1000, 3) if count else 0.0
+
+
+def _instrumented_pool_class(pool_class: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    Subclass of ``pool_class`` that times checkouts.
+
+    A subclass rather than a wrapper so that ``Pool.recreate()`` (used by
+    ``Engine.dispose()``) keeps the instrumentation.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = pool_class.connect(self)
+        except PoolTimeoutError:
+            metrics.record_timeout()
+            raise
+        elapsed = time.perf_counter() - started
+        connect_seconds = connection.info.pop(_CONNECT_SECONDS_KEY, 0.0)
+        metrics.record_checkout(max(0.0, elapsed - connect_seconds))
+        return connection
+
+    return type(pool_class.__name__, (pool_class,), {"connect": connect})
+
+
+def _instrument_engine(engine: Engine, metrics: PoolMetrics) -> None:
+    """Record connect latency and invalidations for ``engine``."""
+
+    @event.listens_for(engine, "do_connect")
+    def on_do_connect(dialect, connection_record, cargs, cparams):
+        connection_record.info["_connect_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        started = connection_record.info.pop("_connect_started", None)
+        if started is not None:
+            seconds = time.perf_counter() - started
+            connection_record.info[_CONNECT_SECONDS_KEY] = seconds
+            metrics.record_connect(seconds)
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
+
+
+class EngineRegistry:
+    """
+    Creates each engine on first use and hands out the same one afterwards.
+
+    Importing the registry does not connect anywhere or require any driver;
+    engines are built lazily from settings.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[str, Engine] = {}
+        self._session_factories: Dict[str, sessionmaker] = {}
+        self._async_engines: Dict[str, AsyncEngine] = {}
+        self._async_session_factories: Dict[str, async_sessionmaker] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+
+    def get_engine(self, role: str = PRIMARY) -> Optional[Engine]:
+        """
+        Engine for ``role``.
+
+        Returns None for the replica when DATABASE_REPLICA_URL is not set.
+        """
+        engine = self._engines.get(role)
+        if engine is not None:
+            return engine
+
+        url = self._database_url(role)
+        if url is None:
+            return None
+
+        with self._lock:
+            if role not in self._engines:
+                self._engines[role] = self._create_engine(role, url)
+                logger.info(f"Created {role} database engine ({pool_class_name()} pool)")
+        return self._engines[role]
+
+    def get_session_factory(self, role: str = PRIMARY) -> Optional[sessionmaker]:
+        """Session factory bound to the engine for ``role``."""
+        if role not in self._session_factories:
+            engine = self.get_engine(role)
+            if engine is None:
+                return None
+            self._session_factories[role] = sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                bind=engine
+            )
+        return self._session_factories[role]
+
+    def has_replica(self) -> bool:
+        """Whether a read replica is configured."""
+        return bool(settings.database_replica_url)
+
+    def get_async_engine(self, role: str = PRIMARY) -> Optional[AsyncEngine]:
+        """Async engine for ``role``, created on first use."""
+        engine = self._async_engines.get(role)
+        if engine is not None:
+            return engine
+
+        if role == PRIMARY and settings.async_database_url:
+            url = settings.async_database_url
+        else:
+            url = self._database_url(role)
+            if url is None:
+                return None
+            url = async_database_url(url)
+
+        with self._lock:
+            if role not in self._async_engines:
+                engine = self._create_async_engine(role, url)
+                self._async_engines[role] = engine
+                self._async_session_factories[role] = async_sessionmaker(
+                    engine,
+                    autoflush=False,
+                    expire_on_commit=False
+                )
+        return self._async_engines[role]
+
+    def get_async_session_factory(self, role: str = PRIMARY) -> Optional[async_sessionmaker]:
+        """Session factory bound to the async engine for ``role``."""
+        if self.get_async_engine(role) is None:
+            return None
+        return self._async_session_factories[role]
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Pool metrics for every engine created so far, keyed by role."""
+        engines: Dict[str, Engine] = dict(self._engines)
+        for role, engine in list(self._async_engines.items()):
+            engines[ASYNC_PREFIX + role] = engine.sync_engine
+        return {
+            key: self._metrics[key].snapshot(engine.pool)
+            for key, engine in engines.items()
+        }
+
+    def dispose(self) -> None:
+        """Close pooled connections of the sync engines, e.g. after fork."""
+        for engine in list(self._engines.values()):
+            engine.dispose()
+
+    async def dispose_async(self) -> None:
+        """Close the async engines' pooled connections and drop them."""
+        for role, engine in list(self._async_engines.items()):
+            await engine.dispose()
+            del self._async_engines[role]
+            self._async_session_factories.pop(role, None)
+            self._metrics.pop(ASYNC_PREFIX + role, None)
+
+    @staticmethod
+    def _database_url(role: str) -> Optional[str]:
+        if role == PRIMARY:
+            return get_secure_database_url()
+        if role == REPLICA:
+            return settings.database_replica_url or None
+        raise ValueError(f"Unknown database role: {role}")
+
+    def _create_engine(self, role: str, url: str) -> Engine:
+        metrics = PoolMetrics()
+        pool_class = POOL_CLASSES[pool_class_name()][0]
+        engine = create_engine(
+            url,
+            echo=settings.database_echo,
+            poolclass=_instrumented_pool_class(pool_class, metrics),
+            connect_args=self._connect_args(url),
+            **self._pool_kwargs(pool_class)
+        )
+        _instrument_engine(engine, metrics)
+        self._metrics[role] = metrics
+        return engine
+
+    def _create_async_engine(self, role: str, url: str) -> AsyncEngine:
+        metrics = PoolMetrics()
+        pool_class = POOL_CLASSES[pool_class_name()][1]
+        if pool_class is None:
+            raise ValueError(f"The {pool_class_name()} pool cannot be used with the async engine")
+        engine = create_async_engine(
+            url,
+            echo=settings.database_echo,
+            poolclass=_instrumented_pool_class(pool_class, metrics),
+            connect_args=self._async_connect_args(url),
+            **self._pool_kwargs(pool_class)
+        )
+        _instrument_engine(engine.sync_engine, metrics)
+        self._metrics[ASYNC_PREFIX + role] = metrics
+        return engine
+
+    @staticmethod
+    def _pool_kwargs(pool_class: Type[Pool]) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"pool_pre_ping": pool_class is not NullPool}
+        if issubclass(pool_class, _SIZED_POOLS):
+            kwargs.update(
+                pool_size=settings.database_pool_size,
+                max_overflow=settings.database_max_overflow,
+                pool_timeout=settings.database_pool_timeout,
+                pool_recycle=settings.database_pool_recycle,
+            )
+        return kwargs
+
+    @staticmethod
+    def _connect_args(url: str) -> Dict[str, Any]:
+        """
+        psycopg2 connection arguments.
+
+        Session settings go in the startup packet, except behind an external
+        pooler, which rejects ``options`` and would leak them between clients;
+        set them on the database role instead.
+        """
+        if make_url(url).get_backend_name() != "postgresql":
+            return {}
+
+        connect_args = {
+            "application_name": f"manna_{settings.environment}",
+            "connect_timeout": settings.database_connect_timeout,
+        }
+        if not settings.database_external_pooler:
+            connect_args["options"] = (
+                f"-c statement_timeout={settings.database_statement_timeout_ms} "
+                "-c timezone=UTC"
+            )
+
+        # SSL configuration for production
+        if settings.environment == "production":
+            connect_args.update({
+                "sslmode": "require",
+                "sslcert": secrets_manager.get_secret("db_ssl_cert_path"),
+                "sslkey": secrets_manager.get_secret("db_ssl_key_path"),
+                "sslrootcert": secrets_manager.get_secret("db_ssl_ca_path"),
+            })
+            # Remove None values
+            connect_args = {k: v for k, v in connect_args.items() if v is not None}
+
+        return connect_args
+
+    @staticmethod
+    def _async_connect_args(url: str) -> Dict[str, Any]:
+        """
+        asyncpg equivalents of ``_connect_args``.
+
+        Behind a transaction pooler consecutive statements may run on
+        different server connections, so asyncpg's prepared statement caches
+        are disabled and any statement it still prepares gets a unique name.
+        """
+        if make_url(url).get_backend_name() != "postgresql":
+            return {}
+
+        if settings.database_external_pooler:
+            connect_args = {
+                "timeout": settings.database_connect_timeout,
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+                "server_settings": {
+                    "application_name": f"manna_{settings.environment}",
+                },
+            }
+        else:
+            connect_args = {
+                "timeout": settings.database_connect_timeout,
+                "server_settings": {
+                    "application_name": f"manna_{settings.environment}",
+                    "statement_timeout": str(settings.database_statement_timeout_ms),
+                    "timezone": "UTC",
+                },
+            }
+
+        # SSL configuration for production
+        if settings.environment == "production":
+            connect_args["ssl"] = EngineRegistry._ssl_context()
+        return connect_args
+
+    @staticmethod
+    def _ssl_context() -> ssl.SSLContext:
+        """
+        asyncpg SSL context built from the same secrets as the psycopg2 settings.
+
+        Matches libpq's ``sslmode=require``: always encrypted, and the server
+        certificate is verified against the CA (without a hostname check)
+        only when a CA file is configured.
+        """
+        ca_path = secrets_manager.get_secret("db_ssl_ca_path")
+        context = ssl.create_default_context(cafile=ca_path)
+        context.check_hostname = False
+        if not ca_path:
+            context.verify_mode = ssl.CERT_NONE
+
+        cert_path = secrets_manager.get_secret("db_ssl_cert_path")
+        if cert_path:
+            context.load_cert_chain(cert_path, secrets_manager.get_secret("db_ssl_key_path"))
+        return context
+
+
+# Global registry; one per worker process
+engine_registry = EngineRegistry()
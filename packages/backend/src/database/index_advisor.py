@@ -0,0 +1,170 @@
+"""
+Index advisor for PostgreSQL.
+
+Reports, from the statistics PostgreSQL already keeps:
+
+- the most expensive statements in ``pg_stat_statements`` whose generic plan
+  sequentially scans a large table with a filter (candidates for an index),
+- tables read mostly by sequential scans,
+- indexes never scanned since the statistics were last reset,
+- maintained indexes (``QUERY_INDEXES``) that are missing from the database.
+
+Generic plans need PostgreSQL 16 (``EXPLAIN (GENERIC_PLAN)``); on older
+servers statements are listed without plans. Run it with
+``python scripts/index_advisor.py``.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# Indexes created for known query shapes, by name
+QUERY_INDEXES = {
+    "idx_transaction_date_id": "transaction list keyset pagination by date",
+    "idx_transaction_amount_id": "transaction list keyset pagination by amount",
+    "idx_transaction_search_vector": "transaction full-text search",
+    "idx_transaction_search_trgm": "transaction substring search",
+    "idx_transaction_user_date":
+        "dashboard, list, stats, export and reports: user_id = ... AND date >= ... ORDER BY date DESC",
+    "idx_transaction_user_category":
+        "dashboard spending: GROUP BY coalesce(user_category_override, subcategory, 'Uncategorized')",
+}
+
+
+def has_pg_stat_statements(conn: Connection) -> bool:
+    """Whether the pg_stat_statements extension is installed in this database."""
+    return bool(conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements')"
+    )).scalar())
+
+
+def top_statements(conn: Connection, limit: int = 20) -> List[Dict[str, Any]]:
+    """Statements with the most total execution time."""
+    # Renamed from total_time/mean_time in PostgreSQL 13
+    columns = set(conn.execute(text(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = 'pg_stat_statements'"
+    )).scalars())
+    total = "total_exec_time" if "total_exec_time" in columns else "total_time"
+    mean = "mean_exec_time" if "mean_exec_time" in columns else "mean_time"
+    rows = conn.execute(text(
+        f"SELECT query, calls, {total} AS total_ms, {mean} AS mean_ms, rows "
+        "FROM pg_stat_statements "
+        "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+        "AND query !~* '^\\s*(explain|begin|commit|rollback|set|show|savepoint|release)\\M' "
+        f"AND query NOT LIKE '%pg_stat_statements%' ORDER BY {total} DESC LIMIT :limit"
+    ), {"limit": limit}).mappings()
+    return [dict(row) for row in rows]
+
+
+def _seq_scans(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Filtered sequential scans anywhere in an EXPLAIN (FORMAT JSON) plan."""
+    scans = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Filter"):
+        scans.append({
+            "table": plan["Relation Name"],
+            "filter": plan["Filter"],
+            "estimated_rows": plan.get("Plan Rows"),
+        })
+    for child in plan.get("Plans", []):
+        scans.extend(_seq_scans(child))
+    return scans
+
+
+def _generic_plan(conn: Connection, query: str) -> Optional[Dict[str, Any]]:
+    """Generic plan of a normalized statement, or None if it cannot be explained."""
+    try:
+        with conn.begin_nested():
+            result = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON, GENERIC_PLAN) {query}").scalar()
+    except Exception as e:
+        logger.debug(f"Could not explain statement: {e}")
+        return None
+    return result[0]["Plan"]
+
+
+def _table_rows(conn: Connection) -> Dict[str, float]:
+    return dict(conn.execute(text(
+        "SELECT relname, n_live_tup FROM pg_stat_user_tables"
+    )).all())
+
+
+def missing_index_candidates(
+    conn: Connection,
+    limit: int = 20,
+    min_rows: int = 10000
+) -> List[Dict[str, Any]]:
+    """
+    Expensive statements that sequentially scan a table of ``min_rows`` or more.
+
+    Statements that cannot be explained (older servers, DDL) are returned
+    with ``scans`` set to None.
+    """
+    table_rows = _table_rows(conn)
+    candidates = []
+    for statement in top_statements(conn, limit):
+        plan = _generic_plan(conn, statement["query"])
+        if plan is None:
+            candidates.append({**statement, "scans": None})
+            continue
+        scans = [
+            scan for scan in _seq_scans(plan)
+            if table_rows.get(scan["table"], 0) >= min_rows
+        ]
+        if scans:
+            candidates.append({**statement, "scans": scans})
+    return candidates
+
+
+def sequential_scan_tables(conn: Connection, min_rows: int = 10000) -> List[Dict[str, Any]]:
+    """Tables of ``min_rows`` or more read more often by sequential than index scans."""
+    rows = conn.execute(text(
+        "SELECT relname AS table, n_live_tup AS live_rows, seq_scan, seq_tup_read, "
+        "coalesce(idx_scan, 0) AS idx_scan FROM pg_stat_user_tables "
+        "WHERE n_live_tup >= :min_rows AND seq_scan > coalesce(idx_scan, 0) "
+        "ORDER BY seq_tup_read DESC"
+    ), {"min_rows": min_rows}).mappings()
+    return [dict(row) for row in rows]
+
+
+def unused_indexes(conn: Connection) -> List[Dict[str, Any]]:
+    """Indexes with no scans since the statistics were reset, largest first."""
+    rows = conn.execute(text(
+        "SELECT s.relname AS table, s.indexrelname AS index, "
+        "pg_relation_size(s.indexrelid) AS size_bytes, "
+        "pg_size_pretty(pg_relation_size(s.indexrelid)) AS size "
+        "FROM pg_stat_user_indexes s JOIN pg_index i ON i.indexrelid = s.indexrelid "
+        "WHERE s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary "
+        "ORDER BY pg_relation_size(s.indexrelid) DESC"
+    )).mappings()
+    return [dict(row) for row in rows]
+
+
+def missing_query_indexes(conn: Connection) -> List[Dict[str, str]]:
+    """Entries of QUERY_INDEXES not present in the database."""
+    existing = set(conn.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"
+    )).scalars())
+    return [
+        {"index": name, "serves": serves}
+        for name, serves in QUERY_INDEXES.items()
+        if name not in existing
+    ]
+
+
+def advise(conn: Connection, limit: int = 20, min_rows: int = 10000) -> Dict[str, Any]:
+    """Full advisor report; PostgreSQL only."""
+    if conn.dialect.name != "postgresql":
+        raise ValueError("The index advisor requires PostgreSQL")
+
+    report = {
+        "missing_query_indexes": missing_query_indexes(conn),
+        "sequential_scan_tables": sequential_scan_tables(conn, min_rows),
+        "unused_indexes": unused_indexes(conn),
+        "statements": None,
+    }
+    if has_pg_stat_statements(conn):
+        report["statements"] = missing_index_candidates(conn, limit, min_rows)
+    return report
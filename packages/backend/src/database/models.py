@@ -4,12 +4,13 @@ SQLAlchemy database models for Manna Financial Platform.
 
 from sqlalchemy import (
     Column, String, Integer, Float, Boolean, DateTime, Date,
-    ForeignKey, Text, JSON, Numeric, Index, UniqueConstraint
+    ForeignKey, Text, JSON, Numeric, Index, UniqueConstraint, text
 )
 from decimal import Decimal
 from sqlalchemy.dialects.postgresql import UUID as PostgreSQLUUID
 from sqlalchemy import TypeDecorator, String
 from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy import event, inspect, select
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 import uuid
@@ -304,14 +305,19 @@ class Transaction(Base, TimestampMixin):
     """Financial transaction model."""
     __tablename__ = "transactions"
     
+    # The table is range partitioned on date, and PostgreSQL requires the
+    # partition key in every unique constraint, so the primary key is (id, date)
     id = Column(UUID(), primary_key=True, default=uuid.uuid4)
     account_id = Column(UUID(), ForeignKey("accounts.id"), nullable=False)
-    plaid_transaction_id = Column(String(255), unique=True, nullable=False, index=True)
+    # Copy of accounts.user_id so user-scoped reads filter transactions alone;
+    # filled from the account on insert (see _set_transaction_user_id)
+    user_id = Column(UUID())
+    plaid_transaction_id = Column(String(255), nullable=False)  # Unique per date, see __table_args__
     
     # Transaction details
     amount = Column('amount', Numeric(15, 2), nullable=False)
     iso_currency_code = Column(String(3), default="USD")
-    date = Column(Date, nullable=False, index=True)
+    date = Column(Date, primary_key=True, index=True)
     datetime = Column(DateTime(timezone=True))
     authorized_date = Column(Date)
     authorized_datetime = Column(DateTime(timezone=True))
@@ -329,6 +335,8 @@ class Transaction(Base, TimestampMixin):
     name = Column(String(500), nullable=False)
     merchant_name = Column(String(255), index=True)
     original_description = Column(Text)
+    # search_vector (tsvector) is generated by the database from these fields;
+    # it is not mapped here, see services/transaction_search.py
     
     # Categorization
     plaid_category = Column('plaid_category', JSON)  # Plaid categories as JSON array
@@ -379,25 +387,100 @@ class Transaction(Base, TimestampMixin):
     account = relationship("Account", back_populates="transactions")
     category = relationship("Category", backref="transactions")
     tax_category = relationship("TaxCategory", backref="transactions")
-    ml_predictions = relationship("MLPrediction", back_populates="transaction", cascade="all, delete-orphan")
+    # Tables referencing transactions have no foreign keys (they cannot
+    # reference id alone), so the joins are spelled out
+    ml_predictions = relationship(
+        "MLPrediction",
+        primaryjoin="Transaction.id == foreign(MLPrediction.transaction_id)",
+        back_populates="transaction",
+        cascade="all, delete-orphan"
+    )
 
     # Bookkeeping relationships
-    journal_entry_lines = relationship("JournalEntryLine", back_populates="transaction")
-    reconciliation_items = relationship("ReconciliationItem", back_populates="transaction")
+    journal_entry_lines = relationship(
+        "JournalEntryLine",
+        primaryjoin="Transaction.id == foreign(JournalEntryLine.transaction_id)",
+        back_populates="transaction"
+    )
+    reconciliation_items = relationship(
+        "ReconciliationItem",
+        primaryjoin="Transaction.id == foreign(ReconciliationItem.transaction_id)",
+        back_populates="transaction"
+    )
     
+    # On PostgreSQL the table is range partitioned on date (migration 014,
+    # src/database/partitioning.py); filter date ranges on the column itself.
     # Indexes
     __table_args__ = (
+        # Unique keys must include the partition key; Plaid sync de-duplicates
+        # across dates under a per-item lock (routers/plaid.py lock_item_transactions)
+        UniqueConstraint("plaid_transaction_id", "date", name="uq_transactions_plaid_transaction_id_date"),
         Index("idx_transaction_date_account", "date", "account_id"),
         Index("idx_transaction_pending", "pending"),
         Index("idx_transaction_category", "category_id", "subcategory"),
         Index("idx_transaction_merchant", "merchant_name"),
         Index("idx_transaction_reconciled", "is_reconciled"),
+        # Keyset pagination seeks on (sort key, id)
+        Index("idx_transaction_date_id", "date", "id"),
+        Index("idx_transaction_amount_id", "amount", "id"),
+        # User-scoped date ranges (user_id = ... AND date >= ...) read the
+        # aggregated columns from the index alone
+        Index(
+            "idx_transaction_user_date", "user_id", text("date DESC"),
+            postgresql_include=["amount", "subcategory", "user_category_override", "pending"]
+        ),
+        # Expression must match EFFECTIVE_CATEGORY in routers/dashboard.py
+        Index(
+            "idx_transaction_user_category", "user_id",
+            text("coalesce(user_category_override, subcategory, 'Uncategorized')"), "date",
+            postgresql_include=["amount"]
+        ),
     )
 
     def __repr__(self):
         return f"<Transaction(id={self.id}, name={self.name}, amount={self.amount})>"
 
 
+def _account_owner(connection, account_id):
+    return connection.execute(select(Account.user_id).where(Account.id == account_id)).scalar()
+
+
+@event.listens_for(Transaction, "before_insert")
+def _set_transaction_user_id(mapper, connection, target):
+    """Fill user_id from the account when the caller did not set it."""
+    if target.user_id is None and target.account_id is not None:
+        target.user_id = _account_owner(connection, target.account_id)
+
+
+@event.listens_for(Transaction, "before_update")
+def _reset_transaction_user_id(mapper, connection, target):
+    """Take user_id from the new account when a transaction changes account."""
+    if target.account_id is not None and inspect(target).attrs.account_id.history.has_changes():
+        target.user_id = _account_owner(connection, target.account_id)
+
+
+class AccountBalanceSnapshot(Base, TimestampMixin):
+    """Closing balance of an account at the end of a month.
+
+    As-of balances are answered from the nearest snapshot plus the
+    transactions dated after it, see services/balance_snapshots.py.
+    """
+    __tablename__ = "account_balance_snapshots"
+
+    id = Column(UUID(), primary_key=True, default=uuid.uuid4)
+    account_id = Column(UUID(), ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
+    period_end = Column(Date, nullable=False)
+    balance = Column(Numeric(15, 2), nullable=False)
+
+    # The unique index doubles as the (account, period_end) lookup index
+    __table_args__ = (
+        UniqueConstraint("account_id", "period_end", name="uq_balance_snapshot_account_period"),
+    )
+
+    def __repr__(self):
+        return f"<AccountBalanceSnapshot(account_id={self.account_id}, period_end={self.period_end}, balance={self.balance})>"
+
+
 class Category(Base, TimestampMixin):
     """Custom transaction categories for ML training and user preferences."""
     __tablename__ = "categories"
@@ -427,7 +510,10 @@ class MLPrediction(Base, TimestampMixin):
     __tablename__ = "ml_predictions"
 
     id = Column(UUID, primary_key=True, default=uuid.uuid4)
-    transaction_id = Column(UUID, ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False)
+    # No foreign key to the partitioned transactions table; a trigger checks
+    # the id (migration 018). Predictions must be deleted before their
+    # transaction, which the ORM cascade and the bulk delete both do
+    transaction_id = Column(UUID, nullable=False)
     category_id = Column(UUID, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
     confidence = Column(Float, nullable=False)
     model_version = Column(String, nullable=True)
@@ -435,7 +521,11 @@ class MLPrediction(Base, TimestampMixin):
     user_feedback = Column(Boolean, nullable=True)  # True if correct, False if incorrect, None if no feedback
 
     # Relationships
-    transaction = relationship("Transaction", back_populates="ml_predictions")
+    transaction = relationship(
+        "Transaction",
+        primaryjoin="foreign(MLPrediction.transaction_id) == Transaction.id",
+        back_populates="ml_predictions"
+    )
     category = relationship("Category")
 
     def __repr__(self):
@@ -451,6 +541,7 @@ class TaxCategory(Base, TimestampMixin):
     category_name = Column(String(255), nullable=False)
     tax_form = Column(String(50), nullable=False)
     tax_line = Column(String(100))
+    schedule_c_line = Column(String(10))
     description = Column(Text)
     deduction_type = Column(String(50))
     percentage_limit = Column(Numeric(5, 2))
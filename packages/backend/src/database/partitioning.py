@@ -0,0 +1,216 @@
+"""
+Range partitioning of the transactions table on ``date``.
+
+Migration 014 turns ``transactions`` into a table partitioned by year (or
+month, per TRANSACTION_PARTITION_INTERVAL at migration time) with a DEFAULT
+partition for dates outside the created ranges. ``ensure_transaction_partitions``
+creates the upcoming partitions ahead of time; it runs on startup and from
+``scripts/manage_transaction_partitions.py``, serialized across workers and
+the script by a transaction-scoped advisory lock.
+
+PostgreSQL only prunes partitions for predicates on ``transactions.date``
+compared with constants or parameters, so date-range reads should filter on
+the column directly. ``scanned_partitions`` reports which partitions a
+statement would read.
+"""
+
+import logging
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Executable
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+INTERVALS = ("year", "month")
+
+# Key of the advisory lock held while partitions are created
+PARTITION_LOCK_KEY = "transaction_partitions"
+
+_PARTITION_NAME = re.compile(r"^transactions_y(\d{4})(?:m(\d{2}))?$")
+
+
+def partition_start(day: date, interval: str) -> date:
+    """First day of the partition containing ``day``."""
+    if interval == "year":
+        return date(day.year, 1, 1)
+    if interval == "month":
+        return date(day.year, day.month, 1)
+    raise ValueError(f"Partition interval must be one of: {', '.join(INTERVALS)}")
+
+
+def next_partition_start(start: date, interval: str) -> date:
+    """First day of the partition after the one starting at ``start``."""
+    if interval == "year":
+        return date(start.year + 1, 1, 1)
+    if start.month == 12:
+        return date(start.year + 1, 1, 1)
+    return date(start.year, start.month + 1, 1)
+
+
+def partition_name(start: date, interval: str) -> str:
+    """Table name of the partition starting at ``start``."""
+    if interval == "year":
+        return f"{PARENT_TABLE}_y{start.year}"
+    return f"{PARENT_TABLE}_y{start.year}m{start.month:02d}"
+
+
+def partition_ranges(first_day: date, last_day: date, interval: str) -> List[Tuple[str, date, date]]:
+    """(name, start, end) of every partition covering ``first_day``..``last_day``."""
+    ranges = []
+    start = partition_start(first_day, interval)
+    while start <= last_day:
+        end = next_partition_start(start, interval)
+        ranges.append((partition_name(start, interval), start, end))
+        start = end
+    return ranges
+
+
+def advance(day: date, intervals: int, interval: str) -> date:
+    """Start of the partition ``intervals`` partitions after the one holding ``day``."""
+    start = partition_start(day, interval)
+    for _ in range(intervals):
+        start = next_partition_start(start, interval)
+    return start
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """Whether the transactions table is range partitioned (PostgreSQL only)."""
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass(:table))"
+    ), {"table": PARENT_TABLE}).scalar())
+
+
+def existing_partitions(conn: Connection) -> Set[str]:
+    """Names of the partitions currently attached to the transactions table."""
+    return set(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": PARENT_TABLE}).scalars())
+
+
+def partition_interval(partitions: Set[str]) -> str:
+    """Interval of the existing partitions, falling back to settings."""
+    for name in partitions:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            return "month" if match.group(2) else "year"
+    return settings.transaction_partition_interval
+
+
+def insertable_columns(conn: Connection, table: str = PARENT_TABLE) -> List[str]:
+    """Columns of ``table`` that accept values (generated columns excluded)."""
+    return list(conn.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table "
+        "AND is_generated = 'NEVER' ORDER BY ordinal_position"
+    ), {"table": table}).scalars())
+
+
+def _create_partition(conn: Connection, name: str, start: date, end: date) -> None:
+    """
+    Create one partition, moving any rows the DEFAULT partition holds for it.
+
+    A new partition cannot be attached while DEFAULT has rows in its range,
+    so those rows are moved through a detached DEFAULT partition in the
+    same transaction.
+    """
+    bounds = {"start": start, "end": end}
+    has_default = DEFAULT_PARTITION in existing_partitions(conn)
+    stranded = has_default and conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+        "WHERE date >= :start AND date < :end)"
+    ), bounds).scalar()
+
+    if not stranded:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        return
+
+    columns = ", ".join(insertable_columns(conn))
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    moved = conn.execute(text(
+        f"INSERT INTO {PARENT_TABLE} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} "
+        "WHERE date >= :start AND date < :end"
+    ), bounds).rowcount
+    conn.execute(text(
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"
+    ), bounds)
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.info(f"Moved {moved} transactions from {DEFAULT_PARTITION} into {name}")
+
+
+def ensure_transaction_partitions(
+    conn: Connection,
+    today: Optional[date] = None,
+    ahead: Optional[int] = None
+) -> List[str]:
+    """
+    Create missing partitions from the current one through ``ahead`` intervals out.
+
+    Does nothing unless the transactions table is partitioned. Concurrent
+    callers wait on an advisory lock held until ``conn``'s transaction ends,
+    then find the partitions already created. Returns the names of the
+    partitions created.
+    """
+    if not is_partitioned(conn):
+        return []
+
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": PARTITION_LOCK_KEY})
+
+    today = today or date.today()
+    ahead = settings.transaction_partitions_ahead if ahead is None else ahead
+    partitions = existing_partitions(conn)
+    interval = partition_interval(partitions)
+
+    created = []
+    for name, start, end in partition_ranges(today, advance(today, ahead, interval), interval):
+        if name not in partitions:
+            _create_partition(conn, name, start, end)
+            created.append(name)
+    if created:
+        logger.info(f"Created transaction partitions: {', '.join(created)}")
+    return created
+
+
+def _relations(plan: Dict[str, Any]) -> List[str]:
+    names = []
+    if "Relation Name" in plan:
+        names.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        names.extend(_relations(child))
+    return names
+
+
+def scanned_partitions(conn: Connection, statement: Executable) -> List[str]:
+    """
+    Transaction partitions PostgreSQL plans to read for ``statement``.
+
+    Partitions pruned at plan time do not appear; a statement without a
+    usable ``date`` predicate lists every partition.
+    """
+    compiled = statement.compile(dialect=conn.dialect)
+    plan = conn.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    return sorted({
+        name for name in _relations(plan[0]["Plan"])
+        if name.startswith(f"{PARENT_TABLE}_")
+    })
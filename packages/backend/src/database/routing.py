@@ -0,0 +1,213 @@
+"""
+Routing of read-only sessions to the read replica.
+
+Heavy read-only work (reports, exports, dashboards) can run on the replica
+so it does not compete with sync writes on the primary. A read goes to the
+replica only when one is configured, its replication lag is within
+``database_replica_max_lag_seconds`` and the user has not written recently;
+otherwise it stays on the primary so users always see their own writes,
+e.g. right after a Plaid sync.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from ..config import settings
+from ..utils.redis import get_redis_client, get_redis_client_sync
+from .engines import REPLICA, engine_registry
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind; zero when it has replayed everything it received
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+RECENT_WRITE_PREFIX = "read_primary"
+
+_lag_lock = threading.Lock()
+_lag_seconds: Optional[float] = None
+_lag_checked_at: Optional[float] = None
+
+# Per-process view of recent writers (user id -> monotonic expiry), so the
+# worker that handled the write does not need Redis to route its reads
+_recent_writes: Dict[str, float] = {}
+
+
+def _recent_write_key(user_id: Any) -> str:
+    return f"{RECENT_WRITE_PREFIX}:{user_id}"
+
+
+def _measure_lag(conn: Connection) -> float:
+    # Other dialects (SQLite in tests) have no replication to lag behind
+    if conn.dialect.name != "postgresql":
+        return 0.0
+    return float(conn.execute(REPLICA_LAG_QUERY).scalar() or 0)
+
+
+def _cached_lag() -> tuple:
+    """(is_fresh, lag) for the last lag measurement."""
+    with _lag_lock:
+        if _lag_checked_at is None:
+            return False, None
+        fresh = time.monotonic() - _lag_checked_at < settings.database_replica_lag_check_interval
+        return fresh, _lag_seconds
+
+
+def _store_lag(lag: Optional[float]) -> None:
+    global _lag_seconds, _lag_checked_at
+    with _lag_lock:
+        _lag_seconds = lag
+        _lag_checked_at = time.monotonic()
+
+
+def replica_lag_seconds() -> Optional[float]:
+    """
+    Replication lag of the replica, re-measured at most once per check interval.
+
+    None when no replica is configured or it could not be reached.
+    """
+    fresh, lag = _cached_lag()
+    if fresh:
+        return lag
+
+    engine = engine_registry.get_engine(REPLICA)
+    if engine is None:
+        return None
+    try:
+        with engine.connect() as conn:
+            lag = _measure_lag(conn)
+    except Exception as e:
+        logger.warning(f"Replica lag check failed, reading from primary: {e}")
+        lag = None
+    _store_lag(lag)
+    return lag
+
+
+async def async_replica_lag_seconds() -> Optional[float]:
+    """Async version of ``replica_lag_seconds`` using the async replica engine."""
+    fresh, lag = _cached_lag()
+    if fresh:
+        return lag
+
+    engine = engine_registry.get_async_engine(REPLICA)
+    if engine is None:
+        return None
+    try:
+        async with engine.connect() as conn:
+            lag = await conn.run_sync(_measure_lag)
+    except Exception as e:
+        logger.warning(f"Replica lag check failed, reading from primary: {e}")
+        lag = None
+    _store_lag(lag)
+    return lag
+
+
+def _replica_is_current(lag: Optional[float]) -> bool:
+    return lag is not None and lag <= settings.database_replica_max_lag_seconds
+
+
+def mark_recent_write(user_id: Any) -> None:
+    """
+    Keep ``user_id``'s reads on the primary for the read-your-writes window.
+
+    Call after committing writes the user will expect to see immediately.
+    """
+    if not engine_registry.has_replica():
+        return
+
+    window = settings.database_read_your_writes_seconds
+    _recent_writes[str(user_id)] = time.monotonic() + window
+
+    redis_client = get_redis_client_sync()
+    if redis_client:
+        try:
+            redis_client.setex(_recent_write_key(user_id), window, "1")
+        except Exception as e:
+            logger.warning(f"Failed to record recent write for user {user_id}: {e}")
+
+
+def _has_local_recent_write(user_id: Any) -> bool:
+    expires_at = _recent_writes.get(str(user_id))
+    if expires_at is None:
+        return False
+    if expires_at <= time.monotonic():
+        _recent_writes.pop(str(user_id), None)
+        return False
+    return True
+
+
+def has_recent_write(user_id: Any) -> bool:
+    """Whether ``user_id`` wrote within the read-your-writes window."""
+    if _has_local_recent_write(user_id):
+        return True
+
+    redis_client = get_redis_client_sync()
+    if redis_client:
+        try:
+            return bool(redis_client.exists(_recent_write_key(user_id)))
+        except Exception as e:
+            logger.warning(f"Failed to check recent writes for user {user_id}: {e}")
+    return False
+
+
+async def async_has_recent_write(user_id: Any) -> bool:
+    """Async version of ``has_recent_write``."""
+    if _has_local_recent_write(user_id):
+        return True
+
+    redis_client = await get_redis_client()
+    if redis_client:
+        try:
+            return bool(await redis_client.exists(_recent_write_key(user_id)))
+        except Exception as e:
+            logger.warning(f"Failed to check recent writes for user {user_id}: {e}")
+    return False
+
+
+def use_replica(user_id: Any = None) -> bool:
+    """Whether a read-only session for ``user_id`` should go to the replica."""
+    if not engine_registry.has_replica():
+        return False
+    if user_id is not None and has_recent_write(user_id):
+        return False
+    return _replica_is_current(replica_lag_seconds())
+
+
+async def async_use_replica(user_id: Any = None) -> bool:
+    """Async version of ``use_replica``."""
+    if not engine_registry.has_replica():
+        return False
+    if user_id is not None and await async_has_recent_write(user_id):
+        return False
+    return _replica_is_current(await async_replica_lag_seconds())
+
+
+def replica_session_factory() -> Optional[sessionmaker]:
+    """Session factory for the replica, or None when none is configured."""
+    return engine_registry.get_session_factory(REPLICA)
+
+
+def async_replica_session_factory() -> Optional[async_sessionmaker]:
+    """Async session factory for the replica, or None when none is configured."""
+    return engine_registry.get_async_session_factory(REPLICA)
+
+
+def reset_replica_routing() -> None:
+    """Forget the cached lag and recent writes (for tests)."""
+    global _lag_seconds, _lag_checked_at
+    with _lag_lock:
+        _lag_seconds = None
+        _lag_checked_at = None
+    _recent_writes.clear()
@@ -12,6 +12,7 @@ from .auth import (
     require_user,
     RoleChecker,
 )
+from .database import get_read_db, get_async_read_db
 
 __all__ = [
     "get_current_user",
@@ -22,4 +23,6 @@ __all__ = [
     "require_staff",
     "require_user",
     "RoleChecker",
+    "get_read_db",
+    "get_async_read_db",
 ]
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Database session dependencies for read-only routes.
+
+``get_read_db`` and ``get_async_read_db`` hand out a replica session when
+replica routing allows it and the request's primary session otherwise.
+Depending on ``get_db``/``get_async_db`` for the fallback keeps their
+overrides (e.g. in tests) effective; those sessions do not connect unless
+used.
+"""
+
+from typing import AsyncGenerator, Generator
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database import get_async_db, get_db
+from ..database.models import User
+from ..database.routing import (
+    async_replica_session_factory,
+    async_use_replica,
+    replica_session_factory,
+    use_replica,
+)
+from .auth import get_current_user
+
+
+def get_read_db(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Generator[Session, None, None]:
+    """
+    Dependency to get a session for read-only work.
+
+    Uses the read replica unless it lags or the user wrote recently.
+    """
+    if not use_replica(current_user.id):
+        yield db
+        return
+
+    replica = replica_session_factory()()
+    try:
+        yield replica
+    finally:
+        replica.close()
+
+
+async def get_async_read_db(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Async version of ``get_read_db``."""
+    if not await async_use_replica(current_user.id):
+        yield db
+        return
+
+    async with async_replica_session_factory()() as replica:
+        yield replica
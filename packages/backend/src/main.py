@@ -3,16 +3,19 @@ Manna Financial Platform - Backend API
 FastAPI application for financial data processing and management.
 """
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from typing import Dict, Any
 from datetime import datetime
 
 from .config import settings
 from .core.database import init_database, check_db_health
+from .database import dispose_async_engine, engine_registry
+from .database.partitioning import ensure_transaction_partitions
 from .core.secrets import validate_production_setup
 from .core.encryption import is_encryption_initialized
 from .middleware import (
@@ -39,8 +42,10 @@ from .routers.reports import router as reports_router
 from .routers.dashboard import router as dashboard_router
 from .routers.tax_categorization import router as tax_router
 from .schemas.common import HealthCheck
-from .utils.redis import check_redis_connection
+from .utils.redis import check_redis_connection, redis_registry
+from .websocket import manager as websocket_manager, router as websocket_router
 from .core.audit import log_audit_event, AuditEventType, AuditSeverity
+from .dependencies.auth import require_admin
 
 # Setup logging
 setup_logging()
@@ -82,6 +87,17 @@ async def lifespan(app: FastAPI):
         if settings.environment == "production":
             raise
 
+    # Create upcoming transaction partitions; the DDL blocks, so it runs in a
+    # thread, and workers starting together queue on its advisory lock
+    def create_partitions():
+        with engine_registry.get_engine().begin() as conn:
+            ensure_transaction_partitions(conn)
+
+    try:
+        await asyncio.to_thread(create_partitions)
+    except Exception as e:
+        logger.error(f"Failed to create transaction partitions: {e}")
+
     # Log application startup
     log_audit_event(
         AuditEventType.SYSTEM_START,
@@ -94,9 +110,10 @@ async def lifespan(app: FastAPI):
         }
     )
     
-    # Check connections with enhanced health checks
+    # Check connections with enhanced health checks; this also creates the
+    # worker's Redis clients
     db_health = check_db_health()
-    redis_status = await check_redis_connection()
+    redis_status = await redis_registry.startup()
 
     db_status = db_health.get("status") == "healthy"
     logger.info(f"Database connection: {'OK' if db_status else 'FAILED'}")
@@ -110,6 +127,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Manna Financial Platform API...")
+    await dispose_async_engine()
+    await websocket_manager.close()
+    await redis_registry.close()
 
     # Log application shutdown
     log_audit_event(
@@ -175,6 +195,7 @@ app.include_router(reports_router, prefix=f"{settings.api_prefix}/reports", tags
 app.include_router(dashboard_router, prefix=f"{settings.api_prefix}/dashboard", tags=["Dashboard"])
 app.include_router(bookkeeping_router, prefix=f"{settings.api_prefix}/bookkeeping", tags=["Bookkeeping"])
 app.include_router(tax_router, tags=["Tax Categorization"])
+app.include_router(websocket_router, tags=["WebSocket"])
 
 
 @app.get("/", response_model=Dict[str, str])
@@ -232,6 +253,43 @@ async def api_health_check() -> HealthCheck:
     return await health_check()
 
 
+def require_metrics_enabled() -> None:
+    """Hide the internal metrics endpoints unless they are switched on."""
+    if not settings.metrics_endpoints_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+METRICS_DEPENDENCIES = [Depends(require_metrics_enabled), Depends(require_admin)]
+
+
+@app.get("/metrics/database", response_model=Dict[str, Any], dependencies=METRICS_DEPENDENCIES)
+async def database_metrics() -> Dict[str, Any]:
+    """
+    Connection pool metrics for every database engine in this worker.
+
+    Reports pool occupancy (checked out, overflow), checkout wait time,
+    connect latency, timeouts and invalidations per engine role.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "pools": engine_registry.metrics(),
+    }
+
+
+@app.get("/metrics/redis", response_model=Dict[str, Any], dependencies=METRICS_DEPENDENCIES)
+async def redis_metrics() -> Dict[str, Any]:
+    """
+    Redis client metrics for this worker.
+
+    Reports the circuit breaker state and counters, and the occupancy of
+    the async and sync connection pools.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        **redis_registry.metrics(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     
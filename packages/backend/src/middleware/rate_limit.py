@@ -1,18 +1,140 @@
 """
 Rate limiting middleware using Redis.
+
+Each request is checked against a per-minute and a per-hour sliding window
+with one Lua script call, which returns the usage of both windows so the
+X-RateLimit headers need no further Redis round trip. When Redis errors or
+does not answer within ``RATE_LIMIT_REDIS_TIMEOUT_MS`` the check falls back
+to an in-process limiter for ``RATE_LIMIT_FALLBACK_SECONDS``.
 """
 
-from fastapi import Request, HTTPException, status
-import time
+import asyncio
 import logging
-from typing import Optional
-import hashlib
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
 
 from ..utils.redis import get_redis_client
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# Cost of one request by path prefix under the API prefix; the longest
+# matching prefix wins and other paths cost 1
+DEFAULT_ROUTE_COSTS = {
+    "/transactions/export": 10,
+    "/transactions/import": 10,
+    "/transactions/bulk": 5,
+    "/reports": 5,
+}
+
+# Sliding window counter: the previous window's count is weighted by how much
+# of it still overlaps the sliding window. KEYS are the current and previous
+# counters of each window; ARGV is now, cost, then limit and seconds of each
+# window. Counters only grow when every window allows the request.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local windows = #KEYS / 2
+local used = {}
+local allowed = 1
+for i = 1, windows do
+    local limit = tonumber(ARGV[i * 2 + 1])
+    local seconds = tonumber(ARGV[i * 2 + 2])
+    local current = tonumber(redis.call('GET', KEYS[i * 2 - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[i * 2]) or '0')
+    used[i] = previous * (1 - (now % seconds) / seconds) + current
+    if used[i] + cost > limit then
+        allowed = 0
+    end
+end
+if allowed == 1 then
+    for i = 1, windows do
+        redis.call('INCRBY', KEYS[i * 2 - 1], cost)
+        redis.call('EXPIRE', KEYS[i * 2 - 1], tonumber(ARGV[i * 2 + 2]) * 2)
+        used[i] = used[i] + cost
+    end
+end
+local reply = {allowed}
+for i = 1, windows do
+    reply[i + 1] = math.ceil(used[i])
+end
+return reply
+"""
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # Unix time the limiting window's current bucket ends
+
+
+def _window_usage(current: int, previous: int, now: float, seconds: int) -> float:
+    """Requests in the sliding window ending at ``now``; mirrors the Lua script."""
+    return previous * (1 - (now % seconds) / seconds) + current
+
+
+def _result(limits: List[Tuple[int, int]], allowed: bool, usage: List[float], now: float) -> RateLimitResult:
+    """Report the window with the fewest remaining requests."""
+    remaining, limit, seconds = min(
+        (max(0, math.floor(limit - used)), limit, seconds)
+        for (limit, seconds), used in zip(limits, usage)
+    )
+    reset = (int(now // seconds) + 1) * seconds
+    return RateLimitResult(allowed=allowed, limit=limit, remaining=remaining, reset=reset)
+
+
+class LocalRateLimiter:
+    """
+    In-process sliding window limiter used while Redis is unavailable.
+
+    Counts only this worker's requests, so with several workers a client
+    may get up to the limit from each.
+    """
+
+    def __init__(self, limits: List[Tuple[int, int]]):
+        self.limits = limits
+        self._counts: Dict[Tuple[str, int, int], int] = {}
+        self._swept_at = 0.0
+
+    def check(self, client_id: str, cost: int, now: float) -> RateLimitResult:
+        self._sweep(now)
+        keys, usage = [], []
+        for _, seconds in self.limits:
+            bucket = int(now // seconds)
+            key = (client_id, seconds, bucket)
+            keys.append(key)
+            usage.append(_window_usage(
+                self._counts.get(key, 0),
+                self._counts.get((client_id, seconds, bucket - 1), 0),
+                now,
+                seconds
+            ))
+
+        allowed = all(used + cost <= limit for used, (limit, _) in zip(usage, self.limits))
+        if allowed:
+            for key in keys:
+                self._counts[key] = self._counts.get(key, 0) + cost
+            usage = [used + cost for used in usage]
+        return _result(self.limits, allowed, usage, now)
+
+    def _sweep(self, now: float) -> None:
+        """Drop counters that no longer overlap any sliding window."""
+        shortest = min(seconds for _, seconds in self.limits)
+        if now - self._swept_at < shortest:
+            return
+        self._swept_at = now
+        self._counts = {
+            key: count for key, count in self._counts.items()
+            if key[2] >= int(now // key[1]) - 1
+        }
+
 
 class RateLimitMiddleware:
     """
@@ -24,12 +146,25 @@ class RateLimitMiddleware:
         app,
         requests_per_minute: int = 60,
         requests_per_hour: int = 1000,
-        exclude_paths: Optional[list] = None
+        exclude_paths: Optional[list] = None,
+        route_costs: Optional[Dict[str, int]] = None
     ):
         self.app = app
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
         self.exclude_paths = exclude_paths or ["/", "/health", "/docs", "/redoc", "/openapi.json"]
+        costs = DEFAULT_ROUTE_COSTS if route_costs is None else route_costs
+        # Longest prefix first so the first match is the most specific
+        self.route_costs = sorted(
+            ((f"{settings.api_prefix}{prefix}", cost) for prefix, cost in costs.items()),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self.limits = [(requests_per_minute, 60), (requests_per_hour, 3600)]
+        self.local_limiter = LocalRateLimiter(self.limits)
+        self.redis_timeout = settings.rate_limit_redis_timeout_ms / 1000
+        self._script = None
+        self._redis_retry_at = 0.0
 
     async def __call__(self, scope, receive, send):
         # Only process HTTP requests
@@ -56,11 +191,18 @@ class RateLimitMiddleware:
         client_id = self._get_client_id(request)
 
         # Check rate limits
-        if not await self._check_rate_limit(client_id):
+        result = await self._check_rate_limit(client_id, self._get_cost(request.url.path))
+        headers = {
+            "x-ratelimit-limit": str(result.limit),
+            "x-ratelimit-remaining": str(result.remaining),
+            "x-ratelimit-reset": str(result.reset),
+        }
+        if not result.allowed:
             response = Response(
                 content='{"detail":"Rate limit exceeded. Please try again later."}',
                 status_code=429,
-                media_type="application/json"
+                media_type="application/json",
+                headers={**headers, "retry-after": str(max(1, result.reset - int(time.time())))}
             )
             await response(scope, receive, send)
             return
@@ -68,20 +210,15 @@ class RateLimitMiddleware:
         # Add custom send to inject headers
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
-                headers = dict(message.get("headers", []))
-                headers[b"x-ratelimit-limit"] = str(self.requests_per_minute).encode()
-                remaining = await self._get_remaining_requests(client_id)
-                headers[b"x-ratelimit-remaining"] = str(remaining).encode()
-                headers[b"x-ratelimit-reset"] = str(int(time.time()) + 60).encode()
-
-                # Convert headers back to list of tuples
-                message["headers"] = [(k, v) for k, v in headers.items()]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (name.encode(), value.encode()) for name, value in headers.items()
+                ]
 
             await send(message)
 
         # Process request with modified send
         await self.app(scope, receive, send_wrapper)
-    
+
     def _get_client_id(self, request: Request) -> str:
         """
         Get unique client identifier.
@@ -90,66 +227,54 @@ class RateLimitMiddleware:
         user_id = getattr(request.state, "user_id", None)
         if user_id:
             return f"user:{user_id}"
-        
+
         # Fall back to IP address
         client_host = request.client.host if request.client else "unknown"
         return f"ip:{client_host}"
-    
-    async def _check_rate_limit(self, client_id: str) -> bool:
+
+    def _get_cost(self, path: str) -> int:
+        """
+        Get the cost weight of a request path.
+        """
+        for prefix, cost in self.route_costs:
+            if path.startswith(prefix):
+                return cost
+        return 1
+
+    async def _check_rate_limit(self, client_id: str, cost: int = 1) -> RateLimitResult:
         """
-        Check if client has exceeded rate limit.
+        Check and count a request against the client's rate limits.
         """
-        try:
-            redis = await get_redis_client()
-            if not redis:
-                # If Redis is not available, allow request
-                return True
-            
-            # Create keys for different time windows
-            minute_key = f"rate_limit:minute:{client_id}"
-            hour_key = f"rate_limit:hour:{client_id}"
-            
-            # Check minute limit
-            minute_count = await redis.incr(minute_key)
-            if minute_count == 1:
-                await redis.expire(minute_key, 60)
-            
-            if minute_count > self.requests_per_minute:
-                return False
-            
-            # Check hour limit
-            hour_count = await redis.incr(hour_key)
-            if hour_count == 1:
-                await redis.expire(hour_key, 3600)
-            
-            if hour_count > self.requests_per_hour:
-                return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Rate limit check failed: {e}")
-            # On error, allow request
-            return True
-    
-    async def _get_remaining_requests(self, client_id: str) -> int:
+        now = time.time()
+        if now >= self._redis_retry_at:
+            try:
+                return await asyncio.wait_for(
+                    self._check_redis(client_id, cost, now), self.redis_timeout
+                )
+            except Exception as e:
+                logger.warning(f"Rate limit check using in-process limiter: {e!r}")
+                self._redis_retry_at = now + settings.rate_limit_fallback_seconds
+
+        return self.local_limiter.check(client_id, cost, now)
+
+    async def _check_redis(self, client_id: str, cost: int, now: float) -> RateLimitResult:
         """
-        Get remaining requests for the current minute.
+        Run the sliding window script in one Redis round trip.
         """
-        try:
-            redis = await get_redis_client()
-            if not redis:
-                return self.requests_per_minute
-            
-            minute_key = f"rate_limit:minute:{client_id}"
-            count = await redis.get(minute_key)
-            
-            if count is None:
-                return self.requests_per_minute
-            
-            remaining = self.requests_per_minute - int(count)
-            return max(0, remaining)
-            
-        except Exception as e:
-            logger.error(f"Failed to get remaining requests: {e}")
-            return self.requests_per_minute
\ No newline at end of file
+        redis = await get_redis_client()
+        if not redis:
+            raise ConnectionError("Redis is not available")
+        if self._script is None:
+            # Sent with EVALSHA, falling back to EVAL once per server
+            self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+        keys, args = [], [now, cost]
+        for limit, seconds in self.limits:
+            bucket = int(now // seconds)
+            # The hash tag keeps a client's keys in one Redis Cluster slot
+            keys += [f"rate_limit:{{{client_id}}}:{seconds}:{bucket}",
+                     f"rate_limit:{{{client_id}}}:{seconds}:{bucket - 1}"]
+            args += [limit, seconds]
+
+        allowed, *usage = await self._script(keys=keys, args=args, client=redis)
+        return _result(self.limits, bool(allowed), [float(used) for used in usage], now)
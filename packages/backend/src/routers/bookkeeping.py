@@ -3,12 +3,12 @@ Bookkeeping API endpoints for journal entries, reconciliation, and financial clo
 """
 
 from typing import List, Dict, Any, Optional
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 from decimal import Decimal
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Body, File, UploadFile
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_
 
 from ..database import get_db
 from ..database.bookkeeping_models import (
@@ -20,17 +20,37 @@ from ..database.bookkeeping_models import (
     ReconciliationItem,
     TransactionPattern
 )
-from ..database.models import User, Transaction, Account
+from ..database.models import User, Account
+from ..database.routing import mark_recent_write
 from ..dependencies.auth import get_current_active_user
+from ..services.bookkeeping_status import BookkeepingStatusService, invalidate_bookkeeping_status
+from ..services.chart_of_accounts_service import invalidate_account_hierarchy
+from ..services.journal_automation import AUTOMATION_RULE_TYPE, RuleCompileError, compile_rule
+from ..services.journal_batch import JournalBatchError, JournalBatchService, allocate_entry_numbers
+from ..services.period_close import (
+    PeriodCloseError,
+    PeriodCloseService,
+    create_period_close_job,
+    get_period_close_job,
+    run_period_close_job,
+)
+from ..services.reconciliation import ReconciliationMatcher, StatementParseError, parse_statement
 from ..schemas.bookkeeping import (
     JournalEntryCreate,
     JournalEntryUpdate,
     JournalEntryResponse,
+    JournalEntryBatchCreate,
+    JournalEntryBatchPost,
+    JournalBatchResult,
     AccountingPeriodResponse,
     ReconciliationStart,
     ReconciliationResponse,
     BookkeepingHealthResponse,
-    PendingTasksResponse
+    PendingTasksResponse,
+    PeriodCloseJob,
+    PeriodClosingBalanceResponse,
+    BookkeepingRuleCreate,
+    BookkeepingRuleResponse
 )
 import logging
 
@@ -46,62 +66,8 @@ async def get_bookkeeping_health(
 ) -> BookkeepingHealthResponse:
     """Get bookkeeping health status and indicators."""
     try:
-        # Get current accounting period
-        current_period = db.query(AccountingPeriod).filter(
-            AccountingPeriod.user_id == current_user.id,
-            AccountingPeriod.start_date <= date.today(),
-            AccountingPeriod.end_date >= date.today()
-        ).first()
-
-        # Count unposted journal entries
-        unposted_entries = db.query(func.count(JournalEntry.id)).filter(
-            JournalEntry.user_id == current_user.id,
-            JournalEntry.is_posted == False
-        ).scalar() or 0
-
-        # Count unreconciled accounts
-        unreconciled_accounts = db.query(func.count(func.distinct(Account.id))).filter(
-            Account.user_id == current_user.id,
-            Account.is_active == True,
-            ~Account.id.in_(
-                db.query(ReconciliationRecord.account_id).filter(
-                    ReconciliationRecord.status == "reconciled",
-                    ReconciliationRecord.reconciliation_date >= date.today() - timedelta(days=30)
-                )
-            )
-        ).scalar() or 0
-
-        # Calculate accuracy score (simplified)
-        total_transactions = db.query(func.count(Transaction.id)).join(Account).filter(
-            Account.user_id == current_user.id
-        ).scalar() or 1
-
-        categorized_transactions = db.query(func.count(Transaction.id)).join(Account).filter(
-            Account.user_id == current_user.id,
-            or_(
-                Transaction.user_category_override.isnot(None),
-                Transaction.subcategory.isnot(None)
-            )
-        ).scalar() or 0
-
-        accuracy_score = (categorized_transactions / total_transactions) * 100 if total_transactions > 0 else 0
-
-        # Determine overall status
-        if unposted_entries > 10 or unreconciled_accounts > 3:
-            status = "behind"
-        elif unposted_entries > 5 or unreconciled_accounts > 1:
-            status = "warning"
-        else:
-            status = "current"
-
-        return BookkeepingHealthResponse(
-            status=status,
-            current_period=current_period.period_name if current_period else None,
-            unposted_entries=unposted_entries,
-            unreconciled_accounts=unreconciled_accounts,
-            accuracy_score=round(accuracy_score, 1),
-            last_reconciliation_date=None  # TODO: Get from reconciliation records
-        )
+        health = BookkeepingStatusService(db).get_health(current_user.id)
+        return BookkeepingHealthResponse(**health)
 
     except Exception as e:
         logger.error(f"Failed to get bookkeeping health: {str(e)}")
@@ -115,65 +81,7 @@ async def get_pending_tasks(
 ) -> PendingTasksResponse:
     """Get list of pending bookkeeping tasks."""
     try:
-        tasks = []
-
-        # Check for uncategorized transactions
-        uncategorized = db.query(func.count(Transaction.id)).join(Account).filter(
-            Account.user_id == current_user.id,
-            Transaction.user_category_override.is_(None),
-            Transaction.subcategory.is_(None)
-        ).scalar() or 0
-
-        if uncategorized > 0:
-            tasks.append({
-                "type": "categorization",
-                "title": "Review Categorization",
-                "description": f"{uncategorized} transactions need categorization",
-                "priority": "high" if uncategorized > 20 else "medium",
-                "count": uncategorized
-            })
-
-        # Check for accounts needing reconciliation
-        accounts_to_reconcile = db.query(Account).filter(
-            Account.user_id == current_user.id,
-            Account.is_active == True,
-            Account.account_type.in_(["depository", "credit"])
-        ).all()
-
-        for account in accounts_to_reconcile:
-            last_recon = db.query(ReconciliationRecord).filter(
-                ReconciliationRecord.account_id == account.id,
-                ReconciliationRecord.status == "reconciled"
-            ).order_by(ReconciliationRecord.reconciliation_date.desc()).first()
-
-            if not last_recon or (date.today() - last_recon.reconciliation_date).days > 30:
-                tasks.append({
-                    "type": "reconciliation",
-                    "title": f"Reconcile {account.name}",
-                    "description": "Account needs monthly reconciliation",
-                    "priority": "high" if not last_recon else "medium",
-                    "account_id": str(account.id)
-                })
-
-        # Check for period closing
-        current_month_start = date.today().replace(day=1)
-        last_month_end = current_month_start - timedelta(days=1)
-        last_month_start = last_month_end.replace(day=1)
-
-        period_exists = db.query(AccountingPeriod).filter(
-            AccountingPeriod.user_id == current_user.id,
-            AccountingPeriod.start_date == last_month_start,
-            AccountingPeriod.is_closed == True
-        ).first()
-
-        if not period_exists and date.today().day > 5:  # After 5th of month
-            tasks.append({
-                "type": "period_closing",
-                "title": f"Close {last_month_end.strftime('%B %Y')}",
-                "description": "Previous month ready for closing",
-                "priority": "high",
-                "period_date": last_month_end.isoformat()
-            })
+        tasks = BookkeepingStatusService(db).get_pending_tasks(current_user.id)
 
         return PendingTasksResponse(
             total_count=len(tasks),
@@ -204,16 +112,7 @@ async def create_journal_entry(
             )
 
         # Generate entry number
-        last_entry = db.query(JournalEntry).filter(
-            JournalEntry.user_id == current_user.id
-        ).order_by(JournalEntry.entry_number.desc()).first()
-
-        if last_entry and last_entry.entry_number:
-            # Extract number and increment
-            last_num = int(last_entry.entry_number.split('-')[-1])
-            entry_number = f"JE-{date.today().strftime('%Y%m')}-{last_num + 1:04d}"
-        else:
-            entry_number = f"JE-{date.today().strftime('%Y%m')}-0001"
+        entry_number, = allocate_entry_numbers(db, current_user.id, 1)
 
         # Create journal entry
         journal_entry = JournalEntry(
@@ -248,6 +147,8 @@ async def create_journal_entry(
 
         db.commit()
         db.refresh(journal_entry)
+        mark_recent_write(current_user.id)
+        invalidate_bookkeeping_status(current_user.id)
 
         return JournalEntryResponse(
             id=journal_entry.id,
@@ -341,6 +242,9 @@ async def post_journal_entry(
 
         db.commit()
         db.refresh(entry)
+        mark_recent_write(current_user.id)
+        invalidate_account_hierarchy(current_user.id)
+        invalidate_bookkeeping_status(current_user.id)
 
         return JournalEntryResponse(
             id=entry.id,
@@ -361,6 +265,97 @@ async def post_journal_entry(
         raise HTTPException(status_code=500, detail="Failed to post journal entry")
 
 
+def _batch_error_detail(error: JournalBatchError) -> str:
+    if not error.errors:
+        return str(error)
+    shown = "; ".join(
+        f"{e.get('entry_number') or e.get('entry_id') or 'entry ' + str(e['index'])}: {e['reason']}"
+        for e in error.errors[:10]
+    )
+    more = f" (and {len(error.errors) - 10} more)" if len(error.errors) > 10 else ""
+    return f"{error}: {shown}{more}"
+
+
+@router.post("/journal-entries/batch", response_model=JournalBatchResult, status_code=201)
+async def import_journal_entries(
+    batch: JournalEntryBatchCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import a batch of journal entries in one transaction.
+
+    Every entry must balance or nothing is imported. With ``post`` set the
+    entries are posted as part of the same transaction.
+    """
+    try:
+        return JournalBatchResult(
+            **JournalBatchService(db).import_entries(current_user.id, batch.entries, post=batch.post)
+        )
+    except JournalBatchError as e:
+        raise HTTPException(status_code=400, detail=_batch_error_detail(e))
+    except Exception as e:
+        logger.error(f"Failed to import journal entries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import journal entries")
+
+
+@router.post("/journal-entries/post", response_model=JournalBatchResult)
+async def post_journal_entries(
+    batch: JournalEntryBatchPost,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Post a batch of journal entries atomically."""
+    try:
+        return JournalBatchResult(**JournalBatchService(db).post_entries(current_user.id, batch.entry_ids))
+    except JournalBatchError as e:
+        raise HTTPException(status_code=400, detail=_batch_error_detail(e))
+    except Exception as e:
+        logger.error(f"Failed to post journal entries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to post journal entries")
+
+
+@router.get("/rules")
+async def list_bookkeeping_rules(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> List[BookkeepingRuleResponse]:
+    """List the user's bookkeeping automation rules."""
+    rules = db.query(BookkeepingRule).filter(
+        BookkeepingRule.user_id == current_user.id
+    ).order_by(BookkeepingRule.priority, BookkeepingRule.rule_name).all()
+    return [BookkeepingRuleResponse.model_validate(rule) for rule in rules]
+
+
+@router.post("/rules", status_code=201)
+async def create_bookkeeping_rule(
+    rule_data: BookkeepingRuleCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> BookkeepingRuleResponse:
+    """
+    Create a bookkeeping automation rule.
+
+    ``journal_entry`` rules are applied to newly synced transactions.
+    """
+    rule = BookkeepingRule(user_id=current_user.id, execution_count=0, **rule_data.model_dump())
+    if rule.rule_type == AUTOMATION_RULE_TYPE:
+        try:
+            compile_rule(rule)
+        except RuleCompileError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid bookkeeping rule: {e}")
+
+    try:
+        db.add(rule)
+        db.commit()
+        db.refresh(rule)
+        return BookkeepingRuleResponse.model_validate(rule)
+    except Exception as e:
+        logger.error(f"Failed to create bookkeeping rule: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to create bookkeeping rule")
+
+
 @router.post("/reconciliation/start")
 async def start_reconciliation(
     reconciliation_data: ReconciliationStart,
@@ -404,6 +399,8 @@ async def start_reconciliation(
         db.add(reconciliation)
         db.commit()
         db.refresh(reconciliation)
+        mark_recent_write(current_user.id)
+        invalidate_bookkeeping_status(current_user.id)
 
         return ReconciliationResponse(
             id=reconciliation.id,
@@ -426,6 +423,62 @@ async def start_reconciliation(
         raise HTTPException(status_code=500, detail="Failed to start reconciliation")
 
 
+@router.post("/reconciliation/{reconciliation_id}/statement")
+async def upload_reconciliation_statement(
+    reconciliation_id: UUID,
+    file: UploadFile = File(...),
+    invert_amounts: bool = Query(
+        True, description="Statement amounts are deposit-positive (opposite of synced transactions)"
+    ),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> ReconciliationResponse:
+    """Match a CSV or OFX bank statement against a pending reconciliation."""
+    reconciliation = db.query(ReconciliationRecord).filter(
+        ReconciliationRecord.id == reconciliation_id
+    ).first()
+
+    account = reconciliation and db.query(Account).filter(
+        Account.id == reconciliation.account_id,
+        Account.user_id == current_user.id
+    ).first()
+
+    if not account:
+        raise HTTPException(status_code=404, detail="Reconciliation not found")
+
+    if reconciliation.status != "pending":
+        raise HTTPException(status_code=400, detail="Reconciliation is not pending")
+
+    contents = await file.read()
+    try:
+        lines = parse_statement(contents.decode("utf-8-sig"), file.filename)
+    except (StatementParseError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid statement file: {e}")
+
+    try:
+        matcher = ReconciliationMatcher(db, invert_amounts=invert_amounts)
+        result = matcher.reconcile(reconciliation, lines)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to match reconciliation statement: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Failed to match statement")
+    mark_recent_write(current_user.id)
+
+    return ReconciliationResponse(
+        id=reconciliation.id,
+        account_id=reconciliation.account_id,
+        account_name=account.name,
+        reconciliation_date=reconciliation.reconciliation_date,
+        statement_balance=reconciliation.statement_balance,
+        book_balance=reconciliation.book_balance,
+        discrepancy_amount=reconciliation.discrepancy_amount,
+        status=reconciliation.status,
+        matched_count=result["matched_count"],
+        unmatched_count=result["unmatched_count"]
+    )
+
+
 @router.get("/accounting-periods")
 async def list_accounting_periods(
     year: Optional[int] = Query(None),
@@ -467,13 +520,25 @@ async def list_accounting_periods(
         raise HTTPException(status_code=500, detail="Failed to retrieve accounting periods")
 
 
+def _closing_error_detail(error: PeriodCloseError) -> str:
+    if error.issues:
+        return f"{error}: {'; '.join(error.issues)}"
+    return str(error)
+
+
 @router.post("/periods/close")
 async def close_accounting_period(
     period_id: UUID = Body(...),
+    force: bool = Query(False, description="Close even if validation checks fail"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> AccountingPeriodResponse:
-    """Close an accounting period."""
+    """
+    Close an accounting period.
+
+    Validates the period, posts closing entries into retained earnings and
+    stores closing balances. Use the close job endpoint for large periods.
+    """
     try:
         period = db.query(AccountingPeriod).filter(
             AccountingPeriod.id == period_id,
@@ -486,18 +551,7 @@ async def close_accounting_period(
         if period.is_closed:
             raise HTTPException(status_code=400, detail="Period is already closed")
 
-        # TODO: Validate all requirements for closing
-        # - All transactions categorized
-        # - All accounts reconciled
-        # - All journal entries posted
-
-        # Close the period
-        period.is_closed = True
-        period.closing_date = datetime.utcnow()
-
-        # TODO: Create closing journal entries
-
-        db.commit()
+        PeriodCloseService(db).close_period(period, force=force)
         db.refresh(period)
 
         return AccountingPeriodResponse(
@@ -512,7 +566,79 @@ async def close_accounting_period(
 
     except HTTPException:
         raise
+    except PeriodCloseError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=_closing_error_detail(e))
     except Exception as e:
         logger.error(f"Failed to close accounting period: {str(e)}")
         db.rollback()
-        raise HTTPException(status_code=500, detail="Failed to close accounting period")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to close accounting period")
+
+
+@router.post("/periods/{period_id}/close/jobs", response_model=PeriodCloseJob, status_code=202)
+async def start_period_close_job(
+    period_id: UUID,
+    background_tasks: BackgroundTasks,
+    force: bool = Query(False, description="Close even if validation checks fail"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Close an accounting period in the background.
+
+    Poll ``GET /periods/close/jobs/{job_id}`` for progress.
+    """
+    period = db.query(AccountingPeriod).filter(
+        AccountingPeriod.id == period_id,
+        AccountingPeriod.user_id == current_user.id
+    ).first()
+
+    if not period:
+        raise HTTPException(status_code=404, detail="Accounting period not found")
+
+    if period.is_closed:
+        raise HTTPException(status_code=400, detail="Period is already closed")
+
+    job = create_period_close_job(current_user.id, period.id, force)
+    background_tasks.add_task(run_period_close_job, job["job_id"], db.get_bind())
+
+    return PeriodCloseJob(**job)
+
+
+@router.get("/periods/close/jobs/{job_id}", response_model=PeriodCloseJob)
+async def get_period_close_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the progress of a background period close."""
+    job = get_period_close_job(job_id)
+    if not job or job["user_id"] != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Period close job not found")
+
+    return PeriodCloseJob(**job)
+
+
+@router.get("/periods/{period_id}/closing-balances")
+async def get_period_closing_balances(
+    period_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> List[PeriodClosingBalanceResponse]:
+    """Get the account balances stored when a period was closed."""
+    period = db.query(AccountingPeriod).filter(
+        AccountingPeriod.id == period_id,
+        AccountingPeriod.user_id == current_user.id
+    ).first()
+
+    if not period:
+        raise HTTPException(status_code=404, detail="Accounting period not found")
+
+    if not period.is_closed:
+        raise HTTPException(status_code=400, detail="Period is not closed")
+
+    try:
+        balances = PeriodCloseService(db).closing_balances(period.id)
+        return [PeriodClosingBalanceResponse(**balance) for balance in balances]
+    except Exception as e:
+        logger.error(f"Failed to get closing balances: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve closing balances")
@@ -5,10 +5,10 @@ Dashboard API endpoints for aggregated financial data.
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, case, literal_column, select
 
-from ..database import get_db
+from ..dependencies.database import get_async_read_db
 from ..database.models import User, Account, Transaction, Category
 from ..dependencies.auth import get_current_active_user
 from pydantic import BaseModel
@@ -24,18 +24,44 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# Spelled with a literal rather than a bound parameter so PostgreSQL matches
+# the expression index idx_transaction_user_category
+EFFECTIVE_CATEGORY = func.coalesce(
+    Transaction.user_category_override,
+    Transaction.subcategory,
+    literal_column("'Uncategorized'")
+)
+
+
+def _active_transactions(user_id):
+    """Predicates selecting the user's transactions on active accounts."""
+    # Filtering on transactions.user_id uses its indexes; the anti-join only
+    # sees the user's (usually no) inactive accounts
+    return (
+        Transaction.user_id == user_id,
+        Transaction.account_id.not_in(
+            select(Account.id).where(
+                Account.user_id == user_id,
+                Account.is_active.isnot(True)
+            )
+        ),
+    )
+
+
 @router.get("/summary")
 async def get_financial_summary(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> ResponseModel:
     """Get financial summary with assets, liabilities, and net worth."""
     try:
         # Get all user accounts (is_hidden is a property that checks is_active)
-        accounts = db.query(Account).filter(
-            Account.user_id == current_user.id,
-            Account.is_active == True
-        ).all()
+        accounts = (await db.execute(
+            select(Account).where(
+                Account.user_id == current_user.id,
+                Account.is_active == True
+            )
+        )).scalars().all()
 
         # Calculate totals
         total_assets = 0
@@ -98,32 +124,32 @@ async def get_financial_summary(
 async def get_recent_transactions(
     limit: int = Query(10, le=100),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> ResponseModel:
     """Get recent transactions."""
     try:
-        # Get user accounts
-        account_ids = db.query(Account.id).filter(
-            Account.user_id == current_user.id,
-            Account.is_active == True
-        ).subquery()
-
-        # Get recent transactions
-        transactions = db.query(Transaction).filter(
-            Transaction.account_id.in_(account_ids)
-        ).order_by(Transaction.date.desc()).limit(limit).all()
+        # Get recent transactions with their account names in one query
+        rows = (await db.execute(
+            select(Transaction, Account.name.label("account_name"))
+            .join(Account, Account.id == Transaction.account_id)
+            .where(
+                Transaction.user_id == current_user.id,
+                Account.is_active == True
+            )
+            .order_by(Transaction.date.desc())
+            .limit(limit)
+        )).all()
 
         # Format transactions for frontend
         data = []
-        for t in transactions:
-            account = db.query(Account).filter(Account.id == t.account_id).first()
+        for t, account_name in rows:
             data.append({
                 "id": str(t.id),
                 "date": t.date.isoformat(),
                 "description": t.name or t.merchant_name or "Unknown",
                 "amount": float(t.amount) if t.amount else 0,
                 "category": t.user_category_override or t.subcategory or "Uncategorized",
-                "account": account.name if account else "Unknown",
+                "account": account_name or "Unknown",
                 "merchant": t.merchant_name,
                 "type": "debit" if (t.amount or 0) > 0 else "credit"
             })
@@ -139,29 +165,23 @@ async def get_recent_transactions(
 async def get_spending_by_category(
     days: int = Query(30, ge=1, le=365),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> ResponseModel:
     """Get spending grouped by category."""
     try:
         start_date = date.today() - timedelta(days=days)
 
-        # Get user accounts
-        account_ids = db.query(Account.id).filter(
-            Account.user_id == current_user.id,
-            Account.is_active == True
-        ).subquery()
-
         # Get spending by category - use actual columns not properties
-        spending = db.query(
-            func.coalesce(Transaction.user_category_override, Transaction.subcategory, 'Uncategorized').label('category'),
-            func.sum(Transaction.amount * 100).label("total")
-        ).filter(
-            Transaction.account_id.in_(account_ids),
-            Transaction.date >= start_date,
-            Transaction.amount > 0  # Only expenses
-        ).group_by(
-            func.coalesce(Transaction.user_category_override, Transaction.subcategory, 'Uncategorized')
-        ).all()
+        spending = (await db.execute(
+            select(
+                EFFECTIVE_CATEGORY.label('category'),
+                func.sum(Transaction.amount * 100).label("total")
+            ).where(
+                *_active_transactions(current_user.id),
+                Transaction.date >= start_date,
+                Transaction.amount > 0  # Only expenses
+            ).group_by(EFFECTIVE_CATEGORY)
+        )).all()
 
         # Calculate total and format data
         total = sum(s.total for s in spending if s.total)
@@ -192,37 +212,33 @@ async def get_spending_by_category(
 async def get_transaction_trends(
     days: int = Query(30, ge=1, le=365),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> ResponseModel:
     """Get daily transaction trends."""
     try:
         start_date = date.today() - timedelta(days=days)
 
-        # Get user accounts
-        account_ids = db.query(Account.id).filter(
-            Account.user_id == current_user.id,
-            Account.is_active == True
-        ).subquery()
-
         # Get daily totals
-        daily_totals = db.query(
-            Transaction.date,
-            func.sum(
-                case(
-                    (Transaction.amount < 0, -Transaction.amount * 100),
-                    else_=0
-                )
-            ).label("income"),
-            func.sum(
-                case(
-                    (Transaction.amount > 0, Transaction.amount * 100),
-                    else_=0
-                )
-            ).label("expenses")
-        ).filter(
-            Transaction.account_id.in_(account_ids),
-            Transaction.date >= start_date
-        ).group_by(Transaction.date).order_by(Transaction.date).all()
+        daily_totals = (await db.execute(
+            select(
+                Transaction.date,
+                func.sum(
+                    case(
+                        (Transaction.amount < 0, -Transaction.amount * 100),
+                        else_=0
+                    )
+                ).label("income"),
+                func.sum(
+                    case(
+                        (Transaction.amount > 0, Transaction.amount * 100),
+                        else_=0
+                    )
+                ).label("expenses")
+            ).where(
+                *_active_transactions(current_user.id),
+                Transaction.date >= start_date
+            ).group_by(Transaction.date).order_by(Transaction.date)
+        )).all()
 
         # Format data
         data = []
@@ -247,7 +263,7 @@ async def get_transaction_trends(
 async def get_cash_flow(
     months: int = Query(6, ge=1, le=24),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> ResponseModel:
     """Get monthly cash flow data."""
     try:
@@ -255,31 +271,27 @@ async def get_cash_flow(
         today = date.today()
         start_date = date(today.year, today.month, 1) - timedelta(days=30 * months)
 
-        # Get user accounts
-        account_ids = db.query(Account.id).filter(
-            Account.user_id == current_user.id,
-            Account.is_active == True
-        ).subquery()
-
         # Get monthly totals
-        monthly_totals = db.query(
-            func.date_trunc('month', Transaction.date).label("month"),
-            func.sum(
-                case(
-                    (Transaction.amount < 0, -Transaction.amount),
-                    else_=0
-                )
-            ).label("income"),
-            func.sum(
-                case(
-                    (Transaction.amount > 0, Transaction.amount),
-                    else_=0
-                )
-            ).label("expenses")
-        ).filter(
-            Transaction.account_id.in_(account_ids),
-            Transaction.date >= start_date
-        ).group_by("month").order_by("month").all()
+        monthly_totals = (await db.execute(
+            select(
+                func.date_trunc('month', Transaction.date).label("month"),
+                func.sum(
+                    case(
+                        (Transaction.amount < 0, -Transaction.amount),
+                        else_=0
+                    )
+                ).label("income"),
+                func.sum(
+                    case(
+                        (Transaction.amount > 0, Transaction.amount),
+                        else_=0
+                    )
+                ).label("expenses")
+            ).where(
+                *_active_transactions(current_user.id),
+                Transaction.date >= start_date
+            ).group_by("month").order_by("month")
+        )).all()
 
         # Format data with running balance
         data = []
@@ -312,8 +324,7 @@ async def get_cash_flow(
 
 @router.get("/alerts")
 async def get_alerts(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user)
 ) -> ResponseModel:
     """Get financial alerts and notifications."""
     try:
@@ -331,15 +342,17 @@ async def get_alerts(
 @router.get("/kpis")
 async def get_kpis(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> ResponseModel:
     """Get key performance indicators."""
     try:
         # Get user accounts
-        accounts = db.query(Account).filter(
-            Account.user_id == current_user.id,
-            Account.is_active == True
-        ).all()
+        accounts = (await db.execute(
+            select(Account).where(
+                Account.user_id == current_user.id,
+                Account.is_active == True
+            )
+        )).scalars().all()
 
         # Calculate total balance
         total_balance = sum(
@@ -349,12 +362,13 @@ async def get_kpis(
 
         # Get this month's transactions
         start_of_month = date.today().replace(day=1)
-        account_ids = [a.id for a in accounts]
 
-        monthly_transactions = db.query(Transaction).filter(
-            Transaction.account_id.in_(account_ids),
-            Transaction.date >= start_of_month
-        ).all()
+        monthly_transactions = (await db.execute(
+            select(Transaction).where(
+                *_active_transactions(current_user.id),
+                Transaction.date >= start_of_month
+            )
+        )).scalars().all()
 
         # Calculate income and expenses
         monthly_income = sum(
@@ -27,6 +27,8 @@ from ..dependencies.auth import get_current_verified_user
 from ..database.models import User
 from ..services.ml_categorization import ml_service
 from ..services.category_rules import category_rules_service
+from ..services.transaction_bulk import bulk_set_user_categories
+from ..websocket import send_transaction_update, send_transactions_categorized
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -65,6 +67,10 @@ async def categorize_transaction(
         transaction.confidence_level = result.confidence
         transaction.updated_at = datetime.utcnow()
         db.commit()
+        await send_transaction_update(
+            str(current_user.id), str(transaction.id), "categorized",
+            {"category": result.suggested_category, "confidence": result.confidence}
+        )
     
     return result
 
@@ -97,14 +103,21 @@ async def categorize_batch(
     # Update transactions if auto_apply is enabled
     updated_count = 0
     if request.auto_apply:
+        applied = []
         for transaction, result in zip(transactions, results):
             if result.confidence >= request.min_confidence and not transaction.user_category:
                 transaction.primary_category = result.suggested_category
                 transaction.confidence_level = result.confidence
                 transaction.updated_at = datetime.utcnow()
                 updated_count += 1
+                applied.append({
+                    "transaction_id": str(transaction.id),
+                    "category": result.suggested_category,
+                    "confidence": result.confidence
+                })
         
         db.commit()
+        await send_transactions_categorized(str(current_user.id), applied)
     
     return BatchCategorizationResponse(
         categorizations=results,
@@ -172,6 +185,10 @@ async def auto_categorize_all(
     
     if not dry_run:
         db.commit()
+        await send_transactions_categorized(str(current_user.id), [
+            {key: item[key] for key in ("transaction_id", "category", "confidence")}
+            for item in categorized
+        ])
     
     return {
         "success": True,
@@ -257,7 +274,7 @@ async def provide_feedback(
         raise HTTPException(status_code=404, detail="Transaction not found")
     
     # Update transaction with correct category
-    transaction.user_category = feedback.correct_category
+    transaction.user_category_override = feedback.correct_category
     transaction.updated_at = datetime.utcnow()
     
     # Record feedback for model improvement
@@ -268,6 +285,7 @@ async def provide_feedback(
     )
     
     db.commit()
+    ml_service.invalidate_predictions([transaction])
     
     return {
         "success": True,
@@ -773,57 +791,69 @@ async def provide_batch_feedback(
 ):
     """
     Provide feedback on multiple categorizations at once.
+
+    Category overrides are applied with one UPDATE, feedback is appended to the
+    retraining log in one write and cached predictions are dropped in one call.
     """
     try:
+        categories: Dict[UUID, str] = {}
+        was_correct: Dict[UUID, bool] = {}
         feedback_results = []
 
         for item in feedback_items:
             transaction_id = item.get("transaction_id")
             correct_category = item.get("correct_category")
-            was_correct = item.get("was_correct", False)
 
             if not transaction_id or not correct_category:
                 continue
 
-            # Verify transaction belongs to user
-            transaction = db.query(Transaction).join(Account).filter(
-                Transaction.id == transaction_id,
-                Account.user_id == current_user.id
-            ).first()
+            try:
+                txn_uuid = UUID(str(transaction_id))
+            except ValueError:
+                feedback_results.append({
+                    "transaction_id": str(transaction_id),
+                    "success": False,
+                    "error": "Invalid transaction id"
+                })
+                continue
+
+            categories[txn_uuid] = correct_category
+            was_correct[txn_uuid] = item.get("was_correct", False)
 
-            if transaction:
-                # Update transaction
-                transaction.user_category_override = correct_category
-                transaction.updated_at = datetime.utcnow()
+        updated = bulk_set_user_categories(db, current_user.id, categories)
+        updated_ids = {row.id for row in updated}
 
-                # Record feedback
-                feedback_result = ml_service.update_from_feedback(
-                    transaction_id=str(transaction_id),
-                    correct_category=correct_category,
-                    was_correct=was_correct
-                )
+        feedback_result = ml_service.update_from_feedback_batch([
+            {
+                "transaction_id": str(txn_id),
+                "correct_category": categories[txn_id],
+                "was_correct": was_correct[txn_id]
+            }
+            for txn_id in categories if txn_id in updated_ids
+        ]) if updated_ids else {}
 
+        db.commit()
+        ml_service.invalidate_predictions(updated)
+
+        retrain_triggered = feedback_result.get("retrain_triggered", False)
+        for txn_id in categories:
+            if txn_id in updated_ids:
                 feedback_results.append({
-                    "transaction_id": str(transaction_id),
+                    "transaction_id": str(txn_id),
                     "success": True,
-                    "retrain_triggered": feedback_result.get("retrain_triggered", False)
+                    "retrain_triggered": retrain_triggered
                 })
             else:
                 feedback_results.append({
-                    "transaction_id": str(transaction_id),
+                    "transaction_id": str(txn_id),
                     "success": False,
                     "error": "Transaction not found or unauthorized"
                 })
 
-        db.commit()
-
-        # Check if any triggered retraining
-        retrain_triggered = any(r.get("retrain_triggered", False) for r in feedback_results)
-
         return {
             "success": True,
             "processed_count": len(feedback_results),
-            "successful_feedback": sum(1 for r in feedback_results if r["success"]),
+            "successful_feedback": len(updated_ids),
             "retrain_triggered": retrain_triggered,
             "results": feedback_results
         }
@@ -5,15 +5,19 @@ Plaid integration router for connecting and managing financial accounts.
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta, date
 from decimal import Decimal
+from uuid import UUID
 from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, text
 import logging
 import json
 import asyncio
 
 from ..database import get_db
 from ..database.models import User, PlaidItem, Institution, Account, Transaction
+from ..database.routing import mark_recent_write
+from ..services.tax_categorization_service import invalidate_tax_summary
+from ..websocket import send_sync_status
 from ..schemas.plaid import (
     PlaidLinkToken, PlaidPublicTokenExchange, PlaidWebhook,
     PlaidInstitution, PlaidError
@@ -21,6 +25,7 @@ from ..schemas.plaid import (
 from ..schemas.account import Account as AccountSchema, AccountList
 from ..schemas.transaction import Transaction as TransactionSchema, TransactionList
 from ..dependencies.auth import get_current_active_user
+from ..services.journal_automation import JournalAutomation
 from ..services.plaid_service import plaid_service
 from ..utils.redis import get_redis_client
 from ..config import settings
@@ -438,6 +443,7 @@ async def fetch_historical_transactions(
             plaid_item = db.query(PlaidItem).filter(PlaidItem.id == plaid_item_id).first()
             if not plaid_item:
                 continue
+            lock_item_transactions(db, plaid_item.id)
 
             try:
                 # Fetch all transactions with pagination
@@ -606,6 +612,15 @@ async def sync_all_transactions(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to save sync results: {str(commit_error)}"
             )
+        mark_recent_write(current_user.id)
+        # Modified and removed transactions can change the deductible totals
+        if total_modified or total_removed:
+            invalidate_tax_summary(current_user.id)
+        await send_sync_status(str(current_user.id), "completed", {
+            "new_transactions": total_new,
+            "modified_transactions": total_modified,
+            "removed_transactions": total_removed,
+        })
 
         # Prepare response
         response = {
@@ -895,6 +910,13 @@ async def fetch_initial_transactions(
             logger.error(f"Failed to fetch historical transactions: {e}")
             # Don't fail the whole process if historical fetch fails
             db.commit()
+        mark_recent_write(user_id)
+        if result["modified_transactions"] or result["removed_transactions"]:
+            invalidate_tax_summary(user_id)
+        await send_sync_status(str(user_id), "completed", {
+            key: result[key]
+            for key in ("new_transactions", "modified_transactions", "removed_transactions")
+        })
         
         # Clear sync lock
         redis_client = await get_redis_client()
@@ -910,6 +932,24 @@ async def fetch_initial_transactions(
             await redis_client.delete(f"sync_lock:{plaid_item_id}")
 
 
+def lock_item_transactions(db: Session, plaid_item_id: Any) -> None:
+    """
+    Serialize inserts of an item's transactions until the caller commits.
+
+    transactions is partitioned by date, so plaid_transaction_id is only
+    unique together with date; the duplicate check in
+    process_added_transaction is what keeps a re-delivered transaction out.
+    On PostgreSQL a transaction-scoped advisory lock per item makes that
+    check safe against a concurrent sync (webhook and manual sync) of the
+    same item. Plaid transaction ids are never shared between items.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"plaid_item_transactions:{plaid_item_id}"}
+        )
+
+
 async def sync_plaid_item_transactions(
     plaid_item: PlaidItem,
     db: Session,
@@ -932,12 +972,15 @@ async def sync_plaid_item_transactions(
     # Mark sync attempt
     plaid_item.last_sync_attempt = datetime.utcnow()
     db.flush()
+    lock_item_transactions(db, plaid_item.id)
 
     # Sync statistics
     total_added = 0
     total_modified = 0
     total_removed = 0
+    total_journal_entries = 0
     page_count = 0
+    journal_automation = None
 
     # Store original cursor for pagination error recovery
     original_cursor = current_cursor
@@ -976,13 +1019,23 @@ async def sync_plaid_item_transactions(
 
             # Process added transactions with progress tracking
             added_txns = sync_result.get("added", [])
+            page_transactions = []
             for i, txn_data in enumerate(added_txns):
-                if await process_added_transaction(txn_data, plaid_item, db):
+                transaction = await process_added_transaction(txn_data, plaid_item, db)
+                if transaction:
+                    page_transactions.append(transaction)
                     total_added += 1
                 # Log progress every 100 transactions
                 if (i + 1) % 100 == 0:
                     logger.info(f"Processing added transactions: {i + 1}/{len(added_txns)}")
 
+            # Generate journal entries for the page from the user's bookkeeping rules
+            if page_transactions:
+                if journal_automation is None:
+                    journal_automation = JournalAutomation(db, UUID(str(user_id)))
+                db.flush()
+                total_journal_entries += journal_automation.apply(page_transactions)
+
             # Process modified transactions
             modified_txns = sync_result.get("modified", [])
             for i, txn_data in enumerate(modified_txns):
@@ -1030,6 +1083,7 @@ async def sync_plaid_item_transactions(
             "new_transactions": total_added,
             "modified_transactions": total_modified,
             "removed_transactions": total_removed,
+            "journal_entries_created": total_journal_entries,
             "pages_processed": page_count
         }
 
@@ -1042,22 +1096,23 @@ async def process_added_transaction(
     txn_data: Dict[str, Any],
     plaid_item: PlaidItem,
     db: Session
-) -> bool:
+) -> Optional[Transaction]:
     """
     Process a newly added transaction with deduplication and error handling.
 
     Returns:
-        True if transaction was processed successfully, False otherwise
+        The new (unflushed) Transaction, or None if it was skipped or failed
     """
     try:
-        # Check if transaction already exists (deduplication)
+        # Check if transaction already exists (deduplication); the caller
+        # holds lock_item_transactions so a concurrent sync cannot race it
         existing = db.query(Transaction).filter(
             Transaction.plaid_transaction_id == txn_data["transaction_id"]
         ).first()
 
         if existing:
             logger.debug(f"Transaction {txn_data['transaction_id']} already exists, skipping")
-            return False
+            return None
 
         # Get account with plaid_item verification
         account = db.query(Account).filter(
@@ -1067,7 +1122,7 @@ async def process_added_transaction(
 
         if not account:
             logger.warning(f"Account {txn_data['account_id']} not found for item {plaid_item.id}")
-            return False
+            return None
 
         # Parse and validate date
         txn_date = parse_transaction_date(txn_data["date"])
@@ -1081,6 +1136,7 @@ async def process_added_transaction(
 
         transaction = Transaction(
             account_id=account.id,
+            user_id=account.user_id,
             plaid_transaction_id=txn_data["transaction_id"],
             amount=Decimal(str(txn_data["amount"])),  # Use amount column directly
             iso_currency_code=txn_data.get("iso_currency_code", "USD"),
@@ -1099,14 +1155,14 @@ async def process_added_transaction(
         )
 
         db.add(transaction)
-        return True
+        return transaction
 
     except Exception as e:
         import traceback
         logger.error(f"Failed to process added transaction {txn_data.get('transaction_id', 'unknown')}: {e}")
         logger.error(f"Transaction data: {txn_data}")
         logger.error(f"Traceback: {traceback.format_exc()}")
-        return False
+        return None
 
 
 async def process_modified_transaction(
@@ -1237,6 +1293,13 @@ async def sync_item_transactions(
         )
 
         db.commit()
+        mark_recent_write(user_id)
+        if result["modified_transactions"] or result["removed_transactions"]:
+            invalidate_tax_summary(user_id)
+        await send_sync_status(str(user_id), "completed", {
+            key: result[key]
+            for key in ("new_transactions", "modified_transactions", "removed_transactions")
+        })
 
         logger.info(f"Background sync complete for item {plaid_item_id}: {result}")
 
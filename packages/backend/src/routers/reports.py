@@ -3,10 +3,10 @@
 from datetime import datetime, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from ..database.base import get_db
+from ..dependencies.database import get_async_read_db
 from ..dependencies.auth import get_current_user
 from ..schemas.user import User
 from ..schemas.reports import (
@@ -20,16 +20,24 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
+async def _generate(db: AsyncSession, build):
+    """
+    Run ``build(service)`` against a ReportGeneratorService.
+
+    The service is synchronous; run_sync drives it on the async session's
+    connection so its queries do not block the event loop.
+    """
+    return await db.run_sync(lambda session: build(ReportGeneratorService(session)))
+
+
 @router.post("/generate", response_model=ReportResponse)
 async def generate_report(
     request: ReportRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Generate a financial report."""
     try:
-        service = ReportGeneratorService(db)
-
         # Determine date range
         if request.start_date and request.end_date:
             start_date = request.start_date
@@ -56,24 +64,26 @@ async def generate_report(
 
         # Generate report based on type
         if request.report_type == ReportType.PROFIT_LOSS:
-            data = service.generate_profit_loss(
+            data = await _generate(db, lambda service: service.generate_profit_loss(
                 current_user.id,
                 start_date,
                 end_date,
                 request.is_business
-            )
+            ))
         elif request.report_type == ReportType.BALANCE_SHEET:
-            data = service.generate_balance_sheet(current_user.id, end_date)
+            data = await _generate(db, lambda service: service.generate_balance_sheet(current_user.id, end_date))
         elif request.report_type == ReportType.CASH_FLOW:
-            data = service.generate_cash_flow(current_user.id, start_date, end_date)
+            data = await _generate(db, lambda service: service.generate_cash_flow(
+                current_user.id, start_date, end_date
+            ))
         elif request.report_type == ReportType.TAX_SUMMARY:
-            data = service.generate_tax_summary(current_user.id, request.year)
+            data = await _generate(db, lambda service: service.generate_tax_summary(current_user.id, request.year))
         elif request.report_type == ReportType.OWNER_PACKAGE:
-            data = service.generate_owner_package(
+            data = await _generate(db, lambda service: service.generate_owner_package(
                 current_user.id,
                 request.year,
                 request.month
-            )
+            ))
         else:
             raise HTTPException(status_code=400, detail="Report type not implemented yet")
 
@@ -93,11 +103,9 @@ async def get_profit_loss(
     month: Optional[int] = Query(None, ge=1, le=12, description="Month for the report"),
     quarter: Optional[int] = Query(None, ge=1, le=4, description="Quarter for the report"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get P&L statement."""
-    service = ReportGeneratorService(db)
-
     # Determine date range
     if month:
         start_date = datetime(year, month, 1)
@@ -115,7 +123,7 @@ async def get_profit_loss(
         start_date = datetime(year, 1, 1)
         end_date = datetime(year, 12, 31)
 
-    data = service.generate_profit_loss(current_user.id, start_date, end_date)
+    data = await _generate(db, lambda service: service.generate_profit_loss(current_user.id, start_date, end_date))
 
     return ReportResponse(
         report_type=ReportType.PROFIT_LOSS,
@@ -127,15 +135,13 @@ async def get_profit_loss(
 async def get_balance_sheet(
     as_of: Optional[datetime] = Query(None, description="As-of date for the balance sheet"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get balance sheet."""
-    service = ReportGeneratorService(db)
-
     if not as_of:
         as_of = datetime.now()
 
-    data = service.generate_balance_sheet(current_user.id, as_of)
+    data = await _generate(db, lambda service: service.generate_balance_sheet(current_user.id, as_of))
 
     return ReportResponse(
         report_type=ReportType.BALANCE_SHEET,
@@ -149,11 +155,9 @@ async def get_cash_flow(
     month: Optional[int] = Query(None, ge=1, le=12, description="Month for the report"),
     quarter: Optional[int] = Query(None, ge=1, le=4, description="Quarter for the report"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get cash flow statement."""
-    service = ReportGeneratorService(db)
-
     # Determine date range
     if month:
         start_date = datetime(year, month, 1)
@@ -171,7 +175,7 @@ async def get_cash_flow(
         start_date = datetime(year, 1, 1)
         end_date = datetime(year, 12, 31)
 
-    data = service.generate_cash_flow(current_user.id, start_date, end_date)
+    data = await _generate(db, lambda service: service.generate_cash_flow(current_user.id, start_date, end_date))
 
     return ReportResponse(
         report_type=ReportType.CASH_FLOW,
@@ -183,12 +187,10 @@ async def get_cash_flow(
 async def get_tax_summary(
     year: int = Query(..., description="Tax year"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get tax summary for the year."""
-    service = ReportGeneratorService(db)
-
-    data = service.generate_tax_summary(current_user.id, year)
+    data = await _generate(db, lambda service: service.generate_tax_summary(current_user.id, year))
 
     return ReportResponse(
         report_type=ReportType.TAX_SUMMARY,
@@ -201,12 +203,10 @@ async def get_owner_package(
     year: int = Query(..., description="Year for the report"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Month for the report"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get comprehensive owner package."""
-    service = ReportGeneratorService(db)
-
-    data = service.generate_owner_package(current_user.id, year, month)
+    data = await _generate(db, lambda service: service.generate_owner_package(current_user.id, year, month))
 
     return ReportResponse(
         report_type=ReportType.OWNER_PACKAGE,
@@ -185,6 +185,21 @@ async def get_chart_of_accounts(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.get("/chart-of-accounts/hierarchy")
+async def get_chart_of_accounts_hierarchy(
+    as_of_date: Optional[str] = Query(None, description="As of date (YYYY-MM-DD)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get chart of accounts as a tree with subtree balance rollups."""
+    try:
+        service = ChartOfAccountsService(db)
+        return service.get_account_hierarchy(str(current_user.id), as_of_date)
+    except Exception as e:
+        logger.error(f"Error getting chart of accounts hierarchy: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.post("/chart-of-accounts", response_model=ChartOfAccount)
 async def create_chart_account(
     account: ChartOfAccountCreate,
@@ -4,20 +4,22 @@ Handles transaction listing, filtering, updates, bulk operations, and exports.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, BackgroundTasks
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, extract
+from fastapi.responses import StreamingResponse, FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, case, func, extract, select
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime
 from uuid import UUID
 import csv
 import io
 import json
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
+import tempfile
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..database.models import Transaction, Account, Category
+from ..database.routing import mark_recent_write
+from ..services.tax_categorization_service import invalidate_tax_summary
 from ..schemas.transaction import (
     Transaction as TransactionSchema,
     TransactionUpdate,
@@ -26,21 +28,63 @@ from ..schemas.transaction import (
     TransactionExport,
     BulkTransactionUpdate,
     TransactionStats,
-    CategorySummary
+    CategorySummary,
+    ExportJob
 )
-from ..schemas.common import PaginatedResponse
+from ..schemas.common import CursorPaginatedResponse
 from ..dependencies.auth import get_current_verified_user
+from ..dependencies.database import get_read_db
+from ..config import settings
+from ..utils.redis import cache_get, cache_set
+from ..services.transaction_bulk import (
+    TransactionOwnershipError,
+    bulk_update_transactions as apply_bulk_update
+)
+from ..services.transaction_search import (
+    search_filter as transaction_search_filter,
+    search_rank as transaction_search_rank,
+    supports_indexed_search
+)
+from ..utils.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    filter_signature,
+    keyset_predicate
+)
 from ..database.models import User
+from ..services.transaction_export import (
+    TransactionExportService,
+    EXCEL_MEDIA_TYPE,
+    create_export_job,
+    get_export_job,
+    get_export_job_file,
+    run_excel_export_job
+)
 # from ..utils.export import generate_csv, generate_excel  # TODO: Implement export utilities
 
 router = APIRouter()
 
+# Sort fields backed by a (column, id) index; other columns would force a full sort
+TRANSACTION_SORT_COLUMNS = {
+    "date": Transaction.date,
+    "amount": Transaction.amount,
+}
 
-@router.get("/", response_model=PaginatedResponse[TransactionSchema])
+EXPORT_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+@router.get("/", response_model=CursorPaginatedResponse[TransactionSchema])
 async def list_transactions(
     # Pagination
-    page: int = Query(1, ge=1, description="Page number"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    page: Optional[int] = Query(
+        None, ge=1, deprecated=True,
+        description="Page number; pages by OFFSET, so deep pages are slow. Use cursor instead"
+    ),
     page_size: int = Query(50, ge=1, le=500, description="Items per page"),
+    include_total: bool = Query(True, description="Include total count (cached per filter set)"),
     
     # Date filters
     start_date: Optional[date] = Query(None, description="Start date filter"),
@@ -63,24 +107,50 @@ async def list_transactions(
     reconciled: Optional[bool] = Query(None, description="Filter reconciled transactions"),
     
     # Search
-    search: Optional[str] = Query(None, description="Search in transaction name/merchant"),
+    search: Optional[str] = Query(None, description="Full-text/fuzzy search in name, merchant and description"),
     
     # Sorting
-    sort_by: str = Query("date", description="Sort field"),
+    sort_by: str = Query("date", description="Sort field (date, amount, or relevance with search)"),
     sort_order: str = Query("desc", description="Sort order (asc/desc)"),
     
     # Dependencies
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_verified_user)
 ):
     """
-    List transactions with advanced filtering, search, and pagination.
+    List transactions with advanced filtering, search, and keyset pagination.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the next page;
+    every page costs the same regardless of how deep it is. The deprecated
+    ``page`` parameter still works for older clients.
     """
-    # Base query - only user's transactions
-    query = db.query(Transaction).join(Account).filter(Account.user_id == current_user.id)
-    
-    # Apply filters
-    filters = []
+    if cursor and page:
+        raise HTTPException(status_code=400, detail="Pass either cursor or page, not both")
+
+    # Relevance ordering is only meaningful for a search
+    search_rank = None
+    if search:
+        indexed_search = supports_indexed_search(db)
+        search_rank = transaction_search_rank(search, indexed_search)
+
+    if sort_by == "relevance":
+        if search_rank is None:
+            raise HTTPException(status_code=400, detail="sort_by=relevance requires a search term")
+        sort_column = search_rank
+    else:
+        sort_column = TRANSACTION_SORT_COLUMNS.get(sort_by)
+    if sort_column is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported sort field '{sort_by}'. Allowed: {', '.join(TRANSACTION_SORT_COLUMNS)}, relevance"
+        )
+    sort_order = sort_order.lower()
+    if sort_order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="sort_order must be 'asc' or 'desc'")
+    descending = sort_order == "desc"
+
+    # Apply filters - only user's transactions
+    filters = [Transaction.user_id == current_user.id]
     
     if start_date:
         filters.append(Transaction.date >= start_date)
@@ -108,41 +178,79 @@ async def list_transactions(
         filters.append(Transaction.is_reconciled == reconciled)
     
     if search:
-        search_term = f"%{search}%"
-        filters.append(
-            or_(
-                Transaction.name.ilike(search_term),
-                Transaction.merchant_name.ilike(search_term),
-                Transaction.original_description.ilike(search_term)
-            )
-        )
-    
-    if filters:
-        query = query.filter(and_(*filters))
+        filters.append(transaction_search_filter(search, indexed_search))
     
-    # Get total count
-    total_items = query.count()
+    query = select(Transaction).where(and_(*filters))
+    if account_type:
+        query = query.join(Account)
+    
+    # Total count is cached per filter set so following pages don't re-count
+    total = None
+    total_is_cached = False
+    if include_total:
+        signature = filter_signature({
+            "start_date": start_date, "end_date": end_date,
+            "min_amount": min_amount, "max_amount": max_amount,
+            "category": category, "detailed_category": detailed_category,
+            "account_id": account_id, "account_type": account_type,
+            "pending": pending, "reconciled": reconciled, "search": search,
+        })
+        count_key = f"transaction_count:{current_user.id}:{signature}"
+        cached_total = await cache_get(count_key)
+        if cached_total is not None:
+            total = int(cached_total)
+            total_is_cached = True
+        else:
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
+            await cache_set(count_key, str(total), settings.transaction_count_cache_ttl)
+    
+    # Seek past the cursor instead of OFFSET
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(
+            keyset_predicate(sort_column, Transaction.id, last_value, last_id, descending)
+        )
     
-    # Apply sorting
-    sort_column = getattr(Transaction, sort_by, Transaction.date)
-    if sort_order.lower() == "desc":
-        query = query.order_by(sort_column.desc())
+    # Apply sorting (id breaks ties so the order is total)
+    if descending:
+        query = query.order_by(sort_column.desc(), Transaction.id.desc())
     else:
-        query = query.order_by(sort_column.asc())
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    transactions = query.offset(offset).limit(page_size).all()
+        query = query.order_by(sort_column.asc(), Transaction.id.asc())
+    if page:
+        query = query.offset((page - 1) * page_size)
+    
+    # Fetch one extra row to learn whether another page exists; the category
+    # is loaded in the same query since responses read primary_category
+    query = query.options(joinedload(Transaction.category))
+    if sort_by == "relevance":
+        rows = (await db.execute(
+            query.add_columns(search_rank.label("search_rank")).limit(page_size + 1)
+        )).all()
+        sort_values = [rank for _, rank in rows]
+        rows = [txn for txn, _ in rows]
+    else:
+        rows = (await db.execute(query.limit(page_size + 1))).scalars().all()
+        sort_values = [getattr(txn, sort_by) for txn in rows]
+    has_more = len(rows) > page_size
+    transactions = rows[:page_size]
     
-    # Calculate pagination info
-    total_pages = (total_items + page_size - 1) // page_size
+    next_cursor = None
+    if has_more:
+        last = transactions[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, sort_values[page_size - 1], last.id)
     
-    return PaginatedResponse(
+    return CursorPaginatedResponse(
         items=transactions,
-        total=total_items,
-        page=page,
         per_page=page_size,
-        pages=total_pages
+        next_cursor=next_cursor,
+        has_more=has_more,
+        total=total,
+        total_is_cached=total_is_cached,
+        page=None if cursor else page or 1,
+        pages=(total + page_size - 1) // page_size if total is not None else None
     )
 
 
@@ -151,36 +259,39 @@ async def get_transaction_stats(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     account_id: Optional[UUID] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_verified_user)
 ):
     """
     Get transaction statistics and summaries.
     """
-    query = db.query(Transaction).join(Account).filter(Account.user_id == current_user.id)
-    
+    filters = [Transaction.user_id == current_user.id]
     if start_date:
-        query = query.filter(Transaction.date >= start_date)
+        filters.append(Transaction.date >= start_date)
     if end_date:
-        query = query.filter(Transaction.date <= end_date)
+        filters.append(Transaction.date <= end_date)
     if account_id:
-        query = query.filter(Transaction.account_id == account_id)
-    
-    # Calculate statistics
-    total_count = query.count()
-    total_income = query.filter(Transaction.amount > 0).with_entities(
-        func.sum(Transaction.amount)
-    ).scalar() or 0
-    total_expenses = query.filter(Transaction.amount < 0).with_entities(
-        func.sum(Transaction.amount)
-    ).scalar() or 0
+        filters.append(Transaction.account_id == account_id)
+
+    def scoped(*columns):
+        return select(*columns).select_from(Transaction).where(*filters)
+
+    # Calculate statistics in one pass over the matching transactions
+    totals = (await db.execute(scoped(
+        func.count(Transaction.id),
+        func.sum(case((Transaction.amount > 0, Transaction.amount))),
+        func.sum(case((Transaction.amount < 0, Transaction.amount)))
+    ))).one()
+    total_count = totals[0]
+    total_income = totals[1] or 0
+    total_expenses = totals[2] or 0
 
     # Get category breakdown (use subcategory column)
-    category_breakdown = query.with_entities(
+    category_breakdown = (await db.execute(scoped(
         Transaction.subcategory,
         func.count(Transaction.id).label("count"),
         func.sum(Transaction.amount).label("total")
-    ).group_by(Transaction.subcategory).all()
+    ).group_by(Transaction.subcategory))).all()
     
     categories = [
         CategorySummary(
@@ -192,11 +303,11 @@ async def get_transaction_stats(
     ]
 
     # Get monthly trend
-    monthly_trend = query.with_entities(
+    monthly_trend = (await db.execute(scoped(
         extract('year', Transaction.date).label('year'),
         extract('month', Transaction.date).label('month'),
         func.sum(Transaction.amount).label('total')
-    ).group_by('year', 'month').order_by('year', 'month').all()
+    ).group_by('year', 'month').order_by('year', 'month'))).all()
 
     return TransactionStats(
         total_transactions=total_count,
@@ -223,9 +334,9 @@ async def get_transaction(
     """
     Get a specific transaction by ID.
     """
-    transaction = db.query(Transaction).join(Account).filter(
+    transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id,
-        Account.user_id == current_user.id
+        Transaction.user_id == current_user.id
     ).first()
     
     if not transaction:
@@ -244,9 +355,9 @@ async def update_transaction(
     """
     Update a transaction's details.
     """
-    transaction = db.query(Transaction).join(Account).filter(
+    transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id,
-        Account.user_id == current_user.id
+        Transaction.user_id == current_user.id
     ).first()
     
     if not transaction:
@@ -267,6 +378,9 @@ async def update_transaction(
     
     db.commit()
     db.refresh(transaction)
+    mark_recent_write(current_user.id)
+    if "amount" in update_dict:
+        invalidate_tax_summary(current_user.id)
     
     return transaction
 
@@ -279,62 +393,27 @@ async def bulk_update_transactions(
 ):
     """
     Perform bulk operations on multiple transactions.
+
+    Each operation runs as set-based statements scoped to the user's accounts,
+    so the number of round trips does not grow with the number of ids.
     """
-    # Verify all transactions belong to user
-    transactions = db.query(Transaction).join(Account).filter(
-        Transaction.id.in_(bulk_update.transaction_ids),
-        Account.user_id == current_user.id
-    ).all()
-    
-    if len(transactions) != len(bulk_update.transaction_ids):
+    try:
+        updated_count = apply_bulk_update(
+            db,
+            current_user.id,
+            bulk_update.transaction_ids,
+            bulk_update.operation,
+            category=bulk_update.category,
+            tag=bulk_update.tag
+        )
+    except TransactionOwnershipError:
         raise HTTPException(status_code=403, detail="Some transactions not found or unauthorized")
-    
-    updated_count = 0
-    
-    # Apply updates based on operation
-    if bulk_update.operation == "categorize":
-        for transaction in transactions:
-            transaction.user_category = bulk_update.category
-            transaction.updated_at = datetime.utcnow()
-            updated_count += 1
-    
-    elif bulk_update.operation == "reconcile":
-        for transaction in transactions:
-            transaction.is_reconciled = True
-            transaction.updated_at = datetime.utcnow()
-            updated_count += 1
-    
-    elif bulk_update.operation == "unreconcile":
-        for transaction in transactions:
-            transaction.is_reconciled = False
-            transaction.updated_at = datetime.utcnow()
-            updated_count += 1
-    
-    elif bulk_update.operation == "add_tag":
-        for transaction in transactions:
-            current_tags = transaction.tags or []
-            if bulk_update.tag and bulk_update.tag not in current_tags:
-                current_tags.append(bulk_update.tag)
-                transaction.tags = current_tags
-                transaction.updated_at = datetime.utcnow()
-                updated_count += 1
-    
-    elif bulk_update.operation == "remove_tag":
-        for transaction in transactions:
-            current_tags = transaction.tags or []
-            if bulk_update.tag and bulk_update.tag in current_tags:
-                current_tags.remove(bulk_update.tag)
-                transaction.tags = current_tags
-                transaction.updated_at = datetime.utcnow()
-                updated_count += 1
-    
-    elif bulk_update.operation == "delete":
-        for transaction in transactions:
-            db.delete(transaction)
-            updated_count += 1
-    
-    db.commit()
-    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    mark_recent_write(current_user.id)
+    if bulk_update.operation == "delete":
+        invalidate_tax_summary(current_user.id)
+
     return {
         "success": True,
         "updated_count": updated_count,
@@ -347,14 +426,14 @@ async def export_transactions_csv(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     account_id: Optional[UUID] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_verified_user)
 ):
     """
     Export transactions as CSV file.
     """
     # Build query
-    query = db.query(Transaction).join(Account).filter(Account.user_id == current_user.id)
+    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
     
     if start_date:
         query = query.filter(Transaction.date >= start_date)
@@ -407,156 +486,125 @@ async def export_transactions_excel(
     end_date: Optional[date] = Query(None),
     account_id: Optional[UUID] = Query(None),
     include_summary: bool = Query(True, description="Include summary sheet"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_verified_user)
 ):
     """
     Export transactions as Excel file with formatting and optional summary.
+
+    Rows are streamed into a write-only workbook and the summary is aggregated
+    in the database. Use ``POST /export/excel/jobs`` for very large ranges.
     """
-    # Build query
-    query = db.query(Transaction).join(Account).filter(Account.user_id == current_user.id)
-    
-    if start_date:
-        query = query.filter(Transaction.date >= start_date)
-    if end_date:
-        query = query.filter(Transaction.date <= end_date)
-    if account_id:
-        query = query.filter(Transaction.account_id == account_id)
-    
-    transactions = query.order_by(Transaction.date.desc()).all()
-    
-    # Create workbook
-    wb = Workbook()
-    
-    # Transactions sheet
-    ws = wb.active
-    ws.title = "Transactions"
-    
-    # Style definitions
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Headers
-    headers = [
-        "Date", "Description", "Merchant", "Amount", "Category",
-        "Account", "Status", "Reconciled", "Notes", "Tags"
-    ]
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-    
-    # Data rows
-    for row, txn in enumerate(transactions, 2):
-        ws.cell(row=row, column=1, value=txn.date)
-        ws.cell(row=row, column=2, value=txn.name)
-        ws.cell(row=row, column=3, value=txn.merchant_name or "")
-        ws.cell(row=row, column=4, value=txn.amount)
-        ws.cell(row=row, column=5, value=txn.user_category or txn.primary_category or "")
-        ws.cell(row=row, column=6, value=txn.account.name)
-        ws.cell(row=row, column=7, value="Pending" if txn.pending else "Posted")
-        ws.cell(row=row, column=8, value="Yes" if txn.is_reconciled else "No")
-        ws.cell(row=row, column=9, value=txn.notes or "")
-        ws.cell(row=row, column=10, value=", ".join(txn.tags) if txn.tags else "")
-        
-        # Format amount cell
-        amount_cell = ws.cell(row=row, column=4)
-        amount_cell.number_format = "#,##0.00"
-        if txn.amount < 0:
-            amount_cell.font = Font(color="FF0000")
-    
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Add summary sheet if requested
-    if include_summary:
-        summary_ws = wb.create_sheet(title="Summary")
-        
-        # Calculate summary statistics
-        total_income = sum(t.amount for t in transactions if t.amount > 0)
-        total_expenses = sum(t.amount for t in transactions if t.amount < 0)
-        net_amount = total_income + total_expenses
-        
-        # Category breakdown
-        category_totals = {}
-        for txn in transactions:
-            cat = txn.user_category or txn.primary_category or "Uncategorized"
-            if cat not in category_totals:
-                category_totals[cat] = 0
-            category_totals[cat] += txn.amount
-        
-        # Write summary
-        summary_data = [
-            ["Transaction Summary", ""],
-            ["", ""],
-            ["Period", f"{start_date or 'All time'} to {end_date or 'Present'}"],
-            ["Total Transactions", len(transactions)],
-            ["", ""],
-            ["Financial Summary", ""],
-            ["Total Income", total_income],
-            ["Total Expenses", abs(total_expenses)],
-            ["Net Amount", net_amount],
-            ["", ""],
-            ["Category Breakdown", "Amount"],
-        ]
-        
-        for cat, amount in sorted(category_totals.items(), key=lambda x: abs(x[1]), reverse=True):
-            summary_data.append([cat, amount])
-        
-        for row_idx, row_data in enumerate(summary_data, 1):
-            for col_idx, value in enumerate(row_data, 1):
-                cell = summary_ws.cell(row=row_idx, column=col_idx, value=value)
-                
-                # Format headers
-                if row_idx in [1, 6, 11]:
-                    cell.font = Font(bold=True, size=12)
-                
-                # Format numbers
-                if col_idx == 2 and isinstance(value, (int, float)):
-                    cell.number_format = "#,##0.00"
-                    if value < 0:
-                        cell.font = Font(color="FF0000")
-        
-        # Auto-adjust summary columns
-        for column in summary_ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            summary_ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Save to bytes
-    output = io.BytesIO()
-    wb.save(output)
+    service = TransactionExportService(db)
+
+    # Spill to disk once the workbook grows past a few MB
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+    service.write_excel(
+        output,
+        current_user.id,
+        start_date=start_date,
+        end_date=end_date,
+        account_id=account_id,
+        include_summary=include_summary
+    )
     output.seek(0)
-    
+
+    def iter_file():
+        try:
+            while chunk := output.read(EXPORT_CHUNK_SIZE):
+                yield chunk
+        finally:
+            output.close()
+
     return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        iter_file(),
+        media_type=EXCEL_MEDIA_TYPE,
         headers={
             "Content-Disposition": f"attachment; filename=transactions_{datetime.now().strftime('%Y%m%d')}.xlsx"
         }
     )
 
 
+@router.post("/export/excel/jobs", response_model=ExportJob, status_code=202)
+async def start_excel_export_job(
+    background_tasks: BackgroundTasks,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    account_id: Optional[UUID] = Query(None),
+    include_summary: bool = Query(True, description="Include summary sheet"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_verified_user)
+):
+    """
+    Start a background Excel export for large date ranges.
+
+    Poll ``GET /export/jobs/{job_id}`` and download the file once it completes.
+    """
+    job = create_export_job(
+        current_user.id,
+        {
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None,
+            "account_id": str(account_id) if account_id else None,
+            "include_summary": include_summary,
+        }
+    )
+
+    background_tasks.add_task(
+        run_excel_export_job,
+        job["job_id"],
+        db.get_bind(),
+        current_user.id,
+        start_date,
+        end_date,
+        account_id,
+        include_summary
+    )
+
+    return ExportJob(**job)
+
+
+@router.get("/export/jobs/{job_id}", response_model=ExportJob)
+async def get_export_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_verified_user)
+):
+    """
+    Get the status of a background export job.
+    """
+    job = get_export_job(job_id)
+    if not job or job["user_id"] != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    return ExportJob(**job)
+
+
+@router.get("/export/jobs/{job_id}/download")
+async def download_export_job(
+    job_id: str,
+    current_user: User = Depends(get_current_verified_user)
+):
+    """
+    Download the file produced by a completed export job.
+    """
+    job = get_export_job(job_id)
+    if not job or job["user_id"] != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+
+    path = get_export_job_file(job)
+    if not path:
+        raise HTTPException(status_code=410, detail="Export file has expired")
+
+    return FileResponse(
+        path,
+        media_type=EXCEL_MEDIA_TYPE,
+        filename=f"transactions_{job['created_at'][:10].replace('-', '')}.xlsx"
+    )
+
+
 @router.post("/import/csv")
 async def import_transactions_csv(
     file: UploadFile = File(...),
@@ -588,6 +636,7 @@ async def import_transactions_csv(
             # Parse transaction data
             transaction = Transaction(
                 account_id=account_id,
+                user_id=current_user.id,
                 plaid_transaction_id=f"manual_{account_id}_{datetime.now().timestamp()}_{row_num}",
                 date=datetime.strptime(row.get("Date", ""), "%Y-%m-%d").date(),
                 name=row.get("Description", ""),
@@ -606,6 +655,8 @@ async def import_transactions_csv(
             errors.append(f"Row {row_num}: {str(e)}")
     
     db.commit()
+    mark_recent_write(current_user.id)
+    invalidate_tax_summary(current_user.id)
     
     return {
         "success": True,
@@ -20,7 +20,7 @@ from .plaid import (
     PlaidWebhook, PlaidInstitution, PlaidError, PlaidItemStatus
 )
 from .common import (
-    PaginationParams, PaginatedResponse, HealthCheck,
+    PaginationParams, PaginatedResponse, CursorPaginatedResponse, HealthCheck,
     ErrorResponse, SuccessResponse
 )
 from .tax_categorization import (
@@ -53,7 +53,7 @@ __all__ = [
     "PlaidWebhook", "PlaidInstitution", "PlaidError", "PlaidItemStatus",
     
     # Common schemas
-    "PaginationParams", "PaginatedResponse", "HealthCheck",
+    "PaginationParams", "PaginatedResponse", "CursorPaginatedResponse", "HealthCheck",
     "ErrorResponse", "SuccessResponse",
 
     # Tax categorization schemas
@@ -56,6 +56,28 @@ class JournalEntryResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class JournalEntryBatchCreate(BaseModel):
+    """Schema for importing a batch of journal entries."""
+    entries: List[JournalEntryCreate] = Field(..., min_length=1, max_length=10000)
+    post: bool = False
+
+
+class JournalEntryBatchPost(BaseModel):
+    """Schema for posting a batch of journal entries."""
+    entry_ids: List[UUID] = Field(..., min_length=1, max_length=10000)
+
+
+class JournalBatchResult(BaseModel):
+    """Result of a bulk journal entry import or post."""
+    entries: int
+    lines: int
+    posted: bool
+    first_entry_number: Optional[str] = None
+    last_entry_number: Optional[str] = None
+    elapsed_seconds: float
+    entries_per_second: Optional[float] = None
+
+
 class AccountingPeriodResponse(BaseModel):
     """Response schema for accounting period."""
     id: UUID
@@ -69,6 +91,32 @@ class AccountingPeriodResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PeriodCloseJob(BaseModel):
+    """Background period close job status."""
+    job_id: str
+    period_id: UUID
+    status: Literal["pending", "running", "completed", "failed"]
+    step: Optional[str] = Field(None, description="Pipeline step currently running")
+    progress: int = Field(0, ge=0, le=100, description="Percent complete")
+    force: bool = False
+    result: Optional[Dict[str, Any]] = None
+    issues: List[str] = Field(default_factory=list, description="Failed closing checks")
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+class PeriodClosingBalanceResponse(BaseModel):
+    """Stored closing balance of one chart account for a closed period."""
+    chart_account_id: UUID
+    account_code: str
+    account_name: str
+    account_type: str
+    period_debits: float
+    period_credits: float
+    balance: float
+
+
 class ReconciliationStart(BaseModel):
     """Schema for starting reconciliation."""
     account_id: UUID
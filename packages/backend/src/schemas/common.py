@@ -44,6 +44,21 @@ class PaginatedResponse(BaseModel, Generic[T]):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    """Generic keyset-paginated response."""
+    items: List[T]
+    per_page: int = Field(description="Items per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+    has_more: bool = Field(description="Whether more items follow this page")
+    total: Optional[int] = Field(None, description="Total number of items, if requested")
+    total_is_cached: bool = Field(False, description="Whether total was served from cache")
+    # Offset pagination fields, kept for clients that have not moved to cursors
+    page: Optional[int] = Field(None, description="Page number (deprecated; unset when paging by cursor)")
+    pages: Optional[int] = Field(None, description="Total number of pages, when total is known (deprecated)")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class HealthCheck(BaseModel):
     """Enhanced health check response with security status."""
     status: str = Field(description="Service status")
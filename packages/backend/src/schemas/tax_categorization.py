@@ -264,6 +264,7 @@ class TaxCategorySummary(BaseModel):
     category_name: str
     tax_form: str
     tax_line: Optional[str]
+    schedule_c_line: Optional[str] = None
     total_amount: float
     transaction_count: int
     requires_substantiation: int
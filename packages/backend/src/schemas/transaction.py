@@ -122,6 +122,18 @@ class TransactionExport(BaseModel):
     include_summary: bool = Field(True, description="Include summary sheet (Excel only)")
 
 
+class ExportJob(BaseModel):
+    """Background export job status."""
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed"]
+    format: str = "excel"
+    params: Dict[str, Any] = Field(default_factory=dict, description="Export filters")
+    row_count: Optional[int] = Field(None, description="Exported rows (once completed)")
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
 class BulkTransactionUpdate(BaseModel):
     """Bulk transaction update request."""
     transaction_ids: List[UUID] = Field(..., description="Transaction IDs to update")
@@ -129,8 +141,12 @@ class BulkTransactionUpdate(BaseModel):
         "categorize", "reconcile", "unreconcile", 
         "add_tag", "remove_tag", "delete"
     ] = Field(..., description="Bulk operation type")
-    category: Optional[str] = Field(None, description="Category for categorize operation")
-    tag: Optional[str] = Field(None, description="Tag for add/remove tag operations")
+    category: Optional[str] = Field(
+        None, validate_default=True, description="Category for categorize operation"
+    )
+    tag: Optional[str] = Field(
+        None, validate_default=True, description="Tag for add/remove tag operations"
+    )
     
     @field_validator("category")
     @classmethod
@@ -0,0 +1,244 @@
+"""
+Month-end balance snapshots for as-of balance lookups.
+
+A balance as of any date is the nearest snapshot on or before that date plus
+the transactions dated after it, so lookups cost one month of activity at
+most instead of the account's whole history. Snapshots are rolled forward
+when an accounting period closes, and adjusted in place when a flush adds,
+removes or changes transactions dated inside an already snapshotted month.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, event, extract, func, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..database.models import Account, AccountBalanceSnapshot, Transaction
+
+logger = logging.getLogger(__name__)
+
+Snapshot = AccountBalanceSnapshot
+
+
+def month_end(year: int, month: int) -> date:
+    """Last day of the given month."""
+    if month == 12:
+        return date(year, 12, 31)
+    return date(year, month + 1, 1) - timedelta(days=1)
+
+
+def _next_month(year: int, month: int) -> Tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _latest_snapshots(account_ids: Iterable[UUID], on_or_before: Optional[date] = None):
+    """Subquery of (account_id, period_end) for each account's latest snapshot."""
+    query = select(
+        Snapshot.account_id,
+        func.max(Snapshot.period_end).label("period_end")
+    ).where(Snapshot.account_id.in_(list(account_ids)))
+    if on_or_before is not None:
+        query = query.where(Snapshot.period_end <= on_or_before)
+    return query.group_by(Snapshot.account_id).subquery()
+
+
+class BalanceSnapshotService:
+    """Reads and maintains account balance snapshots."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def balances_as_of(self, account_ids: Iterable[UUID], as_of: date) -> Dict[UUID, Decimal]:
+        """
+        Balance of each account at the end of ``as_of``.
+
+        Two queries regardless of the number of accounts: the nearest snapshots,
+        then the grouped activity between each snapshot and ``as_of``.
+        """
+        account_ids = list(account_ids)
+        if not account_ids:
+            return {}
+
+        latest = _latest_snapshots(account_ids, as_of)
+        balances: Dict[UUID, Decimal] = {account_id: Decimal("0") for account_id in account_ids}
+
+        for account_id, balance in self.db.execute(
+            select(Snapshot.account_id, Snapshot.balance).join(
+                latest,
+                and_(
+                    Snapshot.account_id == latest.c.account_id,
+                    Snapshot.period_end == latest.c.period_end
+                )
+            )
+        ):
+            balances[account_id] = Decimal(balance)
+
+        for account_id, delta in self.db.execute(
+            select(Transaction.account_id, func.sum(Transaction.amount))
+            .outerjoin(latest, latest.c.account_id == Transaction.account_id)
+            .where(
+                Transaction.account_id.in_(account_ids),
+                Transaction.date <= as_of,
+                or_(latest.c.period_end.is_(None), Transaction.date > latest.c.period_end)
+            )
+            .group_by(Transaction.account_id)
+        ):
+            balances[account_id] += Decimal(delta or 0)
+
+        return balances
+
+    def balance_as_of(self, account_id: UUID, as_of: date) -> Decimal:
+        """Balance of a single account at the end of ``as_of``."""
+        return self.balances_as_of([account_id], as_of)[account_id]
+
+    def snapshot_through(self, user_id: UUID, through: date) -> int:
+        """
+        Persist month-end balances for the user's accounts up to ``through``.
+
+        Rolls each account forward from its latest snapshot (or its first
+        transaction) through the last complete month ending on or before
+        ``through``. Months without activity carry the balance forward so
+        every lookup finds a nearby snapshot. Does not commit.
+
+        Returns:
+            Number of snapshots created
+        """
+        last_month_end = month_end(through.year, through.month)
+        if last_month_end > through:
+            last_month_end = date(through.year, through.month, 1) - timedelta(days=1)
+
+        account_ids = self.db.execute(
+            select(Account.id).where(Account.user_id == user_id)
+        ).scalars().all()
+        if not account_ids:
+            return 0
+
+        latest = _latest_snapshots(account_ids)
+        starting: Dict[UUID, Tuple[date, Decimal]] = {
+            account_id: (period_end, Decimal(balance))
+            for account_id, period_end, balance in self.db.execute(
+                select(Snapshot.account_id, Snapshot.period_end, Snapshot.balance).join(
+                    latest,
+                    and_(
+                        Snapshot.account_id == latest.c.account_id,
+                        Snapshot.period_end == latest.c.period_end
+                    )
+                )
+            )
+        }
+
+        # Monthly activity since each account's latest snapshot, one grouped query
+        year = extract("year", Transaction.date)
+        month = extract("month", Transaction.date)
+        activity: Dict[UUID, Dict[Tuple[int, int], Decimal]] = defaultdict(dict)
+        for account_id, txn_year, txn_month, total in self.db.execute(
+            select(Transaction.account_id, year, month, func.sum(Transaction.amount))
+            .outerjoin(latest, latest.c.account_id == Transaction.account_id)
+            .where(
+                Transaction.account_id.in_(account_ids),
+                Transaction.date <= last_month_end,
+                or_(latest.c.period_end.is_(None), Transaction.date > latest.c.period_end)
+            )
+            .group_by(Transaction.account_id, year, month)
+        ):
+            activity[account_id][(int(txn_year), int(txn_month))] = Decimal(total or 0)
+
+        rows: List[dict] = []
+        for account_id in account_ids:
+            if account_id in starting:
+                period_end, balance = starting[account_id]
+                current = _next_month(period_end.year, period_end.month)
+            elif activity.get(account_id):
+                balance = Decimal("0")
+                current = min(activity[account_id])
+            else:
+                continue
+
+            months = activity.get(account_id, {})
+            while month_end(*current) <= last_month_end:
+                balance += months.get(current, Decimal("0"))
+                rows.append({
+                    "account_id": account_id,
+                    "period_end": month_end(*current),
+                    "balance": balance,
+                })
+                current = _next_month(*current)
+
+        if rows:
+            self.db.execute(insert(Snapshot), rows)
+        logger.info(f"Created {len(rows)} balance snapshots for user {user_id} through {last_month_end}")
+        return len(rows)
+
+
+def apply_snapshot_deltas(db: Session, deltas: Mapping[Tuple[UUID, date], Decimal]) -> None:
+    """
+    Shift snapshots covering changed transactions.
+
+    ``deltas`` maps (account_id, transaction date) to the net amount change.
+    Changes dated after an account's latest snapshot need no adjustment and
+    are filtered out with a single lookup.
+    """
+    deltas = {key: value for key, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    latest = dict(db.execute(
+        select(Snapshot.account_id, func.max(Snapshot.period_end))
+        .where(Snapshot.account_id.in_({account_id for account_id, _ in deltas}))
+        .group_by(Snapshot.account_id)
+    ).all())
+
+    for (account_id, txn_date), delta in deltas.items():
+        if account_id in latest and txn_date <= latest[account_id]:
+            db.execute(
+                update(Snapshot)
+                .where(Snapshot.account_id == account_id, Snapshot.period_end >= txn_date)
+                .values(balance=Snapshot.balance + delta),
+                execution_options={"synchronize_session": False}
+            )
+
+
+def _transaction_deltas(session: Session) -> Dict[Tuple[UUID, date], Decimal]:
+    """Net balance changes per (account, date) pending in a flush."""
+    deltas: Dict[Tuple[UUID, date], Decimal] = defaultdict(Decimal)
+
+    for obj in session.new:
+        if isinstance(obj, Transaction) and obj.amount is not None:
+            deltas[(obj.account_id, obj.date)] += Decimal(obj.amount)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction) and obj.amount is not None:
+            deltas[(obj.account_id, obj.date)] -= Decimal(obj.amount)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction):
+            continue
+        attrs = inspect(obj).attrs
+        changed = False
+        old = {}
+        for name in ("account_id", "date", "amount"):
+            history = attrs[name].history
+            if history.deleted:
+                changed = True
+                old[name] = history.deleted[0]
+            else:
+                old[name] = getattr(obj, name)
+        if changed:
+            if old["amount"] is not None:
+                deltas[(old["account_id"], old["date"])] -= Decimal(old["amount"])
+            deltas[(obj.account_id, obj.date)] += Decimal(obj.amount)
+
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def _adjust_snapshots_after_flush(session: Session, flush_context) -> None:
+    """Keep snapshots consistent with backdated transaction writes."""
+    deltas = _transaction_deltas(session)
+    if deltas:
+        apply_snapshot_deltas(session, deltas)
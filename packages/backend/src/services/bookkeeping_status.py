@@ -0,0 +1,224 @@
+"""
+Bookkeeping health and pending-task summary.
+
+Both the health indicator and the pending-task list are derived from one
+per-user summary built with two statements: the user's active accounts with
+their last reconciliation date, and a single aggregate over transactions
+carrying the journal and accounting-period checks as scalar subqueries.
+The summary is cached briefly per user so it can be shown on every page.
+"""
+
+import json
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database.bookkeeping_models import AccountingPeriod, JournalEntry, ReconciliationRecord
+from ..database.models import Account, Transaction
+from ..utils.redis import get_redis_client_sync
+
+logger = logging.getLogger(__name__)
+
+STATUS_CACHE_PREFIX = "bookkeeping_status"
+RECONCILIATION_INTERVAL_DAYS = 30
+RECONCILABLE_ACCOUNT_TYPES = ("depository", "credit")
+
+
+def _status_cache_key(user_id: UUID) -> str:
+    return f"{STATUS_CACHE_PREFIX}:{user_id}"
+
+
+def invalidate_bookkeeping_status(user_id: UUID) -> None:
+    """Drop the cached bookkeeping summary for a user."""
+    redis_client = get_redis_client_sync()
+    if not redis_client:
+        return
+    try:
+        redis_client.delete(_status_cache_key(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate bookkeeping status for user {user_id}: {e}")
+
+
+class BookkeepingStatusService:
+    """Builds the bookkeeping health and pending-task views for a user."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_summary(self, user_id: UUID, today: Optional[date] = None) -> Dict[str, Any]:
+        """Per-user bookkeeping summary, served from cache when fresh."""
+        today = today or date.today()
+        cache_key = _status_cache_key(user_id)
+        redis_client = get_redis_client_sync()
+        if redis_client:
+            try:
+                cached = redis_client.get(cache_key)
+                if cached:
+                    summary = json.loads(cached)
+                    if summary["as_of"] == today.isoformat():
+                        return summary
+            except Exception as e:
+                logger.warning(f"Bookkeeping status cache read failed for user {user_id}: {e}")
+
+        summary = self._build_summary(user_id, today)
+
+        if redis_client:
+            try:
+                redis_client.setex(cache_key, settings.bookkeeping_status_cache_ttl, json.dumps(summary))
+            except Exception as e:
+                logger.warning(f"Bookkeeping status cache write failed for user {user_id}: {e}")
+
+        return summary
+
+    def _build_summary(self, user_id: UUID, today: date) -> Dict[str, Any]:
+        # Last reconciliation per account in one grouped outer join
+        last_reconciled = func.max(ReconciliationRecord.reconciliation_date)
+        accounts = self.db.execute(
+            select(Account.id, Account.name, Account.account_type, last_reconciled)
+            .outerjoin(
+                ReconciliationRecord,
+                and_(
+                    ReconciliationRecord.account_id == Account.id,
+                    ReconciliationRecord.status == "reconciled"
+                )
+            )
+            .where(Account.user_id == user_id, Account.is_active.is_(True))
+            .group_by(Account.id, Account.name, Account.account_type)
+            .order_by(Account.name)
+        ).all()
+
+        # Everything else in a single aggregate: transaction counts with FILTER,
+        # journal and period checks as uncorrelated scalar subqueries
+        last_month_end = today.replace(day=1) - timedelta(days=1)
+        categorized = or_(
+            Transaction.user_category_override.isnot(None),
+            Transaction.subcategory.isnot(None)
+        )
+        unposted = select(func.count(JournalEntry.id)).where(
+            JournalEntry.user_id == user_id,
+            JournalEntry.is_posted.is_(False)
+        ).scalar_subquery()
+        current_period = select(AccountingPeriod.period_name).where(
+            AccountingPeriod.user_id == user_id,
+            AccountingPeriod.start_date <= today,
+            AccountingPeriod.end_date >= today
+        ).limit(1).scalar_subquery()
+        last_month_closed = exists().where(
+            AccountingPeriod.user_id == user_id,
+            AccountingPeriod.start_date == last_month_end.replace(day=1),
+            AccountingPeriod.is_closed.is_(True)
+        )
+        counts = self.db.execute(
+            select(
+                func.count(Transaction.id).label("total"),
+                func.count(Transaction.id).filter(categorized).label("categorized"),
+                unposted.label("unposted"),
+                current_period.label("current_period"),
+                last_month_closed.label("last_month_closed")
+            )
+            .select_from(Transaction)
+            .join(Account, Account.id == Transaction.account_id)
+            .where(Account.user_id == user_id)
+        ).one()
+
+        return {
+            "as_of": today.isoformat(),
+            "current_period": counts.current_period,
+            "unposted_entries": counts.unposted or 0,
+            "last_month_closed": bool(counts.last_month_closed),
+            "total_transactions": counts.total or 0,
+            "categorized_transactions": counts.categorized or 0,
+            "accounts": [
+                {
+                    "id": str(account_id),
+                    "name": name,
+                    "account_type": account_type,
+                    "last_reconciled": reconciled.isoformat() if reconciled else None
+                }
+                for account_id, name, account_type, reconciled in accounts
+            ],
+        }
+
+    @staticmethod
+    def _days_since_reconciled(account: Dict[str, Any], today: date) -> Optional[int]:
+        if not account["last_reconciled"]:
+            return None
+        return (today - date.fromisoformat(account["last_reconciled"])).days
+
+    def get_health(self, user_id: UUID) -> Dict[str, Any]:
+        """Fields for BookkeepingHealthResponse."""
+        summary = self.get_summary(user_id)
+        today = date.fromisoformat(summary["as_of"])
+
+        unreconciled_accounts = 0
+        for account in summary["accounts"]:
+            days = self._days_since_reconciled(account, today)
+            if days is None or days > RECONCILIATION_INTERVAL_DAYS:
+                unreconciled_accounts += 1
+        reconciled_dates = [a["last_reconciled"] for a in summary["accounts"] if a["last_reconciled"]]
+
+        total = summary["total_transactions"]
+        accuracy_score = (summary["categorized_transactions"] / total) * 100 if total > 0 else 0
+
+        unposted_entries = summary["unposted_entries"]
+        if unposted_entries > 10 or unreconciled_accounts > 3:
+            status = "behind"
+        elif unposted_entries > 5 or unreconciled_accounts > 1:
+            status = "warning"
+        else:
+            status = "current"
+
+        return {
+            "status": status,
+            "current_period": summary["current_period"],
+            "unposted_entries": unposted_entries,
+            "unreconciled_accounts": unreconciled_accounts,
+            "accuracy_score": round(accuracy_score, 1),
+            "last_reconciliation_date": max(reconciled_dates) if reconciled_dates else None,
+        }
+
+    def get_pending_tasks(self, user_id: UUID) -> List[Dict[str, Any]]:
+        """Pending bookkeeping tasks, most important kinds first."""
+        summary = self.get_summary(user_id)
+        today = date.fromisoformat(summary["as_of"])
+        tasks = []
+
+        uncategorized = summary["total_transactions"] - summary["categorized_transactions"]
+        if uncategorized > 0:
+            tasks.append({
+                "type": "categorization",
+                "title": "Review Categorization",
+                "description": f"{uncategorized} transactions need categorization",
+                "priority": "high" if uncategorized > 20 else "medium",
+                "count": uncategorized
+            })
+
+        for account in summary["accounts"]:
+            if account["account_type"] not in RECONCILABLE_ACCOUNT_TYPES:
+                continue
+            days = self._days_since_reconciled(account, today)
+            if days is None or days > RECONCILIATION_INTERVAL_DAYS:
+                tasks.append({
+                    "type": "reconciliation",
+                    "title": f"Reconcile {account['name']}",
+                    "description": "Account needs monthly reconciliation",
+                    "priority": "high" if days is None else "medium",
+                    "account_id": account["id"]
+                })
+
+        if not summary["last_month_closed"] and today.day > 5:  # After 5th of month
+            last_month_end = today.replace(day=1) - timedelta(days=1)
+            tasks.append({
+                "type": "period_closing",
+                "title": f"Close {last_month_end.strftime('%B %Y')}",
+                "description": "Previous month ready for closing",
+                "priority": "high",
+                "period_date": last_month_end.isoformat()
+            })
+
+        return tasks
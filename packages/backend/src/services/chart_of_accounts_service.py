@@ -1,6 +1,8 @@
 """Chart of Accounts service for double-entry bookkeeping."""
 
+import json
 import logging
+from collections import defaultdict
 from decimal import Decimal
 from typing import List, Dict, Optional, Any
 from sqlalchemy.orm import Session
@@ -8,9 +10,33 @@ from sqlalchemy import and_, func, desc
 
 from models.tax_categorization import ChartOfAccount
 from models.transaction import Transaction
+from ..config import settings
+from ..utils.redis import get_redis_client_sync
 
 logger = logging.getLogger(__name__)
 
+HIERARCHY_CACHE_PREFIX = "coa_hierarchy"
+
+
+def _hierarchy_version_key(user_id: str) -> str:
+    return f"{HIERARCHY_CACHE_PREFIX}_version:{user_id}"
+
+
+def invalidate_account_hierarchy(user_id: str) -> None:
+    """
+    Invalidate a user's cached account hierarchies.
+
+    Bumps the user's cache version so every cached as-of variant is dropped
+    at once; stale entries expire on their own TTL.
+    """
+    redis_client = get_redis_client_sync()
+    if not redis_client:
+        return
+    try:
+        redis_client.incr(_hierarchy_version_key(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate account hierarchy cache for user {user_id}: {e}")
+
 
 class ChartOfAccountsService:
     """Service for managing chart of accounts."""
@@ -69,6 +95,7 @@ class ChartOfAccountsService:
 
             self.session.add(account)
             self.session.commit()
+            invalidate_account_hierarchy(user_id)
 
             logger.info(f"Created account {account_code} - {account_name} for user {user_id}")
             return account
@@ -111,6 +138,7 @@ class ChartOfAccountsService:
                     setattr(account, field, value)
 
             self.session.commit()
+            invalidate_account_hierarchy(user_id)
 
             logger.info(f"Updated account {account.account_code} for user {user_id}")
             return account
@@ -142,15 +170,13 @@ class ChartOfAccountsService:
         debits = query.filter(Transaction.transaction_type == "debit").scalar() or Decimal("0")
         credits = query.filter(Transaction.transaction_type == "credit").scalar() or Decimal("0")
 
-        if account.normal_balance == "debit":
-            balance = debits - credits
-        else:
-            balance = credits - debits
+        balance = self._net_balance(account.normal_balance, debits, credits)
 
         # Update the stored balance
         try:
             account.current_balance = balance
             self.session.commit()
+            invalidate_account_hierarchy(user_id)
         except Exception as e:
             self.session.rollback()
             logger.error(f"Failed to update account balance for {account_id}: {str(e)}")
@@ -158,14 +184,57 @@ class ChartOfAccountsService:
 
         return balance
 
+    def get_account_balances(self, user_id: str, as_of_date: Optional[str] = None) -> List[Any]:
+        """
+        Debit and credit totals for every active account in one grouped query.
+
+        Read-only: stored current_balance values are not touched.
+        """
+        debits = func.coalesce(
+            func.sum(Transaction.amount).filter(Transaction.transaction_type == "debit"), 0
+        )
+        credits = func.coalesce(
+            func.sum(Transaction.amount).filter(Transaction.transaction_type == "credit"), 0
+        )
+
+        join_condition = Transaction.chart_account_id == ChartOfAccount.id
+        if as_of_date:
+            join_condition = and_(join_condition, Transaction.date <= as_of_date)
+
+        account_columns = (
+            ChartOfAccount.id,
+            ChartOfAccount.account_code,
+            ChartOfAccount.account_name,
+            ChartOfAccount.account_type,
+            ChartOfAccount.normal_balance,
+            ChartOfAccount.parent_account_id,
+        )
+
+        return self.session.query(
+            *account_columns,
+            debits.label("debits"),
+            credits.label("credits")
+        ).outerjoin(
+            Transaction, join_condition
+        ).filter(
+            ChartOfAccount.user_id == user_id,
+            ChartOfAccount.is_active.is_(True)
+        ).group_by(
+            *account_columns
+        ).order_by(
+            ChartOfAccount.account_code
+        ).all()
+
+    @staticmethod
+    def _net_balance(normal_balance: str, debits: Decimal, credits: Decimal) -> Decimal:
+        """Balance in the account's normal direction."""
+        if normal_balance == "debit":
+            return debits - credits
+        return credits - debits
+
     def get_trial_balance(self, user_id: str, as_of_date: Optional[str] = None) -> Dict[str, Any]:
         """Generate a trial balance report."""
 
-        accounts = self.session.query(ChartOfAccount).filter_by(
-            user_id=user_id,
-            is_active=True
-        ).order_by(ChartOfAccount.account_code).all()
-
         trial_balance = {
             "accounts": [],
             "total_debits": Decimal("0"),
@@ -174,8 +243,12 @@ class ChartOfAccountsService:
             "is_balanced": True
         }
 
-        for account in accounts:
-            balance = self.get_account_balance(account.id, user_id, as_of_date)
+        for account in self.get_account_balances(user_id, as_of_date):
+            balance = self._net_balance(
+                account.normal_balance,
+                Decimal(account.debits or 0),
+                Decimal(account.credits or 0)
+            )
 
             account_data = {
                 "account_code": account.account_code,
@@ -213,28 +286,94 @@ class ChartOfAccountsService:
             is_active=True
         ).order_by(ChartOfAccount.account_code).all()
 
-    def get_account_hierarchy(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get chart of accounts as a hierarchical structure."""
+    def get_account_hierarchy(
+        self,
+        user_id: str,
+        as_of_date: Optional[str] = None,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get chart of accounts as a hierarchical structure with balance rollups.
+
+        Each node carries its own ``balance`` and a ``rollup_balance`` covering
+        its whole subtree, both in the node's normal direction. Results are
+        cached per user until the chart or its postings change.
+        """
+        cache_key = None
+        redis_client = get_redis_client_sync() if use_cache else None
+        if redis_client:
+            try:
+                version = redis_client.get(_hierarchy_version_key(user_id)) or 0
+                cache_key = f"{HIERARCHY_CACHE_PREFIX}:{user_id}:{int(version)}:{as_of_date or 'current'}"
+                cached = redis_client.get(cache_key)
+                if cached:
+                    return json.loads(cached)
+            except Exception as e:
+                logger.warning(f"Account hierarchy cache read failed for user {user_id}: {e}")
+                cache_key = None
 
-        # Get all accounts
         accounts = self.session.query(ChartOfAccount).filter_by(
             user_id=user_id,
             is_active=True
         ).order_by(ChartOfAccount.account_code).all()
 
-        # Build hierarchy
-        account_dict = {acc.id: self._account_to_dict(acc) for acc in accounts}
-        hierarchy = []
+        balances = {
+            row.id: Decimal(row.debits or 0) - Decimal(row.credits or 0)
+            for row in self.get_account_balances(user_id, as_of_date)
+        }
+        hierarchy = self._build_hierarchy(accounts, balances)
 
-        for account in accounts:
-            if account.parent_account_id is None:
-                # Root account
-                account_data = account_dict[account.id]
-                account_data["children"] = self._get_children(account.id, account_dict, accounts)
-                hierarchy.append(account_data)
+        if cache_key:
+            try:
+                redis_client.setex(cache_key, settings.chart_hierarchy_cache_ttl, json.dumps(hierarchy))
+            except Exception as e:
+                logger.warning(f"Account hierarchy cache write failed for user {user_id}: {e}")
 
         return hierarchy
 
+    def _build_hierarchy(
+        self,
+        accounts: List[ChartOfAccount],
+        balances: Dict[Any, Decimal]
+    ) -> List[Dict[str, Any]]:
+        """
+        Link accounts into a tree and roll balances up in linear time.
+
+        ``balances`` holds each account's own debits minus credits. Accounts
+        whose parent is missing or inactive are promoted to roots.
+        """
+        nodes = {account.id: self._account_to_dict(account) for account in accounts}
+        children_by_parent: Dict[Any, List[Any]] = defaultdict(list)
+        roots = []
+        for account in accounts:
+            if account.parent_account_id in nodes and account.parent_account_id != account.id:
+                children_by_parent[account.parent_account_id].append(account.id)
+            else:
+                roots.append(account.id)
+
+        # Iterative post-order walk so deep charts don't hit the recursion limit
+        normal_balances = {account.id: account.normal_balance for account in accounts}
+        subtree: Dict[Any, Decimal] = {}
+        stack = [(account_id, False) for account_id in reversed(roots)]
+        while stack:
+            account_id, children_done = stack.pop()
+            if not children_done:
+                stack.append((account_id, True))
+                stack.extend((child_id, False) for child_id in reversed(children_by_parent[account_id]))
+                continue
+
+            own = balances.get(account_id, Decimal("0"))
+            subtree[account_id] = own + sum(
+                (subtree[child_id] for child_id in children_by_parent[account_id]), Decimal("0")
+            )
+            sign = 1 if normal_balances[account_id] == "debit" else -1
+            node = nodes[account_id]
+            node["balance"] = float(sign * own)
+            node["rollup_balance"] = float(sign * subtree[account_id])
+            node["children"] = [nodes[child_id] for child_id in children_by_parent[account_id]]
+
+        return [nodes[account_id] for account_id in roots]
+
     def delete_account(self, account_id: str, user_id: str) -> bool:
         """Soft delete an account (mark as inactive)."""
 
@@ -259,12 +398,14 @@ class ChartOfAccountsService:
                 # Soft delete - mark as inactive
                 account.is_active = False
                 self.session.commit()
+                invalidate_account_hierarchy(user_id)
                 logger.info(f"Soft deleted account {account.account_code} (has {transaction_count} transactions)")
                 return True
             else:
                 # Hard delete if no transactions
                 self.session.delete(account)
                 self.session.commit()
+                invalidate_account_hierarchy(user_id)
                 logger.info(f"Hard deleted account {account.account_code}")
                 return True
         except Exception as e:
@@ -290,20 +431,8 @@ class ChartOfAccountsService:
             "children": []
         }
 
-    def _get_children(self, parent_id: str, account_dict: Dict[str, Any], accounts: List[ChartOfAccount]) -> List[Dict[str, Any]]:
-        """Recursively get children accounts."""
-
-        children = []
-        for account in accounts:
-            if account.parent_account_id == parent_id:
-                child_data = account_dict[account.id]
-                child_data["children"] = self._get_children(account.id, account_dict, accounts)
-                children.append(child_data)
-
-        return children
-
     def generate_financial_statements(self, user_id: str, as_of_date: Optional[str] = None) -> Dict[str, Any]:
-        """Generate basic financial statements."""
+        """Generate basic financial statements from a single-pass trial balance."""
 
         trial_balance = self.get_trial_balance(user_id, as_of_date)
 
@@ -0,0 +1,289 @@
+"""
+Journal automation for synced transactions.
+
+A user's active ``journal_entry`` bookkeeping rules are compiled once per
+sync into predicate lists, then evaluated against each page of newly synced
+transactions. Matching transactions get balanced journal entries written
+with multi-row inserts, and rule execution stats are updated with a single
+statement per page.
+
+``trigger_conditions`` uses the same condition format as categorization
+rules: a condition ``{"field", "operator", "value", "case_sensitive"}``, a
+list of them (all must hold), or ``{"conditions": [...]}``.
+
+``journal_template`` holds ``debit_account_id`` and ``credit_account_id``
+chart accounts for an outflow (the sides swap for inflows), plus optional
+``description`` (formatted with the transaction's ``name`` and
+``merchant_name``), ``journal_type`` and ``post``.
+"""
+
+import logging
+import operator
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..database.bookkeeping_models import BookkeepingRule, JournalEntry
+from ..database.models import Transaction
+from .journal_batch import allocate_entry_numbers, journal_entry_lines
+
+logger = logging.getLogger(__name__)
+
+AUTOMATION_RULE_TYPE = "journal_entry"
+SYNC_SOURCE_TYPE = "plaid_sync"
+
+CONDITION_FIELDS = {
+    "name": lambda t: t.name,
+    "merchant_name": lambda t: t.merchant_name,
+    # Plaid's raw statement text
+    "description": lambda t: t.original_description,
+    "amount": lambda t: t.amount,
+    "transaction_type": lambda t: t.transaction_type,
+    "payment_channel": lambda t: t.payment_channel,
+    "account_id": lambda t: str(t.account_id),
+    "plaid_category_id": lambda t: t.plaid_category_id,
+    "subcategory": lambda t: t.subcategory,
+}
+
+_COMPARISONS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "lt": operator.lt,
+    "gte": operator.ge,
+    "lte": operator.le,
+}
+
+Predicate = Callable[[Transaction], bool]
+
+
+class RuleCompileError(ValueError):
+    """Raised when a bookkeeping rule cannot be compiled."""
+    pass
+
+
+@dataclass
+class CompiledRule:
+    """A bookkeeping rule ready to evaluate against transactions."""
+    rule_id: UUID
+    priority: int
+    predicates: List[Predicate]
+    debit_account_id: UUID
+    credit_account_id: UUID
+    description: Optional[str]
+    journal_type: str
+    post: bool
+
+    def matches(self, transaction: Transaction) -> bool:
+        return all(predicate(transaction) for predicate in self.predicates)
+
+
+def _compile_condition(condition: Dict[str, Any]) -> Predicate:
+    try:
+        field, op, expected = condition["field"], condition["operator"], condition["value"]
+    except (KeyError, TypeError):
+        raise RuleCompileError(f"Condition needs field, operator and value: {condition}")
+    if field not in CONDITION_FIELDS:
+        raise RuleCompileError(f"Unsupported condition field: {field}")
+    get = CONDITION_FIELDS[field]
+    case_sensitive = condition.get("case_sensitive", False)
+
+    def normalize(value: Any) -> Any:
+        if field == "amount":
+            return Decimal(str(value))
+        if not case_sensitive and isinstance(value, str):
+            return value.lower()
+        return value
+
+    # Expected values are normalized (and regexes compiled) here, once per rule
+    if op == "regex":
+        try:
+            pattern = re.compile(expected, 0 if case_sensitive else re.IGNORECASE)
+        except (re.error, TypeError) as e:
+            raise RuleCompileError(f"Invalid regex {expected!r}: {e}")
+        test = lambda actual: pattern.search(str(actual)) is not None
+    elif op in ("in", "not_in"):
+        if not isinstance(expected, list):
+            raise RuleCompileError(f"Operator {op} needs a list value")
+        values = {normalize(value) for value in expected}
+        test = (lambda actual: actual in values) if op == "in" else (lambda actual: actual not in values)
+    elif op == "contains":
+        needle = normalize(str(expected))
+        test = lambda actual: needle in str(actual)
+    elif op in _COMPARISONS:
+        try:
+            target = normalize(expected)
+        except ArithmeticError:
+            raise RuleCompileError(f"Invalid amount: {expected!r}")
+        compare = _COMPARISONS[op]
+        test = lambda actual: compare(actual, target)
+    else:
+        raise RuleCompileError(f"Unsupported operator: {op}")
+
+    def predicate(transaction: Transaction) -> bool:
+        actual = get(transaction)
+        if actual is None:
+            return False
+        return test(normalize(actual))
+
+    return predicate
+
+
+def compile_rule(rule: BookkeepingRule) -> CompiledRule:
+    """Compile a bookkeeping rule's conditions and journal template."""
+    conditions = rule.trigger_conditions
+    if isinstance(conditions, dict):
+        conditions = conditions.get("conditions", [conditions])
+    if not conditions:
+        raise RuleCompileError("Rule has no trigger conditions")
+
+    template = rule.journal_template or {}
+    try:
+        debit_account_id = UUID(str(template["debit_account_id"]))
+        credit_account_id = UUID(str(template["credit_account_id"]))
+    except (KeyError, ValueError):
+        raise RuleCompileError("Journal template needs debit_account_id and credit_account_id")
+
+    return CompiledRule(
+        rule_id=rule.id,
+        priority=rule.priority if rule.priority is not None else 100,
+        predicates=[_compile_condition(condition) for condition in conditions],
+        debit_account_id=debit_account_id,
+        credit_account_id=credit_account_id,
+        description=template.get("description"),
+        journal_type=template.get("journal_type", "general"),
+        post=bool(template.get("post", False)),
+    )
+
+
+class JournalAutomation:
+    """Applies a user's compiled bookkeeping rules to synced transactions."""
+
+    def __init__(self, db: Session, user_id: UUID):
+        self.db = db
+        self.user_id = user_id
+        self.rules = self._compile_rules()
+
+    def _compile_rules(self) -> List[CompiledRule]:
+        rules = self.db.execute(
+            select(BookkeepingRule).where(
+                BookkeepingRule.user_id == self.user_id,
+                BookkeepingRule.rule_type == AUTOMATION_RULE_TYPE,
+                BookkeepingRule.is_active.is_(True)
+            )
+        ).scalars().all()
+
+        compiled = []
+        for rule in rules:
+            try:
+                compiled.append(compile_rule(rule))
+            except RuleCompileError as e:
+                logger.warning(f"Skipping bookkeeping rule {rule.id} ({rule.rule_name}): {e}")
+        # Lower priority numbers win, as with categorization rules
+        compiled.sort(key=lambda rule: rule.priority)
+        return compiled
+
+    def _entry_description(self, rule: CompiledRule, transaction: Transaction) -> str:
+        if rule.description:
+            try:
+                return rule.description.format(
+                    name=transaction.name or "",
+                    merchant_name=transaction.merchant_name or ""
+                )
+            except (KeyError, IndexError, ValueError):
+                pass
+        return transaction.merchant_name or transaction.name or "Synced transaction"
+
+    def apply(self, transactions: Sequence[Transaction]) -> int:
+        """
+        Write journal entries for the transactions matching a rule. Does not commit.
+
+        Transactions must already be flushed. Each transaction gets at most one
+        entry, from the first matching rule.
+
+        Returns:
+            Number of journal entries created
+        """
+        if not self.rules or not transactions:
+            return 0
+
+        matches = []
+        for transaction in transactions:
+            if not transaction.amount:
+                continue
+            rule = next((rule for rule in self.rules if rule.matches(transaction)), None)
+            if rule:
+                matches.append((rule, transaction))
+        if not matches:
+            return 0
+
+        now = datetime.utcnow()
+        numbers = allocate_entry_numbers(self.db, self.user_id, len(matches))
+        entry_rows = []
+        line_rows = []
+        executions: Dict[UUID, int] = {}
+        for (rule, transaction), entry_number in zip(matches, numbers):
+            entry_id = uuid.uuid4()
+            amount = abs(Decimal(transaction.amount))
+            # Plaid amounts are positive for money leaving the account
+            debit, credit = rule.debit_account_id, rule.credit_account_id
+            if transaction.amount < 0:
+                debit, credit = credit, debit
+
+            entry_rows.append({
+                "id": entry_id,
+                "user_id": self.user_id,
+                "entry_number": entry_number,
+                "entry_date": transaction.date,
+                "description": self._entry_description(rule, transaction),
+                "reference": transaction.plaid_transaction_id,
+                "journal_type": rule.journal_type,
+                "total_debits": amount,
+                "total_credits": amount,
+                "is_balanced": True,
+                "is_posted": rule.post,
+                "posting_date": now if rule.post else None,
+                "source_type": SYNC_SOURCE_TYPE,
+                "automation_rule_id": rule.rule_id,
+            })
+            for line_number, (account_id, debit_amount, credit_amount) in enumerate((
+                (debit, amount, Decimal("0.00")),
+                (credit, Decimal("0.00"), amount),
+            ), 1):
+                line_rows.append({
+                    "journal_entry_id": entry_id,
+                    "chart_account_id": account_id,
+                    "debit_amount": debit_amount,
+                    "credit_amount": credit_amount,
+                    "description": transaction.name,
+                    "transaction_id": transaction.id,
+                    "line_number": line_number,
+                })
+            executions[rule.rule_id] = executions.get(rule.rule_id, 0) + 1
+
+        self.db.execute(insert(JournalEntry).execution_options(render_nulls=True), entry_rows)
+        self.db.execute(insert(journal_entry_lines), line_rows)
+        self.db.execute(
+            update(BookkeepingRule)
+            .where(BookkeepingRule.id.in_(list(executions)))
+            .values(
+                execution_count=func.coalesce(BookkeepingRule.execution_count, 0) + case(
+                    *((BookkeepingRule.id == rule_id, count) for rule_id, count in executions.items())
+                ),
+                last_executed=now
+            ),
+            execution_options={"synchronize_session": False}
+        )
+
+        logger.info(
+            f"Journal automation created {len(entry_rows)} entries from "
+            f"{len(transactions)} synced transactions for user {self.user_id}"
+        )
+        return len(entry_rows)
@@ -0,0 +1,294 @@
+"""
+Bulk journal entry import and posting.
+
+A batch of entries is validated in one vectorized pass, numbered from a
+single block of the user's entry sequence, written with two multi-row
+inserts (entries, then lines) and committed together, optionally already
+posted. Nothing is written if any entry in the batch is rejected.
+"""
+
+import logging
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Integer, cast, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from ..database.bookkeeping_models import JournalEntry, JournalEntryLine
+from ..database.routing import mark_recent_write
+from ..schemas.bookkeeping import JournalEntryCreate
+from .bookkeeping_status import invalidate_bookkeeping_status
+from .chart_of_accounts_service import invalidate_account_hierarchy
+
+logger = logging.getLogger(__name__)
+
+ENTRY_NUMBER_PREFIX = "JE"
+# "JE-YYYYMM-"; the sequence number follows
+_SEQUENCE_OFFSET = len(ENTRY_NUMBER_PREFIX) + len("-YYYYMM-")
+
+# The lines table's chart_of_accounts foreign key points outside this
+# metadata, which the ORM cannot sort for a flush; insert through Core
+journal_entry_lines = JournalEntryLine.__table__
+
+
+def _sequence_key(entry_number: str) -> tuple:
+    """Sort key comparing the sequence number after the last "-" numerically."""
+    head, _, sequence = entry_number.rpartition("-")
+    return (0, int(sequence), head) if sequence.isdigit() else (1, 0, entry_number)
+
+
+class JournalBatchError(Exception):
+    """Raised when a journal entry batch is rejected; nothing is written."""
+
+    def __init__(self, message: str, errors: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def _cents(amount: Optional[Decimal]) -> int:
+    return int((amount or Decimal("0")) * 100)
+
+
+def unbalanced_entries(entries: List[JournalEntryCreate]) -> List[Dict[str, Any]]:
+    """
+    Entries whose debits and credits differ, checked for the whole batch at once.
+
+    Line amounts are flattened into integer cent arrays and summed per entry,
+    so the check is exact and costs one pass over all lines.
+    """
+    counts = [len(entry.lines) for entry in entries]
+    owner = np.repeat(np.arange(len(entries)), counts)
+    debits = np.zeros(len(entries), dtype=np.int64)
+    credits = np.zeros(len(entries), dtype=np.int64)
+    np.add.at(debits, owner, np.fromiter(
+        (_cents(line.debit_amount) for entry in entries for line in entry.lines),
+        dtype=np.int64, count=len(owner)
+    ))
+    np.add.at(credits, owner, np.fromiter(
+        (_cents(line.credit_amount) for entry in entries for line in entry.lines),
+        dtype=np.int64, count=len(owner)
+    ))
+
+    empty = np.array(counts) == 0
+    return [
+        {
+            "index": int(index),
+            "debits": Decimal(int(debits[index])) / 100,
+            "credits": Decimal(int(credits[index])) / 100,
+            "reason": "entry has no lines" if empty[index] else "debits do not equal credits",
+        }
+        for index in np.flatnonzero((debits != credits) | empty)
+    ]
+
+
+def allocate_entry_numbers(
+    db: Session,
+    user_id: UUID,
+    count: int,
+    on: Optional[date] = None
+) -> List[str]:
+    """
+    Reserve a block of ``count`` consecutive journal entry numbers for the user.
+
+    On PostgreSQL a transaction-scoped advisory lock serializes allocations for
+    the user until the caller commits or rolls back.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"journal_entry_numbers:{user_id}"}
+        )
+
+    # The sequence runs past 9999, so compare it as a number, not as text
+    last_number = db.execute(
+        select(func.max(cast(func.substr(JournalEntry.entry_number, _SEQUENCE_OFFSET + 1), Integer)))
+        .where(
+            JournalEntry.user_id == user_id,
+            JournalEntry.entry_number.like(f"{ENTRY_NUMBER_PREFIX}-______-%")
+        )
+    ).scalar()
+    start = last_number + 1 if last_number else 1
+
+    month = (on or date.today()).strftime("%Y%m")
+    return [f"{ENTRY_NUMBER_PREFIX}-{month}-{number:04d}" for number in range(start, start + count)]
+
+
+class JournalBatchService:
+    """Imports and posts journal entries in bulk."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_entries(
+        self,
+        user_id: UUID,
+        entries: List[JournalEntryCreate],
+        post: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Validate, number and insert a batch of journal entries, then commit.
+
+        Raises JournalBatchError listing every unbalanced entry if any entry
+        does not balance.
+        """
+        started = time.perf_counter()
+        if not entries:
+            raise JournalBatchError("No journal entries to import")
+
+        errors = unbalanced_entries(entries)
+        if errors:
+            raise JournalBatchError(f"{len(errors)} journal entries do not balance", errors)
+
+        numbers = allocate_entry_numbers(self.db, user_id, len(entries))
+        posted_at = datetime.utcnow() if post else None
+        entry_rows = []
+        line_rows = []
+        for entry, entry_number in zip(entries, numbers):
+            entry_id = uuid.uuid4()
+            total = sum((line.debit_amount or Decimal("0.00") for line in entry.lines), Decimal("0.00"))
+            entry_rows.append({
+                "id": entry_id,
+                "user_id": user_id,
+                "entry_number": entry_number,
+                "entry_date": entry.entry_date or date.today(),
+                "description": entry.description,
+                "reference": entry.reference,
+                "journal_type": entry.journal_type or "general",
+                "total_debits": total,
+                "total_credits": total,
+                "is_balanced": True,
+                "is_posted": post,
+                "posting_date": posted_at,
+                "source_type": entry.source_type or "import",
+            })
+            for line_number, line in enumerate(entry.lines, 1):
+                line_rows.append({
+                    "id": uuid.uuid4(),
+                    "journal_entry_id": entry_id,
+                    "chart_account_id": line.chart_account_id,
+                    "debit_amount": line.debit_amount or Decimal("0.00"),
+                    "credit_amount": line.credit_amount or Decimal("0.00"),
+                    "description": line.description,
+                    "transaction_id": line.transaction_id,
+                    "line_number": line_number,
+                    "tax_category_id": line.tax_category_id,
+                })
+
+        # Ids are generated up front so lines need no RETURNING round trip;
+        # render_nulls keeps rows with optional fields in the same batch
+        try:
+            self.db.execute(insert(JournalEntry).execution_options(render_nulls=True), entry_rows)
+            self.db.execute(insert(journal_entry_lines), line_rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        mark_recent_write(user_id)
+        invalidate_bookkeeping_status(user_id)
+        if post:
+            invalidate_account_hierarchy(user_id)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Imported {len(entry_rows)} journal entries ({len(line_rows)} lines) "
+            f"for user {user_id} in {elapsed:.3f}s"
+        )
+        return self._report(len(entry_rows), len(line_rows), post, numbers, elapsed)
+
+    def post_entries(self, user_id: UUID, entry_ids: Iterable[UUID]) -> Dict[str, Any]:
+        """
+        Post a batch of the user's journal entries atomically, then commit.
+
+        Every entry must exist, be unposted and balance on its stored lines;
+        otherwise JournalBatchError is raised and nothing is posted.
+        """
+        started = time.perf_counter()
+        ids = list(set(entry_ids))
+        if not ids:
+            raise JournalBatchError("No journal entries to post")
+
+        line_totals = (
+            select(
+                JournalEntryLine.journal_entry_id,
+                func.count(JournalEntryLine.id).label("line_count"),
+                func.coalesce(func.sum(JournalEntryLine.debit_amount), 0).label("debits"),
+                func.coalesce(func.sum(JournalEntryLine.credit_amount), 0).label("credits")
+            )
+            .where(JournalEntryLine.journal_entry_id.in_(ids))
+            .group_by(JournalEntryLine.journal_entry_id)
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(
+                JournalEntry.id,
+                JournalEntry.entry_number,
+                JournalEntry.is_posted,
+                line_totals.c.line_count,
+                line_totals.c.debits,
+                line_totals.c.credits
+            )
+            .outerjoin(line_totals, line_totals.c.journal_entry_id == JournalEntry.id)
+            .where(JournalEntry.id.in_(ids), JournalEntry.user_id == user_id)
+        ).all()
+
+        errors = []
+        found = {row.id for row in rows}
+        for entry_id in ids:
+            if entry_id not in found:
+                errors.append({"entry_id": str(entry_id), "reason": "not found"})
+        for row in rows:
+            if row.is_posted:
+                reason = "already posted"
+            elif not row.line_count:
+                reason = "entry has no lines"
+            elif Decimal(row.debits) != Decimal(row.credits):
+                reason = "debits do not equal credits"
+            else:
+                continue
+            errors.append({"entry_id": str(row.id), "entry_number": row.entry_number, "reason": reason})
+        if errors:
+            raise JournalBatchError(f"{len(errors)} journal entries cannot be posted", errors)
+
+        try:
+            self.db.execute(
+                update(JournalEntry)
+                .where(JournalEntry.id.in_(ids), JournalEntry.is_posted.is_(False))
+                .values(is_posted=True, posting_date=datetime.utcnow()),
+                execution_options={"synchronize_session": False}
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        mark_recent_write(user_id)
+        invalidate_bookkeeping_status(user_id)
+        invalidate_account_hierarchy(user_id)
+
+        elapsed = time.perf_counter() - started
+        numbers = sorted((row.entry_number for row in rows), key=_sequence_key)
+        return self._report(len(rows), int(sum(row.line_count for row in rows)), True, numbers, elapsed)
+
+    @staticmethod
+    def _report(
+        entries: int,
+        lines: int,
+        posted: bool,
+        numbers: List[str],
+        elapsed: float
+    ) -> Dict[str, Any]:
+        return {
+            "entries": entries,
+            "lines": lines,
+            "posted": posted,
+            "first_entry_number": numbers[0] if numbers else None,
+            "last_entry_number": numbers[-1] if numbers else None,
+            "elapsed_seconds": round(elapsed, 4),
+            "entries_per_second": round(entries / elapsed, 1) if elapsed > 0 else None,
+        }
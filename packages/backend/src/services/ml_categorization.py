@@ -307,10 +307,36 @@ class MLCategorizationService:
 
     def _get_cache_key(self, transaction: Transaction) -> str:
         """Generate cache key for transaction prediction."""
-        # Create hash from transaction characteristics
-        text = f"{transaction.name}|{transaction.merchant_name}|{transaction.amount}|{transaction.date.date()}"
+        return self._prediction_cache_key(
+            transaction.name, transaction.merchant_name, transaction.amount, transaction.date
+        )
+
+    @staticmethod
+    def _prediction_cache_key(name: str, merchant_name: Optional[str], amount: Any, txn_date: Any) -> str:
+        """Cache key from the transaction characteristics a prediction depends on."""
+        if isinstance(txn_date, datetime):
+            txn_date = txn_date.date()
+        text = f"{name}|{merchant_name}|{amount}|{txn_date}"
         return f"ml_prediction:{hashlib.md5(text.encode()).hexdigest()}"
 
+    def invalidate_predictions(self, transactions: List[Any]) -> int:
+        """
+        Drop cached predictions for the given transactions in a single Redis call.
+
+        Accepts ORM objects or rows exposing name, merchant_name, amount and date.
+        """
+        if not self.redis_client or not transactions:
+            return 0
+        keys = {
+            self._prediction_cache_key(t.name, t.merchant_name, t.amount, t.date)
+            for t in transactions
+        }
+        try:
+            return self.redis_client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed: {e}")
+            return 0
+
     def _cache_prediction(self, cache_key: str, prediction: Dict[str, Any]):
         """Cache prediction result."""
         try:
@@ -731,32 +757,38 @@ class MLCategorizationService:
         was_correct: bool
     ) -> Dict[str, Any]:
         """Enhanced feedback processing with incremental learning preparation."""
-
-        # Store feedback for batch retraining
-        feedback_file = self.model_path / "feedback.jsonl"
-
-        feedback_entry = {
+        return self.update_from_feedback_batch([{
             "transaction_id": transaction_id,
             "correct_category": correct_category,
-            "was_correct": was_correct,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+            "was_correct": was_correct
+        }])
 
-        with open(feedback_file, "a") as f:
-            f.write(json.dumps(feedback_entry) + "\n")
+    def update_from_feedback_batch(self, feedback_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Record a batch of feedback entries for retraining with a single file write.
 
-        # Invalidate cache for this transaction (if we could identify it)
-        try:
-            # We'd need the transaction object to generate the cache key
-            # For now, we'll implement a simple cache invalidation pattern
-            pattern = f"ml_prediction:*"
-            # In a real implementation, we'd be more surgical about cache invalidation
-        except Exception as e:
-            logger.warning(f"Cache invalidation failed: {e}")
+        Each item needs transaction_id, correct_category and was_correct. Cached
+        predictions are invalidated separately via ``invalidate_predictions``.
+        """
+        # Store feedback for batch retraining
+        feedback_file = self.model_path / "feedback.jsonl"
+        timestamp = datetime.utcnow().isoformat()
+
+        with open(feedback_file, "a+") as f:
+            f.writelines(
+                json.dumps({
+                    "transaction_id": str(item["transaction_id"]),
+                    "correct_category": item["correct_category"],
+                    "was_correct": item["was_correct"],
+                    "timestamp": timestamp
+                }) + "\n"
+                for item in feedback_items
+            )
+            # Count from the same handle instead of reopening the file
+            f.seek(0)
+            feedback_count = sum(1 for _ in f)
 
         # Check if we should trigger retraining
-        feedback_count = sum(1 for _ in open(feedback_file))
-
         retrain_triggered = False
         if feedback_count >= 50:  # More frequent retraining
             retrain_triggered = True
@@ -765,9 +797,10 @@ class MLCategorizationService:
         return {
             "success": True,
             "feedback_recorded": True,
+            "recorded_count": len(feedback_items),
             "total_feedback": feedback_count,
             "retrain_triggered": retrain_triggered,
-            "cache_invalidated": True
+            "cache_invalidated": False
         }
 
     def get_model_metrics(self) -> Dict[str, Any]:
@@ -34,6 +34,7 @@ from threading import Lock
 
 from ..database.models import Transaction, Category
 from ..schemas.transaction import TransactionCategorization
+from ..utils.redis import get_redis_client_sync, pipeline_execute_sync
 
 logger = logging.getLogger(__name__)
 
@@ -42,21 +43,11 @@ class CacheManager:
     """Redis-based cache manager for ML predictions."""
     
     def __init__(self, redis_client: Optional[redis.Redis] = None):
-        try:
-            self.redis_client = redis_client or redis.Redis(
-                host='localhost', 
-                port=6379, 
-                db=1,  # Use separate DB for ML cache
-                decode_responses=True,
-                socket_connect_timeout=1
-            )
-            # Test connection
-            self.redis_client.ping()
-            self.cache_enabled = True
-        except (redis.ConnectionError, redis.TimeoutError):
+        # Keys are prefixed "ml_cat:", so the shared client's database is fine
+        self.redis_client = redis_client or get_redis_client_sync()
+        self.cache_enabled = self.redis_client is not None
+        if not self.cache_enabled:
             logger.warning("Redis not available, caching disabled")
-            self.redis_client = None
-            self.cache_enabled = False
     
     def get_cache_key(self, transaction_features: Dict[str, Any]) -> str:
         """Generate cache key from transaction features."""
@@ -110,6 +101,29 @@ class CacheManager:
         except Exception as e:
             logger.debug(f"Cache set failed: {e}")
 
+    def get_many(self, cache_keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Get cached predictions for several keys with one MGET."""
+        if not self.cache_enabled or not cache_keys:
+            return [None] * len(cache_keys)
+
+        try:
+            values = self.redis_client.mget(cache_keys)
+            return [json.loads(value) if value else None for value in values]
+        except Exception as e:
+            logger.debug(f"Cache get failed: {e}")
+        return [None] * len(cache_keys)
+
+    def set_many(self, predictions: Dict[str, Dict[str, Any]], ttl: int = 3600):
+        """Cache several predictions in one pipelined round trip."""
+        if not self.cache_enabled or not predictions:
+            return
+
+        pipeline_execute_sync(
+            [("setex", key, ttl, json.dumps(prediction, default=str))
+             for key, prediction in predictions.items()],
+            client=self.redis_client
+        )
+
 
 class OptimizedMLCategorizationService:
     """
@@ -450,6 +464,7 @@ class OptimizedMLCategorizationService:
         cached_results = {}
         uncached_transactions = []
         
+        cache_keys = {}
         if use_cache and self.cache_manager:
             for transaction in transactions:
                 features = {
@@ -458,9 +473,11 @@ class OptimizedMLCategorizationService:
                     "amount": float(transaction.amount),
                     "description": transaction.original_description or ""
                 }
-                cache_key = self.cache_manager.get_cache_key(features)
-                cached = self.cache_manager.get(cache_key)
-                
+                cache_keys[transaction.id] = self.cache_manager.get_cache_key(features)
+
+            # One round trip for the whole chunk
+            cached_values = self.cache_manager.get_many(list(cache_keys.values()))
+            for transaction, cached in zip(transactions, cached_values):
                 if cached:
                     cached_results[transaction.id] = cached
                     self.metrics["cache_hits"] += 1
@@ -471,6 +488,7 @@ class OptimizedMLCategorizationService:
             uncached_transactions = transactions
         
         # Process uncached transactions
+        new_cache_entries = {}
         if uncached_transactions and self._can_use_ml():
             # Batch ML processing for efficiency
             ml_results = self._batch_ml_categorize(uncached_transactions)
@@ -489,20 +507,12 @@ class OptimizedMLCategorizationService:
                 
                 # Cache high-confidence results
                 if use_cache and self.cache_manager and confidence >= 0.7:
-                    cache_data = {
+                    new_cache_entries[cache_keys[transaction.id]] = {
                         "category": category,
                         "confidence": confidence,
                         "alternatives": alternatives,
                         "rules_applied": rules_applied
                     }
-                    features = {
-                        "name": transaction.name,
-                        "merchant_name": transaction.merchant_name,
-                        "amount": float(transaction.amount),
-                        "description": transaction.original_description or ""
-                    }
-                    cache_key = self.cache_manager.get_cache_key(features)
-                    self.cache_manager.set(cache_key, cache_data)
                 
                 results.append(TransactionCategorization(
                     transaction_id=transaction.id,
@@ -516,6 +526,9 @@ class OptimizedMLCategorizationService:
             for transaction in uncached_transactions:
                 result = self.categorize_transaction(transaction, use_cache=False)
                 results.append(result)
+
+        if new_cache_entries:
+            self.cache_manager.set_many(new_cache_entries)
         
         # Add cached results
         for transaction in transactions:
@@ -0,0 +1,431 @@
+"""
+Accounting period close pipeline.
+
+Closing a period runs four steps, each a constant number of statements:
+
+1. validate preconditions (uncategorized transactions, unposted journal
+   entries, unreconciled accounts) with one aggregate query;
+2. group the period's posted journal lines by chart account;
+3. write a closing journal entry that zeroes revenue and expense accounts
+   into retained earnings, with all lines in one bulk insert;
+4. store per-account closing balances, rolled forward from the previous
+   closed period, so later reports read them instead of re-summing history.
+
+Large periods can be closed as a background job that reports its progress.
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from models.tax_categorization import ChartOfAccount
+from ..config import settings
+from ..database.bookkeeping_models import (
+    AccountingPeriod,
+    JournalEntry,
+    JournalEntryLine,
+    PeriodClosingBalance,
+    ReconciliationRecord,
+)
+from ..database.models import Account, Transaction
+from ..database.routing import mark_recent_write
+from ..utils.job_store import JobStore
+from .balance_snapshots import BalanceSnapshotService
+from .bookkeeping_status import RECONCILABLE_ACCOUNT_TYPES, invalidate_bookkeeping_status
+from .chart_of_accounts_service import invalidate_account_hierarchy
+
+logger = logging.getLogger(__name__)
+
+# Core table only: the legacy ChartOfAccount mapper is never configured here
+chart_of_accounts = ChartOfAccount.__table__
+# Their chart_of_accounts foreign keys point outside this metadata, which the
+# ORM cannot sort for a flush, so rows are written with Core inserts
+journal_entry_lines = JournalEntryLine.__table__
+period_closing_balances = PeriodClosingBalance.__table__
+
+CLOSING_ACCOUNT_TYPES = ("revenue", "expense")
+
+ProgressCallback = Callable[[str, int], None]
+
+
+class PeriodCloseError(Exception):
+    """Raised when a period cannot be closed."""
+
+    def __init__(self, message: str, issues: Optional[List[str]] = None):
+        super().__init__(message)
+        self.issues = issues or []
+
+
+def build_closing_lines(
+    totals: List[Dict[str, Any]],
+    retained_earnings_id: Optional[UUID]
+) -> List[Dict[str, Any]]:
+    """
+    Journal lines that zero each revenue and expense account for the period.
+
+    ``totals`` holds grouped ``chart_account_id``/``account_type``/``debits``/
+    ``credits`` rows. The net of the reversals goes to retained earnings.
+    """
+    lines = []
+    net = Decimal("0")
+    for row in totals:
+        if row["account_type"] not in CLOSING_ACCOUNT_TYPES:
+            continue
+        balance = Decimal(row["debits"]) - Decimal(row["credits"])
+        if not balance:
+            continue
+        lines.append({
+            "chart_account_id": row["chart_account_id"],
+            "debit_amount": -balance if balance < 0 else Decimal("0.00"),
+            "credit_amount": balance if balance > 0 else Decimal("0.00"),
+            "description": "Period close",
+        })
+        net += balance
+
+    if lines:
+        if retained_earnings_id is None:
+            raise PeriodCloseError("No retained earnings account to close into")
+        lines.append({
+            "chart_account_id": retained_earnings_id,
+            "debit_amount": net if net > 0 else Decimal("0.00"),
+            "credit_amount": -net if net < 0 else Decimal("0.00"),
+            "description": "Net income for the period",
+        })
+
+    for number, line in enumerate(lines, 1):
+        line["line_number"] = number
+    return lines
+
+
+class PeriodCloseService:
+    """Validates and closes accounting periods."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def check_preconditions(self, period: AccountingPeriod) -> List[str]:
+        """Reasons the period is not ready to close, from one aggregate query."""
+        user_accounts = select(Account.id).where(Account.user_id == period.user_id)
+        uncategorized = select(func.count(Transaction.id)).where(
+            Transaction.account_id.in_(user_accounts),
+            Transaction.date.between(period.start_date, period.end_date),
+            Transaction.user_category_override.is_(None),
+            Transaction.subcategory.is_(None)
+        ).scalar_subquery()
+        unposted = select(func.count(JournalEntry.id)).where(
+            JournalEntry.user_id == period.user_id,
+            JournalEntry.is_posted.is_(False),
+            JournalEntry.entry_date.between(period.start_date, period.end_date)
+        ).scalar_subquery()
+        unreconciled = select(func.count(Account.id)).where(
+            Account.user_id == period.user_id,
+            Account.is_active.is_(True),
+            Account.account_type.in_(RECONCILABLE_ACCOUNT_TYPES),
+            ~exists().where(
+                ReconciliationRecord.account_id == Account.id,
+                ReconciliationRecord.status == "reconciled",
+                ReconciliationRecord.reconciliation_date >= period.end_date
+            )
+        ).scalar_subquery()
+
+        counts = self.db.execute(select(
+            uncategorized.label("uncategorized"),
+            unposted.label("unposted"),
+            unreconciled.label("unreconciled")
+        )).one()
+
+        issues = []
+        if counts.uncategorized:
+            issues.append(f"{counts.uncategorized} transactions in the period are uncategorized")
+        if counts.unposted:
+            issues.append(f"{counts.unposted} journal entries in the period are not posted")
+        if counts.unreconciled:
+            issues.append(f"{counts.unreconciled} accounts are not reconciled through {period.end_date}")
+        return issues
+
+    def period_totals(self, period: AccountingPeriod) -> List[Dict[str, Any]]:
+        """Posted debit and credit totals per chart account for the period."""
+        rows = self.db.execute(
+            select(
+                JournalEntryLine.chart_account_id,
+                chart_of_accounts.c.account_type,
+                func.coalesce(func.sum(JournalEntryLine.debit_amount), 0),
+                func.coalesce(func.sum(JournalEntryLine.credit_amount), 0)
+            )
+            .join(JournalEntry, JournalEntry.id == JournalEntryLine.journal_entry_id)
+            .join(chart_of_accounts, chart_of_accounts.c.id == JournalEntryLine.chart_account_id)
+            .where(
+                JournalEntry.user_id == period.user_id,
+                JournalEntry.is_posted.is_(True),
+                JournalEntry.entry_date.between(period.start_date, period.end_date)
+            )
+            .group_by(JournalEntryLine.chart_account_id, chart_of_accounts.c.account_type)
+        ).all()
+        return [
+            {"chart_account_id": account_id, "account_type": account_type,
+             "debits": Decimal(debits), "credits": Decimal(credits)}
+            for account_id, account_type, debits, credits in rows
+        ]
+
+    def _retained_earnings_account(self, user_id: UUID) -> Optional[UUID]:
+        return self.db.execute(
+            select(chart_of_accounts.c.id).where(
+                chart_of_accounts.c.user_id == user_id,
+                chart_of_accounts.c.account_type == "equity",
+                chart_of_accounts.c.is_active.is_(True),
+                chart_of_accounts.c.account_name.ilike("%retained earnings%")
+            ).order_by(chart_of_accounts.c.account_code).limit(1)
+        ).scalar()
+
+    def create_closing_entry(
+        self,
+        period: AccountingPeriod,
+        totals: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Write the posted closing entry and its lines (one bulk insert). Does not commit.
+
+        Returns:
+            The closing lines written; empty when there is nothing to close
+        """
+        lines = build_closing_lines(totals, self._retained_earnings_account(period.user_id))
+        if not lines:
+            return []
+
+        total = sum(line["debit_amount"] for line in lines)
+        entry = JournalEntry(
+            user_id=period.user_id,
+            entry_number=f"CE-{period.end_date.strftime('%Y%m')}-{str(period.id)[:8]}",
+            entry_date=period.end_date,
+            description=f"Closing entry for {period.period_name}",
+            journal_type="closing",
+            total_debits=total,
+            total_credits=sum(line["credit_amount"] for line in lines),
+            is_balanced=True,
+            is_posted=True,
+            posting_date=datetime.utcnow(),
+            period_id=period.id,
+            source_type="period_close"
+        )
+        self.db.add(entry)
+        self.db.flush()
+
+        self.db.execute(
+            insert(journal_entry_lines),
+            [{**line, "journal_entry_id": entry.id} for line in lines]
+        )
+        period.closing_journal_entry_id = entry.id
+        return lines
+
+    def snapshot_closing_balances(
+        self,
+        period: AccountingPeriod,
+        totals: List[Dict[str, Any]],
+        closing_lines: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        """
+        Store each account's period activity and cumulative totals. Does not commit.
+
+        Cumulative totals roll forward from the latest earlier closed period's
+        snapshot, so only this period's activity is ever summed.
+        """
+        activity: Dict[UUID, List[Decimal]] = defaultdict(lambda: [Decimal("0"), Decimal("0")])
+        for row in totals:
+            activity[row["chart_account_id"]][0] += row["debits"]
+            activity[row["chart_account_id"]][1] += row["credits"]
+        for line in closing_lines or []:
+            activity[line["chart_account_id"]][0] += line["debit_amount"]
+            activity[line["chart_account_id"]][1] += line["credit_amount"]
+
+        previous_period = select(AccountingPeriod.id).where(
+            AccountingPeriod.user_id == period.user_id,
+            AccountingPeriod.is_closed.is_(True),
+            AccountingPeriod.end_date < period.start_date,
+            exists().where(PeriodClosingBalance.period_id == AccountingPeriod.id)
+        ).order_by(AccountingPeriod.end_date.desc()).limit(1).scalar_subquery()
+        carried = {
+            account_id: (Decimal(debit_total), Decimal(credit_total))
+            for account_id, debit_total, credit_total in self.db.execute(
+                select(
+                    PeriodClosingBalance.chart_account_id,
+                    PeriodClosingBalance.debit_total,
+                    PeriodClosingBalance.credit_total
+                ).where(PeriodClosingBalance.period_id == previous_period)
+            )
+        }
+
+        rows = []
+        for account_id in set(activity) | set(carried):
+            debits, credits = activity.get(account_id, (Decimal("0"), Decimal("0")))
+            prior_debits, prior_credits = carried.get(account_id, (Decimal("0"), Decimal("0")))
+            rows.append({
+                "period_id": period.id,
+                "chart_account_id": account_id,
+                "period_debits": debits,
+                "period_credits": credits,
+                "debit_total": prior_debits + debits,
+                "credit_total": prior_credits + credits,
+            })
+        if rows:
+            self.db.execute(insert(period_closing_balances), rows)
+        return len(rows)
+
+    def closing_balances(self, period_id: UUID) -> List[Dict[str, Any]]:
+        """Stored closing balances of a closed period, with account details."""
+        rows = self.db.execute(
+            select(
+                PeriodClosingBalance.chart_account_id,
+                chart_of_accounts.c.account_code,
+                chart_of_accounts.c.account_name,
+                chart_of_accounts.c.account_type,
+                chart_of_accounts.c.normal_balance,
+                PeriodClosingBalance.period_debits,
+                PeriodClosingBalance.period_credits,
+                PeriodClosingBalance.debit_total,
+                PeriodClosingBalance.credit_total
+            )
+            .join(chart_of_accounts, chart_of_accounts.c.id == PeriodClosingBalance.chart_account_id)
+            .where(PeriodClosingBalance.period_id == period_id)
+            .order_by(chart_of_accounts.c.account_code)
+        ).all()
+
+        balances = []
+        for row in rows:
+            net = row.debit_total - row.credit_total
+            balances.append({
+                "chart_account_id": str(row.chart_account_id),
+                "account_code": row.account_code,
+                "account_name": row.account_name,
+                "account_type": row.account_type,
+                "period_debits": float(row.period_debits),
+                "period_credits": float(row.period_credits),
+                "balance": float(net if row.normal_balance == "debit" else -net),
+            })
+        return balances
+
+    def close_period(
+        self,
+        period: AccountingPeriod,
+        force: bool = False,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the close pipeline and commit.
+
+        Raises PeriodCloseError with the failing checks unless ``force`` is set.
+        """
+        report = progress or (lambda step, percent: None)
+        if period.is_closed:
+            raise PeriodCloseError("Period is already closed")
+
+        report("validating", 10)
+        issues = self.check_preconditions(period)
+        if issues and not force:
+            raise PeriodCloseError("Period is not ready to close", issues)
+
+        report("totalling", 30)
+        totals = self.period_totals(period)
+
+        report("closing_entries", 55)
+        closing_lines = self.create_closing_entry(period, totals)
+
+        report("snapshotting", 75)
+        accounts_snapshotted = self.snapshot_closing_balances(period, totals, closing_lines)
+        # Month-end balances of the linked bank accounts for as-of lookups
+        BalanceSnapshotService(self.db).snapshot_through(period.user_id, period.end_date)
+
+        period.is_closed = True
+        period.closing_date = datetime.utcnow()
+        self.db.commit()
+        mark_recent_write(period.user_id)
+        invalidate_bookkeeping_status(period.user_id)
+        invalidate_account_hierarchy(period.user_id)
+        report("completed", 100)
+
+        logger.info(f"Closed period {period.period_name} for user {period.user_id}")
+        return {
+            "period_id": str(period.id),
+            "closing_entry_id": str(period.closing_journal_entry_id) if closing_lines else None,
+            "closing_lines": len(closing_lines),
+            "accounts_snapshotted": accounts_snapshotted,
+            "issues": issues,
+        }
+
+
+# Background close jobs
+
+period_close_jobs = JobStore("period_close_job:", lambda: settings.period_close_job_ttl, "period close")
+
+
+def get_period_close_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Look up a period close job by id."""
+    return period_close_jobs.get(job_id)
+
+
+def create_period_close_job(user_id: Any, period_id: Any, force: bool = False) -> Dict[str, Any]:
+    """Register a pending period close job for a user."""
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "user_id": str(user_id),
+        "period_id": str(period_id),
+        "force": force,
+        "status": "pending",
+        "step": None,
+        "progress": 0,
+        "result": None,
+        "issues": [],
+        "error": None,
+        "created_at": datetime.utcnow().isoformat(),
+        "completed_at": None,
+    }
+    period_close_jobs.save(job)
+    return job
+
+
+def run_period_close_job(job_id: str, bind: Any) -> None:
+    """
+    Background task that closes a period and records progress on the job.
+
+    Runs with its own session on ``bind`` so it outlives the request session.
+    """
+    job = get_period_close_job(job_id)
+    if not job:
+        logger.error(f"Period close job {job_id} not found")
+        return
+
+    def report(step: str, percent: int) -> None:
+        job.update(step=step, progress=percent)
+        period_close_jobs.save(job)
+
+    job["status"] = "running"
+    period_close_jobs.save(job)
+
+    db = Session(bind=bind)
+    try:
+        period = db.query(AccountingPeriod).filter(
+            AccountingPeriod.id == UUID(job["period_id"]),
+            AccountingPeriod.user_id == UUID(job["user_id"])
+        ).first()
+        if not period:
+            raise PeriodCloseError("Accounting period not found")
+
+        result = PeriodCloseService(db).close_period(period, force=job["force"], progress=report)
+        job.update(status="completed", result=result, issues=result["issues"])
+    except PeriodCloseError as e:
+        db.rollback()
+        job.update(status="failed", error=str(e), issues=e.issues)
+    except Exception as e:
+        logger.error(f"Period close job {job_id} failed: {e}")
+        db.rollback()
+        job.update(status="failed", error=str(e))
+    finally:
+        db.close()
+        job["completed_at"] = datetime.utcnow().isoformat()
+        period_close_jobs.save(job)
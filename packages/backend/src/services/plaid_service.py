@@ -335,7 +335,7 @@ class PlaidService:
 
         try:
             # Use distributed locking to prevent concurrent syncs
-            with plaid_sync_lock(plaid_item_id, timeout=60.0):
+            async with plaid_sync_lock(plaid_item_id, timeout=60.0):
                 # Get current cursor with fresh data
                 session.refresh(plaid_item)
                 current_cursor = plaid_item.cursor
@@ -0,0 +1,390 @@
+"""
+Bank statement ingestion and automatic reconciliation matching.
+
+Statement lines (CSV or OFX) are matched against an account's transactions
+with an in-memory index keyed by amount: each line only ever looks at
+transactions with exactly the same amount inside a small date window, so a
+year of statement lines is matched against a single range query of
+candidates. Exact candidates are scored on date proximity and description
+similarity and assigned greedily, best score first. Lines left over are
+then tried against small groups of transactions that sum to the line
+amount (a deposit that batches several payments, for example).
+"""
+
+import csv
+import io
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ..database.bookkeeping_models import ReconciliationItem, ReconciliationRecord
+from ..database.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+DATE_WINDOW_DAYS = 5
+MIN_CONFIDENCE = 0.6
+MAX_GROUP_SIZE = 3
+MAX_GROUP_CANDIDATES = 10
+
+# Exact amount agreement is required for a candidate, so it carries the
+# largest share of the score; date and description decide between candidates
+AMOUNT_WEIGHT = 0.5
+DATE_WEIGHT = 0.3
+DESCRIPTION_WEIGHT = 0.2
+GROUP_MATCH_PENALTY = 0.9
+
+CSV_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d", "%d-%b-%Y")
+CSV_DATE_COLUMNS = ("date", "posted date", "posting date", "transaction date")
+CSV_DESCRIPTION_COLUMNS = ("description", "name", "payee", "memo")
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))",
+                              re.IGNORECASE | re.DOTALL)
+_OFX_FIELD = re.compile(r"<(DTPOSTED|TRNAMT|NAME|MEMO|FITID)>([^<\r\n]*)", re.IGNORECASE)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+class StatementParseError(ValueError):
+    """Raised when a bank statement file cannot be parsed."""
+    pass
+
+
+@dataclass
+class StatementLine:
+    """A single line from a bank statement."""
+    date: date
+    amount: Decimal
+    description: str = ""
+    reference: Optional[str] = None
+
+
+@dataclass
+class StatementMatch:
+    """Outcome of matching one statement line."""
+    line: StatementLine
+    transactions: List[Tuple[UUID, Decimal]] = field(default_factory=list)
+    confidence: float = 0.0
+
+    @property
+    def is_matched(self) -> bool:
+        return bool(self.transactions)
+
+
+def _parse_amount(value: str) -> Decimal:
+    text = value.strip().replace("$", "").replace(",", "")
+    negative = text.startswith("(") and text.endswith(")")
+    try:
+        amount = Decimal(text.strip("()") or "0")
+    except InvalidOperation:
+        raise StatementParseError(f"Invalid amount: {value!r}")
+    return -amount if negative else amount
+
+
+def _parse_date(value: str) -> date:
+    text = value.strip()
+    for fmt in CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise StatementParseError(f"Invalid date: {value!r}")
+
+
+def parse_statement_csv(content: str) -> List[StatementLine]:
+    """
+    Parse a CSV bank statement.
+
+    Needs a date column and either an ``Amount`` column (deposits positive)
+    or separate ``Debit``/``Credit`` columns. Header names are matched
+    case-insensitively.
+    """
+    reader = csv.DictReader(io.StringIO(content))
+    if not reader.fieldnames:
+        raise StatementParseError("CSV statement has no header row")
+
+    columns = {name.strip().lower(): name for name in reader.fieldnames if name}
+    date_column = next((columns[c] for c in CSV_DATE_COLUMNS if c in columns), None)
+    description_column = next((columns[c] for c in CSV_DESCRIPTION_COLUMNS if c in columns), None)
+    amount_column = columns.get("amount")
+    debit_column, credit_column = columns.get("debit"), columns.get("credit")
+    if not date_column or not (amount_column or debit_column or credit_column):
+        raise StatementParseError("CSV statement needs a date column and amount or debit/credit columns")
+
+    lines = []
+    for row_num, row in enumerate(reader, 2):
+        if not any((value or "").strip() for value in row.values()):
+            continue
+        try:
+            if amount_column:
+                amount = _parse_amount(row[amount_column] or "0")
+            else:
+                amount = (_parse_amount(row.get(credit_column) or "0") if credit_column else Decimal("0")) \
+                    - (abs(_parse_amount(row.get(debit_column) or "0")) if debit_column else Decimal("0"))
+            lines.append(StatementLine(
+                date=_parse_date(row[date_column] or ""),
+                amount=amount,
+                description=(row.get(description_column) or "").strip() if description_column else "",
+            ))
+        except StatementParseError as e:
+            raise StatementParseError(f"Row {row_num}: {e}")
+    return lines
+
+
+def parse_statement_ofx(content: str) -> List[StatementLine]:
+    """Parse the transaction list of an OFX statement (SGML or XML flavour)."""
+    lines = []
+    for block in _OFX_TRANSACTION.findall(content):
+        fields = {name.upper(): value.strip() for name, value in _OFX_FIELD.findall(block)}
+        if "DTPOSTED" not in fields or "TRNAMT" not in fields:
+            raise StatementParseError("OFX transaction is missing DTPOSTED or TRNAMT")
+        try:
+            posted = datetime.strptime(fields["DTPOSTED"][:8], "%Y%m%d").date()
+        except ValueError:
+            raise StatementParseError(f"Invalid OFX date: {fields['DTPOSTED']!r}")
+        lines.append(StatementLine(
+            date=posted,
+            amount=_parse_amount(fields["TRNAMT"]),
+            description=fields.get("NAME") or fields.get("MEMO", ""),
+            reference=fields.get("FITID"),
+        ))
+    if not lines and "<OFX>" not in content.upper():
+        raise StatementParseError("Not an OFX statement")
+    return lines
+
+
+def parse_statement(content: str, filename: Optional[str] = None) -> List[StatementLine]:
+    """Parse a statement file, picking the format from its name or content."""
+    name = (filename or "").lower()
+    if name.endswith((".ofx", ".qfx")) or "<OFX>" in content[:4096].upper():
+        return parse_statement_ofx(content)
+    return parse_statement_csv(content)
+
+
+def _normalize(text: Optional[str]) -> str:
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def _cents(amount: Decimal) -> int:
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+class ReconciliationMatcher:
+    """Matches statement lines against an account's unreconciled transactions."""
+
+    def __init__(
+        self,
+        db: Session,
+        date_window_days: int = DATE_WINDOW_DAYS,
+        min_confidence: float = MIN_CONFIDENCE,
+        invert_amounts: bool = True
+    ):
+        """
+        Args:
+            db: Database session
+            date_window_days: How far apart statement and transaction dates may be
+            min_confidence: Lowest score accepted as a match
+            invert_amounts: Statement amounts are deposit-positive while synced
+                transactions are outflow-positive, so flip signs before matching
+        """
+        self.db = db
+        self.date_window = date_window_days
+        self.min_confidence = min_confidence
+        self.sign = -1 if invert_amounts else 1
+
+    def _load_candidates(
+        self,
+        account_id: UUID,
+        lines: Sequence[StatementLine],
+        reconciliation_id: Optional[UUID] = None
+    ) -> List[tuple]:
+        """Unreconciled transactions around the statement dates not matched by another reconciliation."""
+        window = timedelta(days=self.date_window)
+        start = min(line.date for line in lines) - window
+        end = max(line.date for line in lines) + window
+
+        matched_query = select(ReconciliationItem.transaction_id).join(
+            ReconciliationRecord, ReconciliationRecord.id == ReconciliationItem.reconciliation_id
+        ).where(
+            ReconciliationRecord.account_id == account_id,
+            ReconciliationItem.is_matched.is_(True),
+            ReconciliationItem.statement_date.between(start - window, end + window)
+        )
+        if reconciliation_id is not None:
+            matched_query = matched_query.where(ReconciliationItem.reconciliation_id != reconciliation_id)
+        already_matched = set(self.db.execute(matched_query).scalars())
+
+        rows = self.db.execute(
+            select(
+                Transaction.id,
+                Transaction.date,
+                Transaction.amount,
+                Transaction.name,
+                Transaction.merchant_name
+            ).where(
+                Transaction.account_id == account_id,
+                Transaction.date.between(start, end),
+                Transaction.is_reconciled.is_(False)
+            ).order_by(Transaction.date)
+        ).all()
+        return [row for row in rows if row.id not in already_matched]
+
+    def _score(self, line: StatementLine, description: str, candidate) -> float:
+        days = abs((candidate.date - line.date).days)
+        date_score = 1 - days / (self.date_window + 1)
+        description_score = 0.0
+        if description:
+            description_score = max(
+                SequenceMatcher(None, description, _normalize(text)).ratio()
+                for text in (candidate.name, candidate.merchant_name)
+            )
+        return AMOUNT_WEIGHT + DATE_WEIGHT * date_score + DESCRIPTION_WEIGHT * description_score
+
+    def match(
+        self,
+        account_id: UUID,
+        lines: Sequence[StatementLine],
+        reconciliation_id: Optional[UUID] = None
+    ) -> List[StatementMatch]:
+        """
+        Match statement lines to transactions; returns one result per line, in order.
+
+        Transactions already matched by other reconciliations are skipped;
+        ``reconciliation_id`` names the one being (re)matched.
+        """
+        results = [StatementMatch(line=line) for line in lines]
+        if not lines:
+            return results
+
+        candidates = self._load_candidates(account_id, lines, reconciliation_id)
+        # Index: amount in cents -> candidates sorted by date, with a parallel date list for bisect
+        by_amount: Dict[int, List[tuple]] = defaultdict(list)
+        for candidate in candidates:
+            by_amount[_cents(candidate.amount)].append(candidate)
+        dates_by_amount = {cents: [c.date for c in group] for cents, group in by_amount.items()}
+
+        window = timedelta(days=self.date_window)
+        pairs = []
+        for index, line in enumerate(lines):
+            cents = self.sign * _cents(line.amount)
+            group = by_amount.get(cents)
+            if not group:
+                continue
+            dates = dates_by_amount[cents]
+            lo = bisect_left(dates, line.date - window)
+            hi = bisect_right(dates, line.date + window)
+            description = _normalize(line.description)
+            for candidate in group[lo:hi]:
+                score = self._score(line, description, candidate)
+                if score >= self.min_confidence:
+                    pairs.append((score, index, candidate))
+
+        used = set()
+        for score, index, candidate in sorted(pairs, key=lambda pair: -pair[0]):
+            if results[index].is_matched or candidate.id in used:
+                continue
+            used.add(candidate.id)
+            results[index].transactions = [(candidate.id, Decimal(candidate.amount))]
+            results[index].confidence = round(score, 4)
+
+        self._match_groups(results, [c for c in candidates if c.id not in used], used)
+        return results
+
+    def _match_groups(self, results: List[StatementMatch], remaining: List[tuple], used: set) -> None:
+        """Match leftover lines to up to MAX_GROUP_SIZE transactions that sum to the line."""
+        if not remaining:
+            return
+        dates = [c.date for c in remaining]
+        window = timedelta(days=self.date_window)
+
+        for result in results:
+            if result.is_matched:
+                continue
+            line = result.line
+            target = self.sign * _cents(line.amount)
+            lo = bisect_left(dates, line.date - window)
+            hi = bisect_right(dates, line.date + window)
+            nearby = [
+                c for c in remaining[lo:hi]
+                if c.id not in used and _cents(c.amount) and (_cents(c.amount) > 0) == (target > 0)
+            ]
+            nearby.sort(key=lambda c: abs((c.date - line.date).days))
+            nearby = nearby[:MAX_GROUP_CANDIDATES]
+
+            best = None
+            for size in range(2, MAX_GROUP_SIZE + 1):
+                for combo in combinations(nearby, size):
+                    if sum(_cents(c.amount) for c in combo) != target:
+                        continue
+                    distance = sum(abs((c.date - line.date).days) for c in combo)
+                    if best is None or distance < best[0]:
+                        best = (distance, combo)
+                if best:
+                    break
+            if not best:
+                continue
+
+            distance, combo = best
+            date_score = 1 - distance / (len(combo) * (self.date_window + 1))
+            confidence = GROUP_MATCH_PENALTY * (AMOUNT_WEIGHT + DATE_WEIGHT * date_score)
+            if confidence < self.min_confidence:
+                continue
+            used.update(c.id for c in combo)
+            result.transactions = [(c.id, Decimal(c.amount)) for c in combo]
+            result.confidence = round(confidence, 4)
+
+    def reconcile(self, reconciliation: ReconciliationRecord, lines: Sequence[StatementLine]) -> Dict[str, int]:
+        """
+        Match a statement against a reconciliation's account and store the items.
+
+        Replaces any items from an earlier upload. Items are written with one
+        bulk insert: one row per matched transaction (carrying its share of
+        the statement amount) and one unmatched row per leftover line.
+        Does not commit.
+        """
+        results = self.match(reconciliation.account_id, lines, reconciliation.id)
+
+        rows = []
+        for result in results:
+            line = result.line
+            base = {
+                "reconciliation_id": reconciliation.id,
+                "statement_date": line.date,
+                "statement_description": (line.description or "")[:255] or None,
+            }
+            if not result.is_matched:
+                rows.append({**base, "transaction_id": None, "statement_amount": line.amount,
+                             "is_matched": False, "match_confidence": None})
+                continue
+            for transaction_id, amount in result.transactions:
+                share = line.amount if len(result.transactions) == 1 else self.sign * amount
+                rows.append({**base, "transaction_id": transaction_id, "statement_amount": share,
+                             "is_matched": True, "match_confidence": Decimal(str(result.confidence))})
+
+        self.db.execute(
+            delete(ReconciliationItem).where(ReconciliationItem.reconciliation_id == reconciliation.id),
+            execution_options={"synchronize_session": False}
+        )
+        if rows:
+            # render_nulls keeps matched and unmatched rows in a single executemany batch
+            self.db.execute(insert(ReconciliationItem).execution_options(render_nulls=True), rows)
+
+        matched = sum(1 for result in results if result.is_matched)
+        logger.info(
+            f"Reconciliation {reconciliation.id}: matched {matched} of {len(results)} statement lines"
+        )
+        return {
+            "matched_count": matched,
+            "unmatched_count": len(results) - matched,
+            "items_created": len(rows),
+        }
@@ -3,11 +3,12 @@
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_
 import json
 import logging
 
 from ..database.models import Transaction, Account, Category, User
+from .balance_snapshots import BalanceSnapshotService
 from ..schemas.reports import (
     ReportType, ReportPeriod, ProfitLossReport, BalanceSheetReport,
     CashFlowReport, TaxSummaryReport, OwnerPackageReport
@@ -32,9 +33,9 @@ class ReportGeneratorService:
         """Generate P&L statement."""
 
         # Get all transactions in the period
-        transactions = self.db.query(Transaction).join(Account).filter(
+        transactions = self.db.query(Transaction).filter(
             and_(
-                Account.user_id == user_id,
+                Transaction.user_id == user_id,
                 Transaction.date >= start_date,
                 Transaction.date <= end_date,
                 Transaction.is_business == is_business if is_business else True
@@ -351,19 +352,12 @@ class ReportGeneratorService:
         accounts: List[Account]
     ) -> float:
         """Get total balance of accounts at a specific date."""
-        total = 0
-        for account in accounts:
-            # Get balance at date by summing transactions before date
-            transactions_sum = self.db.query(
-                func.sum(Transaction.amount)
-            ).filter(
-                and_(
-                    Transaction.account_id == account.id,
-                    Transaction.date < date
-                )
-            ).scalar() or 0
-            total += float(transactions_sum)
-        return total
+        # Balance before the date is the balance at the end of the previous day
+        day_before = (date.date() if isinstance(date, datetime) else date) - timedelta(days=1)
+        balances = BalanceSnapshotService(self.db).balances_as_of(
+            [account.id for account in accounts], day_before
+        )
+        return float(sum(balances.values()))
 
     def _calculate_kpis(
         self,
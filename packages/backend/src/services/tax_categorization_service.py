@@ -1,21 +1,93 @@
 """Tax categorization service for business expense classification."""
 
+import json
 import logging
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Dict, Optional, Tuple, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
+from sqlalchemy import and_, or_, case, func, desc, select
 
 from models.transaction import Transaction
 from models.tax_categorization import (
     TaxCategory, ChartOfAccount, BusinessExpenseTracking,
-    CategoryMapping, CategorizationAudit
+    CategoryMapping, CategorizationAudit, schedule_c_line_number
 )
 from models.category import Category
+from ..config import settings
+from ..database.routing import mark_recent_write
+from ..utils.redis import get_redis_client_sync
+from .chart_of_accounts_service import invalidate_account_hierarchy
+from .tax_keyword_index import TaxKeywordIndex, get_keyword_index
 
 logger = logging.getLogger(__name__)
 
+KEYWORD_MATCH_THRESHOLD = 0.3
+TAX_SUMMARY_CACHE_PREFIX = "tax_summary"
+
+
+def _tax_summary_version_key(user_id: str) -> str:
+    return f"{TAX_SUMMARY_CACHE_PREFIX}_version:{user_id}"
+
+
+def invalidate_tax_summary(user_id: str) -> None:
+    """
+    Invalidate a user's cached tax summaries.
+
+    Bumps the user's cache version so the summaries of every tax year are
+    dropped at once; stale entries expire on their own TTL.
+    """
+    redis_client = get_redis_client_sync()
+    if not redis_client:
+        return
+    try:
+        redis_client.incr(_tax_summary_version_key(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate tax summary cache for user {user_id}: {e}")
+
+
+@dataclass
+class TaxLookupTables:
+    """Everything a batch of tax categorizations reads, loaded once."""
+    tax_categories: Dict[str, TaxCategory] = field(default_factory=dict)
+    chart_accounts: Dict[str, ChartOfAccount] = field(default_factory=dict)
+    chart_accounts_by_tax_category: Dict[str, ChartOfAccount] = field(default_factory=dict)
+    mappings: Dict[str, CategoryMapping] = field(default_factory=dict)
+    keyword_index: Optional[TaxKeywordIndex] = None
+
+    def detect(self, transaction: Transaction) -> Dict[str, Optional[str]]:
+        """Same result as TaxCategorizationService.auto_detect_tax_category, from memory."""
+        mapping = self.mappings.get(str(transaction.category_id)) if transaction.category_id else None
+        if mapping:
+            return {
+                "tax_category_id": str(mapping.tax_category_id),
+                "chart_account_id": str(mapping.chart_account_id),
+                "confidence": float(mapping.confidence_score),
+                "source": "category_mapping"
+            }
+
+        search_text = f"{transaction.name} {transaction.merchant_name or ''} {transaction.description or ''}".lower()
+        best_match, best_score = (
+            self.keyword_index.best_match(search_text) if self.keyword_index else (None, 0.0)
+        )
+
+        if best_match and best_score > KEYWORD_MATCH_THRESHOLD:
+            chart_account = self.chart_accounts_by_tax_category.get(best_match.category_name)
+            return {
+                "tax_category_id": best_match.id,
+                "chart_account_id": str(chart_account.id) if chart_account else None,
+                "confidence": best_score,
+                "source": "keyword_matching"
+            }
+
+        return {
+            "tax_category_id": None,
+            "chart_account_id": None,
+            "confidence": 0.0,
+            "source": "no_match"
+        }
+
 
 class TaxCategorizationService:
     """Service for tax categorization of business transactions."""
@@ -105,6 +177,10 @@ class TaxCategorizationService:
             )
 
             self.session.commit()
+            mark_recent_write(user_id)
+            invalidate_tax_summary(user_id)
+            if str(old_chart_account_id or "") != str(chart_account_id or ""):
+                invalidate_account_hierarchy(user_id)
 
             return {
                 "success": True,
@@ -149,28 +225,10 @@ class TaxCategorizationService:
         # Keyword-based detection
         search_text = f"{transaction.name} {transaction.merchant_name or ''} {transaction.description or ''}".lower()
 
-        # Query tax categories with keywords
-        tax_categories = self.session.query(TaxCategory).filter(
-            and_(
-                TaxCategory.is_active == True,
-                TaxCategory.effective_date <= date.today(),
-                or_(
-                    TaxCategory.expiration_date.is_(None),
-                    TaxCategory.expiration_date >= date.today()
-                )
-            )
-        ).all()
+        # Score every tax category in one pass over the text
+        best_match, best_score = self.keyword_index().best_match(search_text)
 
-        best_match = None
-        best_score = 0
-
-        for tax_category in tax_categories:
-            score = self._calculate_keyword_match_score(search_text, tax_category)
-            if score > best_score:
-                best_score = score
-                best_match = tax_category
-
-        if best_match and best_score > 0.3:  # Minimum confidence threshold
+        if best_match and best_score > KEYWORD_MATCH_THRESHOLD:
             # Find corresponding chart account
             chart_account = self.session.query(ChartOfAccount).filter(
                 and_(
@@ -181,7 +239,7 @@ class TaxCategorizationService:
             ).first()
 
             return {
-                "tax_category_id": str(best_match.id),
+                "tax_category_id": best_match.id,
                 "chart_account_id": str(chart_account.id) if chart_account else None,
                 "confidence": best_score,
                 "source": "keyword_matching"
@@ -195,54 +253,108 @@ class TaxCategorizationService:
         }
 
     def get_tax_summary(self, user_id: str, tax_year: int) -> Dict[str, Any]:
-        """Get tax summary for a specific year."""
+        """Get tax summary for a specific year, cached per user and year."""
 
-        # Get all deductible transactions for the year
-        transactions = self.session.query(Transaction).filter(
-            and_(
-                Transaction.tax_year == tax_year,
-                Transaction.is_tax_deductible == True,
-                Transaction.deductible_amount.isnot(None)
-            )
-        ).join(Transaction.account).filter(
-            Transaction.account.has(user_id=user_id)
-        ).all()
+        redis_client = get_redis_client_sync()
+        cache_key = None
+        if redis_client:
+            try:
+                version = redis_client.get(_tax_summary_version_key(user_id)) or 0
+                cache_key = f"{TAX_SUMMARY_CACHE_PREFIX}:{user_id}:{int(version)}:{tax_year}"
+                cached = redis_client.get(cache_key)
+                if cached:
+                    return json.loads(cached)
+            except Exception as e:
+                logger.warning(f"Tax summary cache read failed for user {user_id}: {e}")
+                cache_key = None
 
-        # Group by tax category
-        summary_by_category = {}
-        total_deductions = Decimal("0")
+        summary = self._build_tax_summary(user_id, tax_year)
 
-        for transaction in transactions:
-            if transaction.tax_category:
-                category_code = transaction.tax_category.category_code
-                category_name = transaction.tax_category.category_name
+        if cache_key:
+            try:
+                redis_client.setex(cache_key, settings.tax_summary_cache_ttl, json.dumps(summary))
+            except Exception as e:
+                logger.warning(f"Tax summary cache write failed for user {user_id}: {e}")
 
-                if category_code not in summary_by_category:
-                    summary_by_category[category_code] = {
-                        "category_name": category_name,
-                        "tax_form": transaction.tax_category.tax_form,
-                        "tax_line": transaction.tax_category.tax_line,
-                        "total_amount": Decimal("0"),
-                        "transaction_count": 0,
-                        "requires_substantiation": 0
-                    }
+        return summary
 
-                summary_by_category[category_code]["total_amount"] += transaction.deductible_amount
-                summary_by_category[category_code]["transaction_count"] += 1
-                total_deductions += transaction.deductible_amount
+    def _build_tax_summary(self, user_id: str, tax_year: int) -> Dict[str, Any]:
+        """Group the year's deductible transactions by tax category in one query."""
 
-                if transaction.requires_substantiation and not transaction.substantiation_complete:
-                    summary_by_category[category_code]["requires_substantiation"] += 1
+        # Plain table columns: the query needs no ORM entities, so it does not
+        # depend on mapper configuration
+        transactions = Transaction.__table__.c
+        tax_categories = TaxCategory.__table__.c
+
+        unsubstantiated = case(
+            (
+                and_(
+                    transactions.requires_substantiation == True,
+                    or_(
+                        transactions.substantiation_complete.is_(None),
+                        transactions.substantiation_complete == False
+                    )
+                ),
+                1
+            ),
+            else_=0
+        )
+        category_columns = (
+            tax_categories.category_code,
+            tax_categories.category_name,
+            tax_categories.tax_form,
+            tax_categories.tax_line,
+            tax_categories.schedule_c_line,
+        )
+        # Uncategorized deductible transactions form one group with no
+        # category; they count towards the transaction total only
+        rows = self.session.execute(
+            select(
+                *category_columns,
+                func.count(transactions.id).label("transaction_count"),
+                func.sum(transactions.deductible_amount).label("total_amount"),
+                func.sum(unsubstantiated).label("requires_substantiation")
+            )
+            .select_from(
+                Transaction.__table__.outerjoin(
+                    TaxCategory.__table__, tax_categories.id == transactions.tax_category_id
+                )
+            )
+            .where(
+                transactions.tax_year == tax_year,
+                transactions.is_tax_deductible == True,
+                transactions.deductible_amount.isnot(None),
+                transactions.user_id == user_id
+            )
+            .group_by(*category_columns)
+        ).all()
 
-        # Convert Decimal to float for JSON serialization
-        for category in summary_by_category.values():
-            category["total_amount"] = float(category["total_amount"])
+        summary_by_category = {}
+        total_deductions = Decimal("0")
+        transaction_count = 0
+
+        for row in rows:
+            transaction_count += row.transaction_count
+            if row.category_code is None:
+                continue
+            total_amount = Decimal(row.total_amount or 0)
+            total_deductions += total_amount
+            summary_by_category[row.category_code] = {
+                "category_name": row.category_name,
+                "tax_form": row.tax_form,
+                "tax_line": row.tax_line,
+                "schedule_c_line": row.schedule_c_line,
+                # Convert Decimal to float for JSON serialization
+                "total_amount": float(total_amount),
+                "transaction_count": row.transaction_count,
+                "requires_substantiation": int(row.requires_substantiation or 0)
+            }
 
         return {
             "tax_year": tax_year,
             "total_deductions": float(total_deductions),
             "categories": summary_by_category,
-            "transaction_count": len(transactions)
+            "transaction_count": transaction_count
         }
 
     def bulk_categorize_for_tax(
@@ -253,27 +365,136 @@ class TaxCategorizationService:
         chart_account_id: Optional[str] = None,
         business_percentage: Decimal = Decimal("100.00")
     ) -> Dict[str, Any]:
-        """Bulk categorize multiple transactions."""
+        """
+        Bulk categorize multiple transactions.
+
+        Lookup tables are loaded once for the whole batch, and transaction
+        updates, business tracking and audit rows are written in bulk with a
+        single commit. Transactions that fail validation are reported in
+        ``errors`` and left unchanged.
+        """
 
         results = []
         errors = []
-
-        for transaction_id in transaction_ids:
-            try:
-                result = self.categorize_for_tax(
-                    transaction_id=transaction_id,
-                    user_id=user_id,
-                    tax_category_id=tax_category_id,
-                    chart_account_id=chart_account_id,
-                    business_percentage=business_percentage,
-                    override_automated=True
-                )
-                results.append(result)
-            except Exception as e:
+        ids = list(dict.fromkeys(str(transaction_id) for transaction_id in transaction_ids))
+
+        transactions = {
+            str(transaction.id): transaction
+            for transaction in self.session.query(Transaction).filter(
+                Transaction.id.in_(ids),
+                Transaction.user_id == user_id
+            ).all()
+        }
+        needs_detection = not tax_category_id or not chart_account_id
+        tables = self._load_lookup_tables(
+            user_id,
+            category_ids={t.category_id for t in transactions.values() if t.category_id} if needs_detection else set(),
+            with_keyword_index=needs_detection
+        )
+        tracked = {
+            str(tracking.transaction_id): tracking
+            for tracking in self.session.query(BusinessExpenseTracking).filter(
+                BusinessExpenseTracking.transaction_id.in_(list(transactions))
+            ).all()
+        } if business_percentage > 0 and transactions else {}
+
+        transaction_updates = []
+        tracking_inserts = []
+        tracking_updates = []
+        audits = []
+        chart_changed = False
+        business_factor = business_percentage / Decimal("100")
+
+        for transaction_id in ids:
+            transaction = transactions.get(transaction_id)
+            if not transaction:
+                errors.append({"transaction_id": transaction_id, "error": f"Transaction {transaction_id} not found"})
+                continue
+
+            detected = tables.detect(transaction) if needs_detection else {}
+            new_tax_category_id = tax_category_id or detected.get("tax_category_id")
+            new_chart_account_id = chart_account_id or detected.get("chart_account_id")
+
+            tax_category = tables.tax_categories.get(str(new_tax_category_id)) if new_tax_category_id else None
+            if new_tax_category_id and not tax_category:
                 errors.append({
                     "transaction_id": transaction_id,
-                    "error": str(e)
+                    "error": f"Invalid or inactive tax category: {new_tax_category_id}"
                 })
+                continue
+            chart_account = tables.chart_accounts.get(str(new_chart_account_id)) if new_chart_account_id else None
+            if new_chart_account_id and not chart_account:
+                errors.append({"transaction_id": transaction_id, "error": f"Invalid chart account: {new_chart_account_id}"})
+                continue
+
+            update = {
+                # Bulk updates match on the full (id, date) primary key
+                "id": transaction.id,
+                "date": transaction.date,
+                "tax_category_id": new_tax_category_id,
+                "chart_account_id": new_chart_account_id,
+                "business_use_percentage": business_percentage,
+                "deductible_amount": transaction.deductible_amount,
+                "requires_substantiation": self._requires_substantiation(transaction, tax_category)
+            }
+            if tax_category and business_percentage > 0:
+                update["deductible_amount"] = tax_category.calculate_deductible_amount(
+                    transaction.amount_decimal * business_factor
+                )
+                if tax_category.tax_form == "Schedule C":
+                    update["schedule_c_line"] = tax_category.tax_line
+            transaction_updates.append(update)
+
+            if business_percentage > 0:
+                tracking = tracked.get(transaction_id)
+                if tracking:
+                    tracking_updates.append({"id": tracking.id, "business_percentage": business_percentage})
+                else:
+                    tracking_inserts.append({
+                        "transaction_id": transaction.id,
+                        "user_id": user_id,
+                        "business_percentage": business_percentage,
+                        "receipt_required": update["requires_substantiation"]
+                    })
+
+            audits.append({
+                "transaction_id": transaction.id,
+                "user_id": user_id,
+                "action_type": "tax_categorize",
+                "old_tax_category_id": transaction.tax_category_id,
+                "new_tax_category_id": new_tax_category_id,
+                "old_chart_account_id": transaction.chart_account_id,
+                "new_chart_account_id": new_chart_account_id,
+                "automated": False
+            })
+            chart_changed = chart_changed or str(transaction.chart_account_id or "") != str(new_chart_account_id or "")
+
+            results.append({
+                "success": True,
+                "transaction_id": transaction_id,
+                "tax_category": tax_category.category_name if tax_category else None,
+                "chart_account": chart_account.account_name if chart_account else None,
+                "deductible_amount": float(update["deductible_amount"]) if update["deductible_amount"] else 0,
+                "requires_substantiation": update["requires_substantiation"]
+            })
+
+        if transaction_updates:
+            try:
+                self.session.bulk_update_mappings(Transaction, transaction_updates)
+                if tracking_updates:
+                    self.session.bulk_update_mappings(BusinessExpenseTracking, tracking_updates)
+                if tracking_inserts:
+                    self.session.bulk_insert_mappings(BusinessExpenseTracking, tracking_inserts)
+                self.session.bulk_insert_mappings(CategorizationAudit, audits)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"Error bulk categorizing {len(transaction_updates)} transactions: {e}")
+                raise
+            mark_recent_write(user_id)
+            invalidate_tax_summary(user_id)
+            if chart_changed:
+                invalidate_account_hierarchy(user_id)
 
         return {
             "success_count": len(results),
@@ -282,6 +503,51 @@ class TaxCategorizationService:
             "errors": errors
         }
 
+    def _load_lookup_tables(
+        self,
+        user_id: str,
+        category_ids: set,
+        with_keyword_index: bool = True
+    ) -> TaxLookupTables:
+        """Load tax categories, chart accounts and category mappings for a batch."""
+        today = date.today()
+        tables = TaxLookupTables()
+
+        tax_categories = self.session.query(TaxCategory).filter(self._effective_tax_category_filter(today)).all()
+        tables.tax_categories = {str(tax_category.id): tax_category for tax_category in tax_categories}
+        if with_keyword_index:
+            tables.keyword_index = self.keyword_index(tax_categories)
+
+        chart_accounts = self.session.query(ChartOfAccount).filter(
+            and_(
+                ChartOfAccount.user_id == user_id,
+                ChartOfAccount.is_active == True
+            )
+        ).all()
+        tables.chart_accounts = {str(account.id): account for account in chart_accounts}
+        for account in chart_accounts:
+            if account.tax_category:
+                tables.chart_accounts_by_tax_category.setdefault(account.tax_category, account)
+
+        if category_ids:
+            mappings = self.session.query(CategoryMapping).filter(
+                and_(
+                    CategoryMapping.user_id == user_id,
+                    CategoryMapping.source_category_id.in_(list(category_ids)),
+                    CategoryMapping.is_active == True,
+                    CategoryMapping.effective_date <= today,
+                    or_(
+                        CategoryMapping.expiration_date.is_(None),
+                        CategoryMapping.expiration_date >= today
+                    )
+                )
+            ).order_by(desc(CategoryMapping.confidence_score)).all()
+            # Highest confidence first, so keep the first mapping per category
+            for mapping in mappings:
+                tables.mappings.setdefault(str(mapping.source_category_id), mapping)
+
+        return tables
+
     def get_schedule_c_export(self, user_id: str, tax_year: int) -> Dict[str, Any]:
         """Export Schedule C data for tax filing."""
 
@@ -290,18 +556,20 @@ class TaxCategorizationService:
         # Map to Schedule C line items
         schedule_c_lines = {}
 
-        for category_code, data in summary["categories"].items():
-            if data["tax_form"] == "Schedule C":
-                line_number = data["tax_line"].replace("Line ", "").replace("a", "").replace("b", "")
-
-                if line_number in schedule_c_lines:
-                    schedule_c_lines[line_number]["amount"] += data["total_amount"]
-                else:
-                    schedule_c_lines[line_number] = {
-                        "line_description": data["category_name"],
-                        "amount": data["total_amount"],
-                        "transaction_count": data["transaction_count"]
-                    }
+        for data in summary["categories"].values():
+            line_number = data.get("schedule_c_line") or schedule_c_line_number(data["tax_form"], data["tax_line"])
+            if not line_number:
+                continue
+
+            if line_number in schedule_c_lines:
+                schedule_c_lines[line_number]["amount"] += data["total_amount"]
+                schedule_c_lines[line_number]["transaction_count"] += data["transaction_count"]
+            else:
+                schedule_c_lines[line_number] = {
+                    "line_description": data["category_name"],
+                    "amount": data["total_amount"],
+                    "transaction_count": data["transaction_count"]
+                }
 
         return {
             "tax_year": tax_year,
@@ -309,29 +577,42 @@ class TaxCategorizationService:
             "total_expenses": sum(line["amount"] for line in schedule_c_lines.values())
         }
 
-    def _calculate_keyword_match_score(self, search_text: str, tax_category: TaxCategory) -> float:
-        """Calculate keyword match score for a tax category."""
-
-        if not tax_category.keywords:
-            return 0.0
-
-        keywords = tax_category.keywords
-        exclusions = tax_category.exclusions or []
-
-        # Check for exclusions first
-        for exclusion in exclusions:
-            if exclusion.lower() in search_text:
-                return 0.0
-
-        # Calculate keyword matches
-        matches = 0
-        total_keywords = len(keywords)
+    @staticmethod
+    def _effective_tax_category_filter(today: date):
+        return and_(
+            TaxCategory.is_active == True,
+            TaxCategory.effective_date <= today,
+            or_(
+                TaxCategory.expiration_date.is_(None),
+                TaxCategory.expiration_date >= today
+            )
+        )
 
-        for keyword in keywords:
-            if keyword.lower() in search_text:
-                matches += 1
+    def keyword_index(self, tax_categories: Optional[List[TaxCategory]] = None) -> TaxKeywordIndex:
+        """
+        Shared keyword index over the currently effective tax categories.
+
+        The index is rebuilt only when the category version (today's date, the
+        number of effective categories and their latest update) changes. Pass
+        already loaded effective categories to skip the version query.
+        """
+        today = date.today()
+        if tax_categories is not None:
+            updated = [tax_category.updated_at for tax_category in tax_categories if tax_category.updated_at]
+            version = (today, len(tax_categories), max(updated) if updated else None)
+            return get_keyword_index(version, lambda: tax_categories)
+
+        count, last_updated = self.session.query(
+            func.count(TaxCategory.id), func.max(TaxCategory.updated_at)
+        ).filter(self._effective_tax_category_filter(today)).one()
+        return get_keyword_index(
+            (today, count, last_updated),
+            lambda: self.session.query(TaxCategory).filter(self._effective_tax_category_filter(today)).all()
+        )
 
-        return matches / total_keywords if total_keywords > 0 else 0.0
+    def _calculate_keyword_match_score(self, search_text: str, tax_category: TaxCategory) -> float:
+        """Calculate keyword match score for a tax category."""
+        return TaxKeywordIndex([tax_category]).best_match(search_text)[1]
 
     def _requires_substantiation(self, transaction: Transaction, tax_category: Optional[TaxCategory]) -> bool:
         """Determine if transaction requires substantiation."""
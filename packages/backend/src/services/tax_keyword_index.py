@@ -0,0 +1,159 @@
+"""
+Keyword index for tax category auto-detection.
+
+Every keyword and exclusion of every effective tax category is compiled into
+one Aho-Corasick automaton, so a transaction's text is scanned once to get
+per-category keyword counts and exclusion hits, however many categories and
+keywords there are. The index holds plain values only and is cached per
+tax-category version, so it can be shared across sessions.
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+@dataclass(frozen=True)
+class IndexedTaxCategory:
+    """The tax category fields auto-detection needs."""
+    id: str
+    category_name: str
+    keyword_count: int
+
+
+class TaxKeywordIndex:
+    """Aho-Corasick automaton over tax category keywords and exclusions."""
+
+    def __init__(self, tax_categories: Iterable[Any]):
+        self.categories: List[IndexedTaxCategory] = []
+        # Pattern id -> [(category position, is_exclusion)], one entry per
+        # occurrence so repeated keywords weigh as they do in the list
+        self._owners: List[List[Tuple[int, bool]]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        patterns: Dict[str, int] = {}
+        for tax_category in tax_categories:
+            keywords = [keyword.lower() for keyword in tax_category.keywords or [] if keyword]
+            if not keywords:
+                continue
+            position = len(self.categories)
+            self.categories.append(IndexedTaxCategory(
+                id=str(tax_category.id),
+                category_name=tax_category.category_name,
+                keyword_count=len(tax_category.keywords)
+            ))
+            terms = [(keyword, False) for keyword in keywords]
+            terms += [(exclusion.lower(), True) for exclusion in tax_category.exclusions or [] if exclusion]
+            for term, is_exclusion in terms:
+                if term not in patterns:
+                    patterns[term] = len(self._owners)
+                    self._owners.append([])
+                    self._add_pattern(term, patterns[term])
+                self._owners[patterns[term]].append((position, is_exclusion))
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, pattern_id: int) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(pattern_id)
+
+    def _build_failure_links(self) -> None:
+        # Breadth-first, so every failure target is finished before it is used;
+        # children of the root keep the root as their failure link
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def scan(self, text: str) -> Tuple[Dict[int, int], Set[int]]:
+        """
+        Scan lowercased text once.
+
+        Returns:
+            Keyword match counts and the set of excluded categories, both keyed
+            by position in ``categories``
+        """
+        found: Set[int] = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+
+        counts: Dict[int, int] = {}
+        excluded: Set[int] = set()
+        for pattern_id in found:
+            for position, is_exclusion in self._owners[pattern_id]:
+                if is_exclusion:
+                    excluded.add(position)
+                else:
+                    counts[position] = counts.get(position, 0) + 1
+        return counts, excluded
+
+    def best_match(self, text: str) -> Tuple[Optional[IndexedTaxCategory], float]:
+        """
+        Highest scoring category for lowercased text, with its score.
+
+        A category scores the share of its keywords found in the text, or zero
+        if any of its exclusions is found. Ties go to the earliest category.
+        """
+        counts, excluded = self.scan(text)
+        best_position = None
+        best_score = 0.0
+        for position in sorted(counts):
+            if position in excluded:
+                continue
+            score = counts[position] / self.categories[position].keyword_count
+            if score > best_score:
+                best_position, best_score = position, score
+        if best_position is None:
+            return None, 0.0
+        return self.categories[best_position], best_score
+
+
+_index_lock = threading.Lock()
+_cached_index: Optional[Tuple[Hashable, TaxKeywordIndex]] = None
+
+
+def get_keyword_index(version: Hashable, load_categories) -> TaxKeywordIndex:
+    """
+    The shared keyword index for a tax-category version.
+
+    ``load_categories`` is called to rebuild the index only when ``version``
+    differs from the cached one.
+    """
+    global _cached_index
+    with _index_lock:
+        if _cached_index and _cached_index[0] == version:
+            return _cached_index[1]
+    index = TaxKeywordIndex(load_categories())
+    with _index_lock:
+        _cached_index = (version, index)
+    return index
+
+
+def clear_keyword_index() -> None:
+    """Drop the cached index, e.g. after tax categories are edited."""
+    global _cached_index
+    with _index_lock:
+        _cached_index = None
@@ -0,0 +1,202 @@
+"""
+Set-based bulk operations on transactions.
+
+Every operation is a constant number of statements scoped to the user's
+accounts, however many transaction ids are passed in.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import case, cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..database.models import MLPrediction, Transaction
+from ..database.bookkeeping_models import JournalEntryLine, ReconciliationItem
+from .balance_snapshots import apply_snapshot_deltas
+
+
+class TransactionOwnershipError(Exception):
+    """Raised when some of the targeted transactions do not belong to the user."""
+    pass
+
+
+def owned_by_user(user_id: UUID) -> ColumnElement:
+    """Predicate limiting transactions to those owned by the user."""
+    return Transaction.user_id == user_id
+
+
+def _check_rowcount(db: Session, rowcount: int, expected: int) -> None:
+    if rowcount != expected:
+        db.rollback()
+        raise TransactionOwnershipError("Some transactions not found or unauthorized")
+
+
+def bulk_update_transactions(
+    db: Session,
+    user_id: UUID,
+    transaction_ids: Iterable[UUID],
+    operation: str,
+    category: Optional[str] = None,
+    tag: Optional[str] = None
+) -> int:
+    """
+    Apply a bulk operation to the user's transactions.
+
+    The operation is all-or-nothing: if any id is missing or owned by another
+    user nothing is changed and TransactionOwnershipError is raised.
+
+    Returns:
+        Number of transactions changed
+    """
+    ids = list(set(transaction_ids))
+    target = (Transaction.id.in_(ids), owned_by_user(user_id))
+    now = datetime.utcnow()
+
+    if operation in ("categorize", "reconcile", "unreconcile"):
+        if operation == "categorize":
+            values = {"user_category_override": category}
+        else:
+            values = {"is_reconciled": operation == "reconcile"}
+        result = db.execute(
+            update(Transaction).where(*target).values(updated_at=now, **values),
+            execution_options={"synchronize_session": False}
+        )
+        _check_rowcount(db, result.rowcount, len(ids))
+        updated_count = result.rowcount
+
+    elif operation in ("add_tag", "remove_tag"):
+        if not tag:
+            raise ValueError(f"Tag is required for {operation} operation")
+        updated_count = _bulk_update_tags(db, ids, target, operation, tag, now)
+
+    elif operation == "delete":
+        # Detach bookkeeping links the same way the ORM would on delete and
+        # drop predictions explicitly: the ORM cascade does not run for a
+        # Core DELETE and the migrated foreign key has no ON DELETE CASCADE
+        owned_ids = select(Transaction.id).where(*target)
+        removed = db.execute(
+            select(Transaction.account_id, Transaction.date, func.sum(Transaction.amount))
+            .where(*target)
+            .group_by(Transaction.account_id, Transaction.date)
+        ).all()
+        for model in (JournalEntryLine, ReconciliationItem):
+            db.execute(
+                update(model)
+                .where(model.transaction_id.in_(owned_ids))
+                .values(transaction_id=None),
+                execution_options={"synchronize_session": False}
+            )
+        db.execute(
+            delete(MLPrediction).where(MLPrediction.transaction_id.in_(owned_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        result = db.execute(
+            delete(Transaction).where(*target),
+            execution_options={"synchronize_session": False}
+        )
+        _check_rowcount(db, result.rowcount, len(ids))
+        updated_count = result.rowcount
+        # Set-based deletes bypass the flush hook that maintains snapshots
+        apply_snapshot_deltas(db, {
+            (account_id, txn_date): -total for account_id, txn_date, total in removed
+        })
+
+    else:
+        raise ValueError(f"Unsupported bulk operation: {operation}")
+
+    db.commit()
+    return updated_count
+
+
+def _bulk_update_tags(
+    db: Session,
+    ids: List[UUID],
+    target: tuple,
+    operation: str,
+    tag: str,
+    now: datetime
+) -> int:
+    """Add or remove a tag, touching only rows whose tags actually change."""
+    if db.get_bind().dialect.name == "postgresql":
+        owned = db.execute(select(func.count()).where(*target)).scalar()
+        _check_rowcount(db, owned, len(ids))
+
+        tags = func.coalesce(cast(Transaction.tags, JSONB), cast("[]", JSONB))
+        has_tag = tags.op("?", is_comparison=True)(tag)
+        if operation == "add_tag":
+            new_tags = tags.op("||")(func.jsonb_build_array(tag))
+            condition = ~has_tag
+        else:
+            new_tags = tags.op("-")(tag)
+            condition = has_tag
+        result = db.execute(
+            update(Transaction)
+            .where(*target, condition)
+            .values(tags=cast(new_tags, Transaction.tags.type), updated_at=now),
+            execution_options={"synchronize_session": False}
+        )
+        return result.rowcount
+
+    # JSON array operators are PostgreSQL specific; elsewhere compute the new
+    # arrays in Python and write them back with one executemany, keyed on
+    # the full (id, date) primary key
+    rows = db.execute(
+        select(Transaction.id, Transaction.date, Transaction.tags).where(*target)
+    ).all()
+    _check_rowcount(db, len(rows), len(ids))
+
+    changes: List[Dict[str, Any]] = []
+    for row_id, row_date, current in rows:
+        current = list(current or [])
+        if operation == "add_tag" and tag not in current:
+            changes.append({"id": row_id, "date": row_date, "tags": current + [tag], "updated_at": now})
+        elif operation == "remove_tag" and tag in current:
+            changes.append({
+                "id": row_id,
+                "date": row_date,
+                "tags": [t for t in current if t != tag],
+                "updated_at": now
+            })
+    if changes:
+        db.execute(update(Transaction), changes)
+    return len(changes)
+
+
+def bulk_set_user_categories(
+    db: Session,
+    user_id: UUID,
+    categories: Dict[UUID, str]
+) -> List[Any]:
+    """
+    Set per-transaction category overrides in a single UPDATE.
+
+    Ids not owned by the user are skipped. Does not commit.
+
+    Returns:
+        Rows (id, name, merchant_name, amount, date) for the updated transactions
+    """
+    if not categories:
+        return []
+    result = db.execute(
+        update(Transaction)
+        .where(Transaction.id.in_(list(categories)), owned_by_user(user_id))
+        .values(
+            user_category_override=case(
+                *((Transaction.id == txn_id, name) for txn_id, name in categories.items())
+            ),
+            updated_at=datetime.utcnow()
+        )
+        .returning(
+            Transaction.id,
+            Transaction.name,
+            Transaction.merchant_name,
+            Transaction.amount,
+            Transaction.date
+        ),
+        execution_options={"synchronize_session": False}
+    )
+    return result.all()
@@ -0,0 +1,404 @@
+"""Streaming transaction export service for Excel downloads and background export jobs."""
+
+import logging
+import os
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import chain, islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database.models import Account, Category, Transaction
+from ..utils.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+EXPORT_HEADERS = [
+    "Date", "Description", "Merchant", "Amount", "Category",
+    "Account", "Status", "Reconciled", "Notes", "Tags"
+]
+
+# Rows fetched per round trip while streaming the export query
+STREAM_BATCH_SIZE = 1000
+
+# Column widths are estimated from the header plus this many leading rows
+WIDTH_SAMPLE_ROWS = 500
+MAX_COLUMN_WIDTH = 50
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+SECTION_FONT = Font(bold=True, size=12)
+NEGATIVE_FONT = Font(color="FF0000")
+AMOUNT_FORMAT = "#,##0.00"
+
+AMOUNT_COLUMN = EXPORT_HEADERS.index("Amount")
+
+
+def _category_label():
+    """SQL expression for the display category (user override, then category name)."""
+    return func.coalesce(func.nullif(Transaction.user_category_override, ""), Category.name)
+
+
+def format_export_row(row: Sequence[Any]) -> List[Any]:
+    """Convert a raw export query row into the exported cell values."""
+    (txn_date, name, merchant_name, amount, category, account_name,
+     pending, is_reconciled, notes, tags) = row
+    return [
+        txn_date,
+        name,
+        merchant_name or "",
+        amount,
+        category or "",
+        account_name,
+        "Pending" if pending else "Posted",
+        "Yes" if is_reconciled else "No",
+        notes or "",
+        ", ".join(tags) if tags else "",
+    ]
+
+
+def estimate_column_widths(rows: Iterable[Sequence[Any]], max_width: int = MAX_COLUMN_WIDTH) -> List[int]:
+    """Estimate column widths from a sample of rows (header included)."""
+    widths: List[int] = []
+    for row in rows:
+        for idx, value in enumerate(row):
+            length = len(str(value)) if value is not None else 0
+            if idx >= len(widths):
+                widths.append(length)
+            elif length > widths[idx]:
+                widths[idx] = length
+    return [min(width + 2, max_width) for width in widths]
+
+
+class TransactionExportService:
+    """Service for exporting transactions without loading them into memory."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _filters(
+        self,
+        user_id: Any,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        account_id: Optional[Any] = None
+    ) -> List[Any]:
+        """Build the filter list shared by the row and summary queries."""
+        filters = [Transaction.user_id == user_id]
+        if start_date:
+            filters.append(Transaction.date >= start_date)
+        if end_date:
+            filters.append(Transaction.date <= end_date)
+        if account_id:
+            filters.append(Transaction.account_id == account_id)
+        return filters
+
+    def iter_rows(
+        self,
+        user_id: Any,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        account_id: Optional[Any] = None
+    ) -> Iterator[List[Any]]:
+        """Stream formatted export rows, newest first, in batches of STREAM_BATCH_SIZE."""
+        query = self.db.query(
+            Transaction.date,
+            Transaction.name,
+            Transaction.merchant_name,
+            Transaction.amount,
+            _category_label(),
+            Account.name,
+            Transaction.pending,
+            Transaction.is_reconciled,
+            Transaction.notes,
+            Transaction.tags,
+        ).join(
+            Account, Transaction.account_id == Account.id
+        ).outerjoin(
+            Category, Transaction.category_id == Category.id
+        ).filter(
+            *self._filters(user_id, start_date, end_date, account_id)
+        ).order_by(
+            Transaction.date.desc(), Transaction.id.desc()
+        ).yield_per(STREAM_BATCH_SIZE)
+
+        for row in query:
+            yield format_export_row(row)
+
+    def get_summary(
+        self,
+        user_id: Any,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        account_id: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """Compute export summary totals and category breakdown in the database."""
+        filters = self._filters(user_id, start_date, end_date, account_id)
+
+        count, total_income, total_expenses = self.db.query(
+            func.count(Transaction.id),
+            func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0)),
+            func.sum(case((Transaction.amount < 0, Transaction.amount), else_=0)),
+        ).filter(*filters).one()
+
+        category = func.coalesce(_category_label(), "Uncategorized")
+        category_total = func.sum(Transaction.amount)
+        breakdown = self.db.query(
+            category.label("category"),
+            category_total.label("total"),
+        ).select_from(
+            Transaction
+        ).outerjoin(
+            Category, Transaction.category_id == Category.id
+        ).filter(*filters).group_by(
+            category
+        ).order_by(
+            func.abs(category_total).desc()
+        ).all()
+
+        total_income = float(total_income or 0)
+        total_expenses = float(total_expenses or 0)
+
+        return {
+            "total_transactions": count or 0,
+            "total_income": total_income,
+            "total_expenses": abs(total_expenses),
+            "net_amount": total_income + total_expenses,
+            "categories": [(name, float(total or 0)) for name, total in breakdown],
+        }
+
+    def write_excel(
+        self,
+        output: BinaryIO,
+        user_id: Any,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        account_id: Optional[Any] = None,
+        include_summary: bool = True
+    ) -> int:
+        """
+        Write the Excel export to a binary file object using write-only worksheets.
+
+        Returns the number of transaction rows written.
+        """
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title="Transactions")
+
+        rows = self.iter_rows(user_id, start_date, end_date, account_id)
+        sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+
+        # Write-only sheets need column dimensions before the first row is appended
+        for idx, width in enumerate(estimate_column_widths(chain([EXPORT_HEADERS], sample)), 1):
+            ws.column_dimensions[get_column_letter(idx)].width = width
+
+        ws.append([self._header_cell(ws, header) for header in EXPORT_HEADERS])
+
+        row_count = 0
+        for values in chain(sample, rows):
+            amount = values[AMOUNT_COLUMN]
+            amount_cell = WriteOnlyCell(ws, value=amount)
+            amount_cell.number_format = AMOUNT_FORMAT
+            if amount is not None and amount < 0:
+                amount_cell.font = NEGATIVE_FONT
+            values[AMOUNT_COLUMN] = amount_cell
+            ws.append(values)
+            row_count += 1
+
+        if include_summary:
+            summary = self.get_summary(user_id, start_date, end_date, account_id)
+            self._write_summary_sheet(wb, summary, start_date, end_date)
+
+        wb.save(output)
+        return row_count
+
+    @staticmethod
+    def _header_cell(ws, value: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        return cell
+
+    def _write_summary_sheet(
+        self,
+        wb: Workbook,
+        summary: Dict[str, Any],
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ) -> None:
+        """Append the Summary sheet built from pre-aggregated totals."""
+        summary_ws = wb.create_sheet(title="Summary")
+
+        summary_data = [
+            ["Transaction Summary", ""],
+            ["", ""],
+            ["Period", f"{start_date or 'All time'} to {end_date or 'Present'}"],
+            ["Total Transactions", summary["total_transactions"]],
+            ["", ""],
+            ["Financial Summary", ""],
+            ["Total Income", summary["total_income"]],
+            ["Total Expenses", summary["total_expenses"]],
+            ["Net Amount", summary["net_amount"]],
+            ["", ""],
+            ["Category Breakdown", "Amount"],
+        ]
+        summary_data.extend([name, total] for name, total in summary["categories"])
+
+        for idx, width in enumerate(estimate_column_widths(summary_data), 1):
+            summary_ws.column_dimensions[get_column_letter(idx)].width = width
+
+        section_rows = {1, 6, 11}
+        for row_idx, row_data in enumerate(summary_data, 1):
+            cells = []
+            for col_idx, value in enumerate(row_data, 1):
+                cell = WriteOnlyCell(summary_ws, value=value)
+                if row_idx in section_rows:
+                    cell.font = SECTION_FONT
+                if col_idx == 2 and isinstance(value, (int, float, Decimal)) and row_idx != 4:
+                    cell.number_format = AMOUNT_FORMAT
+                    if value < 0:
+                        cell.font = NEGATIVE_FONT
+                cells.append(cell)
+            summary_ws.append(cells)
+
+
+# Background export jobs
+
+export_jobs = JobStore("export_job:", lambda: settings.export_job_ttl, "export")
+
+
+def _job_file_path(job_id: str) -> str:
+    return os.path.join(settings.export_directory, f"{job_id}.xlsx")
+
+
+def remove_expired_export_files() -> int:
+    """
+    Delete workbooks (and abandoned partial files) older than the job TTL.
+
+    A job's record expires ``export_job_ttl`` after its last save, which for
+    a finished job is when its file was written, so older files can no
+    longer be downloaded.
+
+    Returns:
+        Number of files removed
+    """
+    try:
+        names = os.listdir(settings.export_directory)
+    except FileNotFoundError:
+        return 0
+
+    cutoff = time.time() - settings.export_job_ttl
+    removed = 0
+    for name in names:
+        if not name.endswith((".xlsx", ".xlsx.part")):
+            continue
+        path = os.path.join(settings.export_directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            # Another worker swept it first
+            continue
+        except OSError as e:
+            logger.warning(f"Failed to remove expired export file {path}: {e}")
+    if removed:
+        logger.info(f"Removed {removed} expired export files")
+    return removed
+
+
+def get_export_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Look up an export job by id."""
+    return export_jobs.get(job_id)
+
+
+def create_export_job(user_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Register a pending export job for a user."""
+    remove_expired_export_files()
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "user_id": str(user_id),
+        "status": "pending",
+        "format": "excel",
+        "params": params,
+        "row_count": None,
+        "error": None,
+        "created_at": datetime.utcnow().isoformat(),
+        "completed_at": None,
+    }
+    export_jobs.save(job)
+    return job
+
+
+def get_export_job_file(job: Dict[str, Any]) -> Optional[str]:
+    """Return the output path of a completed job, if the file still exists."""
+    if job.get("status") != "completed":
+        return None
+    path = _job_file_path(job["job_id"])
+    return path if os.path.exists(path) else None
+
+
+def run_excel_export_job(
+    job_id: str,
+    bind: Any,
+    user_id: Any,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    account_id: Optional[Any] = None,
+    include_summary: bool = True
+) -> None:
+    """
+    Background task that writes an Excel export to the export directory.
+
+    Runs with its own session on ``bind`` so it outlives the request session.
+    """
+    job = get_export_job(job_id)
+    if not job:
+        logger.error(f"Export job {job_id} not found")
+        return
+
+    job["status"] = "running"
+    export_jobs.save(job)
+
+    db = Session(bind=bind)
+    path = _job_file_path(job_id)
+    tmp_path = f"{path}.part"
+    try:
+        os.makedirs(settings.export_directory, exist_ok=True)
+        service = TransactionExportService(db)
+        with open(tmp_path, "wb") as output:
+            row_count = service.write_excel(
+                output, user_id, start_date, end_date, account_id, include_summary
+            )
+        os.replace(tmp_path, path)
+
+        job.update(
+            status="completed",
+            row_count=row_count,
+            completed_at=datetime.utcnow().isoformat()
+        )
+        logger.info(f"Export job {job_id} completed with {row_count} transactions")
+    except Exception as e:
+        logger.error(f"Export job {job_id} failed: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        job.update(
+            status="failed",
+            error=str(e),
+            completed_at=datetime.utcnow().isoformat()
+        )
+    finally:
+        db.close()
+        export_jobs.save(job)
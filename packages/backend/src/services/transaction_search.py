@@ -0,0 +1,75 @@
+"""
+Transaction search backed by PostgreSQL full-text and trigram indexes.
+
+Migration 010 adds a generated ``transactions.search_vector`` tsvector column
+(GIN indexed) and a ``gin_trgm_ops`` index over SEARCH_DOCUMENT. Other
+dialects (SQLite in tests) fall back to plain ILIKE matching.
+"""
+
+from typing import Union
+
+from sqlalchemy import Float, Text, func, literal, literal_column, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..database.models import Transaction
+
+# Text search configuration used by the generated column and by queries
+SEARCH_CONFIG = "simple"
+
+SEARCH_VECTOR = literal_column("transactions.search_vector", type_=TSVECTOR)
+
+# Must match the trigram index expression in migration 010 exactly
+SEARCH_DOCUMENT = literal_column(
+    "(coalesce(transactions.name, '') || ' ' || "
+    "coalesce(transactions.merchant_name, '') || ' ' || "
+    "coalesce(transactions.original_description, ''))",
+    type_=Text
+)
+
+
+def supports_indexed_search(db: Union[Session, AsyncSession]) -> bool:
+    """Whether the session's database has the search column and indexes."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_filter(term: str, indexed: bool = True) -> ColumnElement:
+    """
+    Build the WHERE clause matching a search term.
+
+    On PostgreSQL a row matches on full-text (word/prefix aware), substring
+    (trigram-indexed ILIKE) or fuzzy word similarity for typos.
+    """
+    pattern = _like_pattern(term)
+    if not indexed:
+        return or_(
+            Transaction.name.ilike(pattern, escape="\\"),
+            Transaction.merchant_name.ilike(pattern, escape="\\"),
+            Transaction.original_description.ilike(pattern, escape="\\")
+        )
+
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, term)
+    return or_(
+        SEARCH_VECTOR.op("@@")(ts_query),
+        SEARCH_DOCUMENT.ilike(pattern, escape="\\"),
+        literal(term, type_=Text).op("<%")(SEARCH_DOCUMENT)
+    )
+
+
+def search_rank(term: str, indexed: bool = True) -> ColumnElement:
+    """Relevance score for a search term (higher is better)."""
+    if not indexed:
+        return literal(0.0, type_=Float)
+
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, term)
+    return (
+        func.ts_rank_cd(SEARCH_VECTOR, ts_query)
+        + func.word_similarity(term, SEARCH_DOCUMENT)
+    ).cast(Float)
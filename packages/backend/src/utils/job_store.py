@@ -0,0 +1,75 @@
+"""
+State of background jobs (exports, period closes).
+
+A job is a JSON document stored in Redis under ``<key_prefix><job_id>`` and
+expiring after the store's TTL, so every worker sees it. While Redis is not
+available jobs are kept in process memory with the same expiry.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .redis import get_redis_client_sync
+
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """Saves and looks up job documents under one key prefix."""
+
+    def __init__(self, key_prefix: str, ttl: Callable[[], int], name: str):
+        """
+        Args:
+            key_prefix: Redis key prefix, e.g. ``"export_job:"``
+            ttl: Returns the job lifetime in seconds (read on every save, so
+                it follows the current settings)
+            name: Job kind used in log messages
+        """
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.name = name
+        self._local: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Dict[str, Any]) -> None:
+        """Persist job state to Redis, falling back to process memory."""
+        ttl = self.ttl()
+        client = get_redis_client_sync()
+        if client:
+            try:
+                client.setex(f"{self.key_prefix}{job['job_id']}", ttl, json.dumps(job, default=str))
+                return
+            except Exception as e:
+                logger.warning(f"Failed to store {self.name} job {job['job_id']} in Redis: {e}")
+
+        with self._lock:
+            self._local[job["job_id"]] = (time.monotonic() + ttl, job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a job by id; None once it has expired."""
+        client = get_redis_client_sync()
+        if client:
+            try:
+                value = client.get(f"{self.key_prefix}{job_id}")
+                if value:
+                    return json.loads(value)
+            except Exception as e:
+                logger.warning(f"Failed to read {self.name} job {job_id} from Redis: {e}")
+
+        with self._lock:
+            entry = self._local.get(job_id)
+            if not entry:
+                return None
+            expires_at, job = entry
+            if expires_at <= time.monotonic():
+                del self._local[job_id]
+                return None
+            return dict(job)
+
+    def clear_local(self) -> None:
+        """Drop the in-memory jobs."""
+        with self._lock:
+            self._local.clear()
@@ -0,0 +1,112 @@
+"""
+Keyset (cursor) pagination helpers.
+Cursors are opaque, URL-safe tokens encoding the last row's sort key and id.
+"""
+
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Tuple
+from uuid import UUID
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not match the query."""
+    pass
+
+
+def _serialize_key(value: Any) -> Dict[str, str]:
+    if isinstance(value, datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, (Decimal, int, float)):
+        return {"t": "decimal", "v": str(value)}
+    return {"t": "str", "v": str(value)}
+
+
+def _deserialize_key(data: Dict[str, str]) -> Any:
+    kind, value = data["t"], data["v"]
+    if kind == "datetime":
+        return datetime.fromisoformat(value)
+    if kind == "date":
+        return date.fromisoformat(value)
+    if kind == "decimal":
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort_by: str, sort_order: str, sort_value: Any, row_id: Any) -> str:
+    """
+    Encode the position after a row as an opaque cursor.
+
+    Args:
+        sort_by: Name of the sort field the cursor was produced for
+        sort_order: "asc" or "desc"
+        sort_value: Sort key of the last row on the page
+        row_id: Primary key of the last row (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = {
+        "s": sort_by,
+        "o": sort_order,
+        "k": _serialize_key(sort_value),
+        "id": str(row_id),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, UUID]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for a different sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_value = _deserialize_key(payload["k"])
+        row_id = UUID(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+    if payload.get("s") != sort_by or payload.get("o") != sort_order:
+        raise InvalidCursorError("Cursor does not match the requested sort order")
+
+    return sort_value, row_id
+
+
+def keyset_predicate(
+    sort_column: ColumnElement,
+    id_column: ColumnElement,
+    sort_value: Any,
+    row_id: Any,
+    descending: bool
+) -> ColumnElement:
+    """
+    Build the row-value comparison that seeks past the cursor position.
+
+    ``(sort_column, id) < (value, id)`` lets the database seek directly into a
+    ``(sort_column, id)`` index instead of scanning and discarding an OFFSET.
+    """
+    row = tuple_(sort_column, id_column)
+    position = tuple_(
+        literal(sort_value, type_=sort_column.type),
+        literal(row_id, type_=id_column.type)
+    )
+    return row < position if descending else row > position
+
+
+def filter_signature(filters: Dict[str, Any]) -> str:
+    """Stable hash of a filter set, used to key cached totals."""
+    raw = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
@@ -1,77 +1,363 @@
 """
 Redis connection and utility functions.
 Supports both async and sync Redis clients for different use cases.
+
+Every Redis client in a worker process comes from ``redis_registry``: one
+async and one sync client on explicitly sized blocking connection pools,
+created at startup from ``lifespan``. Both share a circuit breaker, so after
+REDIS_CIRCUIT_FAILURES consecutive connection errors ``get_redis_client``
+and ``get_redis_client_sync`` return None for REDIS_CIRCUIT_RESET_SECONDS
+instead of every caller waiting out a socket timeout.
 """
 
 import redis.asyncio as redis_async
 import redis as redis_sync
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import logging
 import json
+import threading
+import time
 
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
-# Global Redis client instances
-_redis_client_async: Optional[redis_async.Redis] = None
-_redis_client_sync: Optional[redis_sync.Redis] = None
+# Errors that count against the circuit breaker; command errors do not
+_CONNECTION_ERRORS = (redis_sync.ConnectionError, redis_sync.TimeoutError)
 
 
-async def get_redis_client() -> Optional[redis_async.Redis]:
+class CircuitBreaker:
     """
-    Get or create async Redis client instance.
+    Tracks consecutive Redis connection failures.
 
-    Returns:
-        Async Redis client instance or None if connection fails
+    Opens after ``failure_threshold`` of them; while open, clients are not
+    handed out. Once ``reset_seconds`` have passed a single caller is let
+    through as a probe while everyone else is still refused: its success
+    closes the breaker and its failure reopens it. A probe that records
+    neither within ``reset_seconds`` makes way for another.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self._lock = threading.Lock()
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing_since: Optional[float] = None
+        self.commands = 0
+        self.failures = 0
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether Redis should be tried now."""
+        if self.opened_at is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self.opened_at is None:
+                return True
+            if now - self.opened_at >= self.reset_seconds and (
+                self.probing_since is None or now - self.probing_since >= self.reset_seconds
+            ):
+                self.probing_since = now
+                return True
+            self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.commands += 1
+            self.consecutive_failures = 0
+            if self.opened_at is not None:
+                logger.info("Redis circuit breaker closed")
+            self.opened_at = None
+            self.probing_since = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.commands += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.probing_since = None
+            if self.consecutive_failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Redis circuit breaker opened for {self.reset_seconds}s after "
+                        f"{self.consecutive_failures} connection failures"
+                    )
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "commands": self.commands,
+                "failures": self.failures,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+            }
+
+
+class _AsyncRedis(redis_async.Redis):
+    """Async client that reports connection errors to a circuit breaker."""
+
+    breaker: CircuitBreaker
+
+    async def execute_command(self, *args, **options):
+        try:
+            result = await super().execute_command(*args, **options)
+        except _CONNECTION_ERRORS:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+
+class _SyncRedis(redis_sync.Redis):
+    """Sync client that reports connection errors to a circuit breaker."""
+
+    breaker: CircuitBreaker
+
+    def execute_command(self, *args, **options):
+        try:
+            result = super().execute_command(*args, **options)
+        except _CONNECTION_ERRORS:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+
+def _pool_occupancy(pool) -> Dict[str, Any]:
+    """Connection counts of an async or sync blocking pool."""
+    data: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "max_connections": pool.max_connections,
+    }
+    if hasattr(pool, "_in_use_connections"):
+        # redis.asyncio pools
+        data["in_use"] = len(pool._in_use_connections)
+        data["idle"] = len(pool._available_connections)
+    elif hasattr(pool, "_connections"):
+        # redis.BlockingConnectionPool pre-fills its queue with None placeholders
+        idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+        data["in_use"] = len(pool._connections) - idle
+        data["idle"] = idle
+    return data
+
+
+class RedisRegistry:
+    """
+    Creates the worker's Redis clients on first use and hands out the same
+    ones afterwards.
+
+    ``async_client``/``sync_client`` always return the client (e.g. for
+    long-lived holders such as locks). ``get_async_client``/
+    ``get_sync_client`` return None while the circuit breaker is open, and
+    until Redis answers again after a failure they PING it first, returning
+    None if that fails, so callers can keep treating None as "no Redis".
     """
-    global _redis_client_async
 
-    if _redis_client_async is None:
+    def __init__(self, url: Optional[str] = None):
+        self._url = url
+        self._lock = threading.Lock()
+        self._async_client: Optional[_AsyncRedis] = None
+        self._sync_client: Optional[_SyncRedis] = None
+        self.breaker = CircuitBreaker(
+            settings.redis_circuit_failures,
+            settings.redis_circuit_reset_seconds
+        )
+
+    def _pool_kwargs(self) -> Dict[str, Any]:
+        return {
+            "max_connections": settings.redis_max_connections,
+            "timeout": settings.redis_pool_timeout,
+            "socket_connect_timeout": settings.redis_socket_timeout,
+            "socket_timeout": settings.redis_socket_timeout,
+            "health_check_interval": 30,
+            "encoding": "utf-8",
+            "decode_responses": True,
+        }
+
+    @property
+    def async_client(self) -> redis_async.Redis:
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    pool = redis_async.BlockingConnectionPool.from_url(
+                        self._url or settings.redis_url, **self._pool_kwargs()
+                    )
+                    client = _AsyncRedis(connection_pool=pool)
+                    client.breaker = self.breaker
+                    self._async_client = client
+        return self._async_client
+
+    @property
+    def sync_client(self) -> redis_sync.Redis:
+        if self._sync_client is None:
+            with self._lock:
+                if self._sync_client is None:
+                    pool = redis_sync.BlockingConnectionPool.from_url(
+                        self._url or settings.redis_url, **self._pool_kwargs()
+                    )
+                    client = _SyncRedis(connection_pool=pool)
+                    client.breaker = self.breaker
+                    self._sync_client = client
+        return self._sync_client
+
+    def _needs_probe(self) -> bool:
+        """Whether Redis has not answered yet, or failed since it last did."""
+        return self.breaker.commands == 0 or self.breaker.consecutive_failures > 0
+
+    async def get_async_client(self) -> Optional[redis_async.Redis]:
+        """Async client, or None while Redis is failing."""
+        if not self.breaker.allow():
+            return None
+        client = self.async_client
+        if self._needs_probe():
+            try:
+                await client.ping()
+            except Exception as e:
+                logger.error(f"Redis is not available: {e}")
+                return None
+        return client
+
+    def get_sync_client(self) -> Optional[redis_sync.Redis]:
+        """Sync client, or None while Redis is failing."""
+        if not self.breaker.allow():
+            return None
+        client = self.sync_client
+        if self._needs_probe():
+            try:
+                client.ping()
+            except Exception as e:
+                logger.error(f"Redis is not available: {e}")
+                return None
+        return client
+
+    async def startup(self) -> bool:
+        """Create both clients and check the connection; called from ``lifespan``."""
+        self.sync_client
         try:
-            _redis_client_async = redis_async.from_url(
-                settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5,
-            )
-            # Test connection
-            await _redis_client_async.ping()
-            logger.info("Async Redis client initialized successfully")
+            await self.async_client.ping()
+            logger.info("Redis clients initialized successfully")
+            return True
         except Exception as e:
-            logger.error(f"Failed to initialize async Redis client: {e}")
-            _redis_client_async = None
+            logger.error(f"Redis is not reachable at startup: {e}")
+            return False
+
+    async def close(self) -> None:
+        """Close both clients' pooled connections and drop them."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            await self._async_client.connection_pool.disconnect()
+            self._async_client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client.connection_pool.disconnect()
+            self._sync_client = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Circuit breaker counters and pool occupancy of the clients created so far."""
+        pools = {}
+        if self._async_client is not None:
+            pools["async"] = _pool_occupancy(self._async_client.connection_pool)
+        if self._sync_client is not None:
+            pools["sync"] = _pool_occupancy(self._sync_client.connection_pool)
+        return {"circuit_breaker": self.breaker.snapshot(), "pools": pools}
+
+
+# Global registry; one per worker process
+redis_registry = RedisRegistry()
 
-    return _redis_client_async
+
+async def get_redis_client() -> Optional[redis_async.Redis]:
+    """
+    Get the shared async Redis client.
+
+    Returns:
+        Async Redis client instance or None while Redis is failing
+    """
+    return await redis_registry.get_async_client()
 
 
 def get_redis_client_sync() -> Optional[redis_sync.Redis]:
     """
-    Get or create sync Redis client instance for ML services.
+    Get the shared sync Redis client.
 
     Returns:
-        Sync Redis client instance or None if connection fails
+        Sync Redis client instance or None while Redis is failing
     """
-    global _redis_client_sync
+    return redis_registry.get_sync_client()
 
-    if _redis_client_sync is None:
-        try:
-            _redis_client_sync = redis_sync.from_url(
-                settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5,
-            )
-            # Test connection
-            _redis_client_sync.ping()
-            logger.info("Sync Redis client initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize sync Redis client: {e}")
-            _redis_client_sync = None
 
-    return _redis_client_sync
+def _queue_commands(pipe, commands: Sequence[Tuple]) -> None:
+    for name, *args in commands:
+        getattr(pipe, name)(*args)
+
+
+async def pipeline_execute(
+    commands: Sequence[Tuple],
+    transaction: bool = False,
+    client: Optional[redis_async.Redis] = None
+) -> Optional[List[Any]]:
+    """
+    Send several commands in one round trip.
+
+    Args:
+        commands: Tuples of command name and arguments, e.g. ("setex", key, 60, value)
+        transaction: Wrap the commands in MULTI/EXEC
+        client: Async client to use instead of the shared one
+
+    Returns:
+        Replies in command order (a failed command's error in its place),
+        or None if Redis is unavailable
+    """
+    client = client or await redis_registry.get_async_client()
+    if client is None:
+        return None
+    try:
+        async with client.pipeline(transaction=transaction) as pipe:
+            _queue_commands(pipe, commands)
+            results = await pipe.execute(raise_on_error=False)
+    except _CONNECTION_ERRORS as e:
+        redis_registry.breaker.record_failure()
+        logger.error(f"Redis pipeline failed: {e}")
+        return None
+    redis_registry.breaker.record_success()
+    return results
+
+
+def pipeline_execute_sync(
+    commands: Sequence[Tuple],
+    transaction: bool = False,
+    client: Optional[redis_sync.Redis] = None
+) -> Optional[List[Any]]:
+    """Sync equivalent of ``pipeline_execute``."""
+    client = client or redis_registry.get_sync_client()
+    if client is None:
+        return None
+    try:
+        with client.pipeline(transaction=transaction) as pipe:
+            _queue_commands(pipe, commands)
+            results = pipe.execute(raise_on_error=False)
+    except _CONNECTION_ERRORS as e:
+        redis_registry.breaker.record_failure()
+        logger.error(f"Redis pipeline failed: {e}")
+        return None
+    redis_registry.breaker.record_success()
+    return results
 
 
 async def check_redis_connection() -> bool:
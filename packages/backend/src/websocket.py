@@ -1,20 +1,32 @@
 """
 WebSocket Implementation for Real-time Updates
+
+Each worker only holds its own sockets, so messages go through Redis
+pub/sub: a worker subscribes to ``ws:user:<id>`` while that user has a
+socket open on it, and to ``ws:broadcast`` for system messages. Messages
+for users connected to no worker are kept in a capped Redis stream,
+``ws:queue:<id>``, and sent on their next connection. While Redis is
+unavailable messages reach this worker's sockets only and offline messages
+are queued in memory.
+
+The endpoint is served at ``/ws``; clients pass their access token as the
+``token`` query parameter.
 """
 
 import json
 import logging
 import asyncio
-from typing import Dict, Set, Optional, Any
+from contextlib import suppress
+from typing import Dict, List, Set, Optional, Any
 from datetime import datetime
-from fastapi import WebSocket, WebSocketDisconnect, Depends, status
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
 
 from .config import settings
-from .database import get_db
-from .models import User
+from .database import SessionLocal
+from .database.models import User
 from .schemas.websocket import (
     WebSocketMessage,
     WebSocketMessageType,
@@ -22,32 +34,49 @@ from .schemas.websocket import (
     AccountUpdate,
     NotificationMessage,
 )
+from .utils.redis import pipeline_execute, redis_registry
 
 logger = logging.getLogger(__name__)
+router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_prefix}/auth/login")
 
+USER_CHANNEL_PREFIX = "ws:user:"
+BROADCAST_CHANNEL = "ws:broadcast"
+OFFLINE_QUEUE_PREFIX = "ws:queue:"
+
 
 class ConnectionManager:
     """
     Manages WebSocket connections and message broadcasting
     """
     
-    def __init__(self):
-        # Store active connections by user_id
+    def __init__(self, redis_client=None):
+        # Store this worker's active connections by user_id
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # Store connection metadata
         self.connection_metadata: Dict[WebSocket, Dict[str, Any]] = {}
-        # Message queue for offline users
+        # Message queue for offline users while Redis is unavailable
         self.message_queue: Dict[str, list] = {}
-        # Lock for thread safety
+        # Guards the connection maps; never held across Redis calls
         self.lock = asyncio.Lock()
+        # Serializes pub/sub (un)subscribes so they follow the connection maps
+        self._pubsub_lock = asyncio.Lock()
+        self._redis = redis_client
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+    
+    async def _get_redis(self):
+        if self._redis is not None:
+            return self._redis
+        return await redis_registry.get_async_client()
     
     async def connect(self, websocket: WebSocket, user_id: str, metadata: Optional[Dict] = None):
         """Accept and register a new WebSocket connection"""
         await websocket.accept()
         
         async with self.lock:
-            if user_id not in self.active_connections:
+            first_connection = user_id not in self.active_connections
+            if first_connection:
                 self.active_connections[user_id] = set()
             
             self.active_connections[user_id].add(websocket)
@@ -57,27 +86,47 @@ class ConnectionManager:
                 "metadata": metadata or {},
             }
             
-            logger.info(f"User {user_id} connected via WebSocket")
-            
-            # Send any queued messages
-            if user_id in self.message_queue:
-                for message in self.message_queue[user_id]:
-                    await self.send_personal_message(message, websocket)
-                del self.message_queue[user_id]
+            queued = self.message_queue.pop(user_id, [])
+        
+        logger.info(f"User {user_id} connected via WebSocket")
+        
+        # Subscribe before reading the offline queue so nothing published
+        # in between is missed
+        if first_connection:
+            await self._subscribe(user_id)
+        
+        # Send any queued messages
+        queued += await self._drain_offline_queue(user_id)
+        for message in queued:
+            await self.send_personal_message(message, websocket)
     
     async def disconnect(self, websocket: WebSocket, user_id: str):
         """Remove a WebSocket connection"""
         async with self.lock:
-            if user_id in self.active_connections:
-                self.active_connections[user_id].discard(websocket)
-                
-                if not self.active_connections[user_id]:
-                    del self.active_connections[user_id]
-            
-            if websocket in self.connection_metadata:
-                del self.connection_metadata[websocket]
-            
-            logger.info(f"User {user_id} disconnected from WebSocket")
+            last_connection = self._remove_connection(user_id, websocket)
+        
+        logger.info(f"User {user_id} disconnected from WebSocket")
+        if last_connection:
+            await self._unsubscribe(user_id)
+    
+    def _remove_connection(self, user_id: str, websocket: WebSocket) -> bool:
+        """
+        Forget a connection; the caller holds the lock.
+        
+        Returns True if it was the user's last connection on this worker, in
+        which case the caller unsubscribes once the lock is released.
+        """
+        self.connection_metadata.pop(websocket, None)
+        
+        connections = self.active_connections.get(user_id)
+        if connections is None:
+            return False
+        
+        connections.discard(websocket)
+        if connections:
+            return False
+        del self.active_connections[user_id]
+        return True
     
     async def send_personal_message(self, message: str, websocket: WebSocket):
         """Send a message to a specific WebSocket connection"""
@@ -87,38 +136,72 @@ class ConnectionManager:
             logger.error(f"Error sending message to WebSocket: {e}")
     
     async def send_user_message(self, user_id: str, message: Dict[str, Any]):
-        """Send a message to all connections for a specific user"""
+        """Send a message to all connections for a specific user, on any worker"""
         message_str = json.dumps(message, default=str)
         
-        async with self.lock:
-            if user_id in self.active_connections:
-                disconnected = []
-                for connection in self.active_connections[user_id]:
-                    try:
-                        await connection.send_text(message_str)
-                    except Exception as e:
-                        logger.error(f"Error sending message to user {user_id}: {e}")
-                        disconnected.append(connection)
-                
-                # Remove disconnected connections
-                for conn in disconnected:
-                    self.active_connections[user_id].discard(conn)
-                    if conn in self.connection_metadata:
-                        del self.connection_metadata[conn]
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                receivers = await redis.publish(f"{USER_CHANNEL_PREFIX}{user_id}", message_str)
+            except RedisError as e:
+                logger.error(f"Error publishing message to user {user_id}: {e}")
             else:
-                # Queue message for offline user
-                if user_id not in self.message_queue:
-                    self.message_queue[user_id] = []
-                self.message_queue[user_id].append(message_str)
-                
-                # Limit queue size to prevent memory issues
-                if len(self.message_queue[user_id]) > 100:
-                    self.message_queue[user_id] = self.message_queue[user_id][-100:]
+                if receivers:
+                    return
+                # Nobody subscribed: the user is offline, or connected here
+                # while Redis was unavailable
+                if user_id not in self.active_connections and \
+                        await self._queue_offline(user_id, message_str, redis):
+                    return
+        
+        if not await self._deliver_local(user_id, message_str):
+            self._queue_in_memory(user_id, message_str)
     
     async def broadcast(self, message: Dict[str, Any], exclude_user: Optional[str] = None):
-        """Broadcast a message to all connected users"""
+        """Broadcast a message to all connected users on every worker"""
         message_str = json.dumps(message, default=str)
         
+        redis = await self._get_redis()
+        if redis is not None:
+            try:
+                await redis.publish(
+                    BROADCAST_CHANNEL,
+                    json.dumps({"message": message_str, "exclude_user": exclude_user})
+                )
+            except RedisError as e:
+                logger.error(f"Error publishing broadcast: {e}")
+            else:
+                # Without a listener this worker is not among the receivers
+                if self._pubsub is not None:
+                    return
+        
+        await self._broadcast_local(message_str, exclude_user)
+    
+    async def _deliver_local(self, user_id: str, message_str: str) -> bool:
+        """Send to this worker's connections for a user; False if there are none."""
+        async with self.lock:
+            if user_id not in self.active_connections:
+                return False
+            
+            disconnected = []
+            for connection in self.active_connections[user_id]:
+                try:
+                    await connection.send_text(message_str)
+                except Exception as e:
+                    logger.error(f"Error sending message to user {user_id}: {e}")
+                    disconnected.append(connection)
+            
+            # Remove disconnected connections
+            last_connection = False
+            for conn in disconnected:
+                last_connection |= self._remove_connection(user_id, conn)
+        
+        if last_connection:
+            await self._unsubscribe(user_id)
+        return True
+    
+    async def _broadcast_local(self, message_str: str, exclude_user: Optional[str] = None):
+        """Send to all of this worker's connections."""
         async with self.lock:
             disconnected = []
             for user_id, connections in self.active_connections.items():
@@ -133,21 +216,134 @@ class ConnectionManager:
                         disconnected.append((user_id, connection))
             
             # Remove disconnected connections
-            for user_id, conn in disconnected:
-                self.active_connections[user_id].discard(conn)
-                if conn in self.connection_metadata:
-                    del self.connection_metadata[conn]
+            gone = [
+                user_id for user_id, conn in disconnected
+                if self._remove_connection(user_id, conn)
+            ]
+        
+        for user_id in gone:
+            await self._unsubscribe(user_id)
+    
+    def _queue_in_memory(self, user_id: str, message_str: str):
+        """Queue a message for an offline user while Redis is unavailable."""
+        queue = self.message_queue.setdefault(user_id, [])
+        queue.append(message_str)
+        
+        # Limit queue size to prevent memory issues
+        limit = settings.websocket_offline_queue_max
+        if len(queue) > limit:
+            self.message_queue[user_id] = queue[-limit:]
+    
+    async def _queue_offline(self, user_id: str, message_str: str, redis) -> bool:
+        """Append a message to the user's capped offline stream; False if that failed."""
+        stream = f"{OFFLINE_QUEUE_PREFIX}{user_id}"
+        results = await pipeline_execute([
+            # Exact trimming: the streams are short and the cap is a promise
+            ("xadd", stream, {"message": message_str}, "*",
+             settings.websocket_offline_queue_max, False),
+            ("expire", stream, settings.websocket_offline_queue_ttl),
+        ], client=redis)
+        
+        if results is None or isinstance(results[0], Exception):
+            logger.error(f"Error queueing offline message for user {user_id}: {results}")
+            return False
+        return True
+    
+    async def _drain_offline_queue(self, user_id: str) -> list:
+        """Take the messages queued in Redis while the user was offline."""
+        redis = await self._get_redis()
+        if redis is None:
+            return []
+        
+        stream = f"{OFFLINE_QUEUE_PREFIX}{user_id}"
+        try:
+            entries = await redis.xrange(stream)
+            if entries:
+                # Delete only what was read; entries added meanwhile stay queued
+                await redis.xdel(stream, *[entry_id for entry_id, _ in entries])
+        except RedisError as e:
+            logger.error(f"Error reading offline messages for user {user_id}: {e}")
+            return []
+        return [fields["message"] for _, fields in entries]
+    
+    async def _subscribe(self, user_id: str):
+        """Receive the user's messages from every worker."""
+        redis = await self._get_redis()
+        if redis is None:
+            return
+        
+        async with self._pubsub_lock:
+            # The user may have disconnected while we waited
+            if user_id not in self.active_connections:
+                return
+            try:
+                if self._pubsub is None:
+                    pubsub = redis.pubsub(ignore_subscribe_messages=True)
+                    await pubsub.subscribe(BROADCAST_CHANNEL)
+                    self._pubsub = pubsub
+                    self._listener = asyncio.create_task(self._listen())
+                await self._pubsub.subscribe(f"{USER_CHANNEL_PREFIX}{user_id}")
+            except RedisError as e:
+                logger.error(f"Error subscribing to messages for user {user_id}: {e}")
+    
+    async def _unsubscribe(self, user_id: str):
+        async with self._pubsub_lock:
+            # Skip if the user reconnected while we waited
+            if self._pubsub is None or user_id in self.active_connections:
+                return
+            try:
+                await self._pubsub.unsubscribe(f"{USER_CHANNEL_PREFIX}{user_id}")
+            except RedisError as e:
+                logger.error(f"Error unsubscribing from messages for user {user_id}: {e}")
+    
+    async def _listen(self):
+        """Deliver published messages to this worker's connections."""
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    await self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The client reconnects and resubscribes on the next read
+                logger.error(f"WebSocket pub/sub listener error: {e}")
+                await asyncio.sleep(1.0)
+    
+    async def _dispatch(self, channel: str, data: str):
+        if channel == BROADCAST_CHANNEL:
+            payload = json.loads(data)
+            await self._broadcast_local(payload["message"], payload.get("exclude_user"))
+        elif channel.startswith(USER_CHANNEL_PREFIX):
+            user_id = channel[len(USER_CHANNEL_PREFIX):]
+            # The user may have disconnected since the message was published
+            if not await self._deliver_local(user_id, data):
+                redis = await self._get_redis()
+                if redis is None or not await self._queue_offline(user_id, data, redis):
+                    self._queue_in_memory(user_id, data)
+    
+    async def close(self):
+        """Stop listening for published messages; called on shutdown."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+        if self._pubsub is not None:
+            with suppress(RedisError):
+                await self._pubsub.aclose()
+        self._pubsub = None
+        self._listener = None
     
     def get_online_users(self) -> Set[str]:
-        """Get list of currently online user IDs"""
+        """Get list of user IDs connected to this worker"""
         return set(self.active_connections.keys())
     
     def get_connection_count(self) -> int:
-        """Get total number of active connections"""
+        """Get total number of active connections on this worker"""
         return sum(len(conns) for conns in self.active_connections.values())
     
     def get_user_connection_count(self, user_id: str) -> int:
-        """Get number of connections for a specific user"""
+        """Get number of connections on this worker for a specific user"""
         return len(self.active_connections.get(user_id, set()))
 
 
@@ -158,10 +354,13 @@ manager = ConnectionManager()
 async def get_current_user_websocket(
     websocket: WebSocket,
     token: Optional[str] = None,
-    db: Session = Depends(get_db),
 ) -> Optional[User]:
     """
     Authenticate WebSocket connection using JWT token
+    
+    The user is looked up in a session of its own, closed before returning:
+    a get_db dependency would keep a pooled connection checked out for as
+    long as the socket stays open.
     """
     if not token:
         # Try to get token from query parameters
@@ -173,17 +372,18 @@ async def get_current_user_websocket(
     
     try:
         payload = jwt.decode(
-            token, settings.secret_key, algorithms=[settings.algorithm]
+            token, settings.secret_key, algorithms=[settings.jwt_algorithm]
         )
-        user_id: str = payload.get("user_id")
-        if user_id is None:
+        user_id: str = payload.get("sub")
+        if user_id is None or payload.get("type") != "access":
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return None
     except JWTError:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return None
     
-    user = db.query(User).filter(User.id == user_id).first()
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return None
@@ -191,6 +391,7 @@ async def get_current_user_websocket(
     return user
 
 
+@router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
     user: User = Depends(get_current_user_websocket),
@@ -311,6 +512,41 @@ async def send_transaction_update(
     await manager.send_user_message(user_id, message)
 
 
+async def send_transactions_categorized(
+    user_id: str,
+    categorizations: List[Dict[str, Any]],
+):
+    """Send one update for a batch of categorized transactions"""
+    if not categorizations:
+        return
+    message = {
+        "type": WebSocketMessageType.TRANSACTION_UPDATE,
+        "data": {
+            "action": "categorized",
+            "transactions": categorizations,  # transaction_id, category, confidence
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+    }
+    await manager.send_user_message(user_id, message)
+
+
+async def send_sync_status(
+    user_id: str,
+    sync_status: str,
+    result: Dict[str, Any],
+):
+    """Send Plaid sync progress to user"""
+    message = {
+        "type": WebSocketMessageType.SYNC_STATUS,
+        "data": {
+            "status": sync_status,  # "completed", "failed"
+            **result,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+    }
+    await manager.send_user_message(user_id, message)
+
+
 async def send_account_update(
     user_id: str,
     account_id: str,
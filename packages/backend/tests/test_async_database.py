@@ -0,0 +1,173 @@
+"""Tests for the async database layer and the routes served from it."""
+
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.main import app
+from src.database import Base, get_async_db
+from src.database.engines import async_database_url
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.dependencies.auth import (
+    get_current_active_user, get_current_user, get_current_verified_user
+)
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot)
+]
+
+
+class TestAsyncDatabaseUrl:
+    """Tests for deriving the async driver URL."""
+
+    def test_postgresql_uses_asyncpg(self):
+        assert async_database_url("postgresql://app:secret@db:5432/manna") == (
+            "postgresql+asyncpg://app:secret@db:5432/manna"
+        )
+
+    def test_psycopg2_url_uses_asyncpg(self):
+        assert async_database_url("postgresql+psycopg2://app@db/manna") == (
+            "postgresql+asyncpg://app@db/manna"
+        )
+
+    def test_sslmode_becomes_ssl(self):
+        assert async_database_url("postgresql://app@db/manna?sslmode=require") == (
+            "postgresql+asyncpg://app@db/manna?ssl=require"
+        )
+
+    def test_sqlite_uses_aiosqlite(self):
+        assert async_database_url("sqlite:///./manna.db") == "sqlite+aiosqlite:///./manna.db"
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    database = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{database}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="async@example.com", username="async", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_async", access_token="token")
+    db.add(item)
+    db.flush()
+    checking = Account(user_id=user.id, plaid_item_id=item.id, plaid_account_id="acct_checking",
+                       name="Checking", account_type="depository", account_subtype="checking",
+                       current_balance=Decimal("1500.00"))
+    card = Account(user_id=user.id, plaid_item_id=item.id, plaid_account_id="acct_card",
+                   name="Card", account_type="credit", current_balance=Decimal("200.00"))
+    db.add_all([checking, card])
+    db.flush()
+    groceries = Category(user_id=user.id, name="Groceries")
+    db.add(groceries)
+    db.flush()
+    today = date.today()
+    for i, (account, amount, subcategory) in enumerate([
+        (checking, Decimal("-2000.00"), "Income"),
+        (checking, Decimal("45.50"), "Groceries"),
+        (card, Decimal("30.00"), "Groceries"),
+        (card, Decimal("12.00"), "Dining"),
+    ]):
+        db.add(Transaction(
+            account_id=account.id,
+            plaid_transaction_id=f"async_{i}",
+            amount=amount,
+            date=today - timedelta(days=i),
+            name=f"Txn {i}",
+            subcategory=subcategory,
+            category_id=groceries.id if subcategory == "Groceries" else None,
+        ))
+    db.commit()
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    for dependency in (get_current_user, get_current_active_user, get_current_verified_user):
+        app.dependency_overrides[dependency] = lambda: user
+
+    yield TestClient(app)
+
+    app.dependency_overrides.clear()
+    db.close()
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+class TestAsyncRoutes:
+    """Tests for the read routes running on AsyncSession."""
+
+    def test_dashboard_summary(self, async_client):
+        response = async_client.get("/api/v1/dashboard/summary")
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["totalAssets"] == 1500.0
+        assert data["totalLiabilities"] == 200.0
+        assert data["breakdown"]["checking"] == 1500.0
+
+    def test_recent_transactions_include_account_names(self, async_client):
+        response = async_client.get("/api/v1/dashboard/transactions/recent", params={"limit": 3})
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert [t["account"] for t in data] == ["Checking", "Checking", "Card"]
+        assert data[1]["category"] == "Groceries"
+
+    def test_spending_by_category(self, async_client):
+        response = async_client.get("/api/v1/dashboard/spending/by-category")
+
+        assert response.status_code == 200
+        spending = {row["name"]: float(row["value"]) for row in response.json()["data"]}
+        assert spending == {"Groceries": 75.5, "Dining": 12.0}
+
+    def test_kpis(self, async_client):
+        response = async_client.get("/api/v1/dashboard/kpis")
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["totalBalance"] == 1700.0
+        assert data["accountCount"] == 2
+
+    def test_transaction_list_loads_categories(self, async_client):
+        response = async_client.get("/api/v1/transactions/", params={"page_size": 10})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 4
+        assert {item["primary_category"] for item in body["items"]} == {"Groceries", None}
+
+    def test_transaction_stats(self, async_client):
+        response = async_client.get("/api/v1/transactions/stats")
+
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["total_transactions"] == 4
+        assert stats["total_income"] == 87.5
+        assert stats["total_expenses"] == 2000.0
+        categories = {c["category"]: c["transaction_count"] for c in stats["categories"]}
+        assert categories == {"Income": 1, "Groceries": 2, "Dining": 1}
+
+    def test_balance_sheet_report(self, async_client):
+        # The router carries its own /reports prefix on top of the mount prefix
+        response = async_client.get("/api/v1/reports/reports/balance-sheet")
+
+        assert response.status_code == 200
+        assert response.json()["report_type"] == "balance_sheet"
@@ -0,0 +1,202 @@
+"""Tests for month-end balance snapshots and as-of balance lookups."""
+
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database import Base
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.services.balance_snapshots import (
+    BalanceSnapshotService,
+    _transaction_deltas,
+    apply_snapshot_deltas,
+    month_end,
+)
+from src.services.report_generator import ReportGeneratorService
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot)
+]
+
+# (date, amount) for the checking account; February has no activity
+ACTIVITY = [
+    (date(2024, 1, 5), Decimal("100.00")),
+    (date(2024, 1, 20), Decimal("-30.00")),
+    (date(2024, 3, 2), Decimal("50.00")),
+    (date(2024, 3, 31), Decimal("-5.00")),
+    (date(2024, 4, 10), Decimal("7.00")),
+]
+
+
+@pytest.fixture
+def ledger():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="ledger@example.com", username="ledger", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_ledger", access_token="token")
+    db.add(item)
+    db.flush()
+    accounts = []
+    for name in ("checking", "savings"):
+        account = Account(user_id=user.id, plaid_item_id=item.id,
+                          plaid_account_id=f"acct_{name}", name=name,
+                          account_type="depository")
+        db.add(account)
+        accounts.append(account)
+    db.flush()
+    for i, (txn_date, amount) in enumerate(ACTIVITY):
+        db.add(Transaction(account_id=accounts[0].id, plaid_transaction_id=f"l_{i}",
+                           amount=amount, date=txn_date, name=f"Txn {i}"))
+    db.add(Transaction(account_id=accounts[1].id, plaid_transaction_id="s_0",
+                       amount=Decimal("1000.00"), date=date(2024, 2, 14), name="Deposit"))
+    db.commit()
+
+    yield db, user, accounts[0], accounts[1]
+
+    db.close()
+    engine.dispose()
+
+
+def _full_sum(db, account_id, as_of):
+    return db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
+        Transaction.account_id == account_id, Transaction.date <= as_of
+    ).scalar()
+
+
+def _snapshots(db, account_id):
+    return {
+        s.period_end: s.balance
+        for s in db.query(AccountBalanceSnapshot).filter_by(account_id=account_id)
+    }
+
+
+class TestSnapshotThrough:
+    """Tests for rolling snapshots forward."""
+
+    def test_month_end(self):
+        assert month_end(2024, 2) == date(2024, 2, 29)
+        assert month_end(2024, 12) == date(2024, 12, 31)
+
+    def test_creates_month_ends_and_carries_balance(self, ledger):
+        db, user, checking, savings = ledger
+
+        created = BalanceSnapshotService(db).snapshot_through(user.id, date(2024, 3, 31))
+        db.commit()
+
+        assert created == 5  # checking Jan-Mar, savings Feb-Mar
+        assert _snapshots(db, checking.id) == {
+            date(2024, 1, 31): Decimal("70.00"),
+            date(2024, 2, 29): Decimal("70.00"),
+            date(2024, 3, 31): Decimal("115.00"),
+        }
+        assert _snapshots(db, savings.id)[date(2024, 3, 31)] == Decimal("1000.00")
+
+    def test_only_complete_months_and_incremental(self, ledger):
+        db, user, checking, _ = ledger
+        service = BalanceSnapshotService(db)
+
+        service.snapshot_through(user.id, date(2024, 2, 15))
+        assert max(_snapshots(db, checking.id)) == date(2024, 1, 31)
+
+        service.snapshot_through(user.id, date(2024, 4, 30))
+        db.commit()
+        assert _snapshots(db, checking.id)[date(2024, 4, 30)] == Decimal("122.00")
+        assert len(_snapshots(db, checking.id)) == 4
+
+
+class TestBalancesAsOf:
+    """Tests for snapshot + delta lookups."""
+
+    @pytest.mark.parametrize("with_snapshots", [False, True])
+    def test_matches_full_history_sum(self, ledger, with_snapshots):
+        db, user, checking, savings = ledger
+        service = BalanceSnapshotService(db)
+        if with_snapshots:
+            service.snapshot_through(user.id, date(2024, 3, 31))
+            db.commit()
+
+        for as_of in (date(2023, 12, 31), date(2024, 1, 20), date(2024, 2, 29),
+                      date(2024, 3, 15), date(2024, 3, 31), date(2024, 6, 1)):
+            balances = service.balances_as_of([checking.id, savings.id], as_of)
+            assert balances[checking.id] == _full_sum(db, checking.id, as_of)
+            assert balances[savings.id] == _full_sum(db, savings.id, as_of)
+
+    def test_backdated_writes_adjust_snapshots(self, ledger):
+        db, user, checking, _ = ledger
+        service = BalanceSnapshotService(db)
+        service.snapshot_through(user.id, date(2024, 3, 31))
+        db.commit()
+
+        db.add(Transaction(account_id=checking.id, plaid_transaction_id="late",
+                           amount=Decimal("12.00"), date=date(2024, 2, 10), name="Late"))
+        changed = db.query(Transaction).filter_by(plaid_transaction_id="l_0").one()
+        changed.amount = Decimal("90.00")
+        moved = db.query(Transaction).filter_by(plaid_transaction_id="l_3").one()
+        moved.date = date(2024, 4, 1)
+        db.commit()
+
+        assert _snapshots(db, checking.id) == {
+            date(2024, 1, 31): Decimal("60.00"),
+            date(2024, 2, 29): Decimal("72.00"),
+            date(2024, 3, 31): Decimal("122.00"),
+        }
+        assert service.balance_as_of(checking.id, date(2024, 4, 30)) == \
+            _full_sum(db, checking.id, date(2024, 4, 30))
+
+    def test_deletes_reverse_their_amount(self, ledger):
+        db, user, checking, _ = ledger
+        BalanceSnapshotService(db).snapshot_through(user.id, date(2024, 3, 31))
+        db.commit()
+
+        removed = db.query(Transaction).filter_by(plaid_transaction_id="l_1").one()
+        session = SimpleNamespace(new=[], dirty=[], deleted=[removed])
+        deltas = _transaction_deltas(session)
+        assert deltas == {(checking.id, date(2024, 1, 20)): Decimal("30.00")}
+
+        apply_snapshot_deltas(db, deltas)
+        db.commit()
+        assert _snapshots(db, checking.id)[date(2024, 1, 31)] == Decimal("100.00")
+        assert _snapshots(db, checking.id)[date(2024, 3, 31)] == Decimal("145.00")
+
+    def test_changes_after_latest_snapshot_are_skipped(self, ledger):
+        db, user, checking, _ = ledger
+        BalanceSnapshotService(db).snapshot_through(user.id, date(2024, 3, 31))
+        db.commit()
+
+        checking_id = checking.id
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+        apply_snapshot_deltas(db, {(checking_id, date(2024, 4, 2)): Decimal("5.00")})
+
+        assert len(statements) == 1  # only the latest-snapshot lookup
+
+    def test_report_beginning_balance_uses_snapshots(self, ledger):
+        db, user, checking, savings = ledger
+        BalanceSnapshotService(db).snapshot_through(user.id, date(2024, 3, 31))
+        db.commit()
+
+        beginning = ReportGeneratorService(db)._get_beginning_balance(
+            str(user.id), datetime(2024, 4, 1), [checking, savings]
+        )
+
+        assert beginning == 1115.0
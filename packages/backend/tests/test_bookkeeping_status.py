@@ -0,0 +1,147 @@
+"""Tests for the batched bookkeeping health and pending-task summary."""
+
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.main import app
+from src.database import Base, get_db
+from src.database.bookkeeping_models import (
+    AccountingPeriod, JournalEntry, ReconciliationItem, ReconciliationRecord
+)
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.dependencies.auth import get_current_active_user
+from src.services.bookkeeping_status import BookkeepingStatusService
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot, ReconciliationRecord, ReconciliationItem,
+                  AccountingPeriod, JournalEntry)
+]
+
+STATUS_REDIS = "src.services.bookkeeping_status.get_redis_client_sync"
+
+
+@pytest.fixture
+def status_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="books@example.com", username="books", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_books", access_token="token")
+    db.add(item)
+    db.flush()
+    accounts = {}
+    for name, account_type in (("Checking", "depository"), ("Visa", "credit"),
+                               ("Brokerage", "investment")):
+        account = Account(user_id=user.id, plaid_item_id=item.id,
+                          plaid_account_id=f"acct_{name}", name=name, account_type=account_type)
+        db.add(account)
+        accounts[name] = account
+    db.flush()
+    for i in range(25):
+        db.add(Transaction(account_id=accounts["Checking"].id, plaid_transaction_id=f"b_{i}",
+                           amount=Decimal("10.00"), date=date(2024, 3, 1), name=f"Txn {i}",
+                           user_category_override="Food" if i < 3 else None))
+    for i in range(2):
+        db.add(JournalEntry(user_id=user.id, entry_number=f"JE-{i}", entry_date=date.today(),
+                            description="Accrual", total_debits=Decimal("5"),
+                            total_credits=Decimal("5"), is_posted=False))
+    db.add(AccountingPeriod(user_id=user.id, period_name="This month", period_type="monthly",
+                            start_date=date.today().replace(day=1),
+                            end_date=date.today() + timedelta(days=31)))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: statements.append(args[2]))
+
+    yield db, user, statements
+
+    db.close()
+    engine.dispose()
+
+
+class TestBookkeepingStatus:
+    """Tests for /bookkeeping/health and /bookkeeping/pending-tasks."""
+
+    def test_endpoints_share_two_statement_summary(self, status_db):
+        db, user, statements = status_db
+        user.id  # load the expired user before counting statements
+
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        try:
+            with patch(STATUS_REDIS, return_value=None):
+                client = TestClient(app)
+                statements.clear()
+                health = client.get("/api/v1/bookkeeping/health")
+                health_statements = len(statements)
+                tasks = client.get("/api/v1/bookkeeping/pending-tasks")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert health.status_code == 200, health.text
+        assert health_statements == 2
+        assert health.json() == {
+            "status": "warning",
+            "current_period": "This month",
+            "unposted_entries": 2,
+            "unreconciled_accounts": 3,
+            "accuracy_score": 12.0,
+            "last_reconciliation_date": None,
+        }
+
+        assert tasks.status_code == 200, tasks.text
+        kinds = [task["type"] for task in tasks.json()["tasks"]]
+        assert kinds[:3] == ["categorization", "reconciliation", "reconciliation"]
+        assert tasks.json()["tasks"][0]["count"] == 22
+        assert {task["title"] for task in tasks.json()["tasks"][1:3]} == {
+            "Reconcile Checking", "Reconcile Visa"
+        }
+
+    def test_summary_is_cached_per_user(self, status_db):
+        db, user, statements = status_db
+        redis_client = MagicMock()
+        redis_client.get.return_value = None
+
+        with patch(STATUS_REDIS, return_value=redis_client):
+            summary = BookkeepingStatusService(db).get_summary(user.id)
+            key, _, payload = redis_client.setex.call_args.args
+            redis_client.get.return_value = payload
+            statements.clear()
+            cached = BookkeepingStatusService(db).get_summary(user.id)
+
+        assert key == f"bookkeeping_status:{user.id}"
+        assert cached == json.loads(json.dumps(summary))
+        assert statements == []
+
+    def test_stale_day_is_recomputed(self, status_db):
+        db, user, statements = status_db
+        redis_client = MagicMock()
+        redis_client.get.return_value = json.dumps({"as_of": "2000-01-01"})
+
+        with patch(STATUS_REDIS, return_value=redis_client):
+            summary = BookkeepingStatusService(db).get_summary(user.id)
+
+        assert summary["as_of"] == date.today().isoformat()
+        assert summary["total_transactions"] == 25
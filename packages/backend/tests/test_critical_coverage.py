@@ -442,28 +442,26 @@ class TestUtilityFunctions:
 class TestDatabaseConnection:
     """Test database connection utilities."""
     
-    @patch('src.database.base.create_engine')
-    def test_database_connection_success(self, mock_create_engine):
+    @patch('src.database.base.engine')
+    def test_database_connection_success(self, mock_engine):
         """Test successful database connection."""
         from src.database.base import check_db_connection
         
         # Mock successful connection
-        mock_engine = Mock()
         mock_connection = Mock()
         mock_engine.connect.return_value.__enter__.return_value = mock_connection
         mock_connection.execute.return_value = Mock()
-        mock_create_engine.return_value = mock_engine
         
         result = check_db_connection()
         assert result is True
     
-    @patch('src.database.base.create_engine')
-    def test_database_connection_failure(self, mock_create_engine):
+    @patch('src.database.base.engine')
+    def test_database_connection_failure(self, mock_engine):
         """Test database connection failure."""
         from src.database.base import check_db_connection
         
         # Mock connection failure
-        mock_create_engine.side_effect = Exception("Connection failed")
+        mock_engine.connect.side_effect = Exception("Connection failed")
         
         result = check_db_connection()
         assert result is False
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""Tests for the process-wide engine registry and its pool metrics."""
+
+import asyncio
+import ssl
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+
+from src.config import settings
+from src.core.database import SecureDatabase
+from src.database.engines import PRIMARY, REPLICA, ASYNC_PREFIX, EngineRegistry, pool_class_name
+from src.dependencies.auth import require_admin
+from src.main import app
+
+
+@pytest.fixture
+def registry(tmp_path):
+    url = f"sqlite:///{tmp_path / 'primary.db'}"
+    with patch("src.database.engines.get_secure_database_url", return_value=url), \
+            patch.object(settings, "database_pool_class", "queue"), \
+            patch.object(settings, "database_replica_url", None), \
+            patch.object(settings, "async_database_url", None):
+        registry = EngineRegistry()
+        yield registry
+        registry.dispose()
+        asyncio.run(registry.dispose_async())
+
+
+class TestEngineRegistry:
+    """Tests for engine creation and reuse."""
+
+    def test_primary_engine_is_shared(self, registry):
+        assert registry.get_engine() is registry.get_engine(PRIMARY)
+
+    def test_replica_is_none_when_not_configured(self, registry):
+        assert registry.has_replica() is False
+        assert registry.get_engine(REPLICA) is None
+
+    def test_replica_engine_uses_its_own_url(self, registry, tmp_path):
+        replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+        with patch.object(settings, "database_replica_url", replica_url):
+            replica = registry.get_engine(REPLICA)
+
+        assert replica is not registry.get_engine()
+        assert str(replica.url) == replica_url
+
+    def test_unknown_role_raises(self, registry):
+        with pytest.raises(ValueError):
+            registry.get_engine("analytics")
+
+    def test_pool_class_defaults(self):
+        with patch.object(settings, "database_pool_class", None):
+            with patch.object(settings, "environment", "testing"):
+                assert pool_class_name() == "static"
+            with patch.object(settings, "environment", "development"):
+                assert pool_class_name() == "queue"
+
+    def test_invalid_pool_class_raises(self):
+        with patch.object(settings, "database_pool_class", "bouncy"):
+            with pytest.raises(ValueError):
+                pool_class_name()
+
+    def test_secure_database_uses_registry_engine(self):
+        shared_engine = Mock()
+        database = SecureDatabase()
+        with patch("src.core.database.get_secure_database_url",
+                   return_value="postgresql://app@db/manna"), \
+                patch("src.core.database.engine_registry") as mock_registry, \
+                patch.object(database, "_test_connection"):
+            mock_registry.get_engine.return_value = shared_engine
+            database._create_engine()
+
+        assert database.engine is shared_engine
+
+
+class TestPoolMetrics:
+    """Tests for pool instrumentation."""
+
+    def test_checkout_and_connect_are_recorded(self, registry):
+        engine = registry.get_engine()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            during = registry.metrics()[PRIMARY]
+        after = registry.metrics()[PRIMARY]
+
+        assert during["checked_out"] == 1
+        assert after["checked_out"] == 0
+        assert after["checked_in"] == 1
+        assert after["pool_class"] == "QueuePool"
+        assert after["connections_opened"] == 1
+        assert after["checkouts"] == 1
+        assert after["connect_time_max_ms"] > 0
+
+    def test_reused_connection_does_not_reconnect(self, registry):
+        engine = registry.get_engine()
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        metrics = registry.metrics()[PRIMARY]
+        assert metrics["connections_opened"] == 1
+        assert metrics["checkouts"] == 3
+
+    def test_checkout_timeout_is_recorded(self, registry):
+        with patch.object(settings, "database_pool_size", 1), \
+                patch.object(settings, "database_max_overflow", 0), \
+                patch.object(settings, "database_pool_timeout", 0.05):
+            engine = registry.get_engine()
+
+        with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+
+        metrics = registry.metrics()[PRIMARY]
+        assert metrics["checkout_timeouts"] == 1
+        assert metrics["overflow"] == 0
+
+    def test_instrumentation_survives_dispose(self, registry):
+        engine = registry.get_engine()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        engine.dispose()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        metrics = registry.metrics()[PRIMARY]
+        assert metrics["checkouts"] == 2
+        assert metrics["connections_opened"] == 2
+
+    def test_null_pool_has_no_occupancy(self, registry):
+        with patch.object(settings, "database_pool_class", "null"):
+            engine = registry.get_engine()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        metrics = registry.metrics()[PRIMARY]
+        assert metrics["pool_class"] == "NullPool"
+        assert "checked_out" not in metrics
+        assert metrics["connections_opened"] == 1
+
+    def test_async_engine_metrics(self, registry):
+        async def query():
+            async with registry.get_async_session_factory()() as session:
+                await session.execute(text("SELECT 1"))
+
+        asyncio.run(query())
+
+        metrics = registry.metrics()[ASYNC_PREFIX + PRIMARY]
+        assert metrics["pool_class"] == "AsyncAdaptedQueuePool"
+        assert metrics["checkouts"] == 1
+        assert metrics["checked_out"] == 0
+
+
+class TestExternalPoolerMode:
+    """Tests for settings used behind a transaction-pooling PgBouncer."""
+
+    POSTGRES_URL = "postgresql://app@pgbouncer:6432/manna"
+
+    def test_defaults_to_null_pool(self):
+        with patch.object(settings, "database_pool_class", None), \
+                patch.object(settings, "database_external_pooler", True):
+            assert pool_class_name() == "null"
+
+    def test_small_local_pool_can_be_configured(self):
+        with patch.object(settings, "database_pool_class", "queue"), \
+                patch.object(settings, "database_external_pooler", True):
+            assert pool_class_name() == "queue"
+
+    def test_no_startup_options(self):
+        with patch.object(settings, "database_external_pooler", False):
+            direct = EngineRegistry._connect_args(self.POSTGRES_URL)
+        with patch.object(settings, "database_external_pooler", True):
+            pooled = EngineRegistry._connect_args(self.POSTGRES_URL)
+
+        assert "statement_timeout" in direct["options"]
+        assert "options" not in pooled
+        assert pooled["application_name"] == direct["application_name"]
+
+    def test_asyncpg_prepared_statements_disabled(self):
+        with patch.object(settings, "database_external_pooler", True):
+            connect_args = EngineRegistry._async_connect_args(self.POSTGRES_URL)
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+        assert set(connect_args["server_settings"]) == {"application_name"}
+
+    def test_asyncpg_uses_ssl_in_production(self):
+        with patch.object(settings, "environment", "production"), \
+                patch("src.database.engines.secrets_manager.get_secret", return_value=None):
+            production = EngineRegistry._async_connect_args(self.POSTGRES_URL)
+        development = EngineRegistry._async_connect_args(self.POSTGRES_URL)
+
+        assert isinstance(production["ssl"], ssl.SSLContext)
+        assert production["ssl"].verify_mode == ssl.CERT_NONE
+        assert "ssl" not in development
+
+    def test_engines_use_null_pool(self):
+        registry = EngineRegistry()
+        with patch("src.database.engines.get_secure_database_url", return_value=self.POSTGRES_URL), \
+                patch.object(settings, "database_pool_class", None), \
+                patch.object(settings, "database_external_pooler", True), \
+                patch.object(settings, "async_database_url", None):
+            engine = registry.get_engine()
+            async_engine = registry.get_async_engine()
+
+        assert isinstance(engine.pool, NullPool)
+        assert isinstance(async_engine.sync_engine.pool, NullPool)
+        assert async_engine.url.drivername == "postgresql+asyncpg"
+        engine.dispose()
+        asyncio.run(registry.dispose_async())
+
+
+def test_database_metrics_endpoint(registry):
+    with registry.get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    app.dependency_overrides[require_admin] = lambda: None
+    try:
+        with patch("src.main.engine_registry", registry), \
+                patch.object(settings, "metrics_endpoints_enabled", True):
+            response = TestClient(app).get("/metrics/database")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["pools"][PRIMARY]["checkouts"] == 1
+
+
+def test_metrics_endpoints_hidden_unless_enabled():
+    app.dependency_overrides[require_admin] = lambda: None
+    try:
+        client = TestClient(app)
+        responses = [client.get(path) for path in ("/metrics/database", "/metrics/redis")]
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [response.status_code for response in responses] == [404, 404]
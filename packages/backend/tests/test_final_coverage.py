@@ -337,15 +337,11 @@ class TestDatabaseConnection:
     """Test database connection utilities."""
     
     @patch('src.database.base.logger')
-    @patch('src.database.base.create_engine')
-    def test_init_db_success(self, mock_create_engine, mock_logger):
+    @patch('src.database.base.engine')
+    def test_init_db_success(self, mock_engine, mock_logger):
         """Test successful database initialization."""
         from src.database.base import init_db
         
-        # Mock successful engine creation
-        mock_engine = Mock()
-        mock_create_engine.return_value = mock_engine
-        
         # Mock metadata creation
         with patch('src.database.base.Base.metadata') as mock_metadata:
             init_db()
@@ -354,16 +350,17 @@ class TestDatabaseConnection:
             mock_logger.info.assert_called()
     
     @patch('src.database.base.logger')
-    @patch('src.database.base.create_engine')
-    def test_init_db_failure(self, mock_create_engine, mock_logger):
+    @patch('src.database.base.engine')
+    def test_init_db_failure(self, mock_engine, mock_logger):
         """Test database initialization failure."""
         from src.database.base import init_db
         
-        # Mock engine creation failure
-        mock_create_engine.side_effect = Exception("Database error")
-        
-        with pytest.raises(Exception):
-            init_db()
+        # Mock table creation failure
+        with patch('src.database.base.Base.metadata') as mock_metadata:
+            mock_metadata.create_all.side_effect = Exception("Database error")
+            
+            with pytest.raises(Exception):
+                init_db()
         
         mock_logger.error.assert_called()
 
@@ -0,0 +1,121 @@
+"""Tests for the query-shaped transaction indexes and the index advisor."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects import postgresql
+
+from src.database import Base
+from src.database import index_advisor
+from src.database.index_advisor import QUERY_INDEXES, _seq_scans, advise
+from src.database.models import Transaction
+from src.routers.dashboard import EFFECTIVE_CATEGORY
+
+INDEX_ADVISOR_TEST_DATABASE_URL = os.getenv("INDEX_ADVISOR_TEST_DATABASE_URL")
+
+
+class TestTransactionIndexes:
+    """Tests for the covering and expression indexes on transactions."""
+
+    def test_indexes_created_with_tables(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine, tables=[Transaction.__table__])
+
+        with engine.connect() as conn:
+            names = set(conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'transactions'"
+            )).scalars())
+
+        assert {"idx_transaction_user_date", "idx_transaction_user_category"} <= names
+        engine.dispose()
+
+    def test_covering_index_includes_aggregated_columns(self):
+        index = next(i for i in Transaction.__table__.indexes if i.name == "idx_transaction_user_date")
+
+        assert index.dialect_options["postgresql"]["include"] == [
+            "amount", "subcategory", "user_category_override", "pending"
+        ]
+
+    def test_category_expression_matches_index(self):
+        statement = select(EFFECTIVE_CATEGORY).group_by(EFFECTIVE_CATEGORY)
+        compiled = statement.compile(dialect=postgresql.dialect())
+
+        # A bound parameter would not match the indexed expression in generic plans
+        assert compiled.params == {}
+        assert "'Uncategorized'" in str(compiled)
+
+    def test_maintained_indexes_include_new_indexes(self):
+        assert "idx_transaction_user_date" in QUERY_INDEXES
+        assert "idx_transaction_user_category" in QUERY_INDEXES
+
+
+class TestPlanParsing:
+    """Tests for finding sequential scans in EXPLAIN output."""
+
+    def test_nested_filtered_seq_scans(self):
+        plan = {
+            "Node Type": "Hash Join",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "transactions_y2026",
+                 "Filter": "(merchant_name = $1)", "Plan Rows": 1200},
+                {"Node Type": "Hash", "Plans": [
+                    {"Node Type": "Seq Scan", "Relation Name": "accounts", "Plan Rows": 10},
+                ]},
+            ],
+        }
+
+        assert _seq_scans(plan) == [
+            {"table": "transactions_y2026", "filter": "(merchant_name = $1)", "estimated_rows": 1200}
+        ]
+
+    def test_index_scans_ignored(self):
+        plan = {"Node Type": "Index Only Scan", "Relation Name": "transactions",
+                "Index Name": "idx_transaction_user_date"}
+
+        assert _seq_scans(plan) == []
+
+    def test_candidates_filter_small_tables(self):
+        conn = MagicMock()
+        statement = {"query": "SELECT 1", "calls": 10, "total_ms": 50.0, "mean_ms": 5.0, "rows": 10}
+        plan = {"Node Type": "Append", "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "transactions_y2026", "Filter": "(name ~~ $1)"},
+            {"Node Type": "Seq Scan", "Relation Name": "categories", "Filter": "(name = $1)"},
+        ]}
+        with patch.object(index_advisor, "top_statements", return_value=[statement]), \
+                patch.object(index_advisor, "_generic_plan", return_value=plan), \
+                patch.object(index_advisor, "_table_rows",
+                             return_value={"transactions_y2026": 50000, "categories": 40}):
+            candidates = index_advisor.missing_index_candidates(conn, min_rows=10000)
+
+        assert [scan["table"] for scan in candidates[0]["scans"]] == ["transactions_y2026"]
+
+    def test_unexplainable_statements_reported_without_plans(self):
+        statement = {"query": "VACUUM transactions", "calls": 1, "total_ms": 900.0, "mean_ms": 900.0, "rows": 0}
+        with patch.object(index_advisor, "top_statements", return_value=[statement]), \
+                patch.object(index_advisor, "_generic_plan", return_value=None), \
+                patch.object(index_advisor, "_table_rows", return_value={}):
+            candidates = index_advisor.missing_index_candidates(MagicMock())
+
+        assert candidates == [{**statement, "scans": None}]
+
+    def test_advisor_requires_postgres(self):
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            with pytest.raises(ValueError):
+                advise(conn)
+        engine.dispose()
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not INDEX_ADVISOR_TEST_DATABASE_URL, reason="INDEX_ADVISOR_TEST_DATABASE_URL not set")
+def test_advisor_report_against_postgres():
+    engine = create_engine(INDEX_ADVISOR_TEST_DATABASE_URL)
+    with engine.connect() as conn:
+        report = advise(conn)
+    engine.dispose()
+
+    assert set(report) == {
+        "missing_query_indexes", "sequential_scan_tables", "unused_indexes", "statements"
+    }
@@ -0,0 +1,222 @@
+"""Tests for rule-driven journal entries from synced transactions."""
+
+import asyncio
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import JSON, Column, MetaData, Table, create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database import Base
+from src.database.bookkeeping_models import BookkeepingRule, JournalEntry, JournalEntryLine
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.routers.plaid import sync_plaid_item_transactions
+from src.services.journal_automation import (
+    CONDITION_FIELDS, JournalAutomation, RuleCompileError, compile_rule
+)
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot, JournalEntry)
+]
+
+
+def _sqlite_copy(table):
+    # chart_of_accounts lives in the legacy metadata and JSONB has no SQLite
+    # DDL, so these tables are created from plain copies of their columns
+    return Table(table.name, MetaData(), *(
+        Column(column.name, JSON() if isinstance(column.type, JSONB) else column.type,
+               primary_key=column.primary_key, nullable=column.nullable,
+               server_default=column.server_default)
+        for column in table.columns
+    ))
+
+
+@pytest.fixture
+def automation_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    _sqlite_copy(BookkeepingRule.__table__).create(bind=engine)
+    _sqlite_copy(JournalEntryLine.__table__).create(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="rules@example.com", username="rules", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_rules", access_token="token")
+    db.add(item)
+    db.flush()
+    account = Account(user_id=user.id, plaid_item_id=item.id, plaid_account_id="acct_rules",
+                      name="Checking", account_type="depository")
+    db.add(account)
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: statements.append(args[2]))
+
+    yield db, user, item, account, statements
+
+    db.close()
+    engine.dispose()
+
+
+def _rule(user_id, name, conditions, debit, credit, priority=100, **template):
+    return BookkeepingRule(
+        user_id=user_id, rule_name=name, rule_type="journal_entry", priority=priority,
+        trigger_conditions=conditions, execution_count=0, is_active=True,
+        journal_template={"debit_account_id": str(debit), "credit_account_id": str(credit),
+                          **template}
+    )
+
+
+class TestRuleCompilation:
+    """Tests for compiling trigger conditions and templates."""
+
+    def test_conditions_are_compiled(self):
+        rule = compile_rule(_rule(uuid4(), "Software", [
+            {"field": "merchant_name", "operator": "regex", "value": "github|gitlab"},
+            {"field": "amount", "operator": "gte", "value": "5"},
+        ], uuid4(), uuid4()))
+
+        assert rule.matches(Transaction(merchant_name="GitHub", amount=Decimal("7.00")))
+        assert not rule.matches(Transaction(merchant_name="GitHub", amount=Decimal("4.99")))
+        assert not rule.matches(Transaction(merchant_name=None, amount=Decimal("7.00")))
+
+    def test_every_field_reads_a_transaction_column(self, automation_db):
+        db, _, _, account, _ = automation_db
+        transaction = Transaction(
+            account_id=account.id, plaid_transaction_id="fields", amount=Decimal("12.00"),
+            date=date(2024, 5, 1), name="GitHub", merchant_name="GitHub Inc",
+            original_description="GITHUB.COM SF CA", transaction_type="digital",
+            payment_channel="online", plaid_category_id="18018000", subcategory="Software"
+        )
+        db.add(transaction)
+        db.commit()
+        db.refresh(transaction)
+        expected = {
+            "name": "GitHub", "merchant_name": "GitHub Inc",
+            "description": "GITHUB.COM SF CA", "amount": "12.00",
+            "transaction_type": "digital", "payment_channel": "online",
+            "account_id": str(account.id), "plaid_category_id": "18018000",
+            "subcategory": "Software",
+        }
+        assert set(expected) == set(CONDITION_FIELDS)
+
+        for field, value in expected.items():
+            rule = compile_rule(_rule(uuid4(), field, [
+                {"field": field, "operator": "eq", "value": value}
+            ], uuid4(), uuid4()))
+            assert rule.matches(transaction), field
+
+    @pytest.mark.parametrize("conditions,template", [
+        ([], {"debit_account_id": str(uuid4()), "credit_account_id": str(uuid4())}),
+        ({"field": "name", "operator": "regex", "value": "("},
+         {"debit_account_id": str(uuid4()), "credit_account_id": str(uuid4())}),
+        ({"field": "balance", "operator": "eq", "value": 1},
+         {"debit_account_id": str(uuid4()), "credit_account_id": str(uuid4())}),
+        ({"field": "payment_method", "operator": "eq", "value": "online"},
+         {"debit_account_id": str(uuid4()), "credit_account_id": str(uuid4())}),
+        ({"field": "name", "operator": "eq", "value": "Rent"}, {"debit_account_id": "x"}),
+    ])
+    def test_invalid_rules_are_rejected(self, conditions, template):
+        rule = BookkeepingRule(rule_name="Bad", rule_type="journal_entry",
+                               trigger_conditions=conditions, journal_template=template)
+        with pytest.raises(RuleCompileError):
+            compile_rule(rule)
+
+
+class TestJournalAutomation:
+    """Tests for applying rules to synced transactions."""
+
+    def test_batch_of_matches_is_written_in_bulk(self, automation_db):
+        db, user, _, account, statements = automation_db
+        expense, income, cash = uuid4(), uuid4(), uuid4()
+        software = _rule(user.id, "Software", {"conditions": [
+            {"field": "merchant_name", "operator": "in", "value": ["GitHub", "Figma"]}
+        ]}, expense, cash, priority=10, description="Subscription: {merchant_name}", post=True)
+        deposits = _rule(user.id, "Deposits", [
+            {"field": "amount", "operator": "lt", "value": 0}
+        ], cash, income, priority=20)
+        db.add_all([software, deposits])
+        db.commit()
+
+        transactions = []
+        for i, (merchant, amount) in enumerate((("GitHub", "7.00"), ("Figma", "15.00"),
+                                                ("Coffee", "4.50"), (None, "-250.00"))):
+            transactions.append(Transaction(
+                account_id=account.id, plaid_transaction_id=f"auto_{i}", amount=Decimal(amount),
+                date=date(2024, 5, 1), name=merchant or "Payroll", merchant_name=merchant
+            ))
+        db.add_all(transactions)
+        db.flush()
+
+        automation = JournalAutomation(db, user.id)
+        statements.clear()
+        created = automation.apply(transactions)
+        db.commit()
+
+        assert created == 3
+        writes = [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE"))]
+        assert len(writes) == 3
+
+        entries = db.query(JournalEntry).order_by(JournalEntry.entry_number).all()
+        assert [e.description for e in entries] == [
+            "Subscription: GitHub", "Subscription: Figma", "Payroll"
+        ]
+        assert [e.is_posted for e in entries] == [True, True, False]
+        assert {e.source_type for e in entries} == {"plaid_sync"}
+        assert entries[2].automation_rule_id == deposits.id
+
+        lines = db.execute(
+            JournalEntryLine.__table__.select().where(
+                JournalEntryLine.__table__.c.journal_entry_id == entries[2].id
+            ).order_by(JournalEntryLine.__table__.c.line_number)
+        ).all()
+        assert [(l.chart_account_id, l.debit_amount, l.credit_amount) for l in lines] == [
+            (income, Decimal("250.00"), Decimal("0.00")),
+            (cash, Decimal("0.00"), Decimal("250.00")),
+        ]
+
+        db.refresh(software)
+        db.refresh(deposits)
+        assert (software.execution_count, deposits.execution_count) == (2, 1)
+        assert software.last_executed is not None
+
+    def test_sync_runs_automation_per_page(self, automation_db):
+        db, user, item, _, _ = automation_db
+        db.add(_rule(user.id, "Everything", {"field": "amount", "operator": "gt", "value": 0},
+                     uuid4(), uuid4()))
+        db.commit()
+
+        def page(start, has_more):
+            return {
+                "added": [{"transaction_id": f"sync_{i}", "account_id": "acct_rules",
+                           "amount": 10 + i, "date": "2024-05-02", "name": f"Shop {i}"}
+                          for i in range(start, start + 3)],
+                "modified": [], "removed": [],
+                "next_cursor": f"cursor_{start}", "has_more": has_more,
+            }
+
+        sync = AsyncMock(side_effect=[page(0, True), page(3, False)])
+        with patch("src.routers.plaid.plaid_service.sync_transactions", sync):
+            result = asyncio.run(sync_plaid_item_transactions(item, db, str(user.id)))
+        db.commit()
+
+        assert result["new_transactions"] == 6
+        assert result["journal_entries_created"] == 6
+        assert db.query(JournalEntry).count() == 6
@@ -0,0 +1,226 @@
+"""Tests for bulk journal entry import and posting."""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, MetaData, Table, create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.main import app
+from src.database import Base, get_db
+from src.database.bookkeeping_models import AccountingPeriod, JournalEntry, JournalEntryLine
+from src.database.models import User
+from src.dependencies.auth import get_current_active_user
+from src.schemas.bookkeeping import JournalEntryCreate
+from src.services.journal_batch import allocate_entry_numbers, unbalanced_entries
+
+TABLES = [User.__table__, AccountingPeriod.__table__, JournalEntry.__table__]
+
+REDIS_PATCHES = (
+    "src.services.bookkeeping_status.get_redis_client_sync",
+    "src.services.chart_of_accounts_service.get_redis_client_sync",
+)
+
+
+def _lines_table() -> Table:
+    # chart_of_accounts lives in the legacy metadata, so create the lines
+    # table without its foreign keys
+    return Table("journal_entry_lines", MetaData(), *(
+        Column(column.name, column.type, primary_key=column.primary_key,
+               nullable=column.nullable, server_default=column.server_default)
+        for column in JournalEntryLine.__table__.columns
+    ))
+
+
+@pytest.fixture
+def journal_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    _lines_table().create(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="journal@example.com", username="journal", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.commit()
+    user.id
+
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: statements.append(args[2]))
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    with patch(REDIS_PATCHES[0], return_value=None), patch(REDIS_PATCHES[1], return_value=None):
+        yield db, user, statements, TestClient(app)
+    app.dependency_overrides.clear()
+
+    db.close()
+    engine.dispose()
+
+
+def _entry(amount, credit=None, **kwargs):
+    return {
+        "entry_date": "2024-12-31",
+        "description": "Year-end adjustment",
+        "lines": [
+            {"chart_account_id": str(uuid4()), "debit_amount": amount},
+            {"chart_account_id": str(uuid4()), "credit_amount": credit or amount},
+        ],
+        **kwargs,
+    }
+
+
+class TestBatchValidation:
+    """Tests for balance checks and entry numbering."""
+
+    def test_unbalanced_entries_found_in_one_pass(self):
+        entries = [JournalEntryCreate(**entry) for entry in (
+            _entry("100.00"),
+            _entry("100.00", "99.99"),
+            {"description": "Empty", "lines": []},
+            _entry("0.10", "0.1"),
+        )]
+
+        errors = unbalanced_entries(entries)
+
+        assert [(e["index"], e["reason"]) for e in errors] == [
+            (1, "debits do not equal credits"),
+            (2, "entry has no lines"),
+        ]
+        assert errors[0]["debits"] == Decimal("100.00")
+        assert errors[0]["credits"] == Decimal("99.99")
+
+    def test_entry_numbers_continue_the_sequence(self, journal_db):
+        db, user, _, _ = journal_db
+        for number in ("JE-202401-0007", "CE-202401-1b1df0f0"):
+            db.add(JournalEntry(user_id=user.id, entry_number=number, entry_date=date(2024, 1, 31),
+                                description="Existing", total_debits=Decimal("1"),
+                                total_credits=Decimal("1")))
+        db.flush()
+
+        numbers = allocate_entry_numbers(db, user.id, 3, on=date(2024, 2, 1))
+
+        assert numbers == ["JE-202402-0008", "JE-202402-0009", "JE-202402-0010"]
+
+    def test_entry_numbers_compare_numerically_past_9999(self, journal_db):
+        db, user, _, _ = journal_db
+        other = User(email="other@example.com", username="other", hashed_password="x")
+        db.add(other)
+        db.flush()
+        for owner, number in ((user, "JE-202402-9999"), (user, "JE-202402-10000"),
+                              (other, "JE-202402-0001")):
+            db.add(JournalEntry(user_id=owner.id, entry_number=number, entry_date=date(2024, 2, 1),
+                                description="Existing", total_debits=Decimal("1"),
+                                total_credits=Decimal("1")))
+        db.flush()
+
+        assert allocate_entry_numbers(db, user.id, 1, on=date(2024, 2, 1)) == ["JE-202402-10001"]
+
+        # Numbers are unique per user, so another user may reuse 10001
+        db.add(JournalEntry(user_id=other.id, entry_number="JE-202402-10001",
+                            entry_date=date(2024, 2, 1), description="Other",
+                            total_debits=Decimal("1"), total_credits=Decimal("1")))
+        db.flush()
+
+
+class TestBatchEndpoints:
+    """Tests for /journal-entries/batch and /journal-entries/post."""
+
+    def test_import_and_post_batch(self, journal_db):
+        db, _, statements, client = journal_db
+
+        statements.clear()
+        response = client.post("/api/v1/bookkeeping/journal-entries/batch", json={
+            "entries": [_entry(f"{i + 1}.00", reference=f"R{i}" if i % 2 else None)
+                        for i in range(500)],
+            "post": True,
+        })
+
+        assert response.status_code == 201, response.text
+        result = response.json()
+        assert result["entries"] == 500
+        assert result["lines"] == 1000
+        assert result["first_entry_number"].endswith("-0001")
+        assert result["last_entry_number"].endswith("-0500")
+        assert result["entries_per_second"] > 0
+        assert sum(s.lstrip().upper().startswith("INSERT") for s in statements) == 2
+        assert db.query(JournalEntry).filter(JournalEntry.is_posted.is_(True)).count() == 500
+
+    def test_unbalanced_batch_writes_nothing(self, journal_db):
+        db, _, _, client = journal_db
+
+        response = client.post("/api/v1/bookkeeping/journal-entries/batch", json={
+            "entries": [_entry("10.00"), _entry("10.00", "12.00")],
+        })
+
+        assert response.status_code == 400
+        assert "entry 1: debits do not equal credits" in response.json()["message"]
+        assert db.query(JournalEntry).count() == 0
+
+    def test_post_batch_is_all_or_nothing(self, journal_db):
+        db, _, statements, client = journal_db
+        client.post("/api/v1/bookkeeping/journal-entries/batch", json={
+            "entries": [_entry("10.00"), _entry("20.00"), _entry("30.00")],
+        })
+        ids = [str(entry.id) for entry in db.query(JournalEntry).order_by(JournalEntry.entry_number)]
+        db.query(JournalEntry).filter(JournalEntry.entry_number.like("%-0003")).update(
+            {"is_posted": True}, synchronize_session=False
+        )
+        db.commit()
+
+        rejected = client.post("/api/v1/bookkeeping/journal-entries/post",
+                               json={"entry_ids": ids})
+        assert rejected.status_code == 400
+        assert "already posted" in rejected.json()["message"]
+        assert db.query(JournalEntry).filter(JournalEntry.is_posted.is_(True)).count() == 1
+
+        statements.clear()
+        posted = client.post("/api/v1/bookkeeping/journal-entries/post",
+                             json={"entry_ids": ids[:2]})
+        assert posted.status_code == 200, posted.text
+        assert posted.json()["entries"] == 2
+        assert posted.json()["lines"] == 4
+        assert sum(s.lstrip().upper().startswith("UPDATE") for s in statements) == 1
+        db.expire_all()
+        assert db.query(JournalEntry).filter(JournalEntry.is_posted.is_(True)).count() == 3
+
+    def test_post_batch_reports_numbers_in_sequence_order(self, journal_db):
+        db, _, _, client = journal_db
+        client.post("/api/v1/bookkeeping/journal-entries/batch", json={
+            "entries": [_entry("10.00"), _entry("20.00"), _entry("30.00")],
+        })
+        entries = db.query(JournalEntry).order_by(JournalEntry.entry_number).all()
+        for entry, number in zip(entries, ("JE-202402-9999", "JE-202402-10000", "JE-202402-0998")):
+            entry.entry_number = number
+        db.commit()
+
+        response = client.post("/api/v1/bookkeeping/journal-entries/post",
+                               json={"entry_ids": [str(entry.id) for entry in entries]})
+
+        assert response.status_code == 200, response.text
+        assert response.json()["first_entry_number"] == "JE-202402-0998"
+        assert response.json()["last_entry_number"] == "JE-202402-10000"
+
+    def test_writes_keep_reads_on_primary(self, journal_db):
+        _, user, _, client = journal_db
+
+        with patch("src.services.journal_batch.mark_recent_write") as mark:
+            client.post("/api/v1/bookkeeping/journal-entries/batch", json={
+                "entries": [_entry("10.00")],
+            })
+            rejected = client.post("/api/v1/bookkeeping/journal-entries/batch", json={
+                "entries": [_entry("10.00", "12.00")],
+            })
+
+        assert rejected.status_code == 400
+        mark.assert_called_once_with(user.id)
@@ -4,11 +4,12 @@ Comprehensive test suite for optimistic locking implementation with SQLAlchemy 2
 Tests version management, concurrent updates, and distributed locking.
 """
 
+import asyncio
 import os
 import time
 import threading
 import pytest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, AsyncMock, MagicMock, call
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Set up test database
@@ -26,6 +27,7 @@ from src.core.locking import (
     OptimisticLockError,
     DistributedLock,
     DistributedLockError,
+    AsyncDistributedLock,
     RetryableOptimisticLock,
     safe_cursor_update,
     get_distributed_lock,
@@ -384,6 +386,117 @@ class TestDistributedLock:
         assert len(tokens) == 100
 
 
+class TestAsyncDistributedLock:
+    """Test the asyncio distributed lock."""
+
+    def setup_method(self):
+        """Set up an async Redis mock whose scripts reply in turn."""
+        self.scripts = {}
+        self.mock_redis = MagicMock()
+        self.mock_redis.zrem = AsyncMock()
+        self.mock_redis.delete = AsyncMock()
+        self.mock_redis.register_script.side_effect = self._register
+        self.lock = AsyncDistributedLock(redis_client=self.mock_redis)
+
+    def _register(self, source):
+        name = next(name for name in ("ACQUIRE_SCRIPT", "RELEASE_SCRIPT", "EXTEND_SCRIPT")
+                    if getattr(AsyncDistributedLock, name) == source)
+        return self.scripts.setdefault(name, AsyncMock(return_value=1))
+
+    def _script(self, name, **kwargs):
+        self.scripts[name] = AsyncMock(**kwargs)
+        return self.scripts[name]
+
+    async def test_acquire_waits_without_blocking_loop(self):
+        """Test that retries sleep on the event loop."""
+        acquire = self._script("ACQUIRE_SCRIPT", side_effect=[0, 0, 1])
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        token = await self.lock.acquire_lock("test_resource", timeout=1.0, retry_interval=0.05)
+        task.cancel()
+
+        assert token is not None
+        assert acquire.await_count == 3
+        assert len(ticks) >= 5
+        keys = acquire.await_args.kwargs["keys"]
+        assert keys == ["manna:lock:test_resource", "manna:lock:test_resource:queue"]
+
+    async def test_acquire_timeout_leaves_queue(self):
+        """Test that a timed-out waiter removes itself from the queue."""
+        self._script("ACQUIRE_SCRIPT", return_value=0)
+
+        token = await self.lock.acquire_lock("test_resource", timeout=0.05, retry_interval=0.01)
+
+        assert token is None
+        self.mock_redis.zrem.assert_awaited_once()
+        assert self.mock_redis.zrem.await_args.args[0] == "manna:lock:test_resource:queue"
+        self.mock_redis.delete.assert_awaited_once()
+
+    async def test_redis_error_raises_lock_error(self):
+        """Test that Redis errors surface as DistributedLockError."""
+        import redis
+        self._script("ACQUIRE_SCRIPT", side_effect=redis.ConnectionError("down"))
+
+        with pytest.raises(DistributedLockError):
+            await self.lock.acquire_lock("test_resource", timeout=0.1)
+
+    async def test_lock_context_manager_failure(self):
+        """Test that the context manager raises when the lock is not acquired."""
+        self._script("ACQUIRE_SCRIPT", return_value=0)
+
+        with pytest.raises(DistributedLockError):
+            async with self.lock.lock("test_resource", timeout=0.02):
+                pass
+
+    async def test_auto_extend_task_cancelled_on_exit(self):
+        """Test that auto-extension runs as a task and stops on release."""
+        extend = self._script("EXTEND_SCRIPT", return_value=1)
+        release = self._script("RELEASE_SCRIPT", return_value=1)
+
+        async with self.lock.lock("test_resource", auto_extend=True, auto_extend_interval=0.02) as token:
+            await asyncio.sleep(0.07)
+
+        calls = extend.await_count
+        await asyncio.sleep(0.05)
+
+        assert calls >= 2
+        assert extend.await_count == calls
+        assert release.await_args.kwargs["args"] == [token]
+
+    @pytest.mark.integration
+    @pytest.mark.skipif(not os.getenv("LOCK_TEST_REDIS_URL"), reason="LOCK_TEST_REDIS_URL not set")
+    async def test_waiters_served_in_arrival_order(self):
+        """Test fairness against a real Redis."""
+        import redis.asyncio as redis_async
+
+        client = redis_async.from_url(os.environ["LOCK_TEST_REDIS_URL"], decode_responses=True)
+        lock = AsyncDistributedLock(redis_client=client)
+        resource = f"fairness:{time.time()}"
+        order = []
+
+        async def worker(index):
+            async with lock.lock(resource, timeout=5.0):
+                order.append(index)
+                await asyncio.sleep(0.02)
+
+        holder = await lock.acquire_lock(resource)
+        tasks = []
+        for index in range(4):
+            tasks.append(asyncio.create_task(worker(index)))
+            await asyncio.sleep(0.05)
+        await lock.release_lock(resource, holder)
+        await asyncio.gather(*tasks)
+        await client.aclose()
+
+        assert order == [0, 1, 2, 3]
+
+
 class TestConcurrentUpdates:
     """Test concurrent update scenarios."""
 
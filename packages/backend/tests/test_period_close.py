@@ -0,0 +1,296 @@
+"""Tests for the accounting period close pipeline."""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, MetaData, Table, create_engine, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.main import app
+from src.database import Base, get_db
+from models.tax_categorization import ChartOfAccount
+from src.database.bookkeeping_models import (
+    AccountingPeriod, JournalEntry, JournalEntryLine, PeriodClosingBalance, ReconciliationItem,
+    ReconciliationRecord
+)
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.dependencies.auth import get_current_active_user
+from src.services.period_close import (
+    PeriodCloseError,
+    PeriodCloseService,
+    build_closing_lines,
+    create_period_close_job,
+    get_period_close_job,
+    run_period_close_job,
+)
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot, ReconciliationRecord, ReconciliationItem,
+                  AccountingPeriod, JournalEntry)
+]
+
+CLOSE_REDIS = "src.utils.job_store.get_redis_client_sync"
+REDIS_PATCHES = (
+    CLOSE_REDIS,
+    "src.services.bookkeeping_status.get_redis_client_sync",
+    "src.services.chart_of_accounts_service.get_redis_client_sync",
+)
+
+
+def _without_foreign_keys(table, skip=()):
+    # chart_of_accounts lives in the legacy metadata (with a JSONB column), so
+    # the ledger tables are created from plain copies of their columns
+    return Table(table.name, MetaData(), *(
+        Column(column.name, column.type, primary_key=column.primary_key,
+               nullable=column.nullable, server_default=column.server_default)
+        for column in table.columns if column.name not in skip
+    ))
+
+
+@pytest.fixture
+def close_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="close@example.com", username="close", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_close", access_token="token")
+    db.add(item)
+    db.flush()
+    account = Account(user_id=user.id, plaid_item_id=item.id, plaid_account_id="acct_close",
+                      name="Checking", account_type="depository")
+    db.add(account)
+    db.flush()
+    for i in range(3):
+        db.add(Transaction(account_id=account.id, plaid_transaction_id=f"c_{i}",
+                           amount=Decimal("10.00"), date=date(2024, 3, 10 + i), name=f"Txn {i}",
+                           user_category_override="Food" if i else None))
+    # Outside the period, must not be counted
+    db.add(Transaction(account_id=account.id, plaid_transaction_id="c_april",
+                       amount=Decimal("10.00"), date=date(2024, 4, 2), name="April"))
+    db.add(JournalEntry(user_id=user.id, entry_number="JE-1", entry_date=date(2024, 3, 15),
+                        description="Accrual", total_debits=Decimal("5"),
+                        total_credits=Decimal("5"), is_posted=False))
+    period = AccountingPeriod(user_id=user.id, period_name="March 2024", period_type="monthly",
+                              start_date=date(2024, 3, 1), end_date=date(2024, 3, 31))
+    db.add(period)
+    db.commit()
+
+    yield db, user, period, engine
+
+    db.close()
+    engine.dispose()
+
+
+class TestClosingLines:
+    """Tests for building the closing entry lines."""
+
+    def test_zeroes_income_statement_into_retained_earnings(self):
+        revenue, expense, cash, retained = uuid4(), uuid4(), uuid4(), uuid4()
+        lines = build_closing_lines([
+            {"chart_account_id": revenue, "account_type": "revenue",
+             "debits": Decimal("0"), "credits": Decimal("1000.00")},
+            {"chart_account_id": expense, "account_type": "expense",
+             "debits": Decimal("400.00"), "credits": Decimal("0")},
+            {"chart_account_id": cash, "account_type": "asset",
+             "debits": Decimal("1000.00"), "credits": Decimal("400.00")},
+        ], retained)
+
+        assert [(line["chart_account_id"], line["debit_amount"], line["credit_amount"])
+                for line in lines] == [
+            (revenue, Decimal("1000.00"), Decimal("0.00")),
+            (expense, Decimal("0.00"), Decimal("400.00")),
+            (retained, Decimal("0.00"), Decimal("600.00")),
+        ]
+        assert [line["line_number"] for line in lines] == [1, 2, 3]
+        assert sum(l["debit_amount"] for l in lines) == sum(l["credit_amount"] for l in lines)
+
+    def test_nothing_to_close(self):
+        assert build_closing_lines([
+            {"chart_account_id": uuid4(), "account_type": "expense",
+             "debits": Decimal("50"), "credits": Decimal("50")},
+        ], None) == []
+
+    def test_requires_retained_earnings(self):
+        with pytest.raises(PeriodCloseError):
+            build_closing_lines([
+                {"chart_account_id": uuid4(), "account_type": "revenue",
+                 "debits": Decimal("0"), "credits": Decimal("10")},
+            ], None)
+
+
+class TestPeriodCloseService:
+    """Tests for period validation and totals."""
+
+    def test_preconditions(self, close_db):
+        db, _, period, _ = close_db
+
+        issues = PeriodCloseService(db).check_preconditions(period)
+
+        assert issues == [
+            "1 transactions in the period are uncategorized",
+            "1 journal entries in the period are not posted",
+            "1 accounts are not reconciled through 2024-03-31",
+        ]
+
+    def test_period_totals_is_one_grouped_query(self, close_db):
+        db, _, period, _ = close_db
+        period.user_id  # load the expired period before capturing
+        captured = []
+        real_execute = db.execute
+
+        def capture(statement, *args, **kwargs):
+            captured.append(statement)
+            raise RuntimeError("stop")
+
+        db.execute = capture
+        try:
+            with pytest.raises(RuntimeError):
+                PeriodCloseService(db).period_totals(period)
+        finally:
+            db.execute = real_execute
+
+        sql = str(captured[0].compile(dialect=postgresql.dialect()))
+        assert "GROUP BY journal_entry_lines.chart_account_id" in sql
+        assert "journal_entries.is_posted IS true" in sql
+
+    def test_close_refused_when_not_ready(self, close_db):
+        db, _, period, _ = close_db
+
+        with pytest.raises(PeriodCloseError) as excinfo:
+            PeriodCloseService(db).close_period(period)
+
+        assert len(excinfo.value.issues) == 3
+        assert not period.is_closed
+
+
+class TestPeriodCloseJobs:
+    """Tests for background period close jobs."""
+
+    def test_failed_job_records_issues(self, close_db):
+        db, user, period, engine = close_db
+
+        with patch(CLOSE_REDIS, return_value=None):
+            job = create_period_close_job(user.id, period.id)
+            run_period_close_job(job["job_id"], engine)
+            finished = get_period_close_job(job["job_id"])
+
+        assert finished["status"] == "failed"
+        assert finished["step"] == "validating"
+        assert len(finished["issues"]) == 3
+        assert finished["completed_at"] is not None
+
+    def test_job_endpoints(self, close_db):
+        db, user, period, _ = close_db
+
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        try:
+            with patch(CLOSE_REDIS, return_value=None):
+                client = TestClient(app)
+                started = client.post(f"/api/v1/bookkeeping/periods/{period.id}/close/jobs")
+                status = client.get(
+                    f"/api/v1/bookkeeping/periods/close/jobs/{started.json()['job_id']}"
+                )
+                sync = client.post("/api/v1/bookkeeping/periods/close", json=str(period.id))
+                balances = client.get(f"/api/v1/bookkeeping/periods/{period.id}/closing-balances")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert started.status_code == 202, started.text
+        assert started.json()["status"] == "pending"
+        assert status.status_code == 200
+        assert status.json()["status"] == "failed"
+        assert sync.status_code == 400
+        assert "not posted" in sync.json()["message"]
+        assert balances.status_code == 400
+
+
+class TestClosePipeline:
+    """End-to-end close: closing entry, closing balances and roll-forward."""
+
+    @pytest.fixture
+    def ledger(self, close_db):
+        db, user, period, engine = close_db
+        chart = _without_foreign_keys(ChartOfAccount.__table__, skip={"account_metadata"})
+        for table in (chart, _without_foreign_keys(JournalEntryLine.__table__),
+                      _without_foreign_keys(PeriodClosingBalance.__table__)):
+            table.create(bind=engine)
+
+        accounts = {}
+        for code, name, account_type, normal in (
+            ("1000", "Cash", "asset", "debit"),
+            ("3100", "Retained Earnings", "equity", "credit"),
+            ("4000", "Sales", "revenue", "credit"),
+            ("6000", "Rent", "expense", "debit"),
+        ):
+            accounts[name] = uuid4()
+            db.execute(insert(chart).values(
+                id=accounts[name], user_id=user.id, account_code=code, account_name=name,
+                account_type=account_type, normal_balance=normal, is_active=True,
+                is_system_account=False
+            ))
+        db.query(JournalEntry).update({"is_posted": True}, synchronize_session=False)
+        entry = JournalEntry(user_id=user.id, entry_number="JE-2", entry_date=date(2024, 3, 20),
+                             description="Sales less rent", total_debits=Decimal("1000"),
+                             total_credits=Decimal("1000"), is_posted=True)
+        db.add(entry)
+        db.flush()
+        db.execute(insert(JournalEntryLine.__table__), [
+            {"journal_entry_id": entry.id, "chart_account_id": accounts["Cash"], "line_number": 1,
+             "debit_amount": Decimal("600"), "credit_amount": Decimal("0")},
+            {"journal_entry_id": entry.id, "chart_account_id": accounts["Rent"], "line_number": 2,
+             "debit_amount": Decimal("400"), "credit_amount": Decimal("0")},
+            {"journal_entry_id": entry.id, "chart_account_id": accounts["Sales"], "line_number": 3,
+             "debit_amount": Decimal("0"), "credit_amount": Decimal("1000")},
+        ])
+        db.commit()
+        return db, user, period, accounts
+
+    def test_close_and_roll_forward(self, ledger):
+        db, user, period, accounts = ledger
+
+        with patch(REDIS_PATCHES[0], return_value=None), \
+                patch(REDIS_PATCHES[1], return_value=None), \
+                patch(REDIS_PATCHES[2], return_value=None):
+            service = PeriodCloseService(db)
+            result = service.close_period(period, force=True)
+
+            april = AccountingPeriod(user_id=user.id, period_name="April 2024",
+                                     period_type="monthly", start_date=date(2024, 4, 1),
+                                     end_date=date(2024, 4, 30))
+            db.add(april)
+            db.commit()
+            service.close_period(april, force=True)
+
+        assert result["closing_lines"] == 3
+        assert result["accounts_snapshotted"] == 4
+        assert period.is_closed and period.closing_journal_entry_id is not None
+
+        march = {row["account_name"]: row for row in service.closing_balances(period.id)}
+        assert march["Cash"]["balance"] == 600.0
+        assert march["Sales"]["balance"] == 0.0
+        assert march["Sales"]["period_credits"] == 1000.0
+        assert march["Rent"]["balance"] == 0.0
+        assert march["Retained Earnings"]["balance"] == 600.0
+
+        rolled = {row["account_name"]: row["balance"] for row in service.closing_balances(april.id)}
+        assert rolled == {"Cash": 600.0, "Retained Earnings": 600.0, "Sales": 0.0, "Rent": 0.0}
@@ -0,0 +1,77 @@
+"""
+Integration tests for the external pooler (PgBouncer transaction pooling) mode.
+
+Skipped unless PGBOUNCER_TEST_URL points at a PgBouncer in transaction
+pooling mode, e.g. from docker-compose.pgbouncer.yml.
+"""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+
+from src.config import settings
+from src.database.engines import EngineRegistry
+
+PGBOUNCER_TEST_URL = os.getenv("PGBOUNCER_TEST_URL")
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not PGBOUNCER_TEST_URL, reason="PGBOUNCER_TEST_URL not set"),
+]
+
+
+@pytest.fixture
+def registry():
+    with patch("src.database.engines.get_secure_database_url", return_value=PGBOUNCER_TEST_URL), \
+            patch.object(settings, "database_external_pooler", True), \
+            patch.object(settings, "database_pool_class", None), \
+            patch.object(settings, "async_database_url", None):
+        registry = EngineRegistry()
+        yield registry
+        registry.dispose()
+        asyncio.run(registry.dispose_async())
+
+
+def test_sync_engine_runs_repeated_transactions(registry):
+    engine = registry.get_engine()
+
+    for value in range(50):
+        with engine.begin() as conn:
+            assert conn.execute(text("SELECT :value"), {"value": value}).scalar() == value
+
+    assert registry.metrics()["primary"]["pool_class"] == "NullPool"
+
+
+def test_transaction_scoped_advisory_lock(registry):
+    with registry.get_engine().begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": "pgbouncer-test"})
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_async_engine_repeats_statements_without_prepared_statement_errors(registry):
+    async def run_queries(worker: int):
+        factory = registry.get_async_session_factory()
+        for value in range(20):
+            async with factory() as session:
+                result = await session.execute(
+                    text("SELECT CAST(:value AS integer) + CAST(:worker AS integer)"),
+                    {"value": value, "worker": worker}
+                )
+                assert result.scalar() == value + worker
+
+    async def main():
+        await asyncio.gather(*(run_queries(worker) for worker in range(25)))
+
+    asyncio.run(main())
+
+    assert registry.metrics()["async_primary"]["checkouts"] == 500
+
+
+def test_application_name_is_kept(registry):
+    with registry.get_engine().connect() as conn:
+        name = conn.execute(text("SELECT current_setting('application_name')")).scalar()
+
+    assert name == f"manna_{settings.environment}"
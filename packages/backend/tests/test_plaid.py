@@ -1,13 +1,16 @@
 """Tests for Plaid integration endpoints."""
 
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 from uuid import uuid4
 from datetime import datetime, timedelta
 
 from src.database.models import User, PlaidItem, Institution, Account, Transaction
+from src.routers.plaid import sync_plaid_item_transactions
 
 
 class TestPlaidLinkEndpoints:
@@ -446,6 +449,33 @@ class TestPlaidTransactionSync:
         assert response.status_code == 404
 
 
+class TestSyncDeduplication:
+    """Tests for the per-item lock guarding transaction de-duplication."""
+
+    @staticmethod
+    def _sync(dialect):
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = dialect
+        plaid_item = MagicMock(id=uuid4(), cursor=None, status="active")
+        page = {"added": [], "modified": [], "removed": [], "next_cursor": "c1", "has_more": False}
+        with patch("src.routers.plaid.plaid_service.sync_transactions",
+                   AsyncMock(return_value=page)):
+            asyncio.run(sync_plaid_item_transactions(plaid_item, db, str(uuid4())))
+        return db, plaid_item
+
+    def test_sync_takes_item_lock_on_postgres(self):
+        db, plaid_item = self._sync("postgresql")
+
+        statement, params = db.execute.call_args.args
+        assert "pg_advisory_xact_lock" in str(statement)
+        assert params == {"key": f"plaid_item_transactions:{plaid_item.id}"}
+
+    def test_sync_skips_lock_elsewhere(self):
+        db, _ = self._sync("sqlite")
+
+        db.execute.assert_not_called()
+
+
 class TestPlaidWebhooks:
     """Test Plaid webhook handling."""
     
@@ -0,0 +1,151 @@
+"""Tests for the sliding window rate limiter and its in-process fallback."""
+
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from src.config import settings
+from src.middleware import rate_limit
+from src.middleware.rate_limit import LocalRateLimiter, RateLimitMiddleware
+
+RATE_LIMIT_TEST_REDIS_URL = os.getenv("RATE_LIMIT_TEST_REDIS_URL")
+
+
+class TestLocalRateLimiter:
+    """Tests for the in-process sliding window limiter."""
+
+    def test_denies_past_limit_without_counting(self):
+        limiter = LocalRateLimiter([(3, 60)])
+
+        results = [limiter.check("ip:1", 1, 120.0) for _ in range(4)]
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert [result.remaining for result in results] == [2, 1, 0, 0]
+        assert limiter.check("ip:2", 1, 120.0).allowed
+
+    def test_previous_window_weighted_by_overlap(self):
+        limiter = LocalRateLimiter([(10, 60)])
+        for _ in range(10):
+            limiter.check("ip:1", 1, 110.0)
+
+        # Halfway through the next window half the previous count still applies
+        assert limiter.check("ip:1", 1, 150.0).remaining == 4
+        # Near its end almost none does
+        assert limiter.check("ip:1", 1, 179.0).remaining == 7
+
+    def test_cost_counts_against_every_window(self):
+        limiter = LocalRateLimiter([(20, 60), (25, 3600)])
+
+        first = limiter.check("ip:1", 10, 60.0)
+        second = limiter.check("ip:1", 10, 60.0)
+        third = limiter.check("ip:1", 10, 3540.0)
+
+        assert first.allowed and second.allowed and not third.allowed
+        assert (third.limit, third.remaining, third.reset) == (25, 5, 3600)
+
+    def test_sweep_drops_stale_counters(self):
+        limiter = LocalRateLimiter([(5, 60)])
+        limiter.check("ip:1", 1, 0.0)
+        limiter.check("ip:2", 1, 200.0)
+
+        assert {key[0] for key in limiter._counts} == {"ip:2"}
+
+
+def _script_returning(reply):
+    script = AsyncMock(return_value=reply)
+    redis = MagicMock()
+    redis.register_script.return_value = script
+    return redis, script
+
+
+@pytest.fixture
+def production_settings():
+    with patch.object(settings, "environment", "production"):
+        yield
+
+
+class TestRateLimitMiddleware:
+    """Tests for the middleware's single Redis call and fallback."""
+
+    def test_one_script_call_sets_headers(self, production_settings):
+        redis, script = _script_returning([1, 7, 7])
+        middleware = RateLimitMiddleware(PlainTextResponse("ok"))
+
+        with patch.object(rate_limit, "get_redis_client", AsyncMock(return_value=redis)):
+            response = TestClient(middleware).get("/api/v1/accounts/")
+
+        assert response.status_code == 200
+        assert response.headers["x-ratelimit-limit"] == "60"
+        assert response.headers["x-ratelimit-remaining"] == "53"
+        script.assert_awaited_once()
+        keys = script.await_args.kwargs["keys"]
+        assert len(keys) == 4 and all(key.startswith("rate_limit:{ip:testclient}:") for key in keys)
+
+    def test_denied_request_gets_retry_after(self, production_settings):
+        redis, _ = _script_returning([0, 60, 60])
+        middleware = RateLimitMiddleware(PlainTextResponse("ok"))
+
+        with patch.object(rate_limit, "get_redis_client", AsyncMock(return_value=redis)):
+            response = TestClient(middleware).get("/api/v1/accounts/")
+
+        assert response.status_code == 429
+        assert response.headers["x-ratelimit-remaining"] == "0"
+        assert 1 <= int(response.headers["retry-after"]) <= 60
+
+    def test_route_cost_sent_to_script(self, production_settings):
+        redis, script = _script_returning([1, 10, 10])
+        middleware = RateLimitMiddleware(PlainTextResponse("ok"))
+
+        with patch.object(rate_limit, "get_redis_client", AsyncMock(return_value=redis)):
+            TestClient(middleware).get("/api/v1/transactions/export/csv")
+
+        assert script.await_args.kwargs["args"][1] == 10
+        assert middleware._get_cost("/api/v1/transactions/") == 1
+        assert middleware._get_cost("/api/v1/reports/profit-loss") == 5
+
+    async def test_slow_redis_falls_back_to_local_limiter(self, production_settings):
+        async def slow_client():
+            await asyncio.sleep(1)
+
+        middleware = RateLimitMiddleware(PlainTextResponse("ok"), requests_per_minute=2)
+        get_client = AsyncMock(side_effect=slow_client)
+
+        with patch.object(rate_limit, "get_redis_client", get_client):
+            started = time.perf_counter()
+            results = [await middleware._check_rate_limit("ip:1") for _ in range(3)]
+            elapsed = time.perf_counter() - started
+
+        assert [result.allowed for result in results] == [True, True, False]
+        # Redis is skipped for the fallback period after the first timeout
+        assert get_client.await_count == 1
+        assert elapsed < 0.5
+
+    async def test_missing_redis_uses_local_limiter(self, production_settings):
+        middleware = RateLimitMiddleware(PlainTextResponse("ok"))
+
+        with patch.object(rate_limit, "get_redis_client", AsyncMock(return_value=None)):
+            result = await middleware._check_rate_limit("ip:1")
+
+        assert result.allowed and result.remaining == 59
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not RATE_LIMIT_TEST_REDIS_URL, reason="RATE_LIMIT_TEST_REDIS_URL not set")
+async def test_script_against_redis(production_settings):
+    import redis.asyncio as redis_async
+
+    client = redis_async.from_url(RATE_LIMIT_TEST_REDIS_URL, decode_responses=True)
+    middleware = RateLimitMiddleware(PlainTextResponse("ok"), requests_per_minute=3)
+    client_id = f"test:{time.time()}"
+
+    with patch.object(rate_limit, "get_redis_client", AsyncMock(return_value=client)):
+        results = [await middleware._check_rate_limit(client_id) for _ in range(4)]
+    await client.aclose()
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results] == [2, 1, 0, 0]
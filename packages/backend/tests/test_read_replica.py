@@ -0,0 +1,211 @@
+"""Tests for routing read-only sessions to the read replica."""
+
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.config import settings
+from src.database import Base, get_async_db, get_db
+from src.database import routing
+from src.database.engines import EngineRegistry
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.database.routing import (
+    async_use_replica, has_recent_write, mark_recent_write, reset_replica_routing, use_replica
+)
+from src.dependencies.auth import (
+    get_current_active_user, get_current_user, get_current_verified_user
+)
+from src.main import app
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot)
+]
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Primary and replica SQLite files with the replica registered."""
+    primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    registry = EngineRegistry()
+    reset_replica_routing()
+    with patch("src.database.engines.get_secure_database_url", return_value=primary_url), \
+            patch.object(settings, "database_pool_class", "null"), \
+            patch.object(settings, "database_replica_url", replica_url), \
+            patch.object(settings, "async_database_url", None), \
+            patch("src.database.routing.engine_registry", registry), \
+            patch("src.database.routing.get_redis_client_sync", return_value=None), \
+            patch("src.database.routing.get_redis_client", AsyncMock(return_value=None)):
+        yield {"primary": primary_url, "replica": replica_url, "registry": registry}
+    reset_replica_routing()
+    registry.dispose()
+    asyncio.run(registry.dispose_async())
+
+
+class TestReplicaRouting:
+    """Tests for the routing decision."""
+
+    def test_primary_without_replica(self, databases):
+        with patch.object(settings, "database_replica_url", None):
+            assert use_replica("user-1") is False
+
+    def test_replica_when_current(self, databases):
+        assert use_replica("user-1") is True
+
+    def test_primary_when_replica_lags(self, databases):
+        with patch("src.database.routing._measure_lag", return_value=30.0):
+            assert use_replica("user-1") is False
+
+    def test_primary_when_lag_check_fails(self, databases):
+        with patch("src.database.routing._measure_lag", side_effect=Exception("replica down")):
+            assert use_replica("user-1") is False
+
+    def test_lag_is_cached_between_checks(self, databases):
+        with patch("src.database.routing._measure_lag", return_value=0.0) as measure:
+            assert use_replica("user-1") is True
+            assert use_replica("user-2") is True
+
+        assert measure.call_count == 1
+
+    def test_recent_writer_reads_primary(self, databases):
+        mark_recent_write("user-1")
+
+        assert use_replica("user-1") is False
+        assert use_replica("user-2") is True
+
+    def test_recent_write_expires(self, databases):
+        with patch.object(settings, "database_read_your_writes_seconds", 0):
+            mark_recent_write("user-1")
+
+        assert has_recent_write("user-1") is False
+
+    def test_recent_write_is_shared_through_redis(self, databases):
+        redis_client = Mock()
+        redis_client.exists.return_value = 1
+        with patch("src.database.routing.get_redis_client_sync", return_value=redis_client):
+            mark_recent_write("user-1")
+            reset_replica_routing()
+
+            assert has_recent_write("user-1") is True
+
+        redis_client.setex.assert_called_once_with(
+            "read_primary:user-1", settings.database_read_your_writes_seconds, "1"
+        )
+
+    def test_marking_is_skipped_without_replica(self, databases):
+        with patch.object(settings, "database_replica_url", None):
+            mark_recent_write("user-1")
+
+        assert has_recent_write("user-1") is False
+
+    def test_async_routing(self, databases):
+        assert asyncio.run(async_use_replica("user-1")) is True
+
+        mark_recent_write("user-1")
+        assert asyncio.run(async_use_replica("user-1")) is False
+
+
+@pytest.fixture
+def replica_client(databases):
+    """Client whose primary is empty and whose replica holds the user's data."""
+    primary = create_engine(databases["primary"])
+    replica = create_engine(databases["replica"])
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine, tables=TABLES)
+
+    db = sessionmaker(bind=replica, expire_on_commit=False)()
+    user = User(email="replica@example.com", username="replica", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_replica", access_token="token")
+    db.add(item)
+    db.flush()
+    account = Account(user_id=user.id, plaid_item_id=item.id, plaid_account_id="acct_replica",
+                      name="Checking", account_type="depository", account_subtype="checking",
+                      current_balance=Decimal("1500.00"))
+    db.add(account)
+    db.flush()
+    db.add(Transaction(account_id=account.id, plaid_transaction_id="txn_replica",
+                       amount=Decimal("12.50"), date=account.created_at.date(), name="Coffee"))
+    db.commit()
+    db.close()
+
+    async_primary = create_async_engine(
+        databases["primary"].replace("sqlite://", "sqlite+aiosqlite://"), poolclass=NullPool
+    )
+    async_primary_session = async_sessionmaker(async_primary, expire_on_commit=False)
+    primary_session = sessionmaker(bind=primary)
+
+    def override_get_db():
+        session = primary_session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async def override_get_async_db():
+        async with async_primary_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    for dependency in (get_current_user, get_current_active_user, get_current_verified_user):
+        app.dependency_overrides[dependency] = lambda: user
+
+    yield TestClient(app), user
+
+    app.dependency_overrides.clear()
+    primary.dispose()
+    replica.dispose()
+    asyncio.run(async_primary.dispose())
+
+
+class TestReadOnlyRoutes:
+    """Tests for routes served through the read-only dependencies."""
+
+    def test_dashboard_reads_replica(self, replica_client):
+        client, _ = replica_client
+
+        response = client.get("/api/v1/dashboard/summary")
+
+        assert response.status_code == 200
+        assert response.json()["data"]["totalAssets"] == 1500.0
+
+    def test_dashboard_reads_primary_after_write(self, replica_client):
+        client, user = replica_client
+        mark_recent_write(user.id)
+
+        response = client.get("/api/v1/dashboard/summary")
+
+        assert response.status_code == 200
+        assert response.json()["data"]["totalAssets"] == 0
+
+    def test_csv_export_reads_replica(self, replica_client):
+        client, _ = replica_client
+
+        response = client.get("/api/v1/transactions/export/csv")
+
+        assert response.status_code == 200
+        assert "Coffee" in response.text
+
+    def test_csv_export_falls_back_to_primary(self, replica_client):
+        client, _ = replica_client
+
+        with patch.object(routing, "_measure_lag", return_value=60.0):
+            response = client.get("/api/v1/transactions/export/csv")
+
+        assert response.status_code == 200
+        assert "Coffee" not in response.text
@@ -0,0 +1,244 @@
+"""Tests for statement parsing and automatic reconciliation matching."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.main import app
+from src.database import Base, get_db
+from src.database.bookkeeping_models import ReconciliationItem, ReconciliationRecord
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.dependencies.auth import get_current_active_user
+from src.services.reconciliation import (
+    ReconciliationMatcher,
+    StatementLine,
+    StatementParseError,
+    parse_statement,
+    parse_statement_csv,
+)
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot, ReconciliationRecord, ReconciliationItem)
+]
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240305120000
+<TRNAMT>-42.50
+<FITID>A1
+<NAME>COFFEE SHOP #12
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240306
+<TRNAMT>1000.00
+<FITID>A2
+<MEMO>PAYROLL
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+@pytest.fixture
+def recon_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="recon@example.com", username="recon", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_recon", access_token="token")
+    db.add(item)
+    db.flush()
+    account = Account(user_id=user.id, plaid_item_id=item.id, plaid_account_id="acct_recon",
+                      name="Checking", account_type="depository")
+    db.add(account)
+    db.flush()
+    reconciliation = ReconciliationRecord(account_id=account.id,
+                                          reconciliation_date=date(2024, 3, 31),
+                                          statement_balance=Decimal("0"), book_balance=Decimal("0"),
+                                          discrepancy_amount=Decimal("0"), status="pending")
+    db.add(reconciliation)
+    db.commit()
+
+    yield db, user, account, reconciliation, engine
+
+    db.close()
+    engine.dispose()
+
+
+def _add(db, account, key, amount, txn_date, name, **kwargs):
+    transaction = Transaction(account_id=account.id, plaid_transaction_id=key,
+                              amount=Decimal(amount), date=txn_date, name=name, **kwargs)
+    db.add(transaction)
+    db.flush()
+    return transaction
+
+
+class TestStatementParsing:
+    """Tests for CSV and OFX statement parsing."""
+
+    def test_csv_with_amount_column(self):
+        lines = parse_statement_csv(
+            "Date,Description,Amount\n2024-03-05,Coffee,\"(1,042.50)\"\n03/06/2024,Payroll,$1000\n"
+        )
+        assert lines == [
+            StatementLine(date(2024, 3, 5), Decimal("-1042.50"), "Coffee"),
+            StatementLine(date(2024, 3, 6), Decimal("1000"), "Payroll"),
+        ]
+
+    def test_csv_with_debit_and_credit_columns(self):
+        lines = parse_statement_csv(
+            "Posted Date,Payee,Debit,Credit\n2024-03-05,Coffee,42.50,\n2024-03-06,Payroll,,1000\n"
+        )
+        assert [line.amount for line in lines] == [Decimal("-42.50"), Decimal("1000")]
+
+    def test_csv_without_amount_is_rejected(self):
+        with pytest.raises(StatementParseError):
+            parse_statement_csv("Date,Description\n2024-03-05,Coffee\n")
+
+    def test_ofx_sgml(self):
+        lines = parse_statement(OFX_STATEMENT, "march.ofx")
+        assert lines == [
+            StatementLine(date(2024, 3, 5), Decimal("-42.50"), "COFFEE SHOP #12", "A1"),
+            StatementLine(date(2024, 3, 6), Decimal("1000.00"), "PAYROLL", "A2"),
+        ]
+
+
+class TestReconciliationMatcher:
+    """Tests for candidate matching and bulk item persistence."""
+
+    def test_prefers_closest_date_and_description(self, recon_db):
+        db, _, account, _, _ = recon_db
+        near = _add(db, account, "near", "42.50", date(2024, 3, 5), "Coffee Shop")
+        far = _add(db, account, "far", "42.50", date(2024, 3, 8), "Hardware")
+        _add(db, account, "other", "10.00", date(2024, 3, 5), "Coffee Shop")
+
+        results = ReconciliationMatcher(db).match(account.id, [
+            StatementLine(date(2024, 3, 6), Decimal("-42.50"), "COFFEE SHOP #12"),
+            StatementLine(date(2024, 3, 7), Decimal("-42.50"), "HARDWARE STORE"),
+        ])
+
+        assert results[0].transactions == [(near.id, Decimal("42.50"))]
+        assert results[1].transactions == [(far.id, Decimal("42.50"))]
+        assert results[0].confidence > results[1].confidence > 0.6
+
+    def test_skips_reconciled_and_out_of_window(self, recon_db):
+        db, _, account, _, _ = recon_db
+        _add(db, account, "done", "20.00", date(2024, 3, 5), "Gym", is_reconciled=True)
+        _add(db, account, "late", "20.00", date(2024, 3, 20), "Gym")
+
+        results = ReconciliationMatcher(db).match(
+            account.id, [StatementLine(date(2024, 3, 5), Decimal("-20.00"), "Gym")]
+        )
+
+        assert not results[0].is_matched
+
+    def test_one_line_to_many_transactions(self, recon_db):
+        db, _, account, _, _ = recon_db
+        first = _add(db, account, "p1", "-120.00", date(2024, 3, 4), "Invoice 1")
+        second = _add(db, account, "p2", "-80.00", date(2024, 3, 5), "Invoice 2")
+        _add(db, account, "p3", "-55.00", date(2024, 3, 5), "Invoice 3")
+
+        results = ReconciliationMatcher(db).match(
+            account.id, [StatementLine(date(2024, 3, 6), Decimal("200.00"), "DEPOSIT")]
+        )
+
+        assert sorted(results[0].transactions) == sorted(
+            [(first.id, Decimal("-120.00")), (second.id, Decimal("-80.00"))]
+        )
+
+    def test_reconcile_bulk_inserts_and_replaces_items(self, recon_db):
+        db, _, account, reconciliation, engine = recon_db
+        _add(db, account, "t1", "42.50", date(2024, 3, 5), "Coffee")
+        _add(db, account, "g1", "-120.00", date(2024, 3, 4), "Invoice 1")
+        _add(db, account, "g2", "-80.00", date(2024, 3, 5), "Invoice 2")
+        db.commit()
+        lines = [
+            StatementLine(date(2024, 3, 5), Decimal("-42.50"), "Coffee"),
+            StatementLine(date(2024, 3, 6), Decimal("200.00"), "Deposit"),
+            StatementLine(date(2024, 3, 7), Decimal("-9.99"), "Unknown fee"),
+        ]
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+
+        matcher = ReconciliationMatcher(db)
+        result = matcher.reconcile(reconciliation, lines)
+        db.commit()
+        assert result == {"matched_count": 2, "unmatched_count": 1, "items_created": 4}
+        assert sum(s.lstrip().upper().startswith("INSERT") for s in statements) == 1
+
+        items = db.query(ReconciliationItem).filter_by(reconciliation_id=reconciliation.id).all()
+        assert len(items) == 4
+        assert sum(item.statement_amount for item in items) == sum(line.amount for line in lines)
+
+        matcher.reconcile(reconciliation, lines)
+        db.commit()
+        assert db.query(ReconciliationItem).count() == 4
+
+    def test_year_of_statement_lines(self, recon_db):
+        db, _, account, _, _ = recon_db
+        start = date(2023, 1, 1)
+        lines = []
+        for i in range(2000):
+            txn_date = start + timedelta(days=i % 365)
+            amount = Decimal(5 + i % 50) + Decimal(i % 7) / 100
+            db.add(Transaction(account_id=account.id, plaid_transaction_id=f"y{i}",
+                               amount=amount, date=txn_date, name=f"Merchant {i % 40}"))
+            lines.append(StatementLine(txn_date + timedelta(days=1), -amount, f"MERCHANT {i % 40}"))
+        db.flush()
+
+        results = ReconciliationMatcher(db).match(account.id, lines)
+
+        assert all(result.is_matched for result in results)
+        assert len({result.transactions[0][0] for result in results}) == len(lines)
+
+
+class TestStatementUpload:
+    """Tests for POST /bookkeeping/reconciliation/{id}/statement."""
+
+    def test_upload_matches_statement(self, recon_db):
+        db, user, account, reconciliation, _ = recon_db
+        _add(db, account, "coffee", "42.50", date(2024, 3, 5), "Coffee Shop")
+        db.commit()
+
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        try:
+            client = TestClient(app)
+            response = client.post(
+                f"/api/v1/bookkeeping/reconciliation/{reconciliation.id}/statement",
+                files={"file": ("march.ofx", OFX_STATEMENT, "application/x-ofx")}
+            )
+            invalid = client.post(
+                f"/api/v1/bookkeeping/reconciliation/{reconciliation.id}/statement",
+                files={"file": ("march.csv", "Date,Description\n2024-03-05,Coffee\n", "text/csv")}
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200, response.text
+        assert response.json()["matched_count"] == 1
+        assert response.json()["unmatched_count"] == 1
+        assert invalid.status_code == 400
@@ -0,0 +1,148 @@
+"""Tests for the shared Redis client registry and its circuit breaker."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import redis as redis_sync
+
+from src.utils import redis as redis_utils
+from src.utils.redis import CircuitBreaker, RedisRegistry
+
+# Nothing listens here, so connects fail immediately
+UNREACHABLE_URL = "redis://127.0.0.1:1/0"
+
+
+class TestCircuitBreaker:
+    """Tests for opening and closing the breaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.snapshot()["short_circuited"] == 1
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == "closed"
+
+    def test_half_open_after_reset(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        breaker.record_failure()
+
+        with patch.object(redis_utils.time, "monotonic", return_value=breaker.opened_at + 31):
+            assert breaker.state == "half_open"
+            assert breaker.allow()
+            breaker.record_failure()
+            # One failed trial reopens it for another full period
+            assert breaker.state == "open"
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        breaker.record_failure()
+        opened_at = breaker.opened_at
+
+        with patch.object(redis_utils.time, "monotonic", return_value=opened_at + 31):
+            assert [breaker.allow() for _ in range(3)] == [True, False, False]
+        # A probe that never reports back is replaced after another period
+        with patch.object(redis_utils.time, "monotonic", return_value=opened_at + 62):
+            assert breaker.allow()
+            assert not breaker.allow()
+            breaker.record_success()
+            assert breaker.allow()
+
+
+class TestRedisRegistry:
+    """Tests for the shared clients."""
+
+    def test_clients_are_shared(self):
+        registry = RedisRegistry(UNREACHABLE_URL)
+
+        assert registry.sync_client is registry.sync_client
+        assert registry.async_client is registry.async_client
+
+    def test_pool_sized_from_settings(self):
+        registry = RedisRegistry(UNREACHABLE_URL)
+
+        with patch.object(redis_utils.settings, "redis_max_connections", 7):
+            pool = registry.sync_client.connection_pool
+
+        assert isinstance(pool, redis_sync.BlockingConnectionPool)
+        assert pool.max_connections == 7
+
+    def test_unreachable_redis_short_circuits(self):
+        registry = RedisRegistry(UNREACHABLE_URL)
+        client = registry.sync_client
+
+        with patch.object(client.connection_pool, "get_connection",
+                          wraps=client.connection_pool.get_connection) as get_connection:
+            results = [registry.get_sync_client() for _ in range(5)]
+
+        assert results == [None] * 5
+        # Only the first REDIS_CIRCUIT_FAILURES calls tried to connect
+        assert get_connection.call_count == registry.breaker.failure_threshold
+        assert registry.metrics()["circuit_breaker"]["state"] == "open"
+
+    async def test_async_client_none_when_unreachable(self):
+        registry = RedisRegistry(UNREACHABLE_URL)
+
+        assert await registry.get_async_client() is None
+        assert registry.breaker.failures == 1
+        await registry.close()
+
+    def test_metrics_report_pool_occupancy(self):
+        registry = RedisRegistry(UNREACHABLE_URL)
+        registry.sync_client
+        registry.async_client
+
+        metrics = registry.metrics()
+
+        assert set(metrics["pools"]) == {"async", "sync"}
+        assert metrics["pools"]["sync"]["in_use"] == 0
+        asyncio.run(registry.close())
+
+
+class TestPipelineHelpers:
+    """Tests for sending several commands in one round trip."""
+
+    def test_sync_pipeline_queues_commands(self):
+        pipe = MagicMock()
+        pipe.execute.return_value = [True, "value"]
+        client = MagicMock()
+        client.pipeline.return_value.__enter__.return_value = pipe
+
+        results = redis_utils.pipeline_execute_sync(
+            [("setex", "a", 60, "1"), ("get", "b")], client=client
+        )
+
+        assert results == [True, "value"]
+        pipe.setex.assert_called_once_with("a", 60, "1")
+        pipe.get.assert_called_once_with("b")
+        pipe.execute.assert_called_once_with(raise_on_error=False)
+        client.pipeline.assert_called_once_with(transaction=False)
+
+    def test_sync_pipeline_connection_error_returns_none(self):
+        client = MagicMock()
+        client.pipeline.return_value.__enter__.return_value.execute.side_effect = \
+            redis_sync.ConnectionError("down")
+
+        with patch.object(redis_utils, "redis_registry", RedisRegistry(UNREACHABLE_URL)) as registry:
+            assert redis_utils.pipeline_execute_sync([("get", "a")], client=client) is None
+            assert registry.breaker.failures == 1
+
+    async def test_async_pipeline_without_redis(self):
+        with patch.object(redis_utils, "redis_registry", RedisRegistry(UNREACHABLE_URL)) as registry:
+            assert await redis_utils.pipeline_execute([("get", "a")]) is None
+            await registry.close()
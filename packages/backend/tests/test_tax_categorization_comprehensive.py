@@ -1,24 +1,31 @@
 """Comprehensive tests for tax categorization system."""
 
+import json
 import pytest
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Dict, Any
 from unittest.mock import Mock, patch, MagicMock
-from sqlalchemy.orm import Session
+from uuid import uuid4
+from sqlalchemy import JSON, Column, MetaData, Table, create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
 
 # Import models
 from models.tax_categorization import (
     TaxCategory, ChartOfAccount, BusinessExpenseTracking,
-    CategoryMapping, CategorizationAudit
+    CategoryMapping, CategorizationAudit, schedule_c_line_number
 )
+from models.account import Account
 from models.transaction import Transaction
 from models.user import User
 from models.category import Category
 
 # Import services
 from src.services.tax_categorization_service import TaxCategorizationService
+from src.services.tax_keyword_index import TaxKeywordIndex, clear_keyword_index
 from src.services.chart_of_accounts_service import ChartOfAccountsService
 
 
@@ -112,6 +119,7 @@ class TestTaxCategorizationService:
         """Set up test fixtures."""
         self.mock_session = Mock(spec=Session)
         self.service = TaxCategorizationService(self.mock_session)
+        clear_keyword_index()
 
     def test_categorize_for_tax_success_with_provided_ids(self, sample_transaction, sample_tax_category, sample_chart_account):
         """Test successful tax categorization with provided category and account IDs."""
@@ -243,32 +251,56 @@ class TestTaxCategorizationService:
         """Test auto-detection using keyword matching."""
         transaction = Mock(spec=Transaction)
         transaction.category_id = None
-        transaction.name = "Gas station fuel"
-        transaction.merchant_name = "Shell"
-        transaction.description = "Vehicle fuel"
+        transaction.name = "Office supplies"
+        transaction.merchant_name = "Staples"
+        transaction.description = None
 
         chart_account = Mock(spec=ChartOfAccount)
         chart_account.id = "chart-acc-vehicle"
 
-        # Mock no mapping found, but tax categories available
-        mock_query_chain = Mock()
-        mock_query_chain.filter.return_value.order_by.return_value.first.return_value = None  # No mapping
-        mock_query_chain.filter.return_value.all.return_value = [sample_tax_category]  # Available categories
-        self.mock_session.query.return_value = mock_query_chain
-
-        # Mock chart account query
+        # Mock category version, category load and chart account queries
+        mock_version_query = Mock()
+        mock_version_query.filter.return_value.one.return_value = (1, datetime(2024, 1, 1, 12, 0))
+        mock_category_query = Mock()
+        mock_category_query.filter.return_value.all.return_value = [sample_tax_category]
         mock_chart_query = Mock()
         mock_chart_query.filter.return_value.first.return_value = chart_account
-        self.mock_session.query.side_effect = [mock_query_chain, mock_query_chain, mock_chart_query]
+        self.mock_session.query.side_effect = [mock_version_query, mock_category_query, mock_chart_query]
 
-        with patch.object(self.service, '_calculate_keyword_match_score', return_value=0.5):
-            result = self.service.auto_detect_tax_category(transaction, "user-123")
+        result = self.service.auto_detect_tax_category(transaction, "user-123")
 
         assert result["tax_category_id"] == "tax-cat-123"
         assert result["chart_account_id"] == "chart-acc-vehicle"
         assert result["confidence"] == 0.5
         assert result["source"] == "keyword_matching"
 
+    def test_auto_detect_tax_category_reuses_keyword_index(self, sample_tax_category):
+        """Test the keyword index is only rebuilt when the category version changes."""
+        transaction = Mock(spec=Transaction)
+        transaction.category_id = None
+        transaction.name = "Paper and pens"
+        transaction.merchant_name = None
+        transaction.description = None
+
+        version = (1, datetime(2024, 1, 1, 12, 0))
+        mock_version_query = Mock()
+        mock_version_query.filter.return_value.one.return_value = version
+        mock_category_query = Mock()
+        mock_category_query.filter.return_value.all.return_value = [sample_tax_category]
+        mock_chart_query = Mock()
+        mock_chart_query.filter.return_value.first.return_value = None
+        self.mock_session.query.side_effect = [
+            mock_version_query, mock_category_query, mock_chart_query,
+            mock_version_query, mock_chart_query,
+        ]
+
+        first = self.service.auto_detect_tax_category(transaction, "user-123")
+        second = self.service.auto_detect_tax_category(transaction, "user-123")
+
+        assert first == second
+        assert second["tax_category_id"] == "tax-cat-123"
+        assert mock_category_query.filter.return_value.all.call_count == 1
+
     def test_auto_detect_tax_category_no_match(self):
         """Test auto-detection when no matches found."""
         transaction = Mock(spec=Transaction)
@@ -280,6 +312,7 @@ class TestTaxCategorizationService:
         # Mock no mapping and no good keyword matches
         mock_query_chain = Mock()
         mock_query_chain.filter.return_value.order_by.return_value.first.return_value = None
+        mock_query_chain.filter.return_value.one.return_value = (0, None)
         mock_query_chain.filter.return_value.all.return_value = []
         self.mock_session.query.return_value = mock_query_chain
 
@@ -316,41 +349,29 @@ class TestTaxCategorizationService:
         assert score == 0.0
 
     def test_get_tax_summary(self):
-        """Test tax summary generation."""
-        # Create mock transactions
-        transaction1 = Mock(spec=Transaction)
-        transaction1.deductible_amount = Decimal("150.00")
-        transaction1.requires_substantiation = True
-        transaction1.substantiation_complete = False
-        transaction1.tax_category = Mock()
-        transaction1.tax_category.category_code = "SCHED_C_18"
-        transaction1.tax_category.category_name = "Office expense"
-        transaction1.tax_category.tax_form = "Schedule C"
-        transaction1.tax_category.tax_line = "Line 18"
-
-        transaction2 = Mock(spec=Transaction)
-        transaction2.deductible_amount = Decimal("75.00")
-        transaction2.requires_substantiation = False
-        transaction2.substantiation_complete = True
-        transaction2.tax_category = Mock()
-        transaction2.tax_category.category_code = "SCHED_C_27"
-        transaction2.tax_category.category_name = "Travel"
-        transaction2.tax_category.tax_form = "Schedule C"
-        transaction2.tax_category.tax_line = "Line 27a"
-
-        # Mock query chain
-        mock_query = Mock()
-        mock_query.filter.return_value = mock_query
-        mock_query.join.return_value = mock_query
-        mock_query.all.return_value = [transaction1, transaction2]
-        self.mock_session.query.return_value = mock_query
+        """Test tax summary is built from grouped rows."""
+        rows = [
+            Mock(category_code="SCHED_C_18", category_name="Office expense", tax_form="Schedule C",
+                 tax_line="Line 18", schedule_c_line="18", transaction_count=1,
+                 total_amount=Decimal("150.00"), requires_substantiation=1),
+            Mock(category_code="SCHED_C_27", category_name="Travel", tax_form="Schedule C",
+                 tax_line="Line 27a", schedule_c_line="27", transaction_count=1,
+                 total_amount=Decimal("75.00"), requires_substantiation=0),
+            # Deductible but not yet categorized
+            Mock(category_code=None, transaction_count=2, total_amount=Decimal("30.00"),
+                 requires_substantiation=0),
+        ]
+        self.mock_session.execute.return_value.all.return_value = rows
 
-        result = self.service.get_tax_summary("user-123", 2024)
+        with patch("src.services.tax_categorization_service.get_redis_client_sync", return_value=None):
+            result = self.service.get_tax_summary("user-123", 2024)
 
         assert result["tax_year"] == 2024
         assert result["total_deductions"] == 225.00
-        assert result["transaction_count"] == 2
+        assert result["transaction_count"] == 4
         assert len(result["categories"]) == 2
+        self.mock_session.execute.assert_called_once()
+        self.mock_session.query.assert_not_called()
 
         # Check office expense category
         office_cat = result["categories"]["SCHED_C_18"]
@@ -362,63 +383,158 @@ class TestTaxCategorizationService:
         # Check travel category
         travel_cat = result["categories"]["SCHED_C_27"]
         assert travel_cat["category_name"] == "Travel"
+        assert travel_cat["schedule_c_line"] == "27"
         assert travel_cat["total_amount"] == 75.00
         assert travel_cat["transaction_count"] == 1
         assert travel_cat["requires_substantiation"] == 0
 
-    def test_bulk_categorize_for_tax_success(self):
-        """Test successful bulk categorization."""
-        transaction_ids = ["trans-1", "trans-2", "trans-3"]
+    def test_get_tax_summary_uses_cache(self):
+        """Test cached summaries are served per user and year without querying."""
+        redis_client = Mock()
+        redis_client.get.side_effect = [
+            b"2", '{"tax_year": 2024, "total_deductions": 5.0, "categories": {}, "transaction_count": 1}'
+        ]
 
-        # Mock individual categorization calls
-        with patch.object(self.service, 'categorize_for_tax') as mock_categorize:
-            mock_categorize.return_value = {
-                "success": True,
-                "transaction_id": "trans-1",
-                "tax_category": "Office expense"
-            }
+        with patch("src.services.tax_categorization_service.get_redis_client_sync",
+                   return_value=redis_client):
+            result = self.service.get_tax_summary("user-123", 2024)
+
+        assert result["total_deductions"] == 5.0
+        assert redis_client.get.call_args.args[0] == "tax_summary:user-123:2:2024"
+        self.mock_session.execute.assert_not_called()
+
+    def test_get_tax_summary_caches_result(self):
+        """Test a freshly built summary is written to the cache."""
+        self.mock_session.execute.return_value.all.return_value = []
+        redis_client = Mock()
+        redis_client.get.return_value = None
+
+        with patch("src.services.tax_categorization_service.get_redis_client_sync",
+                   return_value=redis_client):
+            result = self.service.get_tax_summary("user-123", 2024)
+
+        key, _, payload = redis_client.setex.call_args.args
+        assert key == "tax_summary:user-123:0:2024"
+        assert json.loads(payload) == result
+
+    def _mock_queries(self, results):
+        """Route session.query(Model) to a chain returning results[Model]."""
+        def query(model):
+            chain = Mock()
+            chain.filter.return_value = chain
+            chain.order_by.return_value = chain
+            chain.all.return_value = results.get(model, [])
+            return chain
+        self.mock_session.query.side_effect = query
+
+    def _bulk_transaction(self, transaction_id, **overrides):
+        transaction = Mock(spec=Transaction)
+        transaction.id = transaction_id
+        transaction.amount_decimal = Decimal("100.00")
+        transaction.category_id = None
+        transaction.tax_category_id = None
+        transaction.chart_account_id = None
+        transaction.deductible_amount = None
+        transaction.name = "Office supplies purchase"
+        transaction.merchant_name = "Staples"
+        transaction.description = None
+        for name, value in overrides.items():
+            setattr(transaction, name, value)
+        return transaction
 
+    def test_bulk_categorize_for_tax_success(self, sample_tax_category, sample_chart_account):
+        """Test bulk categorization writes the whole batch at once."""
+        transactions = [self._bulk_transaction(f"trans-{i}") for i in range(1, 4)]
+        existing_tracking = Mock(spec=BusinessExpenseTracking)
+        existing_tracking.id = "tracking-1"
+        existing_tracking.transaction_id = "trans-1"
+        self._mock_queries({
+            Transaction: transactions,
+            TaxCategory: [sample_tax_category],
+            ChartOfAccount: [sample_chart_account],
+            BusinessExpenseTracking: [existing_tracking],
+        })
+
+        with patch("src.services.tax_categorization_service.invalidate_account_hierarchy") as invalidate, \
+                patch("src.services.tax_categorization_service.invalidate_tax_summary") as invalidate_summary:
             result = self.service.bulk_categorize_for_tax(
-                transaction_ids=transaction_ids,
+                transaction_ids=["trans-1", "trans-2", "trans-3"],
                 user_id="user-123",
-                tax_category_id="tax-cat-123"
+                tax_category_id="tax-cat-123",
+                chart_account_id="chart-acc-123"
             )
 
         assert result["success_count"] == 3
         assert result["error_count"] == 0
-        assert len(result["results"]) == 3
-        assert len(result["errors"]) == 0
-        assert mock_categorize.call_count == 3
+        assert result["results"][0]["tax_category"] == "Office expense"
+        assert result["results"][0]["deductible_amount"] == 100.00
+        # One query per lookup table, not per transaction
+        assert self.mock_session.query.call_count == 4
+        self.mock_session.commit.assert_called_once()
+        invalidate.assert_called_once_with("user-123")
+        invalidate_summary.assert_called_once_with("user-123")
+
+        bulk_updates = self.mock_session.bulk_update_mappings.call_args_list
+        assert bulk_updates[0].args[0] is Transaction
+        assert [row["id"] for row in bulk_updates[0].args[1]] == ["trans-1", "trans-2", "trans-3"]
+        assert bulk_updates[0].args[1][0]["schedule_c_line"] == "Line 18"
+        assert bulk_updates[1].args == (
+            BusinessExpenseTracking, [{"id": "tracking-1", "business_percentage": Decimal("100.00")}]
+        )
+        inserts = {call.args[0]: call.args[1] for call in self.mock_session.bulk_insert_mappings.call_args_list}
+        assert [row["transaction_id"] for row in inserts[BusinessExpenseTracking]] == ["trans-2", "trans-3"]
+        assert len(inserts[CategorizationAudit]) == 3
 
-    def test_bulk_categorize_for_tax_with_errors(self):
+    def test_bulk_categorize_for_tax_with_errors(self, sample_tax_category):
         """Test bulk categorization with some errors."""
-        transaction_ids = ["trans-1", "trans-2", "trans-3"]
-
-        # Mock categorization with some failures
-        with patch.object(self.service, 'categorize_for_tax') as mock_categorize:
-            def side_effect(transaction_id, **kwargs):
-                if transaction_id == "trans-2":
-                    raise ValueError("Invalid transaction")
-                return {
-                    "success": True,
-                    "transaction_id": transaction_id,
-                    "tax_category": "Office expense"
-                }
+        self._mock_queries({
+            Transaction: [self._bulk_transaction("trans-1"), self._bulk_transaction("trans-3")],
+            TaxCategory: [sample_tax_category],
+        })
 
-            mock_categorize.side_effect = side_effect
+        result = self.service.bulk_categorize_for_tax(
+            transaction_ids=["trans-1", "trans-2", "trans-3"],
+            user_id="user-123",
+            tax_category_id="tax-cat-123",
+            chart_account_id="chart-acc-missing"
+        )
 
-            result = self.service.bulk_categorize_for_tax(
-                transaction_ids=transaction_ids,
-                user_id="user-123",
-                tax_category_id="tax-cat-123"
-            )
+        assert result["success_count"] == 0
+        assert result["error_count"] == 3
+        assert result["errors"][1] == {"transaction_id": "trans-2", "error": "Transaction trans-2 not found"}
+        assert "Invalid chart account" in result["errors"][0]["error"]
+        self.mock_session.commit.assert_not_called()
+
+    def test_bulk_categorize_for_tax_auto_detects_from_lookup_tables(
+        self, sample_tax_category, sample_chart_account
+    ):
+        """Test auto-detection in a batch reuses the preloaded tables."""
+        mapping = Mock(spec=CategoryMapping)
+        mapping.source_category_id = "cat-9"
+        mapping.tax_category_id = "tax-cat-123"
+        mapping.chart_account_id = "chart-acc-123"
+        mapping.confidence_score = Decimal("0.9")
+        transactions = [
+            self._bulk_transaction("trans-1", category_id="cat-9", name="Lunch"),
+            self._bulk_transaction("trans-2", name="Paper and pens"),
+            self._bulk_transaction("trans-3", name="Personal office supplies"),
+        ]
+        self._mock_queries({
+            Transaction: transactions,
+            TaxCategory: [sample_tax_category],
+            ChartOfAccount: [sample_chart_account],
+            CategoryMapping: [mapping],
+        })
+
+        result = self.service.bulk_categorize_for_tax(
+            transaction_ids=["trans-1", "trans-2", "trans-3"], user_id="user-123"
+        )
 
-        assert result["success_count"] == 2
-        assert result["error_count"] == 1
-        assert len(result["results"]) == 2
-        assert len(result["errors"]) == 1
-        assert result["errors"][0]["transaction_id"] == "trans-2"
-        assert "Invalid transaction" in result["errors"][0]["error"]
+        assert result["success_count"] == 3
+        assert [r["tax_category"] for r in result["results"]] == [
+            "Office expense", "Office expense", None
+        ]
+        assert self.mock_session.query.call_count == 5
 
     def test_get_schedule_c_export(self):
         """Test Schedule C export functionality."""
@@ -553,6 +669,138 @@ class TestTaxCategorizationService:
         assert audit.action_type == "tax_categorize"
 
 
+class TestTaxKeywordIndex:
+    """Tests for the precompiled tax keyword index."""
+
+    @staticmethod
+    def _category(category_id, name, keywords, exclusions=None):
+        tax_category = Mock(spec=TaxCategory)
+        tax_category.id = category_id
+        tax_category.category_name = name
+        tax_category.keywords = keywords
+        tax_category.exclusions = exclusions
+        return tax_category
+
+    def test_scan_counts_keywords_per_category(self):
+        """Test one scan counts every category's keywords, including overlapping ones."""
+        index = TaxKeywordIndex([
+            self._category("office", "Office expense", ["office", "supplies", "paper"]),
+            self._category("travel", "Travel", ["air", "airfare", "hotel"], ["personal"]),
+            self._category("empty", "Other", []),
+        ])
+
+        counts, excluded = index.scan("airfare and office paper")
+
+        assert [category.id for category in index.categories] == ["office", "travel"]
+        assert counts == {0: 2, 1: 2}
+        assert excluded == set()
+
+    def test_best_match_scores_like_substring_matching(self, sample_tax_category):
+        """Test the best score equals the highest per-category substring score."""
+        service = TaxCategorizationService(Mock(spec=Session))
+        categories = [sample_tax_category, self._category("travel", "Travel", ["hotel", "airfare"])]
+        index = TaxKeywordIndex(categories)
+
+        for text in ["office supplies paper pens", "hotel and office", "personal office supplies", "nothing"]:
+            expected = max(service._calculate_keyword_match_score(text, category) for category in categories)
+            assert index.best_match(text)[1] == expected
+
+        best, score = index.best_match("hotel and office")
+        assert (best.id, best.category_name, score) == ("travel", "Travel", 0.5)
+
+    def test_exclusion_blocks_only_its_category(self):
+        """Test an exclusion hit zeroes its own category and no other."""
+        index = TaxKeywordIndex([
+            self._category("meals", "Meals", ["restaurant", "lunch"], ["personal"]),
+            self._category("personal", "Personal", ["personal"]),
+        ])
+
+        best, score = index.best_match("personal lunch at restaurant")
+
+        assert best.id == "personal"
+        assert score == 1.0
+
+
+class TestTaxSummaryQuery:
+    """Tests for the grouped tax summary query against a database."""
+
+    def setup_method(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        metadata = MetaData()
+        # Copies without foreign keys or postgres-only types, so the legacy
+        # tables can be created on their own in sqlite
+        self.tables = {
+            table.name: Table(table.name, metadata, *[
+                Column(c.name, JSON() if isinstance(c.type, JSONB) else c.type, primary_key=c.primary_key)
+                for c in table.columns
+            ])
+            for table in (Account.__table__, Transaction.__table__, TaxCategory.__table__)
+        }
+        metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.service = TaxCategorizationService(self.session)
+
+    def teardown_method(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _insert(self, table, **values):
+        row_id = values.setdefault("id", uuid4())
+        self.session.execute(self.tables[table].insert().values(**values))
+        return row_id
+
+    def test_summary_groups_in_one_query(self):
+        """Test categories are summed per tax category, scoped to the user and year."""
+        user_id, other_user_id = uuid4(), uuid4()
+        account = self._insert("accounts", user_id=user_id)
+        other_account = self._insert("accounts", user_id=other_user_id)
+        owners = {account: user_id, other_account: other_user_id}
+        office = self._insert("tax_categories", category_code="SCHED_C_18", category_name="Office expense",
+                              tax_form="Schedule C", tax_line="Line 18", schedule_c_line="18")
+        meals = self._insert("tax_categories", category_code="SCHED_C_24B", category_name="Meals",
+                             tax_form="Schedule C", tax_line="Line 24b", schedule_c_line="24")
+        for account_id, category_id, amount, year, unsubstantiated in [
+            (account, office, "100.00", 2024, True),
+            (account, office, "50.25", 2024, False),
+            (account, meals, "40.00", 2024, True),
+            (account, None, "10.00", 2024, False),
+            (account, office, "999.00", 2023, False),
+            (other_account, office, "999.00", 2024, False),
+        ]:
+            self._insert(
+                "transactions", account_id=account_id, user_id=owners[account_id],
+                date=date(year, 6, 1), tax_category_id=category_id,
+                deductible_amount=Decimal(amount), tax_year=year, is_tax_deductible=True,
+                requires_substantiation=unsubstantiated, substantiation_complete=False
+            )
+
+        statements = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+        with patch("src.services.tax_categorization_service.get_redis_client_sync", return_value=None):
+            summary = self.service.get_tax_summary(user_id, 2024)
+            schedule_c = self.service.get_schedule_c_export(user_id, 2024)
+
+        assert len(statements) == 2
+        assert summary["transaction_count"] == 4
+        assert summary["total_deductions"] == 190.25
+        assert summary["categories"]["SCHED_C_18"]["total_amount"] == 150.25
+        assert summary["categories"]["SCHED_C_18"]["transaction_count"] == 2
+        assert summary["categories"]["SCHED_C_18"]["requires_substantiation"] == 1
+        assert summary["categories"]["SCHED_C_24B"]["requires_substantiation"] == 1
+        assert schedule_c["schedule_c_lines"]["24"]["amount"] == 40.00
+        assert schedule_c["total_expenses"] == 190.25
+
+    def test_schedule_c_line_number(self):
+        """Test Schedule C lines are normalized to their line number."""
+        assert schedule_c_line_number("Schedule C", "Line 27a") == "27"
+        assert schedule_c_line_number("Schedule C", "Line 9") == "9"
+        assert schedule_c_line_number("Schedule E", "Line 5") is None
+        assert schedule_c_line_number("Schedule C", None) is None
+
+
 class TestChartOfAccountsService:
     """Comprehensive tests for ChartOfAccountsService."""
 
@@ -745,40 +993,41 @@ class TestChartOfAccountsService:
 
     def test_get_trial_balance(self):
         """Test trial balance generation."""
-        # Create mock accounts
-        asset_account = Mock(spec=ChartOfAccount)
-        asset_account.id = "acc-asset"
+        # Rows from the grouped debit/credit query
+        asset_account = Mock()
         asset_account.account_code = "1100"
         asset_account.account_name = "Cash"
         asset_account.account_type = "asset"
         asset_account.normal_balance = "debit"
+        asset_account.debits = Decimal("1000.00")
+        asset_account.credits = Decimal("0")
 
-        liability_account = Mock(spec=ChartOfAccount)
-        liability_account.id = "acc-liability"
+        liability_account = Mock()
         liability_account.account_code = "2100"
         liability_account.account_name = "Accounts Payable"
         liability_account.account_type = "liability"
         liability_account.normal_balance = "credit"
+        liability_account.debits = Decimal("0")
+        liability_account.credits = Decimal("500.00")
 
-        expense_account = Mock(spec=ChartOfAccount)
-        expense_account.id = "acc-expense"
+        expense_account = Mock()
         expense_account.account_code = "5100"
         expense_account.account_name = "Office Expense"
         expense_account.account_type = "expense"
         expense_account.normal_balance = "debit"
+        expense_account.debits = Decimal("250.00")
+        expense_account.credits = Decimal("50.00")
 
         accounts = [asset_account, liability_account, expense_account]
-        self.mock_session.query.return_value.filter_by.return_value.order_by.return_value.all.return_value = accounts
 
-        with patch.object(self.service, 'get_account_balance') as mock_balance:
-            mock_balance.side_effect = [
-                Decimal("1000.00"),  # Asset balance
-                Decimal("500.00"),   # Liability balance
-                Decimal("200.00")    # Expense balance
-            ]
+        with patch.object(self.service, 'get_account_balances') as mock_balances:
+            mock_balances.return_value = accounts
 
             result = self.service.get_trial_balance("user-123")
 
+        # Read-only report: no stored balances are written
+        self.mock_session.commit.assert_not_called()
+
         assert len(result["accounts"]) == 3
         assert result["total_debits"] == 1200.00  # Asset + Expense
         assert result["total_credits"] == 500.00  # Liability
@@ -828,7 +1077,9 @@ class TestChartOfAccountsService:
         accounts = [parent_account, child_account]
         self.mock_session.query.return_value.filter_by.return_value.order_by.return_value.all.return_value = accounts
 
-        with patch.object(self.service, '_account_to_dict') as mock_to_dict:
+        with patch.object(self.service, '_account_to_dict') as mock_to_dict, \
+                patch.object(self.service, 'get_account_balances', return_value=[]), \
+                patch('src.services.chart_of_accounts_service.get_redis_client_sync', return_value=None):
             mock_to_dict.side_effect = [
                 {"id": "parent-123", "account_code": "5000", "children": []},
                 {"id": "child-123", "account_code": "5100", "children": []}
@@ -841,6 +1092,76 @@ class TestChartOfAccountsService:
         assert len(result[0]["children"]) == 1  # Should have child
         assert result[0]["children"][0]["id"] == "child-123"
 
+    def _chart_account(self, account_id, parent_id, code, normal_balance="debit"):
+        account = Mock(spec=ChartOfAccount)
+        account.id = account_id
+        account.parent_account_id = parent_id
+        account.account_code = code
+        account.normal_balance = normal_balance
+        return account
+
+    def test_get_account_hierarchy_rolls_up_balances(self):
+        """Test subtree balances roll up through every level."""
+        accounts = [
+            self._chart_account("exp", None, "5000"),
+            self._chart_account("office", "exp", "5100"),
+            self._chart_account("supplies", "office", "5110"),
+            self._chart_account("travel", "exp", "5200"),
+            self._chart_account("orphan", "inactive-parent", "5900"),
+            self._chart_account("income", None, "4000", normal_balance="credit"),
+        ]
+        self.mock_session.query.return_value.filter_by.return_value.order_by.return_value.all.return_value = accounts
+        balances = [
+            Mock(id="office", debits=Decimal("100"), credits=Decimal("10")),
+            Mock(id="supplies", debits=Decimal("25"), credits=Decimal("0")),
+            Mock(id="travel", debits=Decimal("40"), credits=Decimal("0")),
+            Mock(id="income", debits=Decimal("0"), credits=Decimal("500")),
+        ]
+
+        with patch.object(self.service, '_account_to_dict',
+                          side_effect=lambda acc: {"id": acc.id, "children": []}), \
+                patch.object(self.service, 'get_account_balances', return_value=balances), \
+                patch('src.services.chart_of_accounts_service.get_redis_client_sync', return_value=None):
+            result = self.service.get_account_hierarchy("user-123")
+
+        roots = {node["id"]: node for node in result}
+        assert set(roots) == {"exp", "orphan", "income"}
+        expenses = roots["exp"]
+        assert expenses["balance"] == 0
+        assert expenses["rollup_balance"] == 155.0
+        office = expenses["children"][0]
+        assert office["balance"] == 90.0
+        assert office["rollup_balance"] == 115.0
+        assert office["children"][0]["rollup_balance"] == 25.0
+        assert roots["income"]["rollup_balance"] == 500.0
+
+    def test_get_account_hierarchy_uses_cache(self):
+        """Test cached hierarchies are served without touching the database."""
+        redis_client = Mock()
+        redis_client.get.side_effect = [b"3", '[{"id": "cached", "children": []}]']
+
+        with patch('src.services.chart_of_accounts_service.get_redis_client_sync',
+                   return_value=redis_client):
+            result = self.service.get_account_hierarchy("user-123", "2024-12-31")
+
+        assert result == [{"id": "cached", "children": []}]
+        assert redis_client.get.call_args.args[0] == "coa_hierarchy:user-123:3:2024-12-31"
+        self.mock_session.query.assert_not_called()
+
+    def test_chart_changes_invalidate_hierarchy_cache(self):
+        """Test account writes bump the user's hierarchy cache version."""
+        account = Mock(spec=ChartOfAccount)
+        account.is_system_account = False
+        account.account_code = "5300"
+        self.mock_session.query.return_value.filter_by.return_value.first.return_value = account
+        redis_client = Mock()
+
+        with patch('src.services.chart_of_accounts_service.get_redis_client_sync',
+                   return_value=redis_client):
+            self.service.update_account("acc-123", "user-123", account_name="Rent")
+
+        redis_client.incr.assert_called_once_with("coa_hierarchy_version:user-123")
+
     def test_delete_account_with_transactions_soft_delete(self):
         """Test soft delete of account with transactions."""
         account = Mock(spec=ChartOfAccount)
@@ -0,0 +1,294 @@
+"""Tests for set-based bulk transaction updates and batch ML feedback."""
+
+import json
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, ForeignKey, MetaData, Table, create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.main import app
+from src.database import Base, get_db
+from src.database.bookkeeping_models import JournalEntryLine, ReconciliationItem
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot, MLPrediction
+)
+from src.dependencies.auth import get_current_verified_user
+from src.services.ml_categorization import MLCategorizationService, ml_service
+from src.services.transaction_bulk import (
+    TransactionOwnershipError,
+    bulk_set_user_categories,
+    bulk_update_transactions,
+)
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot)
+]
+
+
+@pytest.fixture
+def bulk_db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    db = sessionmaker(bind=engine)()
+
+    users = []
+    for name in ("owner", "other"):
+        user = User(email=f"{name}@example.com", username=name, hashed_password="x",
+                    is_verified=True)
+        db.add(user)
+        db.flush()
+        item = PlaidItem(user_id=user.id, plaid_item_id=f"item_{name}", access_token="token")
+        db.add(item)
+        db.flush()
+        account = Account(user_id=user.id, plaid_item_id=item.id,
+                          plaid_account_id=f"acct_{name}", name="Checking",
+                          account_type="depository")
+        db.add(account)
+        db.flush()
+        for i in range(5):
+            db.add(Transaction(
+                account_id=account.id,
+                plaid_transaction_id=f"{name}_{i}",
+                amount=Decimal("10.00") + i,
+                date=date(2024, 3, 1 + i),
+                name=f"{name} txn {i}",
+                tags=["existing"] if i == 0 else None,
+            ))
+        users.append(user)
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda *args: statements.append(args[2]))
+
+    yield db, users[0], users[1], statements
+
+    db.close()
+    engine.dispose()
+
+
+def _table_copy(table, metadata, *extra):
+    # Plain copies without the model's foreign keys: migration 002 created
+    # ml_predictions.transaction_id without ON DELETE CASCADE, and the
+    # bookkeeping tables reference models outside this fixture
+    return Table(table.name, metadata, *(
+        Column(column.name, column.type, primary_key=column.primary_key,
+               nullable=column.nullable, server_default=column.server_default)
+        for column in table.columns if column.name not in {c.name for c in extra}
+    ), *extra)
+
+
+def _ids(db, user):
+    return [
+        t.id for t in db.query(Transaction).join(Account)
+        .filter(Account.user_id == user.id).order_by(Transaction.name)
+    ]
+
+
+class TestBulkUpdateTransactions:
+    """Tests for the set-based bulk operations service."""
+
+    def test_categorize_is_single_statement(self, bulk_db):
+        db, owner, _, statements = bulk_db
+        ids = _ids(db, owner)
+        statements.clear()
+
+        count = bulk_update_transactions(db, owner.id, ids, "categorize", category="Travel")
+
+        assert count == 5
+        assert sum(s.lstrip().upper().startswith("UPDATE") for s in statements) == 1
+        assert {t.user_category_override for t in db.query(Transaction).filter(
+            Transaction.id.in_(ids))} == {"Travel"}
+
+    def test_duplicate_ids_are_accepted(self, bulk_db):
+        db, owner, _, _ = bulk_db
+        ids = _ids(db, owner)
+        assert bulk_update_transactions(db, owner.id, ids + ids, "reconcile") == 5
+
+    def test_foreign_ids_reject_whole_batch(self, bulk_db):
+        db, owner, other, _ = bulk_db
+        ids = _ids(db, owner) + _ids(db, other)[:1]
+
+        with pytest.raises(TransactionOwnershipError):
+            bulk_update_transactions(db, owner.id, ids, "reconcile")
+
+        assert not any(t.is_reconciled for t in db.query(Transaction).all())
+
+    def test_add_and_remove_tag_touch_only_changed_rows(self, bulk_db):
+        db, owner, _, _ = bulk_db
+        ids = _ids(db, owner)
+
+        assert bulk_update_transactions(db, owner.id, ids, "add_tag", tag="existing") == 4
+        assert bulk_update_transactions(db, owner.id, ids, "remove_tag", tag="existing") == 5
+        db.expire_all()
+        assert all(t.tags == [] for t in db.query(Transaction).filter(Transaction.id.in_(ids)))
+
+    def test_missing_tag_is_rejected(self, bulk_db):
+        db, owner, _, _ = bulk_db
+        ids = _ids(db, owner)
+
+        with pytest.raises(ValueError):
+            bulk_update_transactions(db, owner.id, ids, "add_tag", tag=None)
+
+        assert all(t.tags in (None, ["existing"]) for t in db.query(Transaction).all())
+
+    def test_delete_removes_predictions_without_cascade(self, bulk_db):
+        db, owner, other, _ = bulk_db
+        metadata = MetaData()
+        Transaction.__table__.to_metadata(metadata)
+        _table_copy(MLPrediction.__table__, metadata,
+                    Column("transaction_id", MLPrediction.transaction_id.type,
+                           ForeignKey("transactions.id"), nullable=False))
+        _table_copy(JournalEntryLine.__table__, metadata)
+        _table_copy(ReconciliationItem.__table__, metadata)
+        metadata.create_all(bind=db.get_bind(), tables=[
+            metadata.tables[name]
+            for name in ("ml_predictions", "journal_entry_lines", "reconciliation_items")
+        ])
+        # SQLite needs a unique parent key for the foreign key; PostgreSQL
+        # enforces it through the delete trigger from migration 014
+        db.connection().exec_driver_sql("CREATE UNIQUE INDEX test_transactions_id ON transactions (id)")
+        db.connection().exec_driver_sql("PRAGMA foreign_keys=ON")
+
+        mine, theirs = _ids(db, owner), _ids(db, other)
+        db.add_all(MLPrediction(transaction_id=txn_id, confidence=0.9)
+                   for txn_id in mine[:2] + theirs[:1])
+        db.commit()
+
+        assert bulk_update_transactions(db, owner.id, mine, "delete") == 5
+
+        assert not db.query(Transaction).filter(Transaction.id.in_(mine)).count()
+        assert [p.transaction_id for p in db.query(MLPrediction).all()] == theirs[:1]
+
+    def test_set_user_categories_skips_foreign_rows(self, bulk_db):
+        db, owner, other, _ = bulk_db
+        mine, theirs = _ids(db, owner)[:2], _ids(db, other)[:1]
+
+        rows = bulk_set_user_categories(
+            db, owner.id, {mine[0]: "Food", mine[1]: "Fuel", theirs[0]: "Food"}
+        )
+        db.commit()
+
+        assert {row.id for row in rows} == set(mine)
+        overrides = dict(db.query(Transaction.id, Transaction.user_category_override))
+        assert overrides[mine[1]] == "Fuel"
+        assert overrides[theirs[0]] is None
+
+
+class TestBulkEndpoint:
+    """Tests for POST /transactions/bulk."""
+
+    @pytest.fixture
+    def client(self, bulk_db):
+        db, owner, _, _ = bulk_db
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[get_current_verified_user] = lambda: owner
+        with patch("src.services.tax_categorization_service.get_redis_client_sync",
+                   return_value=None):
+            yield TestClient(app)
+        app.dependency_overrides.clear()
+
+    def test_categorize(self, bulk_db, client):
+        db, owner, _, _ = bulk_db
+        ids = _ids(db, owner)
+
+        response = client.post("/api/v1/transactions/bulk", json={
+            "transaction_ids": [str(txn_id) for txn_id in ids],
+            "operation": "categorize",
+            "category": "Travel",
+        })
+
+        assert response.status_code == 200, response.text
+        assert response.json() == {"success": True, "updated_count": 5, "operation": "categorize"}
+        db.expire_all()
+        assert {t.user_category_override for t in db.query(Transaction).filter(
+            Transaction.id.in_(ids))} == {"Travel"}
+
+    def test_foreign_ids_are_forbidden(self, bulk_db, client):
+        db, owner, other, _ = bulk_db
+
+        response = client.post("/api/v1/transactions/bulk", json={
+            "transaction_ids": [str(txn_id) for txn_id in _ids(db, owner) + _ids(db, other)[:1]],
+            "operation": "reconcile",
+        })
+
+        assert response.status_code == 403
+
+
+class TestBatchFeedback:
+    """Tests for POST /ml/feedback/batch."""
+
+    def test_batch_feedback_single_write_and_invalidation(self, bulk_db):
+        db, owner, other, _ = bulk_db
+        mine, theirs = _ids(db, owner), _ids(db, other)[:1]
+        items = [
+            {"transaction_id": str(txn_id), "correct_category": "Food", "was_correct": False}
+            for txn_id in mine + theirs
+        ]
+
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[get_current_verified_user] = lambda: owner
+        try:
+            with patch.object(ml_service, "update_from_feedback_batch",
+                              return_value={"retrain_triggered": False}) as record, \
+                    patch.object(ml_service, "invalidate_predictions") as invalidate:
+                response = TestClient(app).post("/api/v1/ml/feedback/batch", json=items)
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["processed_count"] == 6
+        assert body["successful_feedback"] == 5
+        assert record.call_count == 1
+        assert len(record.call_args.args[0]) == 5
+        assert invalidate.call_count == 1
+        assert len(invalidate.call_args.args[0]) == 5
+
+
+class TestFeedbackLog:
+    """Tests for batched feedback recording in the ML service."""
+
+    def test_feedback_batch_appends_all_entries(self, tmp_path):
+        with patch("src.services.ml_categorization.get_redis_client_sync", return_value=None):
+            service = MLCategorizationService(model_path=tmp_path)
+
+        service.update_from_feedback("a", "Food", True)
+        result = service.update_from_feedback_batch([
+            {"transaction_id": str(i), "correct_category": "Fuel", "was_correct": False}
+            for i in range(3)
+        ])
+
+        lines = (tmp_path / "feedback.jsonl").read_text().splitlines()
+        assert len(lines) == 4
+        assert json.loads(lines[-1])["correct_category"] == "Fuel"
+        assert result["total_feedback"] == 4
+        assert result["recorded_count"] == 3
+
+    def test_invalidate_predictions_uses_one_delete(self, tmp_path):
+        redis_client = MagicMock()
+        with patch("src.services.ml_categorization.get_redis_client_sync",
+                   return_value=redis_client):
+            service = MLCategorizationService(model_path=tmp_path)
+
+        rows = [
+            MagicMock(name=f"row{i}", merchant_name="Shop", amount=Decimal(i),
+                      date=date(2024, 1, 1))
+            for i in range(3)
+        ]
+        service.invalidate_predictions(rows)
+
+        assert redis_client.delete.call_count == 1
+        assert len(redis_client.delete.call_args.args) == 3
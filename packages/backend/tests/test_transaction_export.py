@@ -0,0 +1,225 @@
+"""Tests for the streaming transaction export service and export jobs."""
+
+import io
+import os
+import time
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.database import Base
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.services import transaction_export
+from src.services.transaction_export import (
+    EXPORT_HEADERS,
+    TransactionExportService,
+    create_export_job,
+    estimate_column_widths,
+    format_export_row,
+    get_export_job,
+    get_export_job_file,
+    run_excel_export_job,
+)
+
+EXPORT_TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot)
+]
+
+
+@pytest.fixture
+def export_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine, tables=EXPORT_TABLES)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def export_data(export_engine):
+    """User with one account and a mix of categorized transactions."""
+    db = Session(bind=export_engine)
+    user = User(email="export@example.com", username="exporter", hashed_password="x")
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_export", access_token="token")
+    db.add(item)
+    db.flush()
+    account = Account(
+        user_id=user.id,
+        plaid_item_id=item.id,
+        plaid_account_id="acct_export",
+        name="Checking",
+        account_type="depository",
+    )
+    groceries = Category(name="Groceries")
+    db.add_all([account, groceries])
+    db.flush()
+
+    db.add_all([
+        Transaction(
+            account_id=account.id, plaid_transaction_id="t1", amount=-40,
+            date=date(2024, 3, 1), name="Market", category_id=groceries.id,
+        ),
+        Transaction(
+            account_id=account.id, plaid_transaction_id="t2", amount=-60,
+            date=date(2024, 3, 2), name="Grocer", category_id=groceries.id,
+            tags=["food", "weekly"],
+        ),
+        Transaction(
+            account_id=account.id, plaid_transaction_id="t3", amount=1500,
+            date=date(2024, 3, 3), name="Payroll", user_category_override="Salary",
+        ),
+        Transaction(
+            account_id=account.id, plaid_transaction_id="t4", amount=-5,
+            date=date(2024, 2, 1), name="Fee",
+        ),
+    ])
+    db.commit()
+    yield db, user
+    db.close()
+
+
+class TestExportHelpers:
+    """Tests for row formatting and width estimation."""
+
+    def test_format_export_row(self):
+        row = (date(2024, 1, 2), "Coffee", None, -3.5, None, "Checking",
+               True, False, None, ["a", "b"])
+        assert format_export_row(row) == [
+            date(2024, 1, 2), "Coffee", "", -3.5, "", "Checking",
+            "Pending", "No", "", "a, b",
+        ]
+
+    def test_estimate_column_widths_uses_sample_and_caps(self):
+        rows = [["Date", "Description"], ["2024-01-01", "x" * 80]]
+        assert estimate_column_widths(rows) == [12, 50]
+
+
+class TestTransactionExportService:
+    """Tests for the streaming Excel export."""
+
+    def test_summary_is_aggregated_in_database(self, export_data):
+        db, user = export_data
+        summary = TransactionExportService(db).get_summary(user.id)
+
+        assert summary["total_transactions"] == 4
+        assert summary["total_income"] == 1500
+        assert summary["total_expenses"] == 105
+        assert summary["net_amount"] == 1395
+        assert summary["categories"] == [
+            ("Salary", 1500.0), ("Groceries", -100.0), ("Uncategorized", -5.0)
+        ]
+
+    def test_summary_respects_date_filter(self, export_data):
+        db, user = export_data
+        summary = TransactionExportService(db).get_summary(
+            user.id, start_date=date(2024, 3, 1)
+        )
+        assert summary["total_transactions"] == 3
+
+    def test_write_excel(self, export_data):
+        db, user = export_data
+        output = io.BytesIO()
+
+        row_count = TransactionExportService(db).write_excel(output, user.id)
+
+        assert row_count == 4
+        output.seek(0)
+        wb = load_workbook(output)
+        assert wb.sheetnames == ["Transactions", "Summary"]
+
+        ws = wb["Transactions"]
+        assert [cell.value for cell in ws[1]] == EXPORT_HEADERS
+        assert ws.max_row == 5
+        assert ws["B2"].value == "Payroll"
+        assert ws["E3"].value == "Groceries"
+        assert ws["J3"].value == "food, weekly"
+        assert ws["D3"].font.color.rgb.endswith("FF0000")
+        assert ws.column_dimensions["B"].width == len("Description") + 2
+
+        summary = {row[0].value: row[1].value for row in wb["Summary"].iter_rows()}
+        assert summary["Total Transactions"] == 4
+        assert summary["Net Amount"] == 1395
+
+    def test_write_excel_without_summary(self, export_data):
+        db, user = export_data
+        output = io.BytesIO()
+        TransactionExportService(db).write_excel(output, user.id, include_summary=False)
+        output.seek(0)
+        assert load_workbook(output).sheetnames == ["Transactions"]
+
+
+class TestExportJobs:
+    """Tests for background export jobs."""
+
+    @pytest.fixture(autouse=True)
+    def local_job_store(self, tmp_path):
+        with patch("src.utils.job_store.get_redis_client_sync", return_value=None), \
+                patch.object(transaction_export.settings, "export_directory", str(tmp_path)):
+            transaction_export.export_jobs.clear_local()
+            yield
+
+    def test_run_excel_export_job(self, export_engine, export_data):
+        _, user = export_data
+        job = create_export_job(user.id, {"include_summary": True})
+        assert get_export_job(job["job_id"])["status"] == "pending"
+
+        run_excel_export_job(job["job_id"], export_engine, user.id)
+
+        finished = get_export_job(job["job_id"])
+        assert finished["status"] == "completed"
+        assert finished["row_count"] == 4
+        path = get_export_job_file(finished)
+        assert path is not None
+        assert load_workbook(path)["Transactions"].max_row == 5
+
+    def test_local_jobs_expire_after_ttl(self, export_data):
+        _, user = export_data
+        with patch.object(transaction_export.settings, "export_job_ttl", 0):
+            job = create_export_job(user.id, {})
+
+        assert get_export_job(job["job_id"]) is None
+
+    def test_expired_files_removed_on_new_job(self, export_data, tmp_path):
+        _, user = export_data
+        expired, partial, recent = (tmp_path / "old.xlsx", tmp_path / "old.xlsx.part",
+                                    tmp_path / "new.xlsx")
+        for path in (expired, partial, recent):
+            path.write_bytes(b"xlsx")
+        stale = time.time() - transaction_export.settings.export_job_ttl - 60
+        os.utime(expired, (stale, stale))
+        os.utime(partial, (stale, stale))
+
+        create_export_job(user.id, {})
+
+        assert not expired.exists()
+        assert not partial.exists()
+        assert recent.exists()
+
+    def test_failed_job_records_error(self, export_engine, export_data):
+        _, user = export_data
+        job = create_export_job(user.id, {})
+
+        with patch.object(
+            TransactionExportService, "write_excel", side_effect=RuntimeError("boom")
+        ):
+            run_excel_export_job(job["job_id"], export_engine, user.id)
+
+        failed = get_export_job(job["job_id"])
+        assert failed["status"] == "failed"
+        assert failed["error"] == "boom"
+        assert get_export_job_file(failed) is None
@@ -0,0 +1,246 @@
+"""Tests for keyset (cursor) pagination and search of the transaction list."""
+
+import asyncio
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.main import app
+from src.database import Base, get_async_db
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.dependencies.auth import get_current_verified_user
+from src.routers import transactions as transactions_router
+from src.services.transaction_search import search_filter, search_rank
+from src.utils.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    filter_signature,
+)
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot)
+]
+
+
+class TestCursorEncoding:
+    """Tests for opaque cursor encoding."""
+
+    def test_round_trip_date(self):
+        row_id = uuid4()
+        cursor = encode_cursor("date", "desc", date(2024, 5, 1), row_id)
+        assert decode_cursor(cursor, "date", "desc") == (date(2024, 5, 1), row_id)
+
+    def test_round_trip_decimal(self):
+        row_id = uuid4()
+        cursor = encode_cursor("amount", "asc", Decimal("-12.50"), row_id)
+        assert decode_cursor(cursor, "amount", "asc") == (Decimal("-12.50"), row_id)
+
+    def test_rejects_cursor_for_other_sort(self):
+        cursor = encode_cursor("date", "desc", date(2024, 5, 1), uuid4())
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, "amount", "desc")
+
+    def test_rejects_garbage(self):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor", "date", "desc")
+
+    def test_filter_signature_is_order_independent(self):
+        assert filter_signature({"a": 1, "b": None}) == filter_signature({"b": None, "a": 1})
+        assert filter_signature({"a": 1}) != filter_signature({"a": 2})
+
+
+@pytest.fixture
+def paging_client(tmp_path):
+    # A file database, so the sync seeding engine and the async engine the
+    # endpoint uses see the same data
+    database = tmp_path / "paging.db"
+    engine = create_engine(f"sqlite:///{database}")
+    # NullPool: each request may run on a new event loop, so async
+    # connections must not be pooled across requests
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="pager@example.com", username="pager", hashed_password="x",
+                is_verified=True)
+    db.add(user)
+    db.flush()
+    item = PlaidItem(user_id=user.id, plaid_item_id="item_page", access_token="token")
+    db.add(item)
+    db.flush()
+    account = Account(user_id=user.id, plaid_item_id=item.id,
+                      plaid_account_id="acct_page", name="Checking",
+                      account_type="depository")
+    db.add(account)
+    db.flush()
+    # Three transactions share each date so pages must break ties on id
+    for i in range(25):
+        db.add(Transaction(
+            account_id=account.id,
+            plaid_transaction_id=f"page_{i}",
+            amount=Decimal(i % 10) - 5,
+            date=date(2024, 1, 1 + i // 3),
+            name=f"Txn {i}",
+        ))
+    db.commit()
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_verified_user] = lambda: user
+    cache = {}
+
+    async def fake_get(key):
+        return cache.get(key)
+
+    async def fake_set(key, value, expire=None):
+        cache[key] = value
+        return True
+
+    with patch.object(transactions_router, "cache_get", AsyncMock(side_effect=fake_get)), \
+            patch.object(transactions_router, "cache_set", AsyncMock(side_effect=fake_set)):
+        yield TestClient(app)
+
+    app.dependency_overrides.clear()
+    db.close()
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+def _collect_pages(client, **params):
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, page_size=10)
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/api/v1/transactions/", params=query)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        pages.append(body)
+        cursor = body["next_cursor"]
+        if not body["has_more"]:
+            assert cursor is None
+            return pages
+
+
+class TestKeysetPagination:
+    """Tests for GET /transactions keyset pagination."""
+
+    def test_walks_all_pages_without_duplicates(self, paging_client):
+        pages = _collect_pages(paging_client)
+
+        assert [len(page["items"]) for page in pages] == [10, 10, 5]
+        ids = [item["id"] for page in pages for item in page["items"]]
+        assert len(ids) == len(set(ids)) == 25
+
+        dates = [item["date"] for page in pages for item in page["items"]]
+        assert dates == sorted(dates, reverse=True)
+
+    def test_total_is_cached_after_first_page(self, paging_client):
+        pages = _collect_pages(paging_client)
+        assert pages[0]["total"] == 25
+        assert pages[0]["total_is_cached"] is False
+        assert all(page["total"] == 25 and page["total_is_cached"] for page in pages[1:])
+
+    def test_sort_by_amount_ascending(self, paging_client):
+        pages = _collect_pages(paging_client, sort_by="amount", sort_order="asc")
+        amounts = [item["amount"] for page in pages for item in page["items"]]
+        assert len(amounts) == 25
+        assert amounts == sorted(amounts)
+
+    def test_total_can_be_skipped(self, paging_client):
+        response = paging_client.get(
+            "/api/v1/transactions/", params={"include_total": False}
+        )
+        assert response.status_code == 200
+        assert response.json()["total"] is None
+
+    def test_rejects_unindexed_sort_field(self, paging_client):
+        response = paging_client.get("/api/v1/transactions/", params={"sort_by": "notes"})
+        assert response.status_code == 400
+
+    def test_rejects_cursor_from_other_sort(self, paging_client):
+        first = paging_client.get("/api/v1/transactions/", params={"page_size": 5}).json()
+        response = paging_client.get(
+            "/api/v1/transactions/",
+            params={"cursor": first["next_cursor"], "sort_by": "amount"}
+        )
+        assert response.status_code == 400
+
+
+    def test_deprecated_page_parameter(self, paging_client):
+        pages = _collect_pages(paging_client)
+        assert pages[0]["page"] == 1
+        assert pages[1]["page"] is None
+
+        response = paging_client.get("/api/v1/transactions/", params={"page": 2, "page_size": 10})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["page"] == 2
+        assert body["pages"] == 3
+        assert [item["id"] for item in body["items"]] == [item["id"] for item in pages[1]["items"]]
+
+    def test_rejects_cursor_with_page(self, paging_client):
+        first = paging_client.get("/api/v1/transactions/", params={"page_size": 5}).json()
+        response = paging_client.get(
+            "/api/v1/transactions/", params={"cursor": first["next_cursor"], "page": 2}
+        )
+        assert response.status_code == 400
+
+
+class TestTransactionSearch:
+    """Tests for transaction search filtering and relevance ordering."""
+
+    def test_postgres_search_uses_indexes(self):
+        dialect = postgresql.dialect()
+        where = str(search_filter("coffee", indexed=True).compile(dialect=dialect))
+        assert "transactions.search_vector @@ websearch_to_tsquery" in where
+        assert "ILIKE" in where
+        assert "<%" in where
+
+        rank = str(search_rank("coffee", indexed=True).compile(dialect=dialect))
+        assert "ts_rank_cd" in rank
+        assert "word_similarity" in rank
+
+    def test_fallback_search_escapes_wildcards(self):
+        clause = search_filter("100%", indexed=False)
+        assert clause.clauses[0].right.value == "%100\\%%"
+
+    def test_search_combines_with_filters(self, paging_client):
+        response = paging_client.get(
+            "/api/v1/transactions/",
+            params={"search": "Txn 1", "min_amount": 0}
+        )
+        assert response.status_code == 200
+        names = {item["name"] for item in response.json()["items"]}
+        assert names
+        assert all(name.startswith("Txn 1") for name in names)
+
+    def test_relevance_sort_pages(self, paging_client):
+        pages = _collect_pages(paging_client, search="Txn", sort_by="relevance")
+        ids = [item["id"] for page in pages for item in page["items"]]
+        assert len(ids) == len(set(ids)) == 25
+
+    def test_relevance_requires_search(self, paging_client):
+        response = paging_client.get("/api/v1/transactions/", params={"sort_by": "relevance"})
+        assert response.status_code == 400
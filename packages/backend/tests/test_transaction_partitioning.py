@@ -0,0 +1,163 @@
+"""
+Tests for date partitioning of the transactions table.
+
+The PostgreSQL tests are skipped unless PARTITION_TEST_DATABASE_URL points
+at a scratch database; they create their own partitioned transactions table.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import Column, Date, MetaData, Numeric, String, Table, create_engine, select, text
+
+from src.config import settings
+from src.database.partitioning import (
+    DEFAULT_PARTITION, advance, ensure_transaction_partitions, existing_partitions,
+    is_partitioned, partition_interval, partition_name, partition_ranges, scanned_partitions
+)
+
+PARTITION_TEST_DATABASE_URL = os.getenv("PARTITION_TEST_DATABASE_URL")
+
+
+class TestPartitionRanges:
+    """Tests for partition naming and bounds."""
+
+    def test_yearly_names(self):
+        assert partition_name(date(2024, 1, 1), "year") == "transactions_y2024"
+
+    def test_monthly_names(self):
+        assert partition_name(date(2024, 3, 1), "month") == "transactions_y2024m03"
+
+    def test_yearly_ranges(self):
+        ranges = partition_ranges(date(2023, 6, 15), date(2024, 2, 1), "year")
+
+        assert ranges == [
+            ("transactions_y2023", date(2023, 1, 1), date(2024, 1, 1)),
+            ("transactions_y2024", date(2024, 1, 1), date(2025, 1, 1)),
+        ]
+
+    def test_monthly_ranges_cross_year(self):
+        ranges = partition_ranges(date(2023, 11, 20), date(2024, 1, 5), "month")
+
+        assert [name for name, _, _ in ranges] == [
+            "transactions_y2023m11", "transactions_y2023m12", "transactions_y2024m01"
+        ]
+        assert ranges[1][1:] == (date(2023, 12, 1), date(2024, 1, 1))
+
+    def test_advance(self):
+        assert advance(date(2024, 11, 15), 2, "month") == date(2025, 1, 1)
+        assert advance(date(2024, 11, 15), 1, "year") == date(2025, 1, 1)
+        assert advance(date(2024, 11, 15), 0, "year") == date(2024, 1, 1)
+
+    def test_unknown_interval(self):
+        with pytest.raises(ValueError):
+            partition_ranges(date(2024, 1, 1), date(2024, 2, 1), "week")
+
+    def test_interval_detected_from_existing_partitions(self):
+        assert partition_interval({DEFAULT_PARTITION, "transactions_y2024m05"}) == "month"
+        assert partition_interval({DEFAULT_PARTITION, "transactions_y2024"}) == "year"
+
+    def test_interval_falls_back_to_settings(self):
+        with patch.object(settings, "transaction_partition_interval", "month"):
+            assert partition_interval({DEFAULT_PARTITION}) == "month"
+
+
+class TestUnpartitionedDatabase:
+    """Partition maintenance is a no-op outside PostgreSQL."""
+
+    def test_sqlite_is_not_partitioned(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            assert is_partitioned(conn) is False
+            assert ensure_transaction_partitions(conn) == []
+        engine.dispose()
+
+
+@pytest.fixture
+def partitioned_db():
+    """Scratch PostgreSQL schema with a yearly partitioned transactions table."""
+    engine = create_engine(PARTITION_TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS partition_test CASCADE"))
+        conn.execute(text("CREATE SCHEMA partition_test"))
+        conn.execute(text("SET search_path TO partition_test"))
+        conn.execute(text(
+            "CREATE TABLE transactions (id serial, date date NOT NULL, "
+            "name text, amount numeric(12, 2), PRIMARY KEY (id, date)) "
+            "PARTITION BY RANGE (date)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE transactions_y2023 PARTITION OF transactions "
+            "FOR VALUES FROM ('2023-01-01') TO ('2024-01-01')"
+        ))
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF transactions DEFAULT"))
+        conn.execute(text(
+            "INSERT INTO transactions (date, name, amount) VALUES "
+            "('2023-05-01', 'old', 1), ('2024-02-01', 'stranded', 2)"
+        ))
+    with engine.connect() as conn:
+        conn.execute(text("SET search_path TO partition_test"))
+        conn.commit()
+        yield conn
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA partition_test CASCADE"))
+    engine.dispose()
+
+
+transactions = Table(
+    "transactions", MetaData(),
+    Column("date", Date), Column("name", String), Column("amount", Numeric)
+)
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not PARTITION_TEST_DATABASE_URL, reason="PARTITION_TEST_DATABASE_URL not set")
+class TestPostgresPartitions:
+    """Tests against a real partitioned table."""
+
+    def test_future_partitions_created(self, partitioned_db):
+        created = ensure_transaction_partitions(partitioned_db, today=date(2024, 6, 1), ahead=1)
+        partitioned_db.commit()
+
+        assert created == ["transactions_y2024", "transactions_y2025"]
+        assert {"transactions_y2024", "transactions_y2025"} <= existing_partitions(partitioned_db)
+        assert ensure_transaction_partitions(partitioned_db, today=date(2024, 6, 1), ahead=1) == []
+
+    def test_rows_move_out_of_default_partition(self, partitioned_db):
+        ensure_transaction_partitions(partitioned_db, today=date(2024, 6, 1), ahead=0)
+        partitioned_db.commit()
+
+        assert partitioned_db.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() == 0
+        assert partitioned_db.execute(text("SELECT name FROM transactions_y2024")).scalar() == "stranded"
+
+    def test_concurrent_callers_create_each_partition_once(self, partitioned_db):
+        def worker(_):
+            with partitioned_db.engine.begin() as conn:
+                conn.execute(text("SET LOCAL search_path TO partition_test"))
+                return ensure_transaction_partitions(conn, today=date(2024, 6, 1), ahead=2)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(worker, range(4)))
+
+        assert sorted(name for created in results for name in created) == [
+            "transactions_y2024", "transactions_y2025", "transactions_y2026"
+        ]
+
+    def test_date_range_prunes_partitions(self, partitioned_db):
+        ensure_transaction_partitions(partitioned_db, today=date(2024, 6, 1), ahead=1)
+        start = date(2024, 3, 1)
+        statement = select(transactions.c.amount).where(
+            transactions.c.date >= start, transactions.c.date <= start + timedelta(days=30)
+        )
+
+        assert scanned_partitions(partitioned_db, statement) == ["transactions_y2024"]
+
+    def test_unfiltered_query_scans_all_partitions(self, partitioned_db):
+        statement = select(transactions.c.amount).where(transactions.c.name == "old")
+
+        assert scanned_partitions(partitioned_db, statement) == [
+            DEFAULT_PARTITION, "transactions_y2023"
+        ]
@@ -0,0 +1,144 @@
+"""Tests for the denormalized transactions.user_id and the queries using it."""
+
+import asyncio
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from src.main import app
+from src.database import Base, get_async_db
+from src.database.models import (
+    User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+    AccountBalanceSnapshot
+)
+from src.dependencies.auth import get_current_active_user, get_current_verified_user
+from src.dependencies.database import get_async_read_db
+from src.routers import transactions as transactions_router
+
+TABLES = [
+    model.__table__
+    for model in (User, Institution, PlaidItem, Account, Category, TaxCategory, Transaction,
+                  AccountBalanceSnapshot)
+]
+
+
+def _add_account(db, user, name, is_active=True):
+    item = PlaidItem(user_id=user.id, plaid_item_id=f"item_{name}", access_token="token")
+    db.add(item)
+    db.flush()
+    account = Account(user_id=user.id, plaid_item_id=item.id, plaid_account_id=f"acct_{name}",
+                      name=name, account_type="depository", is_active=is_active)
+    db.add(account)
+    db.flush()
+    return account
+
+
+@pytest.fixture
+def tenant_db(tmp_path):
+    # A file database, so the sync seeding engine and the async engine the
+    # endpoints use see the same data
+    database = tmp_path / "tenant.db"
+    engine = create_engine(f"sqlite:///{database}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    db = sessionmaker(bind=engine)()
+
+    owner = User(email="owner@example.com", username="owner", hashed_password="x", is_verified=True)
+    other = User(email="other@example.com", username="other", hashed_password="x", is_verified=True)
+    db.add_all([owner, other])
+    db.flush()
+    accounts = {
+        "checking": _add_account(db, owner, "checking"),
+        "closed": _add_account(db, owner, "closed", is_active=False),
+        "foreign": _add_account(db, other, "foreign"),
+    }
+    recent = date.today() - timedelta(days=2)
+    for name, account in accounts.items():
+        db.add(Transaction(account_id=account.id, plaid_transaction_id=f"txn_{name}",
+                           amount=Decimal("10.00"), date=recent, name=f"{name} purchase",
+                           subcategory=name.title()))
+    db.commit()
+
+    yield db, owner, other, accounts, async_sessionmaker(async_engine, expire_on_commit=False)
+
+    db.close()
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def tenant_client(tenant_db):
+    db, owner, _, _, async_session = tenant_db
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    app.dependency_overrides[get_current_verified_user] = lambda: owner
+    app.dependency_overrides[get_current_active_user] = lambda: owner
+    with patch.object(transactions_router, "cache_get", AsyncMock(return_value=None)), \
+            patch.object(transactions_router, "cache_set", AsyncMock(return_value=True)):
+        yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+class TestUserIdPopulation:
+    """Tests for filling transactions.user_id at insert time."""
+
+    def test_filled_from_account_on_insert(self, tenant_db):
+        db, owner, other, accounts, _ = tenant_db
+
+        owners = dict(db.execute(select(Transaction.plaid_transaction_id, Transaction.user_id)).all())
+
+        assert owners == {"txn_checking": owner.id, "txn_closed": owner.id, "txn_foreign": other.id}
+
+    def test_explicit_user_id_kept(self, tenant_db):
+        db, owner, _, accounts, _ = tenant_db
+        account_id, user_id = accounts["checking"].id, owner.id
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+
+        db.add(Transaction(account_id=account_id, user_id=user_id,
+                           plaid_transaction_id="txn_explicit", amount=Decimal("1.00"),
+                           date=date.today(), name="Explicit"))
+        db.commit()
+
+        assert not any("FROM accounts" in statement for statement in statements)
+
+    def test_recomputed_when_account_changes(self, tenant_db):
+        db, _, other, accounts, _ = tenant_db
+        transaction = db.query(Transaction).filter_by(plaid_transaction_id="txn_checking").one()
+
+        transaction.account_id = accounts["foreign"].id
+        db.commit()
+
+        assert db.execute(
+            select(Transaction.user_id).where(Transaction.plaid_transaction_id == "txn_checking")
+        ).scalar() == other.id
+
+
+class TestUserScopedQueries:
+    """Tests for the endpoints filtering on transactions.user_id."""
+
+    def test_list_returns_only_own_transactions(self, tenant_client):
+        response = tenant_client.get("/api/v1/transactions/", params={"include_total": "false"})
+
+        assert response.status_code == 200, response.text
+        names = {item["name"] for item in response.json()["items"]}
+        assert names == {"checking purchase", "closed purchase"}
+
+    def test_spending_excludes_inactive_and_foreign_accounts(self, tenant_client):
+        response = tenant_client.get("/api/v1/dashboard/spending/by-category")
+
+        assert response.status_code == 200, response.text
+        assert [entry["name"] for entry in response.json()["data"]] == ["Checking"]
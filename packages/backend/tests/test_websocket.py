@@ -0,0 +1,264 @@
+"""Tests for WebSocket fan-out through Redis pub/sub and offline streams."""
+
+import asyncio
+import json
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src import websocket as websocket_module
+from src.config import settings
+from src.main import app
+from src.utils.security import create_access_token, create_refresh_token
+from src.websocket import BROADCAST_CHANNEL, ConnectionManager, get_current_user_websocket
+
+WEBSOCKET_TEST_REDIS_URL = os.getenv("WEBSOCKET_TEST_REDIS_URL")
+
+
+def _socket():
+    socket = MagicMock()
+    socket.accept = AsyncMock()
+    socket.send_text = AsyncMock()
+    return socket
+
+
+def _redis(receivers=0, queued=None):
+    redis = MagicMock()
+    redis.publish = AsyncMock(return_value=receivers)
+    redis.xrange = AsyncMock(return_value=queued or [])
+    redis.xdel = AsyncMock()
+    pubsub = redis.pubsub.return_value
+    pubsub.subscribe = AsyncMock()
+    pubsub.unsubscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+    pubsub.get_message = AsyncMock(side_effect=lambda timeout: asyncio.sleep(timeout))
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=["1-0", True])
+    redis.pipeline.return_value.__aenter__.return_value = pipe
+    return redis, pubsub, pipe
+
+
+class TestPubSubFanOut:
+    """Tests for delivering messages through per-user channels."""
+
+    async def test_connect_subscribes_to_user_channel(self):
+        redis, pubsub, _ = _redis()
+        manager = ConnectionManager(redis_client=redis)
+        first, second = _socket(), _socket()
+
+        await manager.connect(first, "42")
+        await manager.connect(second, "42")
+        await manager.disconnect(first, "42")
+        pubsub.unsubscribe.assert_not_awaited()
+        await manager.disconnect(second, "42")
+        await manager.close()
+
+        subscribed = [call.args[0] for call in pubsub.subscribe.await_args_list]
+        assert subscribed == [BROADCAST_CHANNEL, "ws:user:42"]
+        pubsub.unsubscribe.assert_awaited_once_with("ws:user:42")
+        pubsub.aclose.assert_awaited_once()
+
+    async def test_redis_io_happens_outside_the_lock(self):
+        redis, pubsub, _ = _redis(queued=[("1-0", {"message": "queued"})])
+        manager = ConnectionManager(redis_client=redis)
+        held = []
+        record = lambda *args, **kwargs: held.append(manager.lock.locked())
+        pubsub.subscribe.side_effect = record
+        pubsub.unsubscribe.side_effect = record
+        redis.xrange.side_effect = lambda *args: held.append(manager.lock.locked()) or \
+            [("1-0", {"message": "queued"})]
+        socket = _socket()
+
+        await manager.connect(socket, "42")
+        await manager.disconnect(socket, "42")
+        await manager.close()
+
+        assert held == [False] * 4
+        socket.send_text.assert_awaited_once_with("queued")
+
+    async def test_quick_disconnect_leaves_no_subscription(self):
+        redis, pubsub, _ = _redis()
+        manager = ConnectionManager(redis_client=redis)
+        socket = _socket()
+
+        # The socket goes away while connect waits to subscribe
+        await manager._pubsub_lock.acquire()
+        connecting = asyncio.create_task(manager.connect(socket, "42"))
+        await asyncio.sleep(0)
+        disconnecting = asyncio.create_task(manager.disconnect(socket, "42"))
+        await asyncio.sleep(0)
+        manager._pubsub_lock.release()
+        await asyncio.gather(connecting, disconnecting)
+        await manager.close()
+
+        subscribed = [call.args[0] for call in pubsub.subscribe.await_args_list]
+        assert "ws:user:42" not in subscribed
+
+    async def test_published_message_not_sent_twice(self):
+        redis, _, pipe = _redis(receivers=1)
+        manager = ConnectionManager(redis_client=redis)
+        socket = _socket()
+        await manager.connect(socket, "42")
+
+        await manager.send_user_message("42", {"type": "notification"})
+        await manager.close()
+
+        redis.publish.assert_awaited_once_with("ws:user:42", '{"type": "notification"}')
+        # The listener delivers it, not the sender
+        socket.send_text.assert_not_awaited()
+        pipe.xadd.assert_not_called()
+
+    async def test_listener_delivers_to_local_sockets(self):
+        redis, _, _ = _redis()
+        manager = ConnectionManager(redis_client=redis)
+        mine, other = _socket(), _socket()
+        await manager.connect(mine, "42")
+        await manager.connect(other, "7")
+
+        await manager._dispatch("ws:user:42", "hello")
+        await manager._dispatch(BROADCAST_CHANNEL,
+                                json.dumps({"message": "system", "exclude_user": "7"}))
+        await manager.close()
+
+        assert [call.args[0] for call in mine.send_text.await_args_list] == ["hello", "system"]
+        other.send_text.assert_not_awaited()
+
+    async def test_broadcast_published_once(self):
+        redis, _, _ = _redis(receivers=3)
+        manager = ConnectionManager(redis_client=redis)
+        socket = _socket()
+        await manager.connect(socket, "42")
+
+        await manager.broadcast({"type": "system"}, exclude_user="7")
+        await manager.close()
+
+        channel, payload = redis.publish.await_args.args
+        assert channel == BROADCAST_CHANNEL
+        assert json.loads(payload) == {"message": '{"type": "system"}', "exclude_user": "7"}
+        socket.send_text.assert_not_awaited()
+
+
+class TestEndpoint:
+    """Tests for authenticating and mounting the WebSocket endpoint."""
+
+    @staticmethod
+    def _session(user):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = user
+        session = MagicMock()
+        session.return_value.__enter__.return_value = db
+        return patch.object(websocket_module, "SessionLocal", session)
+
+    async def test_accepts_access_token(self):
+        user = MagicMock(id="42")
+        socket = _socket()
+        socket.close = AsyncMock()
+        token = create_access_token({"sub": "42"})
+
+        with self._session(user) as session:
+            assert await get_current_user_websocket(socket, token) is user
+
+        # The session is closed before the socket's receive loop starts
+        session.return_value.__exit__.assert_called_once()
+        socket.close.assert_not_awaited()
+
+    async def test_rejects_refresh_token(self):
+        socket = _socket()
+        socket.close = AsyncMock()
+        token = create_refresh_token({"sub": "42"})
+
+        with self._session(MagicMock()):
+            assert await get_current_user_websocket(socket, token) is None
+        socket.close.assert_awaited_once()
+
+    def test_endpoint_is_mounted(self):
+        assert "/ws" in {route.path for route in app.routes}
+
+
+class TestOfflineQueue:
+    """Tests for the capped per-user Redis streams."""
+
+    async def test_offline_message_appended_to_capped_stream(self):
+        redis, _, pipe = _redis(receivers=0)
+        manager = ConnectionManager(redis_client=redis)
+
+        await manager.send_user_message("42", {"type": "notification"})
+
+        pipe.xadd.assert_called_once_with(
+            "ws:queue:42", {"message": '{"type": "notification"}'}, "*",
+            settings.websocket_offline_queue_max, False
+        )
+        pipe.expire.assert_called_once_with("ws:queue:42", settings.websocket_offline_queue_ttl)
+        assert manager.message_queue == {}
+
+    async def test_connect_sends_and_deletes_queued_messages(self):
+        queued = [("1-0", {"message": "first"}), ("2-0", {"message": "second"})]
+        redis, _, _ = _redis(queued=queued)
+        manager = ConnectionManager(redis_client=redis)
+        socket = _socket()
+
+        await manager.connect(socket, "42")
+        await manager.close()
+
+        assert [call.args[0] for call in socket.send_text.await_args_list] == ["first", "second"]
+        redis.xrange.assert_awaited_once_with("ws:queue:42")
+        redis.xdel.assert_awaited_once_with("ws:queue:42", "1-0", "2-0")
+
+
+class TestWithoutRedis:
+    """Tests for the single-worker fallback while Redis is unavailable."""
+
+    @pytest.fixture(autouse=True)
+    def no_redis(self):
+        with patch.object(websocket_module.redis_registry, "get_async_client",
+                          AsyncMock(return_value=None)):
+            yield
+
+    async def test_delivers_to_local_sockets(self):
+        manager = ConnectionManager()
+        socket = _socket()
+        await manager.connect(socket, "42")
+
+        await manager.send_user_message("42", {"type": "notification"})
+        await manager.broadcast({"type": "system"})
+
+        sent = [call.args[0] for call in socket.send_text.await_args_list]
+        assert sent == ['{"type": "notification"}', '{"type": "system"}']
+
+    async def test_offline_messages_queued_in_memory(self):
+        manager = ConnectionManager()
+
+        with patch.object(settings, "websocket_offline_queue_max", 2):
+            for index in range(3):
+                await manager.send_user_message("42", {"index": index})
+        socket = _socket()
+        await manager.connect(socket, "42")
+
+        sent = [call.args[0] for call in socket.send_text.await_args_list]
+        assert sent == ['{"index": 1}', '{"index": 2}']
+        assert manager.message_queue == {}
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not WEBSOCKET_TEST_REDIS_URL, reason="WEBSOCKET_TEST_REDIS_URL not set")
+async def test_message_reaches_socket_on_other_worker():
+    import redis.asyncio as redis_async
+
+    clients = [redis_async.from_url(WEBSOCKET_TEST_REDIS_URL, decode_responses=True) for _ in range(2)]
+    receiving, sending = (ConnectionManager(redis_client=client) for client in clients)
+    user_id = f"test-{time.time()}"
+    socket = _socket()
+
+    await receiving.connect(socket, user_id)
+    await sending.send_user_message(user_id, {"type": "notification"})
+    for _ in range(50):
+        if socket.send_text.await_count:
+            break
+        await asyncio.sleep(0.05)
+
+    await receiving.close()
+    for client in clients:
+        await client.aclose()
+    socket.send_text.assert_awaited_once_with('{"type": "notification"}')